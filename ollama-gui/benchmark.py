@@ -0,0 +1,176 @@
+"""
+End-to-end performance harness for ollama-gui.
+
+Starts the mock Ollama server, drives OllamaInterface in a withdrawn Tk
+window and measures, for each streamed response:
+
+- time to first token, from send until the first token is on screen
+- UI thread stalls, from a heartbeat scheduled on the Tk event loop
+- render throughput, tokens per second from first to last render
+
+    python benchmark.py --tokens 5000 --tokens-per-sec 0 --runs 3
+
+Tk needs a display; on a headless machine run it under ``xvfb-run``.
+"""
+
+import sys
+import time
+import argparse
+import statistics
+
+from typing import List
+
+import tkinter as tk
+
+from mock_ollama import MockOllamaServer
+from ollama_gui import OllamaInterface, ConversationStore
+
+HEARTBEAT_MS = 10
+
+
+class Harness:
+    def __init__(self, root: tk.Tk, app: OllamaInterface, server: MockOllamaServer):
+        self.root = root
+        self.app = app
+        self.server = server
+
+        self.lags: List[float] = []
+        self.tick_durations: List[float] = []
+        self.sent_at = 0.0
+        self.first_render_at = 0.0
+        self.last_render_at = 0.0
+        self.finished_at = 0.0
+
+        self._last_beat = 0.0
+        self._wrap_interface()
+
+    def _wrap_interface(self):
+        """Time every render tick and catch the first and last render."""
+        app = self.app
+        render_tick = app.render_tick
+        finish_generation = app.finish_generation
+
+        def timed_render_tick():
+            start = time.perf_counter()
+            render_tick()
+            end = time.perf_counter()
+            self.tick_durations.append(end - start)
+            if self.sent_at and app.chat_view.text_of(-1):
+                if not self.first_render_at:
+                    self.first_render_at = end
+                self.last_render_at = end
+
+        def timed_finish_generation():
+            finish_generation()
+            self.finished_at = time.perf_counter()
+
+        # render_tick reschedules itself through the instance attribute
+        app.render_tick = timed_render_tick
+        app.finish_generation = timed_finish_generation
+
+    def _heartbeat(self):
+        now = time.perf_counter()
+        if self._last_beat:
+            self.lags.append(max(0.0, now - self._last_beat - HEARTBEAT_MS / 1000))
+        self._last_beat = now
+        self.root.after(HEARTBEAT_MS, self._heartbeat)
+
+    def wait(self, condition, timeout: float):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("benchmark step timed out")
+            self.root.update()
+            time.sleep(0.001)
+
+    def connect(self):
+        # Let the refresh started by OllamaInterface against the default host
+        # finish first, so that it cannot overwrite the model list later
+        self.wait(lambda: "disabled" not in self.app.refresh_button.state(), 30)
+        self.app.host_input.delete(0, tk.END)
+        self.app.host_input.insert(0, self.server.url)
+        self.app.refresh_models()
+        self.wait(lambda: "disabled" not in self.app.send_button.state(), 10)
+        self._heartbeat()
+
+    def run_once(self, timeout: float) -> dict:
+        self.lags.clear()
+        self.tick_durations.clear()
+        self.first_render_at = self.last_render_at = self.finished_at = 0.0
+
+        self.app.user_input.insert("1.0", "Write a long answer.")
+        sent_at = self.sent_at = time.perf_counter()
+        self.app.on_send_button()
+        self.wait(lambda: self.finished_at, timeout)
+        self.sent_at = 0.0
+
+        rendered = self.last_render_at - self.first_render_at
+        lags = sorted(self.lags)
+        return {
+            "ttft": self.first_render_at - sent_at if self.first_render_at else 0.0,
+            "total": self.finished_at - sent_at,
+            "tokens_per_sec": self.server.tokens / rendered if rendered > 0 else 0.0,
+            "ticks": len(self.tick_durations),
+            "tick_max": max(self.tick_durations, default=0.0),
+            "lag_p99": lags[int(len(lags) * 0.99)] if lags else 0.0,
+            "lag_max": lags[-1] if lags else 0.0,
+            "stall": sum(lag for lag in lags if lag > 0.05),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ollama-gui streaming benchmark")
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument(
+        "--tokens-per-sec",
+        type=float,
+        default=0,
+        help="mock streaming speed, 0 streams as fast as possible",
+    )
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args(argv)
+
+    server = MockOllamaServer(
+        tokens=args.tokens,
+        tokens_per_sec=args.tokens_per_sec,
+        latency=args.latency,
+    ).start()
+
+    root = tk.Tk()
+    root.withdraw()
+    # Keep benchmark conversations out of the user's chat history
+    app = OllamaInterface(root, store=ConversationStore(":memory:"))
+    harness = Harness(root, app, server)
+
+    results = []
+    try:
+        harness.connect()
+        for run in range(1, args.runs + 1):
+            result = harness.run_once(args.timeout)
+            results.append(result)
+            print(
+                f"run {run}: ttft {result['ttft'] * 1000:.0f} ms, "
+                f"total {result['total']:.2f} s, "
+                f"render {result['tokens_per_sec']:.0f} tok/s, "
+                f"ticks {result['ticks']} (max {result['tick_max'] * 1000:.1f} ms), "
+                f"ui lag p99 {result['lag_p99'] * 1000:.1f} ms "
+                f"max {result['lag_max'] * 1000:.1f} ms, "
+                f"stalled {result['stall'] * 1000:.0f} ms"
+            )
+    finally:
+        root.destroy()
+        server.stop()
+
+    if len(results) > 1:
+        print(
+            f"median: ttft {statistics.median(r['ttft'] for r in results) * 1000:.0f} ms, "
+            f"render {statistics.median(r['tokens_per_sec'] for r in results):.0f} tok/s, "
+            f"ui lag max {max(r['lag_max'] for r in results) * 1000:.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
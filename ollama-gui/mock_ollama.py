@@ -0,0 +1,335 @@
+"""
+A stand-in for the Ollama HTTP API, for testing and benchmarking ollama-gui
+without a real Ollama daemon or models.
+
+Implements /api/tags, /api/chat (NDJSON streaming with configurable latency
+and tokens per second), /api/pull progress and /api/delete.
+
+    python mock_ollama.py --port 11434 --tokens 500 --tokens-per-sec 40
+"""
+
+import json
+import time
+import argparse
+import threading
+
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Iterable, Tuple
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua"
+).split()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+    disable_nagle_algorithm = True  # send each streamed line at once
+    server: "MockOllamaServer"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def handle(self):
+        try:
+            super().handle()
+        except (ConnectionResetError, BrokenPipeError):
+            # The client dropped a keep-alive connection, e.g. on Stop or when
+            # its pool closed it
+            self.close_connection = True
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _send_json(self, data: dict, status: int = 200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str):
+        self._send_json({"error": message}, status)
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_line(self, data: dict):
+        line = json.dumps(data).encode("utf-8") + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(
+                {
+                    "models": [
+                        {
+                            "name": name,
+                            "model": name,
+                            "modified_at": _now(),
+                            "size": 0,
+                        }
+                        for name in self.server.list_models()
+                    ]
+                }
+            )
+        else:
+            self._send_error(404, "not found")
+
+    def do_POST(self):
+        if self.path == "/api/chat":
+            self._chat(self._read_json())
+        elif self.path == "/api/pull":
+            self._pull(self._read_json())
+        else:
+            self._send_error(404, "not found")
+
+    def do_DELETE(self):
+        if self.path != "/api/delete":
+            self._send_error(404, "not found")
+            return
+        name = self._read_json().get("name", "")
+        if self.server.remove_model(name):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self._send_error(404, f"model '{name}' not found")
+
+    def _chat(self, request: dict):
+        model = request.get("model", "")
+        if not self.server.has_model(model):
+            self._send_error(404, f"model '{model}' not found, try pulling it first")
+            return
+
+        start = time.perf_counter()
+        options = request.get("options") or {}
+        count = int(options.get("num_predict") or self.server.tokens)
+        prompt_tokens = sum(
+            len(str(message.get("content", "")).split()) + 4
+            for message in request.get("messages", [])
+        )
+
+        time.sleep(self.server.latency)
+        load_end = time.perf_counter()
+        if self.server.prompt_tokens_per_sec > 0:
+            time.sleep(prompt_tokens / self.server.prompt_tokens_per_sec)
+        prompt_end = time.perf_counter()
+
+        try:
+            if request.get("stream", True):
+                self._start_stream()
+                content = None
+                for token in self.server.generate(count):
+                    self._write_line(
+                        {
+                            "model": model,
+                            "created_at": _now(),
+                            "message": {"role": "assistant", "content": token},
+                            "done": False,
+                        }
+                    )
+            else:
+                content = "".join(self.server.generate(count))
+
+            end = time.perf_counter()
+            final = {
+                "model": model,
+                "created_at": _now(),
+                "message": {"role": "assistant", "content": content or ""},
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": int((end - start) * 1e9),
+                "load_duration": int((load_end - start) * 1e9),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int((prompt_end - load_end) * 1e9),
+                "eval_count": count,
+                "eval_duration": int((end - prompt_end) * 1e9),
+            }
+            if request.get("stream", True):
+                self._write_line(final)
+                self._end_stream()
+            else:
+                self._send_json(final)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, as the real server does it aborts
+            # the generation
+            self.close_connection = True
+
+    def _pull(self, request: dict):
+        name = request.get("name", "")
+        if not name:
+            self._send_error(400, "missing model name")
+            return
+
+        total = 4 * 1024 * 1024
+        steps = 8
+        try:
+            self._start_stream()
+            self._write_line({"status": "pulling manifest"})
+            for step in range(1, steps + 1):
+                time.sleep(self.server.pull_delay / steps)
+                self._write_line(
+                    {
+                        "status": "pulling 0123456789ab",
+                        "digest": "sha256:0123456789ab",
+                        "total": total,
+                        "completed": total * step // steps,
+                    }
+                )
+            self._write_line({"status": "verifying sha256 digest"})
+            self._write_line({"status": "writing manifest"})
+            self.server.add_model(name if ":" in name else f"{name}:latest")
+            self._write_line({"status": "success"})
+            self._end_stream()
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    """
+    Threaded mock server, one thread per connection.
+
+    Use ``start()`` to serve from a background thread, or
+    ``serve_forever()`` to serve from the calling thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        models: Iterable[str] = ("mock:latest",),
+        tokens: int = 200,
+        tokens_per_sec: float = 50.0,
+        prompt_tokens_per_sec: float = 2000.0,
+        latency: float = 0.2,
+        pull_delay: float = 1.0,
+        verbose: bool = False,
+    ):
+        """
+        :param address: host and port, port 0 picks a free port
+        :param models: names returned by /api/tags
+        :param tokens: tokens per chat response, options.num_predict overrides it
+        :param tokens_per_sec: streaming speed, 0 streams as fast as possible
+        :param prompt_tokens_per_sec: simulated prompt processing speed
+        :param latency: delay before the first token, like loading a model
+        :param pull_delay: duration of a simulated /api/pull
+        :param verbose: log every request to stderr
+        """
+        super().__init__(address, MockOllamaHandler)
+        self.tokens = tokens
+        self.tokens_per_sec = tokens_per_sec
+        self.prompt_tokens_per_sec = prompt_tokens_per_sec
+        self.latency = latency
+        self.pull_delay = pull_delay
+        self.verbose = verbose
+        self._models = list(models)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockOllamaServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def list_models(self):
+        with self._lock:
+            return list(self._models)
+
+    def has_model(self, name: str) -> bool:
+        with self._lock:
+            return name in self._models
+
+    def add_model(self, name: str):
+        with self._lock:
+            if name not in self._models:
+                self._models.append(name)
+
+    def remove_model(self, name: str) -> bool:
+        with self._lock:
+            if name in self._models:
+                self._models.remove(name)
+                return True
+            return False
+
+    def generate(self, count: int):
+        """Yield ``count`` tokens, paced to ``tokens_per_sec``."""
+        interval = 1 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0
+        start = time.perf_counter()
+        for i in range(count):
+            if interval:
+                # Pace against the start time so that sleep overshoot
+                # does not accumulate
+                delay = start + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            yield WORDS[i % len(WORDS)] + ("\n\n" if i % 60 == 59 else " ")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock Ollama API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument(
+        "--model",
+        action="append",
+        dest="models",
+        help="model name to serve, can be repeated (default: mock:latest)",
+    )
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0)
+    parser.add_argument("--prompt-tokens-per-sec", type=float, default=2000.0)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--pull-delay", type=float, default=1.0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = MockOllamaServer(
+        (args.host, args.port),
+        models=args.models or ("mock:latest",),
+        tokens=args.tokens,
+        tokens_per_sec=args.tokens_per_sec,
+        prompt_tokens_per_sec=args.prompt_tokens_per_sec,
+        latency=args.latency,
+        pull_delay=args.pull_delay,
+        verbose=args.verbose,
+    )
+    print(f"Mock Ollama listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,26 @@
+import os
 import sys
+import csv
 import json
+import argparse
+import bisect
 import time
+import queue
 import pprint
+import sqlite3
 import platform
 import webbrowser
 
+import http.client
 import urllib.parse
-import urllib.request
 
-from threading import Thread
-from typing import Optional, List, Generator
+from functools import partial
+from threading import Thread, Event, Lock, BoundedSemaphore
+from typing import Optional, List, Generator, Callable, Union, Tuple, Any, Dict
 
 try:
     import tkinter as tk
-    from tkinter import ttk, font, messagebox
+    from tkinter import ttk, font, messagebox, filedialog
 
 except (ModuleNotFoundError, ImportError):
     print(
@@ -24,6 +31,12 @@ except (ModuleNotFoundError, ImportError):
 
 __version__ = "1.2.1"
 
+# Streamed tokens are batched and rendered on the UI thread at this interval,
+# roughly 40 frames per second.
+RENDER_INTERVAL_MS = 25
+
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".ollama-gui")
+
 
 def _system_check(root: tk.Tk) -> Optional[str]:
     """
@@ -61,8 +74,1528 @@ def _system_check(root: tk.Tk) -> Optional[str]:
                 )
 
 
+class OllamaError(Exception):
+    """An error response from the Ollama API."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class OllamaClient:
+    """
+    A small HTTP client for the Ollama API that reuses keep-alive connections.
+
+    Idle connections are kept in a bounded pool, so refreshing the model list
+    or sending the next chat turn does not pay for a new TCP connection.
+    Requests that fail while connecting, or on a pooled connection the server
+    has already closed, are retried with exponential backoff.
+    Streaming endpoints are read line by line as NDJSON.
+    """
+
+    # Errors raised before the server has produced any response. These are
+    # safe to retry because the request was never processed.
+    RETRYABLE_ERRORS = (ConnectionError, http.client.BadStatusLine)
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 4,
+        timeout: float = 10.0,
+        stream_timeout: float = 300.0,
+        retries: int = 2,
+        backoff: float = 0.25,
+    ):
+        """
+        :param base_url: Ollama host, e.g. http://127.0.0.1:11434
+        :param pool_size: maximum number of idle connections kept open
+        :param timeout: connect timeout and read timeout of plain requests
+        :param stream_timeout: maximum wait between two lines of a stream,
+                               which includes loading the model
+        :param retries: retries after the first failed attempt
+        :param backoff: delay before the first retry, doubled on each retry
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.stream_timeout = stream_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(
+            maxsize=pool_size
+        )
+        self._base_url = ""
+        self.base_url = base_url
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    @base_url.setter
+    def base_url(self, url: str):
+        url = url.strip().rstrip("/")
+        if "://" not in url:
+            url = f"http://{url}"
+        if url == self._base_url:
+            return
+
+        parts = urllib.parse.urlsplit(url)
+        self._connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port
+        self._base_url = url
+        self.close()
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Send a request and return the decoded JSON body.
+
+        :param timeout: read timeout, defaults to the client timeout
+        :raise OllamaError: if the server answers with an error status
+        """
+        conn, response = self._open(
+            method, path, payload, self.timeout if timeout is None else timeout
+        )
+        reusable = False
+        try:
+            body = response.read()
+            reusable = True
+            if response.status >= 400:
+                raise OllamaError(response.status, self._error_message(body))
+            return json.loads(body) if body else {}
+        finally:
+            self._release(conn, response, reusable)
+
+    def stream(
+        self, method: str, path: str, payload: Optional[dict] = None
+    ) -> Generator[dict, None, None]:
+        """
+        Send a request and yield each line of the NDJSON response.
+
+        Closing the generator early closes the connection, which also tells
+        the server to stop generating.
+
+        :raise OllamaError: if the server answers with an error status
+        """
+        conn, response = self._open(method, path, payload, self.stream_timeout)
+        reusable = False
+        try:
+            if response.status >= 400:
+                body = response.read()
+                reusable = True
+                raise OllamaError(response.status, self._error_message(body))
+
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            reusable = True
+        finally:
+            self._release(conn, response, reusable)
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return an idle connection, or a new one if the pool is empty."""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            conn = self._connection_class(self._host, self._port, timeout=self.timeout)
+            return conn, False
+
+    def _release(
+        self,
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+        reusable: bool,
+    ):
+        """Put a connection back into the pool if it can serve another request."""
+        if not reusable or response.will_close:
+            conn.close()
+            return
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _open(
+        self, method: str, path: str, payload: Optional[dict], read_timeout: float
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send the request, retrying connection failures, and return the response."""
+        body = None
+        headers = {}
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        attempt = 0
+        while True:
+            conn, reused = self._acquire()
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                conn.sock.settimeout(read_timeout)
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except self.RETRYABLE_ERRORS:
+                conn.close()
+                # A pooled connection the server closed while it was idle,
+                # retry at once on the next one
+                if reused:
+                    continue
+                if attempt >= self.retries:
+                    raise
+                time.sleep(self.backoff * 2**attempt)
+                attempt += 1
+            except Exception:
+                conn.close()
+                raise
+
+    @staticmethod
+    def _error_message(body: bytes) -> str:
+        try:
+            return json.loads(body)["error"]
+        except (ValueError, KeyError, TypeError):
+            return body.decode("utf-8", "replace").strip() or "No response"
+
+
+class ChatContext:
+    """
+    Keeps the messages sent with each chat request within a token budget.
+
+    Token counts are estimated locally. When the history no longer fits, the
+    oldest messages are cut so that the rest fills at most half the budget,
+    and the cut messages are replaced by a summary written by the model
+    itself. The summary is cached and extended only when more messages are
+    cut, so most turns reuse it and the server can reuse its prompt cache.
+    """
+
+    SUMMARY_PROMPT = (
+        "Summarize the conversation below in a few short paragraphs. Keep names, "
+        "facts, decisions and open questions, so that the conversation can be "
+        "continued from the summary alone."
+    )
+
+    def __init__(
+        self,
+        client: OllamaClient,
+        num_ctx: int = 4096,
+        response_reserve: int = 1024,
+        keep_alive: str = "30m",
+        summarize: bool = True,
+    ):
+        """
+        :param client: client used for summary requests
+        :param num_ctx: context window requested from the server
+        :param response_reserve: tokens kept free for the response
+        :param keep_alive: how long the server keeps the model loaded
+        :param summarize: summarize cut messages instead of dropping them
+        """
+        self.client = client
+        self.num_ctx = num_ctx
+        self.response_reserve = response_reserve
+        self.keep_alive = keep_alive
+        self.summarize = summarize
+
+        # (model, number of summarized messages, key of those messages, summary)
+        self._summary: Optional[Tuple[str, int, int, str]] = None
+        # Why the last prepare dropped messages instead of summarizing them
+        self.summary_error: Optional[str] = None
+
+    @property
+    def budget(self) -> int:
+        """Tokens available for the prompt."""
+        return max(self.num_ctx - self.response_reserve, 256)
+
+    @property
+    def options(self) -> dict:
+        return {"num_ctx": self.num_ctx}
+
+    @staticmethod
+    def estimate_tokens(message: dict) -> int:
+        """
+        A rough token count: about 4 ASCII characters per token, one token
+        per other character, plus the message framing.
+        """
+        content = message.get("content") or ""
+        ascii_chars = len(content.encode("ascii", "ignore"))
+        return 4 + (ascii_chars + 3) // 4 + len(content) - ascii_chars
+
+    @staticmethod
+    def _key(messages: List[dict]) -> int:
+        return hash(tuple((m.get("role"), m.get("content")) for m in messages))
+
+    def _summary_message(self, summary: str) -> dict:
+        return {
+            "role": "system",
+            "content": f"Summary of the earlier conversation:\n{summary}",
+        }
+
+    def prepare(
+        self, model: str, history: List[dict], stop_event: Optional[Event] = None
+    ) -> Tuple[List[dict], int]:
+        """
+        Return the messages to send for the next turn and their estimated size.
+
+        May block on a summary request, call it from a worker thread. Setting
+        stop_event abandons the summary and the cut messages are dropped.
+        """
+        self.summary_error = None
+        estimates = [self.estimate_tokens(message) for message in history]
+
+        # Reuse the cached summary if it still describes the same messages
+        start, prefix = 0, []
+        if self._summary is not None:
+            summary_model, count, key, summary = self._summary
+            if (
+                summary_model == model
+                and count <= len(history)
+                and key == self._key(history[:count])
+            ):
+                start, prefix = count, [self._summary_message(summary)]
+            else:
+                self._summary = None
+
+        total = sum(map(self.estimate_tokens, prefix)) + sum(estimates[start:])
+        if total <= self.budget:
+            return prefix + history[start:], total
+
+        # Cut so that the remaining messages fill at most half the budget, which
+        # leaves room for the next turns before another cut is needed.
+        # The latest message is always kept.
+        cut, kept = len(history) - 1, estimates[-1]
+        while cut > start and kept + estimates[cut - 1] <= self.budget // 2:
+            cut -= 1
+            kept += estimates[cut]
+
+        if cut > start:
+            prefix = []
+            if self.summarize:
+                previous = self._summary[3] if self._summary else None
+                summary = self._summarize(
+                    model, previous, history[start:cut], stop_event
+                )
+                if summary:
+                    self._summary = (model, cut, self._key(history[:cut]), summary)
+                    prefix = [self._summary_message(summary)]
+
+        messages = prefix + history[cut:]
+        return messages, sum(map(self.estimate_tokens, messages))
+
+    def _summarize(
+        self,
+        model: str,
+        previous: Optional[str],
+        messages: List[dict],
+        stop_event: Optional[Event] = None,
+    ) -> Optional[str]:
+        lines = []
+        if previous:
+            lines.append(f"Earlier summary: {previous}")
+        lines.extend(f"{m['role']}: {m['content']}" for m in messages)
+
+        # The transcript must fit the context itself, keep its most recent part
+        transcript = "\n\n".join(lines)[-self.budget * 3 :]
+
+        # Streamed like a chat response, so a stop between two lines closes
+        # the connection instead of waiting for the whole summary
+        stream = self.client.stream(
+            "POST",
+            "/api/chat",
+            {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": self.SUMMARY_PROMPT},
+                    {"role": "user", "content": transcript},
+                ],
+                "stream": True,
+                "options": self.options,
+                "keep_alive": self.keep_alive,
+            },
+        )
+        parts = []
+        try:
+            for data in stream:
+                if stop_event is not None and stop_event.is_set():
+                    self.summary_error = "stopped"
+                    return None
+                if "error" in data:
+                    self.summary_error = data["error"]
+                    return None
+                if "message" in data:
+                    parts.append(data["message"]["content"])
+        except Exception as e:  # noqa
+            # Fall back to dropping the messages
+            self.summary_error = str(e) or type(e).__name__
+            return None
+        finally:
+            stream.close()
+
+        summary = "".join(parts).strip()
+        if not summary:
+            self.summary_error = "empty summary"
+        return summary or None
+
+
+class ConversationStore:
+    """
+    Conversations saved in a local SQLite database.
+
+    Message content is indexed with FTS5 for full-text search when the SQLite
+    library supports it, otherwise search falls back to LIKE.
+    The connection is shared by the UI and worker threads behind a lock.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS conversations (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY,
+        conversation_id INTEGER NOT NULL
+            REFERENCES conversations(id) ON DELETE CASCADE,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        model TEXT,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS messages_conversation
+        ON messages(conversation_id, id);
+    """
+
+    FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts
+        USING fts5(content, content='messages', content_rowid='id');
+    CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE OF content ON messages
+    BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+    END;
+    """
+
+    def __init__(self, path: str = os.path.join(DATA_DIR, "conversations.db")):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA foreign_keys=ON")
+            self._db.executescript(self.SCHEMA)
+            try:
+                self._db.executescript(self.FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:  # no FTS5 in this SQLite build
+                self.has_fts = False
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def create_conversation(self, title: str) -> int:
+        now = time.time()
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO conversations (title, created_at, updated_at) "
+                "VALUES (?, ?, ?)",
+                (title, now, now),
+            )
+            return cursor.lastrowid
+
+    def delete_conversation(self, conversation_id: int):
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM conversations WHERE id = ?", (conversation_id,)
+            )
+
+    def add_message(
+        self, conversation_id: int, role: str, content: str, model: str = None
+    ) -> int:
+        now = time.time()
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO messages "
+                "(conversation_id, role, content, model, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (conversation_id, role, content, model, now),
+            )
+            self._db.execute(
+                "UPDATE conversations SET updated_at = ? WHERE id = ?",
+                (now, conversation_id),
+            )
+            return cursor.lastrowid
+
+    def update_message(self, message_id: int, content: str):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE messages SET content = ? WHERE id = ?", (content, message_id)
+            )
+
+    def list_conversations(self, limit: int = 200) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT c.id, c.title, c.updated_at, COUNT(m.id) AS messages "
+                "FROM conversations c LEFT JOIN messages m "
+                "ON m.conversation_id = c.id "
+                "GROUP BY c.id ORDER BY c.updated_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def load_messages(self, conversation_id: int) -> List[sqlite3.Row]:
+        """All messages of a conversation, oldest first."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, role, content, model FROM messages "
+                "WHERE conversation_id = ? ORDER BY id",
+                (conversation_id,),
+            ).fetchall()
+
+    def search(self, query: str, limit: int = 100) -> List[sqlite3.Row]:
+        """
+        Find messages containing all words of the query.
+
+        :return: rows of conversation id, title, message id and a snippet
+        """
+        words = query.split()
+        if not words:
+            return []
+
+        with self._lock:
+            if self.has_fts:
+                # Quote every word so that FTS syntax in the query is literal,
+                # and match it as a prefix
+                match = " ".join('"' + w.replace('"', '""') + '"*' for w in words)
+                return self._db.execute(
+                    "SELECT m.conversation_id, c.title, m.id AS message_id, "
+                    "snippet(messages_fts, 0, '[', ']', '...', 12) AS snippet "
+                    "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                    "JOIN conversations c ON c.id = m.conversation_id "
+                    "WHERE messages_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+
+            condition = " AND ".join(["m.content LIKE ?"] * len(words))
+            return self._db.execute(
+                "SELECT m.conversation_id, c.title, m.id AS message_id, "
+                "substr(m.content, 1, 80) AS snippet "
+                "FROM messages m JOIN conversations c ON c.id = m.conversation_id "
+                f"WHERE {condition} ORDER BY m.id DESC LIMIT ?",
+                [f"%{w}%" for w in words] + [limit],
+            ).fetchall()
+
+
+class ResponseMetrics:
+    """
+    Timing of one chat response.
+
+    Time to first token and end-to-end latency are measured by the client,
+    the rest comes from the final message of the Ollama stream.
+    Durations are in seconds.
+    """
+
+    FIELDS = (
+        "model",
+        "started_at",
+        "ttft",
+        "latency",
+        "prompt_tokens",
+        "prompt_eval_duration",
+        "eval_count",
+        "eval_duration",
+        "load_duration",
+        "tokens_per_sec",
+        "prompt_tokens_per_sec",
+    )
+
+    def __init__(self, model: str):
+        self.model = model
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.ttft: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.prompt_tokens: Optional[int] = None
+        self.prompt_eval_duration: Optional[float] = None
+        self.eval_count: Optional[int] = None
+        self.eval_duration: Optional[float] = None
+        self.load_duration: Optional[float] = None
+        self._start = time.perf_counter()
+
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._start
+
+    def finish(self, final: Optional[dict] = None):
+        """
+        :param final: the last message of the stream, None if it was stopped
+        """
+        self.latency = time.perf_counter() - self._start
+        if not final:
+            return
+        self.prompt_tokens = final.get("prompt_eval_count")
+        self.eval_count = final.get("eval_count")
+        for name in ("prompt_eval_duration", "eval_duration", "load_duration"):
+            if final.get(name) is not None:
+                setattr(self, name, final[name] / 1e9)
+
+    @staticmethod
+    def _rate(count: Optional[int], duration: Optional[float]) -> Optional[float]:
+        if count and duration:
+            return count / duration
+        return None
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        return self._rate(self.eval_count, self.eval_duration)
+
+    @property
+    def prompt_tokens_per_sec(self) -> Optional[float]:
+        return self._rate(self.prompt_tokens, self.prompt_eval_duration)
+
+    def summary(self) -> str:
+        parts = []
+        if self.tokens_per_sec is not None:
+            parts.append(f"{self.tokens_per_sec:.1f} tok/s")
+        if self.prompt_tokens_per_sec is not None:
+            parts.append(
+                f"prompt {self.prompt_tokens} tok @ {self.prompt_tokens_per_sec:.0f} tok/s"
+            )
+        if self.load_duration is not None:
+            parts.append(f"load {self.load_duration:.2f}s")
+        if self.ttft is not None:
+            parts.append(f"first token {self.ttft:.2f}s")
+        if self.latency is not None:
+            parts.append(f"total {self.latency:.2f}s")
+        return " · ".join(parts)
+
+    def as_row(self) -> dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class SessionStats:
+    """Response metrics of this session, aggregated per model."""
+
+    COLUMNS = (
+        "model",
+        "responses",
+        "tokens",
+        "tokens_per_sec",
+        "prompt_tokens_per_sec",
+        "avg_load",
+        "avg_ttft",
+        "avg_latency",
+    )
+
+    def __init__(self):
+        self.responses: List[ResponseMetrics] = []
+
+    def add(self, metrics: ResponseMetrics):
+        self.responses.append(metrics)
+
+    def clear(self):
+        self.responses.clear()
+
+    def by_model(self) -> Dict[str, dict]:
+        grouped: Dict[str, List[ResponseMetrics]] = {}
+        for metrics in self.responses:
+            grouped.setdefault(metrics.model, []).append(metrics)
+
+        def _sum(items, name):
+            return sum(getattr(m, name) or 0 for m in items)
+
+        def _avg(items, name):
+            values = [getattr(m, name) for m in items if getattr(m, name) is not None]
+            return sum(values) / len(values) if values else None
+
+        rows = {}
+        for model, items in grouped.items():
+            # Rates are total tokens over total time, so long responses weigh more
+            rows[model] = {
+                "model": model,
+                "responses": len(items),
+                "tokens": _sum(items, "eval_count"),
+                "tokens_per_sec": ResponseMetrics._rate(
+                    _sum(items, "eval_count"), _sum(items, "eval_duration")
+                ),
+                "prompt_tokens_per_sec": ResponseMetrics._rate(
+                    _sum(items, "prompt_tokens"), _sum(items, "prompt_eval_duration")
+                ),
+                "avg_load": _avg(items, "load_duration"),
+                "avg_ttft": _avg(items, "ttft"),
+                "avg_latency": _avg(items, "latency"),
+            }
+        return rows
+
+    def export_csv(self, path: str, per_response: bool = False):
+        """
+        :param path: output file
+        :param per_response: one row per response instead of one per model
+        """
+        if per_response:
+            columns, rows = ResponseMetrics.FIELDS, [m.as_row() for m in self.responses]
+        else:
+            columns, rows = self.COLUMNS, list(self.by_model().values())
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+class CompareRun:
+    """
+    One prompt streamed from several models at the same time.
+
+    At most ``limit`` models generate at once, the others wait for a free
+    slot in the order they were given. Workers only write the per-model
+    results, the UI reads them once per frame through ``drain``.
+    """
+
+    FINISHED = ("done", "stopped", "error")
+
+    def __init__(
+        self,
+        fetch: Callable[..., Generator],
+        models: List[str],
+        messages: List[dict],
+        limit: int = 2,
+        on_result: Optional[Callable[[ResponseMetrics], None]] = None,
+    ):
+        """
+        :param fetch: streams a response, with the signature of
+                      OllamaInterface.fetch_chat_stream_result
+        :param models: models to ask
+        :param messages: chat messages sent to every model
+        :param limit: maximum number of models generating at once
+        :param on_result: called from the worker with the metrics of each
+                          response that has finished
+        """
+        self.fetch = fetch
+        self.models = list(models)
+        self.messages = messages
+        self.limit = max(1, limit)
+        self.on_result = on_result
+        self.stop_event = Event()
+        self._slots = BoundedSemaphore(self.limit)
+        self.results: Dict[str, dict] = {
+            model: {
+                "status": "queued",
+                "pending": queue.Queue(),
+                "tokens": 0,
+                "first_at": None,
+                "metrics": None,
+                "error": None,
+            }
+            for model in self.models
+        }
+
+    def start(self) -> "CompareRun":
+        for model in self.models:
+            Thread(target=self._worker, args=(model,), daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    @property
+    def done(self) -> bool:
+        return all(r["status"] in self.FINISHED for r in self.results.values())
+
+    def drain(self, model: str) -> str:
+        """Return the text streamed by a model since the last call."""
+        pending = self.results[model]["pending"]
+        tokens = []
+        while True:
+            try:
+                tokens.append(pending.get_nowait())
+            except queue.Empty:
+                return "".join(tokens)
+
+    def describe(self, model: str) -> str:
+        result = self.results[model]
+        status = result["status"]
+        metrics: Optional[ResponseMetrics] = result["metrics"]
+        if status == "queued":
+            return "Waiting for a free slot"
+        if status == "error":
+            return f"Error: {result['error']}"
+        if status == "running":
+            if result["first_at"] is None:
+                return "Loading..."
+            # Ollama streams about one token per chunk
+            elapsed = time.perf_counter() - result["first_at"]
+            rate = result["tokens"] / elapsed if elapsed > 0 else 0.0
+            return (
+                f"{result['tokens']} tokens · ~{rate:.1f} tok/s · "
+                f"first token {metrics.ttft:.2f}s"
+            )
+        summary = metrics.summary() if metrics is not None else ""
+        if status == "stopped":
+            return f"Stopped · {summary}" if summary else "Stopped"
+        return summary
+
+    def _worker(self, model: str):
+        result = self.results[model]
+        with self._slots:
+            if self.stop_event.is_set():
+                result["status"] = "stopped"
+                return
+            metrics = result["metrics"] = ResponseMetrics(model)
+            result["status"] = "running"
+            try:
+                for token in self.fetch(model, self.messages, metrics, self.stop_event):
+                    if not token:
+                        continue
+                    if result["first_at"] is None:
+                        result["first_at"] = time.perf_counter()
+                    result["tokens"] += 1
+                    result["pending"].put(token)
+            except Exception as e:  # noqa
+                result["error"] = str(e) or type(e).__name__
+                result["status"] = "error"
+                return
+
+            result["status"] = "stopped" if self.stop_event.is_set() else "done"
+            if self.on_result is not None:
+                self.on_result(metrics)
+
+
+class BatchRunner:
+    """
+    Runs prompts from a JSONL or CSV file through /api/chat.
+
+    Each input row has a prompt, or in JSONL a list of chat messages, and
+    optionally an id, a model and a system prompt. Results are appended to a
+    JSONL file as each one finishes. Rows whose id already has a successful
+    result from the same model in that file are skipped, so running a crashed
+    or cancelled batch again resumes it, and running it with another model
+    adds that model's results. Each result has an attempt number counted per
+    id and model, the latest result of a row has the highest one.
+    """
+
+    def __init__(
+        self,
+        client: OllamaClient,
+        model: str,
+        input_path: str,
+        output_path: str,
+        workers: int = 4,
+        rate: float = 0.0,
+        options: Optional[dict] = None,
+        keep_alive: Optional[str] = None,
+    ):
+        """
+        :param client: client of the Ollama host
+        :param model: model of rows that do not name one
+        :param input_path: prompts, .csv or JSONL
+        :param output_path: JSONL results, appended to
+        :param workers: number of requests in flight
+        :param rate: maximum requests started per second, 0 for no limit
+        :param options: Ollama options sent with every request
+        :param keep_alive: how long Ollama keeps the model loaded
+        """
+        self.client = client
+        self.model = model
+        self.input_path = input_path
+        self.output_path = output_path
+        self.workers = max(1, workers)
+        self.rate = rate
+        self.options = options
+        self.keep_alive = keep_alive
+        self.stop_event = Event()
+        self.total = 0
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+        self._lock = Lock()
+        self._next_start = 0.0
+        self._previous: Dict[Tuple[str, str], List[str]] = {}
+
+    @staticmethod
+    def default_output(input_path: str) -> str:
+        return os.path.splitext(input_path)[0] + ".results.jsonl"
+
+    @staticmethod
+    def load_prompts(path: str) -> List[dict]:
+        """
+        :raise ValueError: if a row cannot be parsed or has no prompt
+        """
+        if path.lower().endswith(".csv"):
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                rows: List[Any] = list(csv.DictReader(f))
+        else:
+            rows = []
+            with open(path, encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError as e:
+                        raise ValueError(f"line {number}: {e}") from None
+
+        prompts = []
+        for number, row in enumerate(rows, 1):
+            if isinstance(row, str):
+                row = {"prompt": row}
+            if not isinstance(row, dict) or not (
+                row.get("prompt") or row.get("messages")
+            ):
+                raise ValueError(f"row {number} has no prompt")
+            messages = row.get("messages")
+            if messages and not (
+                isinstance(messages, list)
+                and all(
+                    isinstance(m, dict) and "role" in m and "content" in m
+                    for m in messages
+                )
+            ):
+                raise ValueError(
+                    f"row {number}: messages must be a list of objects "
+                    "with a role and a content"
+                )
+            row = dict(row)
+            # Without an id the row number identifies a row when resuming
+            row["id"] = str(row.get("id") or number)
+            prompts.append(row)
+        return prompts
+
+    @staticmethod
+    def previous_results(path: str) -> Dict[Tuple[str, str], List[str]]:
+        """Statuses of the results in an output file per (id, model), in order."""
+        results: Dict[Tuple[str, str], List[str]] = {}
+        if not os.path.exists(path):
+            return results
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # cut off by a crash
+                if isinstance(record, dict):
+                    key = (str(record.get("id")), str(record.get("model")))
+                    results.setdefault(key, []).append(record.get("status"))
+        return results
+
+    def _key(self, row: dict) -> Tuple[str, str]:
+        return row["id"], row.get("model") or self.model
+
+    def stop(self):
+        """Cancel the run, requests in flight are dropped and run again on resume."""
+        self.stop_event.set()
+
+    def run(self, on_result: Optional[Callable[[dict], None]] = None) -> bool:
+        """
+        Run the batch and block until it is finished or cancelled.
+
+        :param on_result: called from a worker thread with each result
+        :return: False if the run was cancelled
+        :raise ValueError: if the input cannot be parsed
+        """
+        prompts = self.load_prompts(self.input_path)
+        self._previous = self.previous_results(self.output_path)
+        jobs: "queue.Queue[dict]" = queue.Queue()
+        for row in prompts:
+            if "ok" not in self._previous.get(self._key(row), ()):
+                jobs.put(row)
+        self.total = len(prompts)
+        self.skipped = self.total - jobs.qsize()
+        self.completed = self.failed = 0
+
+        # A crash can leave the last line unterminated
+        if os.path.exists(self.output_path) and os.path.getsize(self.output_path):
+            with open(self.output_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                unterminated = f.read(1) != b"\n"
+        else:
+            unterminated = False
+
+        with open(self.output_path, "a", encoding="utf-8") as output:
+            if unterminated:
+                output.write("\n")
+            threads = [
+                Thread(target=self._worker, args=(jobs, output, on_result), daemon=True)
+                for _ in range(min(self.workers, jobs.qsize()))
+            ]
+            for thread in threads:
+                thread.start()
+            try:
+                for thread in threads:
+                    while thread.is_alive():
+                        thread.join(0.2)
+            except KeyboardInterrupt:
+                self.stop()
+                for thread in threads:
+                    thread.join()
+        return not self.stop_event.is_set()
+
+    def _wait_for_start(self):
+        """Space out request starts to the rate limit."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.perf_counter()
+            start = max(now, self._next_start)
+            self._next_start = start + 1 / self.rate
+        self.stop_event.wait(start - now)
+
+    def _worker(self, jobs: "queue.Queue[dict]", output, on_result):
+        while not self.stop_event.is_set():
+            try:
+                row = jobs.get_nowait()
+            except queue.Empty:
+                return
+            self._wait_for_start()
+            record = self._chat(row)
+            if record is None:
+                return
+
+            with self._lock:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                if record["status"] == "ok":
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            if on_result is not None:
+                on_result(record)
+
+    def _chat(self, row: dict) -> Optional[dict]:
+        """Stream one response, None if the run was cancelled meanwhile."""
+        model = row.get("model") or self.model
+        metrics = ResponseMetrics(model)
+        content = []
+        final = None
+        error = None
+        try:
+            # Inside the try, so a bad row becomes an error record instead of
+            # ending its worker
+            if row.get("messages"):
+                messages = list(row["messages"])
+            else:
+                messages = [{"role": "user", "content": row["prompt"]}]
+            if row.get("system"):
+                messages.insert(0, {"role": "system", "content": row["system"]})
+
+            payload = {"model": model, "messages": messages, "stream": True}
+            if self.options:
+                payload["options"] = self.options
+            if self.keep_alive:
+                payload["keep_alive"] = self.keep_alive
+
+            stream = self.client.stream("POST", "/api/chat", payload)
+            try:
+                for data in stream:
+                    if self.stop_event.is_set():
+                        return None
+                    if data.get("done"):
+                        final = data
+                    token = data.get("message", {}).get("content")
+                    if token:
+                        metrics.first_token()
+                        content.append(token)
+            finally:
+                stream.close()
+        except Exception as e:  # noqa
+            if self.stop_event.is_set():
+                return None
+            error = str(e) or type(e).__name__
+        metrics.finish(final)
+
+        record = {
+            "id": row["id"],
+            "model": model,
+            "attempt": len(self._previous.get(self._key(row), ())) + 1,
+            "prompt": row.get("prompt"),
+            "response": "".join(content),
+            "status": "error" if error else "ok",
+            "error": error,
+        }
+        record.update(
+            (name, value) for name, value in metrics.as_row().items() if name != "model"
+        )
+        return record
+
+
+class MessageRow:
+    """The widgets showing one message, reused for different messages."""
+
+    __slots__ = ("frame", "header", "bubble", "footer", "window", "index")
+
+    def __init__(self, frame, header, bubble, footer, window):
+        self.frame: tk.Frame = frame
+        self.header: tk.Label = header
+        self.bubble: tk.Label = bubble
+        self.footer: tk.Label = footer
+        self.window: int = window
+        self.index: Optional[int] = None
+
+
+class ChatView:
+    """
+    A virtualized list of chat messages drawn on a Canvas.
+
+    Only messages near the viewport have widgets. Rows of widgets come from a
+    pool and are refilled as the view scrolls, so scrolling and resizing a
+    long conversation costs the same as a short one. Heights of messages that
+    were never shown are estimated from font metrics, and corrected once the
+    message is rendered. A resize remeasures the rendered rows only, the
+    other messages are estimated again once the size settles.
+    """
+
+    BACKGROUND = "white"
+    GAP = 14  # vertical space between messages
+    MARGIN = 4  # horizontal space at both sides
+    OVERSCAN = 300  # pixels rendered above and below the viewport
+    SETTLE_MS = 150  # delay after the last resize before estimating again
+    STYLES = {
+        "user": ("#48a4f2", "white"),
+        "assistant": ("#eaeaea", "black"),
+    }
+    FOOTER_COLORS = {"Metrics": "gray", "Error": "red"}
+
+    def __init__(self, parent: tk.Misc, interface: "OllamaInterface"):
+        self.interface = interface
+        family = interface.default_font
+        self.font = font.Font(family=family, size=12)
+        self.header_font = font.Font(family=family, size=10, weight="bold")
+        self.footer_font = font.Font(family=family, size=9)
+        self._char_width = max(1, self.font.measure("abcdefghijklmnopqrstuvwxyz") // 26)
+        # Font metrics are Tcl calls, read them once for all estimates
+        self._linespace = self.font.metrics("linespace")
+        self._header_space = self.header_font.metrics("linespace") + 4
+        self._footer_space = self.footer_font.metrics("linespace") + 4
+
+        self.frame = ttk.Frame(parent)
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.frame.grid_rowconfigure(0, weight=1)
+
+        self.canvas = tk.Canvas(
+            self.frame,
+            background=self.BACKGROUND,
+            highlightthickness=0,
+            yscrollincrement=20,
+        )
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(
+            self.frame, orient="vertical", command=self.canvas.yview
+        )
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+
+        # Message dicts, see _new_item
+        self.items: List[dict] = []
+        self._offsets: List[int] = []
+        self._total_height = 0
+        self._rows: Dict[int, MessageRow] = {}
+        self._pool: List[MessageRow] = []
+        self._width = self.canvas.winfo_reqwidth()
+        self._wrap = max(100, int(self._width * 0.7))
+        self._layout_pending = False
+        self._settle_job: Optional[str] = None
+
+        # One context menu for all messages, menu_index is the message under
+        # the cursor when it was opened
+        self.menu_index: Optional[int] = None
+        self.menu = tk.Menu(self.canvas, tearoff=0)
+        self.menu.add_command(
+            label="Edit",
+            command=lambda: interface.layout.show_editor_window(self.menu_index),
+        )
+        self.menu.add_command(
+            label="Copy This",
+            command=lambda: interface.copy_text(self.text_of(self.menu_index)),
+        )
+        self.menu.add_command(label="Copy All", command=interface.copy_all)
+        self.menu.add_separator()
+        self.menu.add_command(label="Clear Chat", command=interface.clear_chat)
+
+        self.canvas.bind("<Configure>", self._on_resize)
+        self._bind_common(self.canvas, None)
+        self._reflow()
+
+    # ------------------------------------------------------------------
+    # Content
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.items)
+
+    def text_of(self, index: Optional[int]) -> str:
+        if index is None or not -len(self.items) <= index < len(self.items):
+            return ""
+        return self.items[index]["text"]
+
+    @staticmethod
+    def _new_item(role: str, text: str, header: Optional[str]) -> dict:
+        return {
+            "role": role,
+            "text": text,
+            "header": header,
+            "footer": None,
+            "footer_style": None,
+            # Measured height and the wrap width it was measured at, None
+            # until the message is rendered
+            "height": None,
+            "wrap": None,
+            # (wrap width, estimated height), None after the content changed
+            "estimate": None,
+        }
+
+    def add_message(self, role: str, text: str = "", header: Optional[str] = None):
+        self.items.append(self._new_item(role, text, header))
+        stick = self._at_bottom()
+        self._reflow(len(self.items) - 1)
+        self._schedule_layout()
+        if stick:
+            self.scroll_to_end()
+
+    def set_messages(self, messages: List[Tuple[str, str, Optional[str]]]):
+        """Replace all messages by (role, text, header) tuples and show the end."""
+        self.clear()
+        self.items.extend(
+            self._new_item(role, text, header) for role, text, header in messages
+        )
+        self._reflow()
+        self.scroll_to_end()
+
+    def append_text(self, text: str):
+        """Append streamed text to the last message."""
+        if self.items:
+            item = self.items[-1]
+            item["text"] += text
+            self._changed(len(self.items) - 1)
+
+    def set_text(self, index: int, text: str):
+        self.items[index]["text"] = text
+        self._changed(index % len(self.items))
+
+    def set_footer(self, index: int, text: str, style: str = "Metrics"):
+        item = self.items[index]
+        item["footer"] = text
+        item["footer_style"] = style
+        self._changed(index % len(self.items))
+
+    def remove_last(self):
+        if self.items:
+            self._release(len(self.items) - 1)
+            self.items.pop()
+            self._reflow(len(self.items))
+            self._schedule_layout()
+
+    def clear(self):
+        for index in list(self._rows):
+            self._release(index)
+        self.items.clear()
+        self._reflow()
+        self.canvas.yview_moveto(0)
+
+    def scroll_to_end(self):
+        self.canvas.yview_moveto(1.0)
+        self._schedule_layout()
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def _height(self, item: dict) -> int:
+        """
+        Measured height of a message, or an estimate from its text length
+        without creating widgets. Estimates are cached per wrap width.
+        """
+        if item["height"] is not None:
+            return item["height"]
+        estimate = item["estimate"]
+        # While a resize is in progress any earlier estimate will do
+        if estimate is not None and (
+            estimate[0] == self._wrap or self._settle_job is not None
+        ):
+            return estimate[1]
+
+        chars_per_line = max(1, self._wrap // self._char_width)
+        lines = sum(
+            max(1, -(-len(paragraph) // chars_per_line))
+            for paragraph in item["text"].split("\n")
+        )
+        height = lines * self._linespace + 16
+        if item["header"]:
+            height += self._header_space
+        if item["footer"]:
+            height += self._footer_space
+        item["estimate"] = (self._wrap, height)
+        return height
+
+    def _reflow(self, start: int = 0):
+        """Recompute message offsets from index start on, and the scroll region."""
+        start = min(start, len(self._offsets), len(self.items))
+        del self._offsets[start:]
+        if start:
+            y = self._offsets[-1] + self._height(self.items[start - 1]) + self.GAP
+        else:
+            y = self.GAP // 2
+        for item in self.items[start:]:
+            self._offsets.append(y)
+            y += self._height(item) + self.GAP
+        self._total_height = y
+        self.canvas.configure(scrollregion=(0, 0, self._width, y))
+
+    def _at_bottom(self) -> bool:
+        return self.canvas.yview()[1] >= 0.999
+
+    def _schedule_layout(self):
+        if not self._layout_pending:
+            self._layout_pending = True
+            self.canvas.after_idle(self._layout)
+
+    def _on_scroll(self, first: str, last: str):
+        self.scrollbar.set(first, last)
+        self._schedule_layout()
+
+    def _on_resize(self, event: tk.Event):
+        if event.width == self._width:
+            return
+        self._width = event.width
+        self._wrap = max(100, int(event.width * 0.7))
+
+        # Only rendered rows are remeasured, the other messages keep their old
+        # heights until the size settles
+        if self._settle_job is not None:
+            self.canvas.after_cancel(self._settle_job)
+        self._settle_job = self.canvas.after(self.SETTLE_MS, self._settle)
+
+        stick = self._at_bottom()
+        for index, row in self._rows.items():
+            self._fill(row, index)
+        self._reflow()
+        self._position_rows()
+        if stick:
+            self.scroll_to_end()
+        self._schedule_layout()
+
+    def _settle(self):
+        """Estimate the messages measured at an older width again."""
+        self._settle_job = None
+        for item in self.items:
+            if item["height"] is not None and item["wrap"] != self._wrap:
+                item["height"] = None
+        self._relayout_keeping_view()
+
+    def _relayout_keeping_view(self, start: int = 0):
+        """Reflow from index start, keeping the message on top of the view still."""
+        stick = self._at_bottom()
+        top_before = self.canvas.canvasy(0)
+        anchor = max(0, bisect.bisect_right(self._offsets, top_before) - 1)
+        anchor_offset = self._offsets[anchor] if self._offsets else None
+        self._reflow(start)
+        if stick:
+            self.canvas.yview_moveto(1.0)
+        elif anchor_offset is not None and self._total_height:
+            shift = self._offsets[anchor] - anchor_offset
+            if shift:
+                self.canvas.yview_moveto((top_before + shift) / self._total_height)
+        self._position_rows()
+
+    def _visible_range(self) -> Tuple[int, int]:
+        top = self.canvas.canvasy(0) - self.OVERSCAN
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) + self.OVERSCAN
+        first = max(0, bisect.bisect_right(self._offsets, top) - 1)
+        last = bisect.bisect_left(self._offsets, bottom)
+        return first, min(last, len(self.items))
+
+    def _layout(self):
+        """Render the messages near the viewport and release the others."""
+        self._layout_pending = False
+        first, last = self._visible_range()
+
+        for index in list(self._rows):
+            if not first <= index < last:
+                self._release(index)
+
+        # Measuring replaces estimated heights, keep the content in view still
+        # while the offsets after the first changed message move
+        changed = None
+        heights = []
+        for index in range(first, last):
+            if index not in self._rows:
+                heights.append((index, self._height(self.items[index])))
+                row = self._pool.pop() if self._pool else self._create_row()
+                self._rows[index] = row
+                self._fill(row, index)
+        for index, height in heights:
+            if self.items[index]["height"] != height:
+                changed = index
+                break
+
+        if changed is not None:
+            self._relayout_keeping_view(changed)
+        else:
+            self._position_rows()
+
+    def _position_rows(self):
+        width = max(1, self._width - 2 * self.MARGIN)
+        for index, row in self._rows.items():
+            self.canvas.coords(row.window, self.MARGIN, self._offsets[index])
+            self.canvas.itemconfigure(
+                row.window,
+                width=width,
+                height=self.items[index]["height"],
+                state="normal",
+            )
+
+    def _changed(self, index: int):
+        """Update a message after its content changed."""
+        stick = self._at_bottom()
+        row = self._rows.get(index)
+        item = self.items[index]
+        item["estimate"] = None
+        if row is not None:
+            resized = self._fill(row, index)
+        else:
+            item["height"] = None
+            resized = True
+        if resized:
+            self._reflow(index)
+            self._position_rows()
+        if stick:
+            self.scroll_to_end()
+
+    # ------------------------------------------------------------------
+    # Rows
+    # ------------------------------------------------------------------
+
+    def _create_row(self) -> MessageRow:
+        frame = tk.Frame(self.canvas, background=self.BACKGROUND)
+        frame.pack_propagate(False)
+        header = tk.Label(
+            frame,
+            background=self.BACKGROUND,
+            foreground="#ff007b",
+            font=self.header_font,
+        )
+        bubble = tk.Label(
+            frame,
+            justify=tk.LEFT,
+            padx=8,
+            pady=8,
+            font=self.font,
+            borderwidth=0,
+            highlightthickness=0,
+        )
+        footer = tk.Label(frame, background=self.BACKGROUND, font=self.footer_font)
+        window = self.canvas.create_window(
+            0, 0, anchor="nw", window=frame, state="hidden"
+        )
+        row = MessageRow(frame, header, bubble, footer, window)
+
+        for widget in (frame, header, bubble, footer):
+            self._bind_common(widget, row)
+        bubble.bind(
+            "<Double-1>",
+            lambda e: self.interface.layout.show_editor_window(row.index),
+        )
+        return row
+
+    def _bind_common(self, widget: tk.Misc, row: Optional[MessageRow]):
+        widget.bind(
+            "<MouseWheel>",
+            lambda e: self.canvas.yview_scroll(int(-3 * (e.delta / 120)), "units"),
+        )
+        # X11 reports the wheel as buttons 4 and 5
+        widget.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-3, "units"))
+        widget.bind("<Button-5>", lambda e: self.canvas.yview_scroll(3, "units"))
+
+        _right_click = (
+            "<Button-2>" if platform.system().lower() == "darwin" else "<Button-3>"
+        )
+        widget.bind(_right_click, lambda e: self._show_menu(e, row))
+
+    def _show_menu(self, event: tk.Event, row: Optional[MessageRow]):
+        self.menu_index = row.index if row is not None else None
+        state = tk.NORMAL if self.menu_index is not None else tk.DISABLED
+        self.menu.entryconfigure("Edit", state=state)
+        self.menu.entryconfigure("Copy This", state=state)
+        self.menu.post(event.x_root, event.y_root)
+
+    def _fill(self, row: MessageRow, index: int) -> bool:
+        """
+        Show a message in a row and measure it.
+
+        :return: whether the measured height differs from the stored one
+        """
+        item = self.items[index]
+        row.index = index
+        side = tk.E if item["role"] == "user" else tk.W
+        background, foreground = self.STYLES.get(item["role"], self.STYLES["assistant"])
+
+        for widget in (row.header, row.bubble, row.footer):
+            widget.pack_forget()
+
+        height = 0
+        if item["header"]:
+            row.header.configure(text=item["header"])
+            row.header.pack(anchor=side, pady=(0, 4))
+            height += row.header.winfo_reqheight() + 4
+
+        row.bubble.configure(
+            text=item["text"],
+            background=background,
+            foreground=foreground,
+            wraplength=self._wrap,
+        )
+        row.bubble.pack(anchor=side)
+        height += row.bubble.winfo_reqheight()
+
+        if item["footer"]:
+            row.footer.configure(
+                text=item["footer"],
+                foreground=self.FOOTER_COLORS.get(item["footer_style"], "gray"),
+            )
+            row.footer.pack(anchor=side, pady=(4, 0))
+            height += row.footer.winfo_reqheight() + 4
+
+        resized = height != item["height"]
+        item["height"] = height
+        item["wrap"] = self._wrap
+        return resized
+
+    def _release(self, index: int):
+        row = self._rows.pop(index, None)
+        if row is not None:
+            row.index = None
+            self.canvas.itemconfigure(row.window, state="hidden")
+            self._pool.append(row)
+
+
 class OllamaInterface:
-    chat_box: tk.Text
+    chat_view: ChatView
     user_input: tk.Text
     host_input: ttk.Entry
     progress: ttk.Progressbar
@@ -74,24 +1607,52 @@ class OllamaInterface:
     model_select: ttk.Combobox
     log_textbox: tk.Text
     models_list: tk.Listbox
+    context_label: ttk.Label
 
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, store: Optional[ConversationStore] = None):
+        """
+        :param root: main window
+        :param store: conversation history, defaults to the database in DATA_DIR
+        """
         self.root: tk.Tk = root
         self.api_url: str = "http://127.0.0.1:11434"
         self.chat_history: List[dict] = []
-        self.label_widgets: List[tk.Label] = []
+        # Per message of chat_history: its id in the store and the model that
+        # answered it
+        self.message_meta: List[dict] = []
+        self.conversation_id: Optional[int] = None
+        self.generating: bool = False
         self.default_font: str = font.nametofont("TkTextFont").actual()["family"]
 
+        # Worker threads never touch widgets directly. They put streamed tokens
+        # (str) or UI calls ((callable, args)) here, and render_tick applies them
+        # on the UI thread in order.
+        self.render_queue: "queue.Queue[Union[str, Tuple[Callable, tuple]]]" = (
+            queue.Queue()
+        )
+        self.stop_event = Event()
+        self.client = OllamaClient(self.api_url)
+        self.context = ChatContext(self.client)
+        self.session_stats = SessionStats()
+        self.store: Optional[ConversationStore] = store
+        self.store_warning_shown: bool = False
+        if store is None:
+            try:
+                self.store = ConversationStore()
+            except (OSError, sqlite3.Error) as e:
+                self.warn_store_error(f"Conversation history is disabled: {e}")
+
         self.layout = LayoutManager(self)
         self.layout.init_layout()
 
         self.root.after(200, self.check_system)
+        self.root.after(RENDER_INTERVAL_MS, self.render_tick)
         self.refresh_models()
 
     def copy_text(self, text: str):
         if text:
-            self.chat_box.clipboard_clear()
-            self.chat_box.clipboard_append(text)
+            self.root.clipboard_clear()
+            self.root.clipboard_append(text)
 
     def copy_all(self):
         self.copy_text(pprint.pformat(self.chat_history))
@@ -117,15 +1678,47 @@ class OllamaInterface:
         if message is not None:
             messagebox.showwarning("Warning", message, parent=self.root)
 
-    def append_text_to_chat(self, text: str, *args, use_label: bool = False):
-        self.chat_box.config(state=tk.NORMAL)
-        if use_label:
-            cur_label_widget = self.label_widgets[-1]
-            cur_label_widget.config(text=cur_label_widget.cget("text") + text)
-        else:
-            self.chat_box.insert(tk.END, text, *args)
-        self.chat_box.see(tk.END)
-        self.chat_box.config(state=tk.DISABLED)
+    def warn_store_error(self, message: str):
+        """Tell the user once that chat history is no longer being saved."""
+        if self.store_warning_shown:
+            return
+        self.store_warning_shown = True
+        # Deferred so the warning does not block the render tick or window setup
+        self.root.after_idle(
+            lambda: messagebox.showwarning("Warning", message, parent=self.root)
+        )
+
+    def run_on_ui(self, func: Callable, *args):
+        """Schedule a widget update from a worker thread."""
+        self.render_queue.put((func, args))
+
+    def render_tick(self):
+        """
+        Drain the render queue once per frame.
+
+        Consecutive tokens are joined and appended to the current message in a
+        single widget update, so the cost per frame does not depend on how fast
+        the model streams.
+        """
+        tokens = []
+        try:
+            while True:
+                try:
+                    item = self.render_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, str):
+                    tokens.append(item)
+                    continue
+                if tokens:
+                    self.chat_view.append_text("".join(tokens))
+                    tokens = []
+                func, args = item
+                func(*args)
+            if tokens:
+                self.chat_view.append_text("".join(tokens))
+        finally:
+            self.root.after(RENDER_INTERVAL_MS, self.render_tick)
 
     def append_log_to_inner_textbox(
         self, message: Optional[str] = None, clear: bool = False
@@ -139,12 +1732,6 @@ class OllamaInterface:
             self.log_textbox.config(state=tk.DISABLED)
             self.log_textbox.see(tk.END)
 
-    def resize_inner_text_widget(self, event: tk.Event):
-        for i in self.label_widgets:
-            current_width = event.widget.winfo_width()
-            max_width = int(current_width) * 0.7
-            i.config(wraplength=max_width)
-
     def show_error(self, text):
         self.model_select.set(text)
         self.model_select.config(foreground="red")
@@ -161,6 +1748,17 @@ class OllamaInterface:
         self.stop_button.grid_remove()
         self.progress.grid_remove()
 
+    def stop_generation(self):
+        self.stop_event.set()
+        self.stop_button.state(["disabled"])
+
+    def finish_generation(self):
+        self.generating = False
+        self.hide_process_bar()
+        self.send_button.state(["!disabled"])
+        self.refresh_button.state(["!disabled"])
+        self.stop_button.state(["!disabled"])
+
     def handle_key_press(self, event: tk.Event):
         if event.keysym == "Return":
             if event.state & 0x1 == 0x1:  # Shift key is pressed
@@ -179,161 +1777,278 @@ class OllamaInterface:
 
     def update_host(self):
         self.api_url = self.host_input.get()
+        self.client.base_url = self.api_url
 
     def update_model_select(self):
+        """Fetch the models on a worker thread and show them in model_select."""
         try:
             models = self.fetch_models()
-            self.model_select["values"] = models
-            if models:
-                self.model_select.set(models[0])
-                self.send_button.state(["!disabled"])
-            else:
-                self.show_error("You need download a model!")
+            self.run_on_ui(self.show_model_select, models)
         except Exception:  # noqa
-            self.show_error("Error! Please check the host.")
+            self.run_on_ui(self.show_error, "Error! Please check the host.")
         finally:
-            self.refresh_button.state(["!disabled"])
+            self.run_on_ui(self.refresh_button.state, ["!disabled"])
+
+    def show_model_select(self, models: List[str]):
+        self.model_select["values"] = models
+        if models:
+            self.model_select.set(models[0])
+            self.send_button.state(["!disabled"])
+        else:
+            self.show_error("You need download a model!")
 
     def update_model_list(self):
+        """Fetch the models on a worker thread and show them in models_list."""
+        try:
+            models = self.fetch_models()
+            self.run_on_ui(self.show_model_list, models)
+        except Exception:  # noqa
+            self.run_on_ui(self.show_model_list, [])
+            self.run_on_ui(
+                self.append_log_to_inner_textbox,
+                "Error! Please check the Ollama host.",
+            )
+
+    def show_model_list(self, models: List[str]):
         if self.models_list.winfo_exists():
             self.models_list.delete(0, tk.END)
+            for model in models:
+                self.models_list.insert(tk.END, model)
+
+    def save_message(self, role: str, content: str, model: Optional[str] = None):
+        """Append a message to chat_history and to the current conversation."""
+        message_id = None
+        if self.store is not None:
             try:
-                models = self.fetch_models()
-                for model in models:
-                    self.models_list.insert(tk.END, model)
-            except Exception:  # noqa
-                self.append_log_to_inner_textbox("Error! Please check the Ollama host.")
+                if self.conversation_id is None:
+                    title = " ".join(content.split())[:60] or "New chat"
+                    self.conversation_id = self.store.create_conversation(title)
+                message_id = self.store.add_message(
+                    self.conversation_id, role, content, model
+                )
+            except sqlite3.Error as e:
+                self.warn_store_error(f"Failed to save message: {e}")
+        self.chat_history.append({"role": role, "content": content})
+        self.message_meta.append({"id": message_id, "model": model})
+
+    def update_message(self, index: int, content: str):
+        self.chat_history[index]["content"] = content
+        message_id = self.message_meta[index]["id"]
+        if self.store is not None and message_id is not None:
+            try:
+                self.store.update_message(message_id, content)
+            except sqlite3.Error as e:
+                self.warn_store_error(f"Failed to save message: {e}")
+
+    def open_conversation(self, conversation_id: int):
+        if self.generating or self.store is None:
+            return
+        rows = self.store.load_messages(conversation_id)
+
+        self.clear_chat()
+        self.conversation_id = conversation_id
+        for row in rows:
+            self.chat_history.append({"role": row["role"], "content": row["content"]})
+            self.message_meta.append({"id": row["id"], "model": row["model"]})
+
+        self.chat_view.set_messages(
+            [
+                (
+                    row["role"],
+                    row["content"],
+                    (
+                        (row["model"] or row["role"])
+                        if row["role"] == "assistant"
+                        else None
+                    ),
+                )
+                for row in rows
+            ]
+        )
 
     def on_send_button(self, _=None):
         message = self.user_input.get("1.0", "end-1c")
         if message:
-            self.layout.create_inner_label(on_right_side=True)
-            self.append_text_to_chat(f"{message}", use_label=True)
-            self.append_text_to_chat(f"\n\n")
+            self.chat_view.add_message("user", message)
             self.user_input.delete("1.0", "end")
-            self.chat_history.append({"role": "user", "content": message})
+            self.save_message("user", message)
+
+            self.generating = True
+            self.show_process_bar()
+            self.send_button.state(["disabled"])
+            self.refresh_button.state(["disabled"])
+            self.stop_event.clear()
+
+            model = self.model_select.get()
+            self.chat_view.add_message("assistant", header=model)
 
             Thread(
                 target=self.generate_ai_response,
+                args=(model,),
                 daemon=True,
             ).start()
 
-    def generate_ai_response(self):
-        self.show_process_bar()
-        self.send_button.state(["disabled"])
-        self.refresh_button.state(["disabled"])
+    def show_context_size(
+        self, tokens: int, sent: int, total: int, error: Optional[str] = None
+    ):
+        text = (
+            f"Prompt ~{tokens}/{self.context.num_ctx} tokens, "
+            f"{sent} of {total} messages"
+        )
+        if error:
+            text += f" (summary failed, older messages dropped: {error})"
+        self.context_label.config(text=text, foreground="red" if error else "gray")
 
+    def generate_ai_response(self, model: str):
+        ai_message = []
         try:
-            self.append_text_to_chat(f"{self.model_select.get()}\n", ("Bold",))
-            ai_message = ""
-            self.layout.create_inner_label()
-            for i in self.fetch_chat_stream_result():
-                self.append_text_to_chat(f"{i}", use_label=True)
-                ai_message += i
-            self.chat_history.append({"role": "assistant", "content": ai_message})
-            self.append_text_to_chat("\n\n")
+            messages, tokens = self.context.prepare(
+                model, self.chat_history, self.stop_event
+            )
+            if self.stop_event.is_set():
+                # Stopped while summarizing, the chat request was never sent
+                self.run_on_ui(self.chat_view.remove_last)
+                return
+            self.run_on_ui(
+                self.show_context_size,
+                tokens,
+                len(messages),
+                len(self.chat_history),
+                self.context.summary_error,
+            )
+
+            metrics = ResponseMetrics(model)
+            for i in self.fetch_chat_stream_result(model, messages, metrics):
+                self.render_queue.put(i)
+                ai_message.append(i)
+            self.run_on_ui(self.save_message, "assistant", "".join(ai_message), model)
+            self.run_on_ui(self.session_stats.add, metrics)
+            self.run_on_ui(self.chat_view.set_footer, -1, metrics.summary(), "Metrics")
         except Exception:  # noqa
-            self.append_text_to_chat(tk.END, f"\nAI error!\n\n", ("Error",))
+            # Keep every chat view message paired with a chat_history message
+            if ai_message:
+                self.run_on_ui(
+                    self.save_message, "assistant", "".join(ai_message), model
+                )
+            else:
+                self.run_on_ui(self.chat_view.remove_last)
+            self.run_on_ui(self.chat_view.set_footer, -1, "AI error!", "Error")
         finally:
-            self.hide_process_bar()
-            self.send_button.state(["!disabled"])
-            self.refresh_button.state(["!disabled"])
-            self.stop_button.state(["!disabled"])
+            self.run_on_ui(self.finish_generation)
+
+    def compare_models(self, prompt: str, models: List[str], limit: int) -> CompareRun:
+        """Send one prompt to several models, outside of the current chat."""
+        return CompareRun(
+            self.fetch_chat_stream_result,
+            models,
+            [{"role": "user", "content": prompt}],
+            limit,
+            on_result=lambda metrics: self.run_on_ui(self.session_stats.add, metrics),
+        ).start()
 
     def fetch_models(self) -> List[str]:
-        with urllib.request.urlopen(
-            urllib.parse.urljoin(self.api_url, "/api/tags")
-        ) as response:
-            data = json.load(response)
-            models = [model["name"] for model in data["models"]]
-            return models
-
-    def fetch_chat_stream_result(self) -> Generator:
-        request = urllib.request.Request(
-            urllib.parse.urljoin(self.api_url, "/api/chat"),
-            data=json.dumps(
-                {
-                    "model": self.model_select.get(),
-                    "messages": self.chat_history,
-                    "stream": True,
-                }
-            ).encode("utf-8"),
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-
-        with urllib.request.urlopen(request) as resp:
-            for line in resp:
-                if "disabled" in self.stop_button.state():  # stop
+        data = self.client.request("GET", "/api/tags")
+        models = [model["name"] for model in data["models"]]
+        return models
+
+    def fetch_chat_stream_result(
+        self,
+        model: str,
+        messages: List[dict],
+        metrics: Optional[ResponseMetrics] = None,
+        stop_event: Optional[Event] = None,
+    ) -> Generator:
+        stream = self.client.stream(
+            "POST",
+            "/api/chat",
+            {
+                "model": model,
+                "messages": messages,
+                "stream": True,
+                "options": self.context.options,
+                "keep_alive": self.context.keep_alive,
+            },
+        )
+        if stop_event is None:
+            stop_event = self.stop_event
+        final = None
+        try:
+            for data in stream:
+                if stop_event.is_set():  # stop
                     break
-                data = json.loads(line.decode("utf-8"))
+                if data.get("done"):
+                    final = data
                 if "message" in data:
-                    time.sleep(0.01)
+                    if metrics is not None and data["message"]["content"]:
+                        metrics.first_token()
                     yield data["message"]["content"]
+        finally:
+            stream.close()
+            if metrics is not None:
+                metrics.finish(final)
 
     def delete_model(self, model_name: str):
-        self.append_log_to_inner_textbox(clear=True)
+        """Delete a model, runs on a worker thread."""
+        log = partial(self.run_on_ui, self.append_log_to_inner_textbox)
+        log(None, True)
         if not model_name:
             return
 
-        req = urllib.request.Request(
-            urllib.parse.urljoin(self.api_url, "/api/delete"),
-            data=json.dumps({"name": model_name}).encode("utf-8"),
-            method="DELETE",
-        )
         try:
-            with urllib.request.urlopen(req) as response:
-                if response.status == 200:
-                    self.append_log_to_inner_textbox("Model deleted successfully.")
-                elif response.status == 404:
-                    self.append_log_to_inner_textbox("Model not found.")
+            self.client.request("DELETE", "/api/delete", {"name": model_name})
+            log("Model deleted successfully.")
+        except OllamaError as e:
+            if e.status == 404:
+                log("Model not found.")
+            else:
+                log(f"Failed to delete model: {e}")
         except Exception as e:
-            self.append_log_to_inner_textbox(f"Failed to delete model: {e}")
+            log(f"Failed to delete model: {e}")
         finally:
             self.update_model_list()
             self.update_model_select()
 
     def download_model(self, model_name: str, insecure: bool = False):
-        self.append_log_to_inner_textbox(clear=True)
+        """Pull a model and log its progress, runs on a worker thread."""
+        log = partial(self.run_on_ui, self.append_log_to_inner_textbox)
+        log(None, True)
         if not model_name:
             return
 
-        self.download_button.state(["disabled"])
+        self.run_on_ui(self.download_button.state, ["disabled"])
 
-        req = urllib.request.Request(
-            urllib.parse.urljoin(self.api_url, "/api/pull"),
-            data=json.dumps(
-                {"name": model_name, "insecure": insecure, "stream": True}
-            ).encode("utf-8"),
-            method="POST",
-        )
         try:
-            with urllib.request.urlopen(req) as response:
-                for line in response:
-                    data = json.loads(line.decode("utf-8"))
-                    log = data.get("error") or data.get("status") or "No response"
-                    if "status" in data:
-                        total = data.get("total")
-                        completed = data.get("completed", 0)
-                        if total:
-                            log += f" [{completed}/{total}]"
-                    self.append_log_to_inner_textbox(log)
+            for data in self.client.stream(
+                "POST",
+                "/api/pull",
+                {"name": model_name, "insecure": insecure, "stream": True},
+            ):
+                line = data.get("error") or data.get("status") or "No response"
+                if "status" in data:
+                    total = data.get("total")
+                    completed = data.get("completed", 0)
+                    if total:
+                        line += f" [{completed}/{total}]"
+                log(line)
         except Exception as e:
-            self.append_log_to_inner_textbox(f"Failed to download model: {e}")
+            log(f"Failed to download model: {e}")
         finally:
             self.update_model_list()
             self.update_model_select()
-            if self.download_button.winfo_exists():
-                self.download_button.state(["!disabled"])
+            self.run_on_ui(self.enable_download_button)
+
+    def enable_download_button(self):
+        if self.download_button.winfo_exists():
+            self.download_button.state(["!disabled"])
 
     def clear_chat(self):
-        for i in self.label_widgets:
-            i.destroy()
-        self.label_widgets.clear()
-        self.chat_box.config(state=tk.NORMAL)
-        self.chat_box.delete(1.0, tk.END)
-        self.chat_box.config(state=tk.DISABLED)
+        """Start a new conversation, the current one stays in the store."""
+        if self.generating:
+            return
+        self.chat_view.clear()
         self.chat_history.clear()
+        self.message_meta.clear()
+        self.conversation_id = None
 
 
 class LayoutManager:
@@ -351,6 +2066,11 @@ class LayoutManager:
         self.interface: OllamaInterface = interface
         self.management_window: Optional[tk.Toplevel] = None
         self.editor_window: Optional[tk.Toplevel] = None
+        self.stats_window: Optional[tk.Toplevel] = None
+        self.conversations_window: Optional[tk.Toplevel] = None
+        self.compare_window: Optional[tk.Toplevel] = None
+        self.batch_window: Optional[tk.Toplevel] = None
+        self.refresh_stats: Callable = lambda: None
 
     def init_layout(self):
         self._header_frame()
@@ -387,38 +2107,9 @@ class LayoutManager:
         self.interface.host_input = host_input
 
     def _chat_container_frame(self):
-        chat_frame = ttk.Frame(self.interface.root)
-        chat_frame.grid(row=1, column=0, sticky="nsew", padx=20)
-        chat_frame.grid_columnconfigure(0, weight=1)
-        chat_frame.grid_rowconfigure(0, weight=1)
-
-        chat_box = tk.Text(
-            chat_frame,
-            wrap=tk.WORD,
-            state=tk.DISABLED,
-            font=(self.interface.default_font, 12),
-            spacing1=5,
-            highlightthickness=0,
-        )
-        chat_box.grid(row=0, column=0, sticky="nsew")
-
-        scrollbar = ttk.Scrollbar(chat_frame, orient="vertical", command=chat_box.yview)
-        scrollbar.grid(row=0, column=1, sticky="ns")
-
-        chat_box.configure(yscrollcommand=scrollbar.set)
-
-        chat_box_menu = tk.Menu(chat_box, tearoff=0)
-        chat_box_menu.add_command(label="Copy All", command=self.interface.copy_all)
-        chat_box_menu.add_separator()
-        chat_box_menu.add_command(label="Clear Chat", command=self.interface.clear_chat)
-        chat_box.bind("<Configure>", self.interface.resize_inner_text_widget)
-
-        _right_click = (
-            "<Button-2>" if platform.system().lower() == "darwin" else "<Button-3>"
-        )
-        chat_box.bind(_right_click, lambda e: chat_box_menu.post(e.x_root, e.y_root))
-
-        self.interface.chat_box = chat_box
+        chat_view = ChatView(self.interface.root, self.interface)
+        chat_view.frame.grid(row=1, column=0, sticky="nsew", padx=20)
+        self.interface.chat_view = chat_view
 
     def _processbar_frame(self):
         process_frame = ttk.Frame(self.interface.root, height=28)
@@ -434,11 +2125,16 @@ class LayoutManager:
             process_frame,
             width=5,
             text="Stop",
-            command=lambda: stop_button.state(["disabled"]),
+            command=self.interface.stop_generation,
         )
 
+        context_label = ttk.Label(process_frame, foreground="gray")
+        context_label.grid(row=0, column=2, sticky="e")
+        process_frame.grid_columnconfigure(2, weight=1)
+
         self.interface.progress = progress
         self.interface.stop_button = stop_button
+        self.interface.context_label = context_label
 
     def _input_frame(self):
         input_frame = ttk.Frame(self.interface.root)
@@ -467,6 +2163,16 @@ class LayoutManager:
         file_menu.add_command(
             label="Model Management", command=self.show_model_management_window
         )
+        file_menu.add_command(label="New Chat", command=self.interface.clear_chat)
+        file_menu.add_command(
+            label="Conversations", command=self.show_conversations_window
+        )
+        file_menu.add_command(label="Compare Models", command=self.show_compare_window)
+        file_menu.add_command(label="Batch Run", command=self.show_batch_window)
+        file_menu.add_separator()
+        file_menu.add_command(
+            label="Session Stats", command=self.show_session_stats_window
+        )
         file_menu.add_command(label="Exit", command=self.interface.root.quit)
 
         edit_menu = tk.Menu(menubar, tearoff=0)
@@ -532,6 +2238,10 @@ class LayoutManager:
         tips.bind("<Button-1>", lambda e: webbrowser.open("https://ollama.com/library"))
         tips.grid(row=1, column=0, sticky="W", padx=(0, 5), pady=5)
 
+        self._context_settings_frame(management_window).grid(
+            row=1, column=0, sticky="ew", padx=10, pady=(0, 10)
+        )
+
         list_action_frame = ttk.Frame(management_window)
         list_action_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=(0, 10))
         list_action_frame.grid_columnconfigure(0, weight=1)
@@ -564,7 +2274,514 @@ class LayoutManager:
             daemon=True,
         ).start()
 
-    def show_editor_window(self, _, inner_label):
+    def _context_settings_frame(self, parent: tk.Misc) -> ttk.Frame:
+        context = self.interface.context
+        frame = ttk.Frame(parent)
+
+        num_ctx = tk.IntVar(frame, value=context.num_ctx)
+        keep_alive = tk.StringVar(frame, value=context.keep_alive)
+        summarize = tk.BooleanVar(frame, value=context.summarize)
+
+        def _apply(*_):
+            try:
+                context.num_ctx = max(int(num_ctx.get()), 512)
+            except (tk.TclError, ValueError):
+                pass
+            context.keep_alive = keep_alive.get().strip() or "5m"
+            context.summarize = summarize.get()
+
+        ttk.Label(frame, text="Context:").grid(row=0, column=0)
+        ttk.Spinbox(
+            frame,
+            from_=512,
+            to=131072,
+            increment=512,
+            width=8,
+            textvariable=num_ctx,
+        ).grid(row=0, column=1, padx=(5, 10))
+        ttk.Label(frame, text="Keep alive:").grid(row=0, column=2)
+        ttk.Entry(frame, width=6, textvariable=keep_alive).grid(
+            row=0, column=3, padx=(5, 10)
+        )
+        ttk.Checkbutton(frame, text="Summarize", variable=summarize).grid(
+            row=0, column=4
+        )
+
+        for var in (num_ctx, keep_alive, summarize):
+            var.trace_add("write", _apply)
+        return frame
+
+    def show_conversations_window(self):
+        if self.conversations_window and self.conversations_window.winfo_exists():
+            self.conversations_window.lift()
+            return
+
+        store = self.interface.store
+        if store is None:
+            messagebox.showwarning(
+                "Conversations",
+                "Conversation history is not available.",
+                parent=self.interface.root,
+            )
+            return
+
+        window = tk.Toplevel(self.interface.root)
+        window.title("Conversations")
+        window.geometry("600x400")
+        window.grid_columnconfigure(0, weight=1)
+        window.grid_rowconfigure(1, weight=1)
+
+        search_input = ttk.Entry(window)
+        search_input.grid(row=0, column=0, sticky="ew", padx=(10, 5), pady=10)
+
+        table = ttk.Treeview(window, columns=("title", "detail"), show="headings")
+        table.heading("title", text="Conversation")
+        table.heading("detail", text="")
+        table.column("title", width=220)
+        table.column("detail", width=340)
+        table.grid(row=1, column=0, columnspan=3, sticky="nsew", padx=10)
+
+        # Treeview item -> conversation id
+        conversations = {}
+
+        def _show(query: str = ""):
+            table.delete(*table.get_children())
+            conversations.clear()
+            if query.strip():
+                table.heading("detail", text="Match")
+                rows = store.search(query)
+                for row in rows:
+                    item = table.insert(
+                        "", tk.END, values=(row["title"], row["snippet"])
+                    )
+                    conversations[item] = row["conversation_id"]
+            else:
+                table.heading("detail", text="Updated")
+                for row in store.list_conversations():
+                    updated = time.strftime(
+                        "%Y-%m-%d %H:%M", time.localtime(row["updated_at"])
+                    )
+                    item = table.insert(
+                        "",
+                        tk.END,
+                        values=(row["title"], f"{updated}, {row['messages']} messages"),
+                    )
+                    conversations[item] = row["id"]
+
+        def _open(_=None):
+            selection = table.selection()
+            if selection:
+                self.interface.open_conversation(conversations[selection[0]])
+
+        def _delete():
+            selection = table.selection()
+            if not selection:
+                return
+            conversation_id = conversations[selection[0]]
+            if not messagebox.askyesno(
+                "Delete", "Delete this conversation?", parent=window
+            ):
+                return
+            store.delete_conversation(conversation_id)
+            if conversation_id == self.interface.conversation_id:
+                self.interface.clear_chat()
+            _show(search_input.get())
+
+        search_input.bind("<Return>", lambda e: _show(search_input.get()))
+        table.bind("<Double-1>", _open)
+        ttk.Button(
+            window, text="Search", command=lambda: _show(search_input.get())
+        ).grid(row=0, column=1, pady=10)
+        ttk.Button(window, text="Delete", command=_delete).grid(
+            row=0, column=2, padx=(5, 10), pady=10
+        )
+
+        _show()
+        self.conversations_window = window
+
+    def show_compare_window(self):
+        if self.compare_window and self.compare_window.winfo_exists():
+            self.compare_window.lift()
+            return
+
+        window = tk.Toplevel(self.interface.root)
+        window.title("Compare Models")
+        window.geometry("900x600")
+        window.grid_columnconfigure(0, weight=1)
+        window.grid_rowconfigure(2, weight=1)
+
+        controls = ttk.Frame(window)
+        controls.grid(row=0, column=0, sticky="ew", padx=10, pady=(10, 5))
+        controls.grid_columnconfigure(0, weight=1)
+
+        models_list = tk.Listbox(
+            controls, selectmode=tk.MULTIPLE, height=4, exportselection=False
+        )
+        models_list.grid(row=0, column=0, rowspan=2, sticky="ew")
+        for model in self.interface.model_select["values"]:
+            models_list.insert(tk.END, model)
+
+        ttk.Label(controls, text="Parallel:").grid(row=0, column=1, padx=(10, 5))
+        limit = tk.IntVar(value=2)
+        ttk.Spinbox(controls, from_=1, to=8, width=4, textvariable=limit).grid(
+            row=0, column=2
+        )
+
+        compare_button = ttk.Button(controls, text="Compare")
+        compare_button.grid(row=1, column=1, columnspan=2, padx=(10, 0), sticky="ew")
+        stop_button = ttk.Button(controls, text="Stop")
+        stop_button.grid(row=1, column=3, padx=(5, 0))
+        stop_button.state(["disabled"])
+
+        prompt_input = tk.Text(
+            window, font=(self.interface.default_font, 12), height=3, wrap=tk.WORD
+        )
+        prompt_input.grid(row=1, column=0, sticky="ew", padx=10, pady=5)
+        prompt_input.insert("1.0", self.interface.user_input.get("1.0", "end-1c"))
+
+        results = ttk.Frame(window)
+        results.grid(row=2, column=0, sticky="nsew", padx=10, pady=(5, 10))
+        results.grid_rowconfigure(1, weight=1)
+
+        # Model -> (response text, status label) of the current run
+        panes: Dict[str, Tuple[tk.Text, ttk.Label]] = {}
+        current: List[CompareRun] = []
+
+        def _tick():
+            if not window.winfo_exists() or not current:
+                return
+            run = current[0]
+            # Read done first, so the text streamed before it is still drained
+            finished = run.done
+            for model, (text, status) in panes.items():
+                chunk = run.drain(model)
+                if chunk:
+                    text.config(state=tk.NORMAL)
+                    text.insert(tk.END, chunk)
+                    text.see(tk.END)
+                    text.config(state=tk.DISABLED)
+                status.config(
+                    text=run.describe(model),
+                    foreground="red" if run.results[model]["error"] else "gray",
+                )
+            if finished:
+                compare_button.state(["!disabled"])
+                stop_button.state(["disabled"])
+            else:
+                window.after(RENDER_INTERVAL_MS, _tick)
+
+        def _compare():
+            prompt = prompt_input.get("1.0", "end-1c").strip()
+            models = [models_list.get(i) for i in models_list.curselection()]
+            if not prompt or not models:
+                messagebox.showinfo(
+                    "Compare", "Enter a prompt and select models.", parent=window
+                )
+                return
+            try:
+                parallel = max(1, limit.get())
+            except tk.TclError:
+                parallel = 1
+
+            # Columns of the previous run keep their weight after their panes
+            # are destroyed, so reset them before laying out fewer panes
+            for column in range(results.grid_size()[0]):
+                results.grid_columnconfigure(column, weight=0, uniform="")
+            for child in results.winfo_children():
+                child.destroy()
+            panes.clear()
+            for column, model in enumerate(models):
+                results.grid_columnconfigure(column, weight=1, uniform="pane")
+                ttk.Label(
+                    results,
+                    text=model,
+                    foreground="#ff007b",
+                    font=(self.interface.default_font, 10, "bold"),
+                ).grid(row=0, column=column, sticky="w", padx=2)
+                text = tk.Text(
+                    results,
+                    wrap=tk.WORD,
+                    state=tk.DISABLED,
+                    font=(self.interface.default_font, 11),
+                    width=1,
+                    highlightthickness=0,
+                )
+                text.grid(row=1, column=column, sticky="nsew", padx=2)
+                status = ttk.Label(
+                    results,
+                    foreground="gray",
+                    font=(self.interface.default_font, 9),
+                    wraplength=max(120, 860 // len(models)),
+                )
+                status.grid(row=2, column=column, sticky="w", padx=2)
+                panes[model] = (text, status)
+
+            compare_button.state(["disabled"])
+            stop_button.state(["!disabled"])
+            current[:] = [self.interface.compare_models(prompt, models, parallel)]
+            _tick()
+
+        def _stop():
+            if current:
+                current[0].stop()
+            stop_button.state(["disabled"])
+
+        def _close():
+            _stop()
+            window.destroy()
+
+        compare_button.config(command=_compare)
+        stop_button.config(command=_stop)
+        window.protocol("WM_DELETE_WINDOW", _close)
+        self.compare_window = window
+
+    def show_batch_window(self):
+        if self.batch_window and self.batch_window.winfo_exists():
+            self.batch_window.lift()
+            return
+
+        window = tk.Toplevel(self.interface.root)
+        window.title("Batch Run")
+        window.geometry("560x260")
+        window.grid_columnconfigure(1, weight=1)
+
+        input_path = tk.StringVar()
+        output_path = tk.StringVar()
+        model = tk.StringVar(value=self.interface.model_select.get())
+        workers = tk.IntVar(value=4)
+        rate = tk.DoubleVar(value=0.0)
+
+        def _browse_input():
+            path = filedialog.askopenfilename(
+                parent=window,
+                filetypes=[("Prompts", "*.jsonl *.json *.csv"), ("All files", "*")],
+            )
+            if path:
+                input_path.set(path)
+                if not output_path.get():
+                    output_path.set(BatchRunner.default_output(path))
+
+        def _browse_output():
+            path = filedialog.asksaveasfilename(
+                parent=window,
+                defaultextension=".jsonl",
+                filetypes=[("JSON Lines", "*.jsonl")],
+                confirmoverwrite=False,  # results are appended, not overwritten
+            )
+            if path:
+                output_path.set(path)
+
+        ttk.Label(window, text="Prompts:").grid(
+            row=0, column=0, sticky="w", padx=10, pady=(10, 5)
+        )
+        ttk.Entry(window, textvariable=input_path).grid(
+            row=0, column=1, sticky="ew", pady=(10, 5)
+        )
+        ttk.Button(window, text="Browse", command=_browse_input).grid(
+            row=0, column=2, padx=10, pady=(10, 5)
+        )
+        ttk.Label(window, text="Results:").grid(row=1, column=0, sticky="w", padx=10)
+        ttk.Entry(window, textvariable=output_path).grid(row=1, column=1, sticky="ew")
+        ttk.Button(window, text="Browse", command=_browse_output).grid(
+            row=1, column=2, padx=10
+        )
+        ttk.Label(window, text="Model:").grid(
+            row=2, column=0, sticky="w", padx=10, pady=5
+        )
+        ttk.Combobox(
+            window,
+            textvariable=model,
+            values=self.interface.model_select["values"],
+            state="readonly",
+        ).grid(row=2, column=1, sticky="ew", pady=5)
+
+        settings = ttk.Frame(window)
+        settings.grid(row=3, column=1, sticky="w")
+        ttk.Label(settings, text="Workers:").grid(row=0, column=0)
+        ttk.Spinbox(settings, from_=1, to=16, width=4, textvariable=workers).grid(
+            row=0, column=1, padx=(5, 15)
+        )
+        ttk.Label(settings, text="Requests/s (0 = no limit):").grid(row=0, column=2)
+        ttk.Spinbox(
+            settings, from_=0, to=100, increment=0.5, width=6, textvariable=rate
+        ).grid(row=0, column=3, padx=5)
+
+        progress = ttk.Progressbar(window, mode="determinate")
+        progress.grid(row=4, column=0, columnspan=3, sticky="ew", padx=10, pady=10)
+        status = ttk.Label(window, foreground="gray")
+        status.grid(row=5, column=0, columnspan=2, sticky="w", padx=10)
+
+        buttons = ttk.Frame(window)
+        buttons.grid(row=5, column=2, padx=10)
+        start_button = ttk.Button(buttons, text="Start")
+        start_button.grid(row=0, column=0)
+        cancel_button = ttk.Button(buttons, text="Cancel")
+        cancel_button.grid(row=0, column=1, padx=(5, 0))
+        cancel_button.state(["disabled"])
+
+        # The running BatchRunner, and its outcome set by the worker thread
+        current: List[BatchRunner] = []
+        outcome: Dict[str, Any] = {}
+
+        def _run(runner: BatchRunner):
+            try:
+                outcome["finished"] = runner.run()
+            except Exception as e:  # noqa
+                # Report any failure, otherwise the window waits forever
+                outcome["error"] = str(e) or type(e).__name__
+
+        def _tick():
+            if not window.winfo_exists() or not current:
+                return
+            runner = current[0]
+            done = runner.skipped + runner.completed + runner.failed
+            progress.config(maximum=max(1, runner.total), value=done)
+            text = f"{done}/{runner.total} done, {runner.failed} failed"
+            if runner.skipped:
+                text += f", {runner.skipped} from an earlier run"
+
+            if "error" in outcome:
+                status.config(text=f"Error: {outcome['error']}", foreground="red")
+            elif "finished" in outcome:
+                if not outcome["finished"]:
+                    text += ". Cancelled, start again to resume"
+                status.config(text=text, foreground="gray")
+            else:
+                status.config(text=text, foreground="gray")
+                window.after(200, _tick)
+                return
+            start_button.state(["!disabled"])
+            cancel_button.state(["disabled"])
+
+        def _start():
+            if not input_path.get() or not model.get():
+                messagebox.showinfo(
+                    "Batch Run", "Choose a prompts file and a model.", parent=window
+                )
+                return
+            if not output_path.get():
+                output_path.set(BatchRunner.default_output(input_path.get()))
+            try:
+                worker_count, requests_per_sec = workers.get(), rate.get()
+            except tk.TclError:
+                worker_count, requests_per_sec = 4, 0.0
+
+            context = self.interface.context
+            runner = BatchRunner(
+                self.interface.client,
+                model.get(),
+                input_path.get(),
+                output_path.get(),
+                workers=worker_count,
+                rate=requests_per_sec,
+                options=context.options,
+                keep_alive=context.keep_alive,
+            )
+            current[:] = [runner]
+            outcome.clear()
+            start_button.state(["disabled"])
+            cancel_button.state(["!disabled"])
+            status.config(text="Starting...", foreground="gray")
+            Thread(target=_run, args=(runner,), daemon=True).start()
+            window.after(200, _tick)
+
+        def _cancel():
+            if current:
+                current[0].stop()
+            cancel_button.state(["disabled"])
+
+        def _close():
+            _cancel()
+            window.destroy()
+
+        start_button.config(command=_start)
+        cancel_button.config(command=_cancel)
+        window.protocol("WM_DELETE_WINDOW", _close)
+        self.batch_window = window
+
+    def show_session_stats_window(self):
+        if self.stats_window and self.stats_window.winfo_exists():
+            self.stats_window.lift()
+            self.refresh_stats()
+            return
+
+        stats = self.interface.session_stats
+        stats_window = tk.Toplevel(self.interface.root)
+        stats_window.title("Session Stats")
+        stats_window.geometry("760x300")
+        stats_window.grid_columnconfigure(0, weight=1)
+        stats_window.grid_rowconfigure(0, weight=1)
+
+        headings = {
+            "model": ("Model", 180),
+            "responses": ("Responses", 80),
+            "tokens": ("Tokens", 70),
+            "tokens_per_sec": ("Tokens/s", 80),
+            "prompt_tokens_per_sec": ("Prompt tok/s", 90),
+            "avg_load": ("Load (s)", 70),
+            "avg_ttft": ("First token (s)", 100),
+            "avg_latency": ("Total (s)", 70),
+        }
+        table = ttk.Treeview(
+            stats_window, columns=SessionStats.COLUMNS, show="headings"
+        )
+        for column in SessionStats.COLUMNS:
+            text, width = headings[column]
+            table.heading(column, text=text)
+            table.column(column, width=width, anchor="w" if column == "model" else "e")
+        table.grid(row=0, column=0, columnspan=4, sticky="nsew", padx=10, pady=10)
+
+        def _format(value):
+            if value is None:
+                return "-"
+            if isinstance(value, float):
+                return f"{value:.2f}"
+            return value
+
+        def _refresh():
+            table.delete(*table.get_children())
+            for row in stats.by_model().values():
+                table.insert(
+                    "", tk.END, values=[_format(row[c]) for c in SessionStats.COLUMNS]
+                )
+
+        def _export(per_response: bool):
+            path = filedialog.asksaveasfilename(
+                parent=stats_window,
+                defaultextension=".csv",
+                filetypes=[("CSV", "*.csv")],
+                initialfile="responses.csv" if per_response else "session_stats.csv",
+            )
+            if path:
+                try:
+                    stats.export_csv(path, per_response)
+                except OSError as e:
+                    messagebox.showerror("Error", str(e), parent=stats_window)
+
+        def _clear():
+            stats.clear()
+            _refresh()
+
+        ttk.Button(stats_window, text="Refresh", command=_refresh).grid(
+            row=1, column=0, sticky="w", padx=10, pady=(0, 10)
+        )
+        ttk.Button(
+            stats_window, text="Export Summary", command=lambda: _export(False)
+        ).grid(row=1, column=1, padx=(0, 5), pady=(0, 10))
+        ttk.Button(
+            stats_window, text="Export Responses", command=lambda: _export(True)
+        ).grid(row=1, column=2, padx=(0, 5), pady=(0, 10))
+        ttk.Button(stats_window, text="Clear", command=_clear).grid(
+            row=1, column=3, padx=(0, 10), pady=(0, 10)
+        )
+
+        _refresh()
+        self.refresh_stats = _refresh
+        self.stats_window = stats_window
+
+    def show_editor_window(self, index: Optional[int]):
+        if index is None:
+            return
         if self.editor_window and self.editor_window.winfo_exists():
             self.editor_window.lift()
             return
@@ -582,19 +2799,17 @@ class LayoutManager:
 
         chat_editor = tk.Text(editor_window)
         chat_editor.grid(row=0, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
-        chat_editor.insert(tk.END, inner_label.cget("text"))
+        chat_editor.insert(tk.END, self.interface.chat_view.text_of(index))
 
         editor_window.grid_rowconfigure(0, weight=1)
         editor_window.grid_columnconfigure(0, weight=1)
         editor_window.grid_columnconfigure(1, weight=1)
 
         def _save():
-            idx = self.interface.label_widgets.index(inner_label)
-            if len(self.interface.chat_history) > idx:
-                self.interface.chat_history[idx]["content"] = chat_editor.get(
-                    "1.0", "end-1c"
-                )
-                inner_label.config(text=chat_editor.get("1.0", "end-1c"))
+            if len(self.interface.chat_history) > index:
+                text = chat_editor.get("1.0", "end-1c")
+                self.interface.update_message(index, text)
+                self.interface.chat_view.set_text(index, text)
 
             editor_window.destroy()
 
@@ -611,53 +2826,70 @@ class LayoutManager:
 
         self.editor_window = editor_window
 
-    def create_inner_label(self, on_right_side: bool = False):
-        background = "#48a4f2" if on_right_side else "#eaeaea"
-        foreground = "white" if on_right_side else "black"
-        max_width = int(self.interface.chat_box.winfo_reqwidth()) * 0.7
-        inner_label = tk.Label(
-            self.interface.chat_box,
-            justify=tk.LEFT,
-            wraplength=max_width,
-            background=background,
-            highlightthickness=0,
-            highlightbackground=background,
-            foreground=foreground,
-            padx=8,
-            pady=8,
-            font=(self.interface.default_font, 12),
-            borderwidth=0,
-        )
-        self.interface.label_widgets.append(inner_label)
 
-        inner_label.bind(
-            "<MouseWheel>",
-            lambda e: self.interface.chat_box.yview_scroll(
-                int(-1 * (e.delta / 120)), "units"
-            ),
-        )
-        inner_label.bind(
-            "<Double-1>", lambda e: self.show_editor_window(e, inner_label)
-        )
+def run_batch(argv: Optional[List[str]] = None) -> int:
+    """Run a batch without the GUI: ``python ollama_gui.py batch prompts.jsonl``"""
+    parser = argparse.ArgumentParser(
+        prog="ollama_gui.py batch",
+        description="Run prompts from a JSONL or CSV file through an Ollama model. "
+        "Running the same batch again resumes it, rows are matched by id and "
+        "model. Results of a row are numbered by attempt, the latest one counts.",
+    )
+    parser.add_argument("input", help="prompts, .csv or JSONL")
+    parser.add_argument(
+        "output",
+        nargs="?",
+        help="JSONL results, appended to (default: <input>.results.jsonl)",
+    )
+    parser.add_argument("--model", required=True, help="model of rows without one")
+    parser.add_argument("--host", default="http://127.0.0.1:11434")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="maximum requests started per second, 0 for no limit",
+    )
+    parser.add_argument("--num-ctx", type=int, help="context window of the model")
+    parser.add_argument("--keep-alive", default="30m")
+    args = parser.parse_args(argv)
+
+    output = args.output or BatchRunner.default_output(args.input)
+    runner = BatchRunner(
+        OllamaClient(args.host, pool_size=args.workers),
+        args.model,
+        args.input,
+        output,
+        workers=args.workers,
+        rate=args.rate,
+        options={"num_ctx": args.num_ctx} if args.num_ctx else None,
+        keep_alive=args.keep_alive,
+    )
 
-        _right_menu = tk.Menu(inner_label, tearoff=0)
-        _right_menu.add_command(
-            label="Edit", command=lambda: self.show_editor_window(None, inner_label)
-        )
-        _right_menu.add_command(
-            label="Copy This",
-            command=lambda: self.interface.copy_text(inner_label.cget("text")),
-        )
-        _right_menu.add_separator()
-        _right_menu.add_command(label="Clear Chat", command=self.interface.clear_chat)
-        _right_click = (
-            "<Button-2>" if platform.system().lower() == "darwin" else "<Button-3>"
-        )
-        inner_label.bind(_right_click, lambda e: _right_menu.post(e.x_root, e.y_root))
-        self.interface.chat_box.window_create(tk.END, window=inner_label)
-        if on_right_side:
-            idx = self.interface.chat_box.index("end-1c").split(".")[0]
-            self.interface.chat_box.tag_add("Right", f"{idx}.0", f"{idx}.end")
+    def _report(record: dict):
+        done = runner.skipped + runner.completed + runner.failed
+        if record["status"] == "ok":
+            detail = f"{record['latency']:.2f}s"
+            if record["tokens_per_sec"] is not None:
+                detail += f", {record['tokens_per_sec']:.1f} tok/s"
+        else:
+            detail = f"error: {record['error']}"
+        print(f"[{done}/{runner.total}] {record['id']}: {detail}", flush=True)
+
+    try:
+        finished = runner.run(_report)
+    except (OSError, ValueError) as e:
+        print(f"{args.input}: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"{runner.completed} succeeded, {runner.failed} failed, "
+        f"{runner.skipped} skipped from an earlier run -> {output}"
+    )
+    if not finished:
+        print("Cancelled, run the same command again to resume.")
+        return 130
+    return 1 if runner.failed else 0
 
 
 def run():
@@ -673,16 +2905,12 @@ def run():
     root.grid_rowconfigure(2, weight=0)
     root.grid_rowconfigure(3, weight=0)
 
-    app = OllamaInterface(root)
-
-    app.chat_box.tag_configure(
-        "Bold", foreground="#ff007b", font=(app.default_font, 10, "bold")
-    )
-    app.chat_box.tag_configure("Error", foreground="red")
-    app.chat_box.tag_configure("Right", justify="right")
+    OllamaInterface(root)
 
     root.mainloop()
 
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["batch"]:
+        sys.exit(run_batch(sys.argv[2:]))
     run()
@@ -5,11 +5,13 @@
 QuickEdit++ 主程序入口
 """
 
+# 启动耗时分析器最先导入, 计时从这里开始
+from app.startup_profiler import startup_profiler
 import sys
 import os
 import argparse
 import traceback
-from app.editor import QuickEditApp
+import multiprocessing
 from loguru import logger
 
 
@@ -39,6 +41,47 @@ def handle_exception(exc_type, exc_value, exc_traceback):
         traceback.print_exception(exc_type, exc_value, exc_traceback)
 
 
+def resolve_file_paths(files):
+    """
+    检查命令行提供的文件路径, 不存在的文件作为新文件创建
+
+    任一路径无效时打印错误信息并退出程序
+
+    Args:
+        files (list): 命令行提供的文件路径列表
+
+    Returns:
+        list: 文件绝对路径列表
+    """
+    file_paths = []
+    for file in files:
+        # 检查路径是否存在
+        if os.path.exists(file):
+            # 检查是否是目录
+            if os.path.isdir(file):
+                print(f"error: 无法打开目录: {file}")
+                sys.exit(1)
+        else:
+            # 文件不存在，检查上级目录是否存在
+            dir_path = os.path.dirname(file)
+            if dir_path and not os.path.exists(dir_path):
+                print(f"error: 上级目录不存在: {file}")
+                sys.exit(1)
+
+            # 作为新文件创建
+            try:
+                with open(file, "w", encoding="utf-8") as f:
+                    f.write("")
+            except Exception as e:
+                print(f"error: 无法创建文件: {file}，错误信息: {str(e)}")
+                logger.error(f"无法创建文件: {file}，错误信息: {str(e)}")
+                sys.exit(1)
+
+        # 转发给已运行的编辑器时工作目录可能不同, 统一使用绝对路径
+        file_paths.append(os.path.abspath(file))
+    return file_paths
+
+
 def main():
     """主函数"""
     # 设置全局异常处理
@@ -49,52 +92,67 @@ def main():
 
     # 创建命令行参数解析器
     parser = argparse.ArgumentParser(description=f"{program_name} - 轻量级文本编辑器")
-    parser.add_argument("file", nargs="?", help="要打开的文件路径")
+    parser.add_argument(
+        "files", nargs="*", metavar="file", help="要打开的文件路径, 可以指定多个"
+    )
+    parser.add_argument(
+        "--new-instance",
+        action="store_true",
+        help="不转发给已运行的编辑器, 总是启动新的窗口",
+    )
+    parser.add_argument(
+        "--trace-startup",
+        action="store_true",
+        help="记录各启动阶段的耗时, 报告写入配置目录下的startup_trace.txt",
+    )
 
     # 解析命令行参数
     args = parser.parse_args()
 
-    # 检查是否有多个参数
-    if len(sys.argv) > 2:
-        print("error: 只支持打开单个文件，请一次只提供一个文件路径")
-        sys.exit(1)
+    if args.trace_startup:
+        startup_profiler.enable()
+
+    file_paths = resolve_file_paths(args.files)
+
+    # 单实例模式下已有编辑器运行时, 把文件转发给它后直接退出
+    with startup_profiler.phase("加载配置"):
+        from config.config_manager import config_manager
+
+    single_instance = not args.new_instance and config_manager.get(
+        "app.single_instance", True
+    )
+    if single_instance:
+        from app.single_instance import forward_files
+
+        if forward_files(file_paths):
+            logger.info("文件已转发给运行中的编辑器")
+            sys.exit(0)
 
     # 创建并运行应用
     try:
-        app = QuickEditApp()
+        # 编辑器模块依赖较多, 在解析参数之后导入, 以便计入启动跟踪
+        with startup_profiler.phase("导入编辑器模块"):
+            from app.editor import QuickEditApp
+
+        with startup_profiler.phase("创建主窗口"):
+            app = QuickEditApp()
 
         # 初始化拖拽功能
-        app.init_drag_drop()
-
-        # 如果提供了文件路径参数
-        if args.file:
-            # 检查路径是否存在
-            if os.path.exists(args.file):
-                # 检查是否是目录
-                if os.path.isdir(args.file):
-                    print("error: 无法打开目录")
-                    sys.exit(1)
-
-                # 文件存在，直接打开
-                app.open_file_with_path(args.file)
-            else:
-                # 文件不存在，检查上级目录是否存在
-                dir_path = os.path.dirname(args.file)
-                if dir_path and not os.path.exists(dir_path):
-                    print("error: 上级目录不存在")
-                    sys.exit(1)
-
-                # 作为新文件创建
-                try:
-                    # 先创建空文件
-                    with open(args.file, "w", encoding="utf-8") as f:
-                        f.write("")
-                    # 然后通过文件操作打开它
-                    app.open_file_with_path(args.file)
-                except Exception as e:
-                    print(f"error: 无法创建文件: {args.file}，错误信息: {str(e)}")
-                    logger.error(f"无法创建文件: {args.file}，错误信息: {str(e)}")
-                    sys.exit(1)
+        with startup_profiler.phase("初始化拖拽功能"):
+            app.init_drag_drop()
+
+        # 尽早开始监听, 窗口初始化期间转发的文件会在进入主循环后打开
+        if single_instance:
+            with startup_profiler.phase("启动单实例服务"):
+                app.start_instance_server()
+
+        # 依次打开命令行提供的文件
+        with startup_profiler.phase("打开命令行文件"):
+            for file_path in file_paths:
+                app.open_file_with_path(file_path)
+
+        # 窗口完成首次绘制后写入启动跟踪报告
+        startup_profiler.mark_first_paint(app)
 
         # 运行应用
         app.run()
@@ -106,4 +164,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包后的程序需要支持文档统计使用的进程池
+    multiprocessing.freeze_support()
     main()
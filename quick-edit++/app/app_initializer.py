@@ -14,6 +14,10 @@ from .file_operations import FileOperations
 from .file_watcher import FileWatcher
 from syntax_highlighter import SyntaxHighlighter
 from .find_replace_engine import FindReplaceEngine
+from .text_change_proxy import TextChangeProxy
+from .text_stats_model import TextStatsModel
+from .undo_journal import UndoJournal
+from .startup_profiler import startup_profiler
 from ctypes import windll
 from loguru import logger
 import os
@@ -61,8 +65,11 @@ class AppInitializer:
         )  # 从配置中读取默认换行符
         self.app.is_new_file = False  # 是否为新文件状态
 
-        # 字符数缓存
-        self.app._total_chars = 0  # 缓存的总字符数
+        # 文本统计模型, 在UI初始化后创建
+        self.app.text_change_proxy = None  # 文本组件修改代理
+        self.app.text_stats = None  # 增量维护的文本统计
+        self.app.undo_journal = None  # 撤销日志
+        self.app.documents = None  # 文档管理器, 在编辑器组件初始化后创建
 
         # 从配置文件中读取只读模式状态
         self.app.is_read_only = config_manager.get(
@@ -195,6 +202,32 @@ class AppInitializer:
             value=current_notification_duration
         )
 
+    def init_text_stats(self):
+        """初始化文本修改代理、增量统计模型和撤销日志"""
+        textbox = self.app.text_area._textbox
+
+        # 代理底层文本组件命令, 修改前后通知观察者
+        self.app.text_change_proxy = TextChangeProxy(textbox)
+
+        # 统计模型根据修改增量维护字符数、行数等统计值
+        self.app.text_stats = TextStatsModel(self.app, textbox)
+        self.app.text_change_proxy.add_observer(self.app.text_stats)
+
+        # 撤销日志记录修改增量, 取代Tk自带的撤销栈
+        persist = config_manager.get("text_editor.persist_undo_history", True)
+        self.app.undo_journal = UndoJournal(
+            self.app,
+            textbox,
+            memory_budget=config_manager.get(
+                "text_editor.undo_memory_budget", 8 * 1024 * 1024
+            ),
+            max_steps=config_manager.get("text_editor.max_undo", 50),
+            history_dir=(
+                os.path.join(APP_CONFIG_DIR, "undo_history") if persist else None
+            ),
+        )
+        self.app.text_change_proxy.add_observer(self.app.undo_journal)
+
     def init_syntax_highlighting(self):
         """初始化语法高亮功能"""
         # 创建语法高亮实例并关联到文本区域
@@ -246,26 +279,37 @@ class AppInitializer:
 
     def initialize_app(self):
         """执行完整的应用初始化流程"""
-        # 按顺序执行初始化步骤
-        self.init_dpi_support()
+        # 按顺序执行初始化步骤, 每一步都计入启动跟踪
+        with startup_profiler.phase("DPI感知"):
+            self.init_dpi_support()
 
         # 初始化CTk主窗口 - 修复继承关系问题
-        ctk.CTk.__init__(self.app)
+        with startup_profiler.phase("创建CTk主窗口"):
+            ctk.CTk.__init__(self.app)
 
         # 初始化菜单变量 (需要在UI初始化之前)
-        self.init_menu_variables()
+        with startup_profiler.phase("菜单变量"):
+            self.init_menu_variables()
 
         # 初始化文件属性 (需要在UI初始化之前)
-        self.init_file_attributes()
+        with startup_profiler.phase("文件属性"):
+            self.init_file_attributes()
 
         # 初始化UI组件
-        self.ui_initializer.initialize_ui()
+        with startup_profiler.phase("UI组件"):
+            self.ui_initializer.initialize_ui()
+
+        # 初始化文本统计 (需要在文本区域创建之后)
+        with startup_profiler.phase("文本统计和撤销日志"):
+            self.init_text_stats()
 
         # 初始化语法高亮
-        self.init_syntax_highlighting()
+        with startup_profiler.phase("语法高亮"):
+            self.init_syntax_highlighting()
 
         # 初始化其他组件
-        self.init_other()
+        with startup_profiler.phase("查找引擎和日志"):
+            self.init_other()
 
         # 初始化文件菜单部分项的状态
         self.app.update_file_menu_state()
@@ -25,15 +25,52 @@ class AutoSaveManager:
         self.app = app
 
         # 自动保存相关属性
-        self.auto_save_enabled = config_manager.get(
-            "app.auto_save", False
-        )  # 是否启用自动保存
-        self.auto_save_interval = config_manager.get(
-            "app.auto_save_interval", 5
-        )  # 自动保存间隔，单位秒
+        app_config = config_manager.get_component_config("app")
+        self.auto_save_enabled = app_config.auto_save  # 是否启用自动保存
+        self.auto_save_interval = app_config.auto_save_interval  # 自动保存间隔，单位秒
         self.last_auto_save_time = 0  # 上次自动保存时间
         self._auto_save_job = None  # 自动保存任务ID
 
+        # 订阅自动保存配置, 修改配置后自动启动或停止定时任务
+        config_manager.subscribe("app.auto_save", self._on_config_changed)
+        config_manager.subscribe("app.auto_save_interval", self._on_config_changed)
+
+    def _on_config_changed(self, key_path, value):
+        """
+        自动保存配置变更回调
+
+        更新内部状态、菜单变量和状态栏, 并根据新配置启动或停止自动保存任务
+
+        Args:
+            key_path: 变更的配置键路径
+            value: 配置值, 统一从快照读取以得到校正类型后的值
+        """
+        app_config = config_manager.get_component_config("app")
+        enabled = app_config.auto_save
+        interval = app_config.auto_save_interval
+        if enabled == self.auto_save_enabled and interval == self.auto_save_interval:
+            return
+
+        was_enabled = self.auto_save_enabled
+        self.auto_save_enabled = enabled
+        self.auto_save_interval = interval
+
+        # 同步菜单变量
+        if self.app.auto_save_var is not None:
+            self.app.auto_save_var.set(enabled)
+        self.app.auto_save_interval_var.set(str(interval))
+
+        # 使用状态栏的方法更新显示
+        self.app.status_bar.set_auto_save_status()
+
+        if enabled:
+            # 启动新的自动保存任务（start_auto_save方法会自动取消现有任务）
+            self.start_auto_save()
+        elif was_enabled:
+            # 禁用自动保存，取消自动保存任务，并将上次的自动保存时间设置为0
+            self.stop_auto_save()
+            self.last_auto_save_time = 0
+
     def start_auto_save(self):
         """
         启动自动保存功能
@@ -157,10 +194,8 @@ class AutoSaveManager:
 
         功能：
         - 获取Checkbutton已更新的状态值
-        - 保存配置
-        - 更新内部状态
-        - 更新状态栏显示
-        - 根据状态启动或停止自动保存
+        - 保存配置, 由配置变更回调更新内部状态、状态栏并启动或停止自动保存
+        - 启用时立即保存一次并显示通知
         """
         # 获取Checkbutton已更新的当前状态值
         if self.app.auto_save_var is not None:
@@ -170,21 +205,11 @@ class AutoSaveManager:
             current_state = config_manager.get("app.auto_save", False)
             current_state = not current_state
 
-        # 保存配置
+        # 保存配置, 配置变更回调会更新内部状态并启动或停止自动保存任务
         config_manager.set("app.auto_save", current_state)
         config_manager.save_config()
 
-        # 更新内部状态
-        self.auto_save_enabled = current_state
-
-        # 使用状态栏的方法更新显示
-        self.app.status_bar.set_auto_save_status()
-
-        # 根据状态启动或停止自动保存
         if current_state:
-            # 启用自动保存，启动自动保存任务
-            self.start_auto_save()
-
             # 开启的时候立即保存一次(如果文件已修改)
             if self.app.current_file_path and self.app.is_modified():
                 # 调用内部的保存方法
@@ -195,11 +220,6 @@ class AutoSaveManager:
             self.app.nm.show_info(message="自动保存已启用")
 
         else:
-            # 禁用自动保存，取消自动保存任务
-            self.stop_auto_save()
-            # 禁用自动保存后，将上次的自动保存时间设置为0
-            self.last_auto_save_time = 0
-
             # 禁用自动保存调用通知
             self.app.nm.show_info(message="自动保存已禁用")
 
@@ -213,24 +233,10 @@ class AutoSaveManager:
         Args:
             interval (int): 保存间隔，单位为秒
         """
-        # 保存配置
+        # 保存配置, 配置变更回调会更新内部状态并重新启动自动保存任务
         config_manager.set("app.auto_save_interval", interval)
         config_manager.save_config()
 
-        # 更新内部状态
-        self.auto_save_interval = interval
-
-        # 更新auto_save_interval_var变量
-        self.app.auto_save_interval_var.set(str(interval))
-
-        # 使用状态栏的方法更新显示
-        self.app.status_bar.set_auto_save_status()
-
-        # 如果自动保存已启用，重新启动自动保存任务
-        if self.auto_save_enabled:
-            # 启动新的自动保存任务（start_auto_save方法会自动取消现有任务）
-            self.start_auto_save()
-
         # 显示通知
         # self.app.status_bar.show_notification(f"自动保存间隔已设置为: {interval}秒")
         self.app.nm.show_info(message=f"自动保存间隔已设置为: {interval}秒")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+书签索引模块
+按起始位置有序保存书签, 并用线段树维护结束位置, 定位、包含查询和
+上一个/下一个查询都只需要O(log n)次位置比较
+"""
+
+
+class Bookmark:
+    """
+    书签类
+
+    起止位置保存为Tk标记名, 文本编辑时由Tk自动移动, 不需要重新计算
+    """
+
+    __slots__ = ("tag", "start", "end")
+
+    def __init__(self, tag, start, end):
+        """
+        初始化书签
+
+        Args:
+            tag (str): 高亮标签名
+            start (str): 起始位置的标记名
+            end (str): 结束位置的标记名, 单点书签与起始标记相同
+        """
+        self.tag = tag
+        self.start = start
+        self.end = end
+
+    @property
+    def is_point(self):
+        """是否为单点书签"""
+        return self.start == self.end
+
+
+class BookmarkIndex:
+    """
+    书签索引类
+
+    书签按起始位置排序, 另用线段树记录每个区间内结束位置最靠后的书签;
+    位置比较由调用方提供, 只要所有标记使用相同的gravity, 编辑就不会改变
+    标记之间的先后顺序, 排序和线段树在编辑后依然有效, 只在增删书签后重建线段树
+    """
+
+    def __init__(self, compare):
+        """
+        初始化书签索引
+
+        Args:
+            compare (callable): 位置比较函数, 参数为 (位置, 运算符, 位置), 与Text.compare一致
+        """
+        self.compare = compare
+        self._bookmarks = []
+        # 线段树, 节点保存区间内结束位置最靠后的书签序号, 增删书签后置为None
+        self._tree = None
+        self._size = 0  # 线段树叶子数量
+
+    def __len__(self):
+        return len(self._bookmarks)
+
+    def __iter__(self):
+        return iter(self._bookmarks)
+
+    def __getitem__(self, index):
+        return self._bookmarks[index]
+
+    def bisect_left(self, position):
+        """
+        查找第一个起始位置不早于position的书签序号
+
+        Args:
+            position (str): 文本位置
+
+        Returns:
+            int: 书签序号, 所有书签都在position之前时返回书签数量
+        """
+        lo, hi = 0, len(self._bookmarks)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.compare(self._bookmarks[mid].start, "<", position):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def bisect_right(self, position):
+        """
+        查找第一个起始位置晚于position的书签序号
+
+        Args:
+            position (str): 文本位置
+
+        Returns:
+            int: 书签序号, 没有晚于position的书签时返回书签数量
+        """
+        lo, hi = 0, len(self._bookmarks)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.compare(self._bookmarks[mid].start, "<=", position):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def add(self, bookmark):
+        """
+        添加书签, 起始位置相同的书签按添加顺序排列
+
+        Args:
+            bookmark (Bookmark): 要添加的书签, 其标记必须已经设置
+        """
+        self._bookmarks.insert(self.bisect_right(bookmark.start), bookmark)
+        self._tree = None
+
+    def remove(self, bookmark):
+        """
+        删除书签
+
+        Args:
+            bookmark (Bookmark): 要删除的书签
+
+        Returns:
+            bool: 书签存在并已删除返回True
+        """
+        # 只需要检查起始位置相同的书签
+        index = self.bisect_left(bookmark.start)
+        while index < len(self._bookmarks):
+            current = self._bookmarks[index]
+            if current is bookmark:
+                del self._bookmarks[index]
+                self._tree = None
+                return True
+            if self.compare(current.start, ">", bookmark.start):
+                break
+            index += 1
+        return False
+
+    def clear(self):
+        """删除所有书签"""
+        self._bookmarks.clear()
+        self._tree = None
+
+    def find_containing(self, position):
+        """
+        查找包含指定位置的书签, 起止位置都算在范围内
+
+        Args:
+            position (str): 文本位置
+
+        Returns:
+            Optional[Bookmark]: 起始位置最靠后的包含该位置的书签, 没有时返回None
+        """
+        count = self.bisect_right(position)
+        if not count:
+            return None
+
+        self._ensure_tree()
+        index = self._rightmost_reaching(1, 0, self._size, count, position)
+        return self._bookmarks[index] if index >= 0 else None
+
+    def find_within(self, start, end):
+        """
+        查找完全位于指定范围内的书签
+
+        Args:
+            start (str): 范围起始位置
+            end (str): 范围结束位置
+
+        Yields:
+            Bookmark: 起止位置都在 [start, end] 内的书签, 按起始位置排序
+        """
+        index = self.bisect_left(start)
+        while index < len(self._bookmarks):
+            bookmark = self._bookmarks[index]
+            if self.compare(bookmark.start, ">", end):
+                return
+            if self.compare(bookmark.end, "<=", end):
+                yield bookmark
+            index += 1
+
+    def next_after(self, position):
+        """
+        查找起始位置在指定位置之后的第一个书签, 没有时循环到第一个书签
+
+        Args:
+            position (str): 文本位置
+
+        Returns:
+            Optional[Bookmark]: 下一个书签, 没有书签时返回None
+        """
+        if not self._bookmarks:
+            return None
+        index = self.bisect_right(position)
+        return self._bookmarks[index % len(self._bookmarks)]
+
+    def previous_before(self, position):
+        """
+        查找起始位置在指定位置之前的最后一个书签, 没有时循环到最后一个书签
+
+        Args:
+            position (str): 文本位置
+
+        Returns:
+            Optional[Bookmark]: 上一个书签, 没有书签时返回None
+        """
+        if not self._bookmarks:
+            return None
+        return self._bookmarks[self.bisect_left(position) - 1]
+
+    def _later_end(self, a, b):
+        """返回结束位置更靠后的书签序号, -1表示空"""
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        if self.compare(self._bookmarks[b].end, ">", self._bookmarks[a].end):
+            return b
+        return a
+
+    def _ensure_tree(self):
+        """增删书签后重建线段树"""
+        if self._tree is not None:
+            return
+
+        size = 1
+        while size < len(self._bookmarks):
+            size *= 2
+
+        tree = [-1] * (2 * size)
+        tree[size : size + len(self._bookmarks)] = range(len(self._bookmarks))
+        self._tree = tree
+        for node in range(size - 1, 0, -1):
+            tree[node] = self._later_end(tree[2 * node], tree[2 * node + 1])
+        self._size = size
+
+    def _rightmost_reaching(self, node, lo, hi, count, position):
+        """
+        在前count个书签中查找序号最大且结束位置不早于position的书签
+
+        区间内结束位置最靠后的书签都在position之前时直接剪枝,
+        因此只会沿一条路径向下查找
+
+        Returns:
+            int: 书签序号, 没有时返回-1
+        """
+        best = self._tree[node]
+        if lo >= count or best < 0:
+            return -1
+        if self.compare(self._bookmarks[best].end, "<", position):
+            return -1
+        if hi - lo == 1:
+            return lo
+
+        mid = (lo + hi) // 2
+        index = self._rightmost_reaching(2 * node + 1, mid, hi, count, position)
+        if index >= 0:
+            return index
+        return self._rightmost_reaching(2 * node, lo, mid, count, position)
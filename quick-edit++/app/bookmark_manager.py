@@ -4,12 +4,25 @@
 """
 书签功能模块
 提供简单的书签添加、删除、导航和清除功能
+书签锚定在Tk标记上, 编辑时位置自动跟随; 关闭文件时书签按文件路径保存到配置目录,
+重新打开未在外部修改过的文件时恢复
 """
 
+import hashlib
+import json
+import os
+import random
 import tkinter as tk
 from typing import List, Tuple, Optional
-import random
 from loguru import logger
+from config.config_manager import config_manager, APP_CONFIG_DIR
+from app.bookmark_index import Bookmark, BookmarkIndex
+
+# 书签文件的格式版本
+BOOKMARK_FILE_VERSION = 1
+
+# 书签目录中最多保留的文件数, 超过时删除最久未使用的
+MAX_BOOKMARK_FILES = 200
 
 
 class BookmarkManager:
@@ -23,10 +36,14 @@ class BookmarkManager:
             editor: 编辑器实例
         """
         self.editor = editor
-        self.bookmarks: List[Tuple[int, int, int, int]] = (
-            []
-        )  # 存储书签的起始行号、起始列号、结束行号、结束列号
-        self.bookmark_tags = []  # 存储书签的标签名
+        # 按起始位置排序的书签索引, 书签的起止位置为Tk标记
+        self.bookmarks = BookmarkIndex(self.editor.text_area.compare)
+
+        # 书签保存目录, 为None时不保存
+        persist = config_manager.get("text_editor.persist_bookmarks", True)
+        self.bookmark_dir = (
+            os.path.join(APP_CONFIG_DIR, "bookmarks") if persist else None
+        )
 
         # 定义书签背景色颜色集合
         self.bookmark_colors = [
@@ -149,44 +166,57 @@ class BookmarkManager:
             logger.error(f"获取光标位置失败: {str(e)}")
             raise ValueError(f"获取光标位置失败: {str(e)}")
 
-    def _is_position_in_bookmark(
-        self, line: int, col: int, bookmark: Tuple[int, int, int, int]
-    ) -> bool:
+    def _get_range(self, bookmark: Bookmark) -> Tuple[int, int, int, int]:
         """
-        检查指定位置是否在书签范围内
+        获取书签当前的位置
 
         Args:
-            line: 行号
-            col: 列号
-            bookmark: 书签元组 (起始行, 起始列, 结束行, 结束列)
+            bookmark: 书签
 
         Returns:
-            bool: 如果位置在书签范围内返回True，否则返回False
+            Tuple[int, int, int, int]: (起始行, 起始列, 结束行, 结束列)
         """
-        start_line, start_col, end_line, end_col = bookmark
-        if line < start_line or line > end_line:
-            return False
-        if line == start_line and col < start_col:
-            return False
-        if line == end_line and col > end_col:
-            return False
-        return True
+        text_area = self.editor.text_area
+        start_line, start_col = self._parse_index(text_area.index(bookmark.start))
+        end_line, end_col = self._parse_index(text_area.index(bookmark.end))
+        return start_line, start_col, end_line, end_col
 
-    def _find_bookmark_at_position(self, line: int, col: int) -> Optional[int]:
+    def _find_bookmark_at_position(self, line: int, col: int) -> Optional[Bookmark]:
         """
-        查找指定位置的书签索引
+        查找指定位置的书签
 
         Args:
             line: 行号
             col: 列号
 
         Returns:
-            Optional[int]: 如果找到书签返回索引，否则返回None
+            Optional[Bookmark]: 如果找到书签返回书签，否则返回None
         """
-        for i, bookmark in enumerate(self.bookmarks):
-            if self._is_position_in_bookmark(line, col, bookmark):
-                return i
-        return None
+        return self.bookmarks.find_containing(f"{line}.{col}")
+
+    def _find_bookmark_in_range(
+        self, start_index: str, end_index: str
+    ) -> Optional[Bookmark]:
+        """
+        查找完全位于指定范围内的书签, 与范围完全相同的书签优先
+
+        Args:
+            start_index: 范围起始位置
+            end_index: 范围结束位置
+
+        Returns:
+            Optional[Bookmark]: 如果找到书签返回书签，否则返回None
+        """
+        text_area = self.editor.text_area
+        found = None
+        for bookmark in self.bookmarks.find_within(start_index, end_index):
+            if text_area.compare(bookmark.start, "==", start_index) and (
+                text_area.compare(bookmark.end, "==", end_index)
+            ):
+                return bookmark
+            if found is None:
+                found = bookmark
+        return found
 
     def toggle_bookmark(self):
         """
@@ -210,85 +240,58 @@ class BookmarkManager:
                 # 有选中文本，为选中内容添加书签
                 start_index = str(selected_range[0])
                 end_index = str(selected_range[1])
-                start_line, start_col = self._parse_index(start_index)
-                end_line, end_col = self._parse_index(end_index)
 
-                # 检查是否已存在该书签
-                for i, bookmark in enumerate(self.bookmarks):
-                    s_line, s_col, e_line, e_col = bookmark
-                    if (
-                        s_line == start_line
-                        and s_col == start_col
-                        and e_line == end_line
-                        and e_col == end_col
-                    ):
-                        # 存在则删除
-                        self._remove_bookmark_at_index(i)
-                        return False
-
-                # 检查选中范围内是否有其他书签
-                for i, bookmark in enumerate(self.bookmarks):
-                    s_line, s_col, e_line, e_col = bookmark
-                    # 如果书签完全在选中范围内，删除它
-                    if (
-                        s_line >= start_line
-                        and e_line <= end_line
-                        and (s_line > start_line or s_col >= start_col)
-                        and (e_line < end_line or e_col <= end_col)
-                    ):
-                        self._remove_bookmark_at_index(i)
-                        return False
+                # 选中范围内已有书签则删除
+                bookmark = self._find_bookmark_in_range(start_index, end_index)
+                if bookmark is not None:
+                    self._remove_bookmark(bookmark)
+                    return False
 
                 # 不存在则添加
+                start_line, start_col = self._parse_index(start_index)
+                end_line, end_col = self._parse_index(end_index)
                 self._add_bookmark_range(start_line, start_col, end_line, end_col)
                 return True
             else:
-                # 没有选中文本，为当前光标位置添加书签
-                line_num, column_num = self._get_cursor_position()
-
-                # 检查是否已存在该书签
-                bookmark_index = self._find_bookmark_at_position(line_num, column_num)
-                if bookmark_index is not None:
-                    # 存在则删除
-                    self._remove_bookmark_at_index(bookmark_index)
-                    return False
-
-                # 不存在则添加
-                self._add_bookmark(line_num, column_num)
-                return True
+                return self._toggle_bookmark_at_cursor()
         except tk.TclError as e:
             # 处理Tkinter文本选择相关的错误
             logger.error(f"获取文本选择时出错: {str(e)}")
             # 没有选中文本，为当前光标位置添加书签
             try:
-                line_num, column_num = self._get_cursor_position()
-
-                # 检查是否已存在该书签
-                bookmark_index = self._find_bookmark_at_position(line_num, column_num)
-                if bookmark_index is not None:
-                    # 存在则删除
-                    self._remove_bookmark_at_index(bookmark_index)
-                    return False
-
-                # 不存在则添加
-                self._add_bookmark(line_num, column_num)
-                return True
+                return self._toggle_bookmark_at_cursor()
             except Exception as inner_e:
                 # 处理获取光标位置时的错误
                 logger.error(f"书签操作失败: {str(inner_e)}")
-                # self.editor.status_bar.show_notification(
-                #     f"书签操作失败: {str(inner_e)}", 1000
-                # )
                 self.editor.nm.show_error(message=f"书签操作失败: {str(inner_e)}")
                 return False
 
         except Exception as e:
             # 处理其他未预期的错误
             logger.error(f"书签操作失败: {str(e)}")
-            # self.editor.status_bar.show_notification(f"书签操作失败: {str(e)}", 1000)
             self.editor.nm.show_error(message=f"书签操作失败: {str(e)}")
             return False
 
+    def _toggle_bookmark_at_cursor(self) -> bool:
+        """
+        切换当前光标位置的书签
+
+        Returns:
+            bool: 添加书签返回True，删除书签返回False
+        """
+        line_num, column_num = self._get_cursor_position()
+
+        # 检查是否已存在该书签
+        bookmark = self._find_bookmark_at_position(line_num, column_num)
+        if bookmark is not None:
+            # 存在则删除
+            self._remove_bookmark(bookmark)
+            return False
+
+        # 不存在则添加
+        self._add_bookmark(line_num, column_num)
+        return True
+
     def _generate_unique_tag_name(
         self, start_line: int, start_col: int, end_line: int = None, end_col: int = None
     ) -> str:
@@ -315,6 +318,76 @@ class BookmarkManager:
         unique_id = str(uuid.uuid4())[:8]
         return f"bookmark_{unique_id}_{start_line}_{start_col}_{end_line}_{end_col}"
 
+    def _create_bookmark(
+        self, start_line: int, start_col: int, end_line: int, end_col: int
+    ) -> Bookmark:
+        """
+        创建书签标记和高亮并加入索引
+
+        Args:
+            start_line: 起始行号
+            start_col: 起始列号
+            end_line: 结束行号
+            end_col: 结束列号
+
+        Returns:
+            Bookmark: 新建的书签
+        """
+        text_area = self.editor.text_area
+        tag_name = self._generate_unique_tag_name(
+            start_line, start_col, end_line, end_col
+        )
+
+        # 所有标记都使用左侧重力, 编辑时标记之间的先后顺序保持不变, 索引无需重建
+        start_mark = f"{tag_name}_start"
+        text_area.mark_set(start_mark, f"{start_line}.{start_col}")
+        text_area.mark_gravity(start_mark, tk.LEFT)
+        if start_line == end_line and start_col == end_col:
+            end_mark = start_mark
+        else:
+            end_mark = f"{tag_name}_end"
+            text_area.mark_set(end_mark, f"{end_line}.{end_col}")
+            text_area.mark_gravity(end_mark, tk.LEFT)
+
+        bookmark = Bookmark(tag_name, start_mark, end_mark)
+        self.bookmarks.add(bookmark)
+        self._highlight_bookmark(bookmark)
+        return bookmark
+
+    def _highlight_bookmark(self, bookmark: Bookmark):
+        """
+        按书签标记的当前位置设置高亮背景
+
+        Args:
+            bookmark: 书签
+        """
+        text_area = self.editor.text_area
+        text_area.tag_remove(bookmark.tag, "1.0", tk.END)
+        if bookmark.is_point:
+            # 单点书签高亮整行
+            text_area.tag_add(
+                bookmark.tag,
+                f"{bookmark.start} linestart",
+                f"{bookmark.start} lineend",
+            )
+        else:
+            text_area.tag_add(bookmark.tag, bookmark.start, bookmark.end)
+        text_area.tag_config(bookmark.tag, background=self.bookmark_bg_color)
+
+    def _discard_bookmark(self, bookmark: Bookmark):
+        """
+        删除书签的索引、高亮和标记, 不显示提示
+
+        Args:
+            bookmark: 书签
+        """
+        text_area = self.editor.text_area
+        self.bookmarks.remove(bookmark)
+        text_area.tag_delete(bookmark.tag)
+        text_area.mark_unset(bookmark.start)
+        if not bookmark.is_point:
+            text_area.mark_unset(bookmark.end)
+
     def _add_bookmark(self, line_num: int, column_num: int):
         """
         添加书签并设置高亮
@@ -323,23 +396,11 @@ class BookmarkManager:
             line_num: 行号
             column_num: 列号
         """
-        # 添加到书签列表（使用范围格式，起始和结束位置相同）
-        self.bookmarks.append((line_num, column_num, line_num, column_num))
-
-        # 按行号排序
-        self.bookmarks.sort(key=lambda x: x[0])
-
-        # 创建唯一标签名并设置高亮背景
-        tag_name = self._generate_unique_tag_name(line_num, column_num)
-        self.bookmark_tags.append(tag_name)
-
-        # 设置书签行的背景色
-        self.editor.text_area.tag_add(tag_name, f"{line_num}.0", f"{line_num}.end")
-        self.editor.text_area.tag_config(tag_name, background=self.bookmark_bg_color)
+        # 使用范围格式，起始和结束位置相同
+        self._create_bookmark(line_num, column_num, line_num, column_num)
 
         # 显示提示信息
         self.editor.status_bar.show_notification(f"已添加书签: 行 {line_num}", 500)
-        # self.editor.nm.show_info(message=f"已添加书签: 行 {line_num}")
 
     def _add_bookmark_range(
         self, start_line: int, start_col: int, end_line: int, end_col: int
@@ -353,99 +414,48 @@ class BookmarkManager:
             end_line: 结束行号
             end_col: 结束列号
         """
-        # 添加到书签列表
-        self.bookmarks.append((start_line, start_col, end_line, end_col))
-
-        # 按行号排序
-        self.bookmarks.sort(key=lambda x: x[0])
-
-        # 创建唯一标签名并设置高亮背景
-        tag_name = self._generate_unique_tag_name(
-            start_line, start_col, end_line, end_col
-        )
-        self.bookmark_tags.append(tag_name)
-
-        # 设置书签范围的背景色
-        self.editor.text_area.tag_add(
-            tag_name, f"{start_line}.{start_col}", f"{end_line}.{end_col}"
-        )
-        self.editor.text_area.tag_config(tag_name, background=self.bookmark_bg_color)
+        self._create_bookmark(start_line, start_col, end_line, end_col)
 
         # 显示提示信息
         if start_line == end_line:
             self.editor.status_bar.show_notification(
                 f"已添加书签: 行 {start_line}", 500
             )
-            # self.editor.nm.show_info(message=f"已添加书签: 行 {start_line}")
-
         else:
             self.editor.status_bar.show_notification(
                 f"已添加书签: 行 {start_line}-{end_line}", 500
             )
-            # self.editor.nm.show_info(message=f"已添加书签: 行 {start_line}-{end_line}")
 
-    def _remove_bookmark_at_index(self, index: int):
+    def _remove_bookmark(self, bookmark: Bookmark):
         """
-        根据索引删除书签
+        删除书签
 
         Args:
-            index: 书签在列表中的索引
+            bookmark: 要删除的书签
 
         Returns:
             bool: 成功删除返回True，否则返回False
         """
-        if not (0 <= index < len(self.bookmarks)):
-            return False
-
         try:
-            start_line, start_col, end_line, end_col = self.bookmarks[index]
-
-            # 从列表中删除
-            del self.bookmarks[index]
-
-            # 删除对应的标签
-            tag_name = (
-                self.bookmark_tags[index] if index < len(self.bookmark_tags) else None
-            )
-            if tag_name:
-                self.bookmark_tags.remove(tag_name)
-                self.editor.text_area.tag_delete(tag_name)
+            start_line, _, end_line, _ = self._get_range(bookmark)
+            self._discard_bookmark(bookmark)
 
             # 显示提示信息
             if start_line == end_line:
                 self.editor.status_bar.show_notification(
                     f"已删除书签: 行 {start_line}", 500
                 )
-                # self.editor.nm.show_info(message=f"已删除书签: 行 {start_line}")
             else:
                 self.editor.status_bar.show_notification(
                     f"已删除书签: 行 {start_line}-{end_line}", 500
                 )
-                # self.editor.nm.show_info(message=f"已删除书签: 行 {start_line}-{end_line}")
 
             return True
         except Exception as e:
             logger.error(f"删除书签失败: {str(e)}")
-            # self.editor.status_bar.show_notification(f"删除书签失败: {str(e)}", 1000)
             self.editor.nm.show_error(message=f"删除书签失败: {str(e)}")
             return False
 
-    def _find_bookmarks_on_line(self, line_num: int) -> List[Tuple[int, int, int, int]]:
-        """
-        查找指定行上的所有书签
-
-        Args:
-            line_num: 行号
-
-        Returns:
-            List[Tuple[int, int, int, int]]: 该行上的所有书签列表
-        """
-        return [
-            bookmark
-            for bookmark in self.bookmarks
-            if bookmark[0] <= line_num <= bookmark[2]
-        ]
-
     def _find_next_bookmark(
         self, current_line: int, current_col: int
     ) -> Optional[Tuple[int, int]]:
@@ -459,27 +469,11 @@ class BookmarkManager:
         Returns:
             Optional[Tuple[int, int]]: 下一个书签的(行号, 列号)，如果没有找到返回None
         """
-        # 首先检查当前行是否有在当前列之后的书签
-        current_line_bookmarks = self._find_bookmarks_on_line(current_line)
-        for start_line, start_col, _, _ in sorted(
-            current_line_bookmarks, key=lambda x: x[1]
-        ):
-            if start_col > current_col:
-                return (start_line, start_col)
-
-        # 如果当前行没有，查找下一行的书签
-        for start_line, start_col, _, _ in self.bookmarks:
-            if start_line > current_line:
-                return (start_line, start_col)
-
-        # 如果没有找到，循环到第一个书签
-        if self.bookmarks:
-            start_line, start_col, _, _ = sorted(
-                self.bookmarks, key=lambda x: (x[0], x[1])
-            )[0]
-            return (start_line, start_col)
-
-        return None
+        # 起始位置在光标之后的第一个书签, 没有时循环到第一个书签
+        bookmark = self.bookmarks.next_after(f"{current_line}.{current_col}")
+        if bookmark is None:
+            return None
+        return self._parse_index(self.editor.text_area.index(bookmark.start))
 
     def _find_previous_bookmark(
         self, current_line: int, current_col: int
@@ -494,29 +488,11 @@ class BookmarkManager:
         Returns:
             Optional[Tuple[int, int]]: 上一个书签的(行号, 列号)，如果没有找到返回None
         """
-        # 首先检查当前行是否有在当前列之前的书签
-        current_line_bookmarks = self._find_bookmarks_on_line(current_line)
-        for start_line, start_col, _, _ in sorted(
-            current_line_bookmarks, key=lambda x: x[1], reverse=True
-        ):
-            if start_col < current_col:
-                return (start_line, start_col)
-
-        # 如果当前行没有，查找上一行的书签
-        for start_line, start_col, _, _ in sorted(
-            self.bookmarks, key=lambda x: (x[0], x[1]), reverse=True
-        ):
-            if start_line < current_line:
-                return (start_line, start_col)
-
-        # 如果没有找到，循环到最后一个书签
-        if self.bookmarks:
-            start_line, start_col, _, _ = sorted(
-                self.bookmarks, key=lambda x: (x[0], x[1]), reverse=True
-            )[0]
-            return (start_line, start_col)
-
-        return None
+        # 起始位置在光标之前的最后一个书签, 没有时循环到最后一个书签
+        bookmark = self.bookmarks.previous_before(f"{current_line}.{current_col}")
+        if bookmark is None:
+            return None
+        return self._parse_index(self.editor.text_area.index(bookmark.start))
 
     def goto_next_bookmark(self):
         """
@@ -527,7 +503,6 @@ class BookmarkManager:
         """
         if not self.bookmarks:
             self.editor.status_bar.show_notification("没有书签可跳转", 500)
-            # self.editor.nm.show_info(message="没有书签可跳转")
             return False
 
         # 获取当前光标位置
@@ -558,7 +533,6 @@ class BookmarkManager:
         """
         if not self.bookmarks:
             self.editor.status_bar.show_notification("没有书签可跳转", 500)
-            # self.editor.nm.show_info(message="没有书签可跳转")
             return False
 
         # 获取当前光标位置
@@ -584,23 +558,26 @@ class BookmarkManager:
         """清除所有书签"""
         if not self.bookmarks:
             self.editor.status_bar.show_notification("没有书签可清除", 500)
-            # self.editor.nm.show_info(message="没有书签可清除")
             return
 
-        # 清除所有标签
-        for tag_name in self.bookmark_tags:
-            self.editor.text_area.tag_delete(tag_name)
-
-        # 清空列表
-        self.bookmarks.clear()
-        self.bookmark_tags.clear()
+        # 清除所有标签和标记
+        self.reset()
 
         # 重新随机选择一个背景色
         self.bookmark_bg_color = random.choice(self.bookmark_colors)
 
         # 显示提示信息
         self.editor.status_bar.show_notification("已清除所有书签", 500)
-        # self.editor.nm.show_info(message="已清除所有书签")
+
+    def reset(self):
+        """删除所有书签, 不显示提示, 用于切换或关闭文件"""
+        text_area = self.editor.text_area
+        for bookmark in self.bookmarks:
+            text_area.tag_delete(bookmark.tag)
+            text_area.mark_unset(bookmark.start)
+            if not bookmark.is_point:
+                text_area.mark_unset(bookmark.end)
+        self.bookmarks.clear()
 
     def _jump_to_position(self, line_num: int, column_num: int):
         """
@@ -625,46 +602,180 @@ class BookmarkManager:
             logger.error(
                 f"跳转到位置失败: 行 {line_num}, 列 {column_num}, 错误: {str(e)}"
             )
-            # self.editor.status_bar.show_notification(f"跳转到书签失败: {str(e)}", 1000)
             self.editor.nm.show_error(message=f"跳转到书签失败: {str(e)}")
 
     def refresh_bookmarks(self):
-        """刷新书签显示（在文件内容发生变化时调用）"""
+        """
+        刷新书签显示
+
+        书签位置由标记自动跟随编辑, 这里只按标记的当前位置重新设置高亮,
+        例如单点书签所在行被拆分或合并之后
+        """
         try:
-            # 保存当前书签位置
-            current_bookmarks = self.bookmarks.copy()
-
-            # 清除所有标签
-            for tag_name in self.bookmark_tags:
-                self.editor.text_area.tag_delete(tag_name)
-            self.bookmark_tags.clear()
-
-            # 重新添加标签
-            self.bookmarks = []
-            for start_line, start_col, end_line, end_col in current_bookmarks:
-                # 检查行号是否仍然有效（文件可能已被修改）
-                last_line = int(self.editor.text_area.index("end-1c").split(".")[0])
-                if start_line <= last_line:
-                    # 如果是范围书签，检查结束行是否有效
-                    if end_line > last_line:
-                        # 调整结束行到文件末尾
-                        end_line = last_line
-                        end_col = len(
-                            self.editor.text_area.get(
-                                f"{end_line}.0", f"{end_line}.end"
-                            )
-                        )
-
-                    # 重新添加书签
-                    if start_line == end_line and start_col == end_col:
-                        # 单点书签
-                        self._add_bookmark(start_line, start_col)
-                    else:
-                        # 范围书签
-                        self._add_bookmark_range(
-                            start_line, start_col, end_line, end_col
-                        )
+            for bookmark in self.bookmarks:
+                self._highlight_bookmark(bookmark)
         except Exception as e:
             logger.error(f"刷新书签失败: {str(e)}")
-            # self.editor.status_bar.show_notification(f"刷新书签失败: {str(e)}", 1000)
             self.editor.nm.show_error(message=f"刷新书签失败: {str(e)}")
+
+    def get_positions(self) -> List[Tuple[int, int, int, int]]:
+        """
+        获取所有书签的当前位置
+
+        Returns:
+            List[Tuple[int, int, int, int]]: 按起始位置排序的 (起始行, 起始列, 结束行, 结束列) 列表
+        """
+        return [self._get_range(bookmark) for bookmark in self.bookmarks]
+
+    def restore_positions(self, positions: List[Tuple[int, int, int, int]]):
+        """
+        按位置列表重建书签, 替换当前所有书签
+
+        用于整体替换文本内容之后, 例如重新加载文件; 超出文本末尾的书签被丢弃,
+        结束位置超出末尾的范围书签被截断到末尾
+
+        Args:
+            positions: (起始行, 起始列, 结束行, 结束列) 列表
+        """
+        self.reset()
+        text_area = self.editor.text_area
+        last_line = int(text_area.index("end-1c").split(".")[0])
+        for start_line, start_col, end_line, end_col in positions:
+            if start_line > last_line:
+                continue
+            # 由Tk把超出行尾或文本末尾的位置规范化
+            start_line, start_col = self._parse_index(
+                text_area.index(f"{start_line}.{start_col}")
+            )
+            end_line, end_col = self._parse_index(
+                text_area.index(f"{end_line}.{end_col}")
+            )
+            self._create_bookmark(start_line, start_col, end_line, end_col)
+
+    def save_bookmarks(self, file_path: str) -> bool:
+        """
+        保存文件的书签, 保存后清空当前书签
+
+        应在文件内容与磁盘上的文件一致时调用; 没有书签时删除该文件已保存的书签
+
+        Args:
+            file_path: 书签所属的文件路径
+
+        Returns:
+            bool: 是否保存成功
+        """
+        if not self.bookmark_dir:
+            self.reset()
+            return False
+
+        bookmark_path = self._bookmark_file_path(file_path)
+        positions = self.get_positions()
+        self.reset()
+        if not positions:
+            self._remove_bookmark_file(bookmark_path)
+            return False
+
+        temp_path = f"{bookmark_path}.tmp"
+        try:
+            # 记录文件大小和修改时间, 文件在外部被修改后书签不再恢复
+            stat = os.stat(file_path)
+            data = {
+                "version": BOOKMARK_FILE_VERSION,
+                "file_path": os.path.abspath(file_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "bookmarks": positions,
+            }
+
+            os.makedirs(self.bookmark_dir, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, bookmark_path)
+            self._prune_bookmark_files()
+            return True
+
+        except Exception as e:
+            logger.error(f"保存书签失败: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+    def load_bookmarks(self, file_path: str) -> bool:
+        """
+        恢复文件的书签, 文件在保存书签后被修改过则丢弃书签
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            bool: 是否恢复了书签
+        """
+        self.reset()
+        if not self.bookmark_dir:
+            return False
+
+        bookmark_path = self._bookmark_file_path(file_path)
+        if not os.path.exists(bookmark_path):
+            return False
+
+        try:
+            with open(bookmark_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            stat = os.stat(file_path)
+            valid = (
+                data.get("version") == BOOKMARK_FILE_VERSION
+                and data.get("file_path") == os.path.abspath(file_path)
+                and data.get("size") == stat.st_size
+                and data.get("mtime_ns") == stat.st_mtime_ns
+            )
+            positions = [tuple(position) for position in data["bookmarks"]]
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            logger.warning(f"书签文件已损坏: {e}")
+            valid = False
+
+        if not valid or not positions:
+            self._remove_bookmark_file(bookmark_path)
+            return False
+
+        try:
+            self.restore_positions(positions)
+        except (ValueError, tk.TclError) as e:
+            logger.warning(f"恢复书签失败: {e}")
+            self.reset()
+            return False
+
+        # 更新修改时间, 清理时按最久未使用删除
+        os.utime(bookmark_path)
+        logger.info(f"已恢复 {len(self.bookmarks)} 个书签: {file_path}")
+        return True
+
+    def _bookmark_file_path(self, file_path: str) -> str:
+        """获取文件对应的书签文件路径"""
+        key = hashlib.sha1(
+            os.path.abspath(file_path).encode("utf-8", "surrogatepass")
+        ).hexdigest()
+        return os.path.join(self.bookmark_dir, f"{key}.json")
+
+    def _remove_bookmark_file(self, bookmark_path: str):
+        """删除失效的书签文件"""
+        try:
+            if os.path.exists(bookmark_path):
+                os.remove(bookmark_path)
+        except OSError as e:
+            logger.debug(f"删除书签文件失败: {e}")
+
+    def _prune_bookmark_files(self):
+        """书签文件过多时删除最久未使用的"""
+        try:
+            paths = [
+                os.path.join(self.bookmark_dir, name)
+                for name in os.listdir(self.bookmark_dir)
+                if name.endswith(".json")
+            ]
+            if len(paths) <= MAX_BOOKMARK_FILES:
+                return
+            paths.sort(key=os.path.getmtime)
+            for path in paths[: len(paths) - MAX_BOOKMARK_FILES]:
+                self._remove_bookmark_file(path)
+        except OSError as e:
+            logger.debug(f"清理书签文件失败: {e}")
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文档管理模块
+管理多个打开的文档, 只有当前文档载入Tk文本组件, 其余文档挂起为紧凑的状态:
+文本较大时压缩保存, 撤销步骤写入磁盘日志, 书签和语法高亮只保存位置
+"""
+
+import os
+import zlib
+from loguru import logger
+from config.config_manager import config_manager
+
+# 挂起文档的文本达到该字符数时压缩保存
+COMPRESS_THRESHOLD = 64 * 1024
+
+# 压缩级别, 切换文档时压缩速度比压缩率更重要
+COMPRESS_LEVEL = 1
+
+
+class Document:
+    """
+    文档类
+
+    保存一个文档挂起时的全部状态; 当前文档的状态保存在编辑器和文本组件中,
+    只有挂起时才写入这里
+    """
+
+    def __init__(self):
+        """初始化空白文档"""
+        self.file_path = None  # 文件路径
+        self.encoding = config_manager.get("app.default_encoding", "UTF-8")
+        self.line_ending = config_manager.get("app.default_line_ending", "LF")
+        self.is_new_file = False  # 是否为新文件状态
+        self.modified = False  # 是否有未保存的修改
+        self.cursor = "1.0"  # 光标位置
+        self.yview = 0.0  # 垂直滚动位置
+        self.xview = 0.0  # 水平滚动位置
+        self.undo_state = None  # UndoJournal.suspend返回的撤销状态
+        self.bookmark_positions = []  # 书签位置列表
+        self.highlight_state = None  # 语法高亮状态
+        self._text = ""  # 文本内容, 较大时为压缩后的字节串
+
+    @property
+    def memory_usage(self):
+        """挂起的文本占用的字节数估算"""
+        return len(self._text)
+
+    @property
+    def has_saved_state(self):
+        """是否有关闭时需要保存的撤销历史或书签"""
+        return self.undo_state is not None or bool(self.bookmark_positions)
+
+    def store_text(self, text):
+        """
+        保存挂起文档的文本
+
+        Args:
+            text (str): 文本内容
+        """
+        if len(text) >= COMPRESS_THRESHOLD:
+            self._text = zlib.compress(
+                text.encode("utf-8", "surrogatepass"), COMPRESS_LEVEL
+            )
+        else:
+            self._text = text
+
+    def take_text(self):
+        """
+        取出挂起文档的文本, 取出后释放保存的副本
+
+        Returns:
+            str: 文本内容
+        """
+        text = self._text
+        self._text = ""
+        if isinstance(text, bytes):
+            return zlib.decompress(text).decode("utf-8", "surrogatepass")
+        return text
+
+
+class DocumentManager:
+    """
+    文档管理器类
+
+    按标签顺序保存打开的文档, 切换文档时挂起当前文档并载入目标文档;
+    始终至少有一个文档, 编辑器启动时的空白文本区域就是第一个文档
+    """
+
+    def __init__(self, editor):
+        """
+        初始化文档管理器
+
+        Args:
+            editor: 编辑器实例
+        """
+        self.editor = editor
+        self.documents = [Document()]
+        self.active = self.documents[0]
+        self._listeners = []
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __iter__(self):
+        return iter(self.documents)
+
+    def __contains__(self, document):
+        return document in self.documents
+
+    def add_listener(self, callback):
+        """
+        添加文档列表或当前文档变化时的回调
+
+        Args:
+            callback (callable): 无参数的回调函数
+        """
+        self._listeners.append(callback)
+
+    def _notify(self):
+        """通知文档列表或当前文档已变化"""
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"文档变化回调执行失败: {e}")
+
+    # ------------------------------------------------------------------
+    # 文档信息
+    # ------------------------------------------------------------------
+
+    def path_of(self, document):
+        """获取文档的文件路径, 当前文档从编辑器读取"""
+        if document is self.active:
+            return self.editor.current_file_path
+        return document.file_path
+
+    def is_modified(self, document):
+        """获取文档是否有未保存的修改, 当前文档从文本组件读取"""
+        if document is self.active:
+            return self.editor.is_modified()
+        return document.modified
+
+    def title_of(self, document):
+        """
+        获取文档的显示名称
+
+        Args:
+            document (Document): 文档
+
+        Returns:
+            str: 文件名, 新文件返回"新文件", 其余没有路径的文档返回"未命名"
+        """
+        file_path = self.path_of(document)
+        if file_path:
+            return os.path.basename(file_path)
+        is_new_file = (
+            self.editor.is_new_file if document is self.active else document.is_new_file
+        )
+        return "新文件" if is_new_file else "未命名"
+
+    def is_blank(self):
+        """
+        当前文档是否为空白文档, 空白文档打开文件时直接复用, 不再新建标签
+
+        Returns:
+            bool: 没有文件路径、不是新文件、没有修改并且没有内容时返回True
+        """
+        editor = self.editor
+        return (
+            not editor.current_file_path
+            and not editor.is_new_file
+            and not editor.is_modified()
+            and editor.get_char_count() == 0
+        )
+
+    def find(self, file_path):
+        """
+        查找已打开指定文件的文档
+
+        Args:
+            file_path (str): 文件路径
+
+        Returns:
+            Optional[Document]: 找到的文档, 没有时返回None
+        """
+        target = os.path.normcase(os.path.abspath(file_path))
+        for document in self.documents:
+            path = self.path_of(document)
+            if path and os.path.normcase(os.path.abspath(path)) == target:
+                return document
+        return None
+
+    # ------------------------------------------------------------------
+    # 文档切换
+    # ------------------------------------------------------------------
+
+    def new_document(self):
+        """
+        在当前文档之后新建空白文档并切换到该文档
+
+        Returns:
+            Document: 新建的文档
+        """
+        document = Document()
+        self.documents.insert(self.documents.index(self.active) + 1, document)
+        self._suspend_active()
+        self._materialize(document)
+        return document
+
+    def activate(self, document):
+        """
+        切换到指定文档
+
+        Args:
+            document (Document): 要切换到的文档
+        """
+        if document is self.active or document not in self.documents:
+            return
+        self._suspend_active()
+        self._materialize(document)
+
+    def activate_next(self, step=1):
+        """
+        按标签顺序循环切换文档
+
+        Args:
+            step (int): 1为下一个文档, -1为上一个文档
+        """
+        if len(self.documents) < 2:
+            return
+        index = self.documents.index(self.active)
+        self.activate(self.documents[(index + step) % len(self.documents)])
+
+    def close_active(self):
+        """
+        关闭当前文档并切换到相邻的文档, 不检查保存
+
+        调用方应先处理未保存的修改并保存撤销历史和书签
+
+        Returns:
+            bool: 只剩一个文档时返回False, 由调用方清空编辑器
+        """
+        if len(self.documents) < 2:
+            return False
+
+        index = self.documents.index(self.active)
+        self.documents.pop(index)
+        self.editor.undo_journal.reset()
+        self.active = None
+
+        # 优先切换到右侧的文档
+        self._materialize(self.documents[min(index, len(self.documents) - 1)])
+        return True
+
+    def _suspend_active(self):
+        """把当前文档的状态从编辑器和文本组件保存到文档中"""
+        editor = self.editor
+        text_area = editor.text_area
+        document = self.active
+
+        document.file_path = editor.current_file_path
+        document.encoding = editor.current_encoding
+        document.line_ending = editor.current_line_ending
+        document.is_new_file = editor.is_new_file
+        document.modified = editor.is_modified()
+        document.cursor = text_area.index("insert")
+        document.yview = text_area.yview()[0]
+        document.xview = text_area.xview()[0]
+        document.bookmark_positions = editor.bookmark_manager.get_positions()
+        document.highlight_state = editor.syntax_highlighter.export_state()
+        document.undo_state = editor.undo_journal.suspend()
+        document.store_text(text_area.get("1.0", "end-1c"))
+
+    def _materialize(self, document):
+        """
+        把文档载入编辑器和文本组件, 成为当前文档
+
+        Args:
+            document (Document): 挂起的文档
+        """
+        editor = self.editor
+        text_area = editor.text_area
+
+        editor.file_watcher.stop_watching()
+        editor.bookmark_manager.reset()
+
+        # 只读模式下需要临时启用文本组件才能替换内容
+        if editor.is_read_only:
+            text_area.configure(state="normal")
+        # 替换内容不记录到撤销日志, 也不发布修改记录, 显示和高亮在后面统一恢复
+        try:
+            with editor.undo_journal.paused(), editor.text_change_proxy.muted():
+                text_area.delete("1.0", "end")
+                text_area.insert("1.0", document.take_text())
+        finally:
+            if editor.is_read_only:
+                text_area.configure(state="disabled")
+
+        editor.undo_journal.resume(document.undo_state)
+        document.undo_state = None
+
+        editor.bookmark_manager.restore_positions(document.bookmark_positions)
+        document.bookmark_positions = []
+
+        editor.current_file_path = document.file_path
+        editor.current_encoding = document.encoding
+        editor.current_line_ending = document.line_ending
+        editor.is_new_file = document.is_new_file
+        editor.set_modified(document.modified)
+
+        # 内容与挂起时一致, 直接恢复高亮标签, 无法恢复时重新检测语言并高亮
+        highlighter = editor.syntax_highlighter
+        if not highlighter.restore_state(document.highlight_state):
+            if document.file_path:
+                highlighter.apply_highlighting(document.file_path)
+        document.highlight_state = None
+
+        text_area.mark_set("insert", document.cursor)
+        text_area.yview_moveto(document.yview)
+        text_area.xview_moveto(document.xview)
+
+        if document.file_path:
+            editor.file_watcher.start_watching(document.file_path, keep_cache=True)
+
+        self.active = document
+
+        editor._update_window_title()
+        editor.status_bar.update_file_info()
+        editor.update_file_menu_state()
+        editor.update_editor_display()
+        self._notify()
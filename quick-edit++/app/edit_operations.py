@@ -32,7 +32,9 @@ class EditOperations:
                 return
 
             # 执行撤销操作
-            self.text_area.edit_undo()
+            if not self.undo_journal.undo():
+                self.nm.show_info(message="没有可撤销的操作")
+                return
             # 更新编辑器显示和字符计数
             self.update_editor_display()
             self.update_char_count()
@@ -52,7 +54,9 @@ class EditOperations:
                 return
 
             # 执行重做操作
-            self.text_area.edit_redo()
+            if not self.undo_journal.redo():
+                self.nm.show_info(message="没有可重做的操作")
+                return
             # 更新编辑器显示和字符计数
             self.update_editor_display()
             self.update_char_count()
@@ -1497,11 +1501,15 @@ func (s *StructName) IsValid() bool {
         try:
             # 检查是否有选中的文本
             try:
-                selected_text = self.text_area.get(tk.SEL_FIRST, tk.SEL_LAST)
-                if selected_text:
-                    # 计算字符数和行数
-                    char_count = len(selected_text)
-                    line_count = selected_text.count("\n") + 1
+                # 只通过索引计算字符数和行数, 不复制选中的文本
+                sel_start = self.text_area.index(tk.SEL_FIRST)
+                sel_end = self.text_area.index(tk.SEL_LAST)
+                char_count = self.text_stats.count_chars(sel_start, sel_end)
+                if char_count:
+                    # 计算行数
+                    line_count = (
+                        int(sel_end.split(".")[0]) - int(sel_start.split(".")[0]) + 1
+                    )
                     # 构建信息文本
                     info_text = (
                         f"选中文本信息:\n字符数: {char_count}\n行数: {line_count}"
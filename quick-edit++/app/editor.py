@@ -21,6 +21,10 @@ from app.auto_save_manager import AutoSaveManager
 from app.edit_operations import EditOperations
 from app.selection_operations import SelectionOperations
 from app.bookmark_manager import BookmarkManager
+from app.document_manager import DocumentManager
+from app.ui_update_scheduler import UIUpdateScheduler
+from app.startup_profiler import startup_profiler
+from app.single_instance import SingleInstanceServer
 from ui.menu import (
     toggle_syntax_highlight,
     toggle_toolbar_visibility,
@@ -47,6 +51,16 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         # 创建自动保存管理器
         self.auto_save_manager = AutoSaveManager(self)
 
+        # 单实例服务, 由start_instance_server启动
+        self.instance_server = None
+
+        # 创建界面更新调度器, 按帧合并行号、当前行高亮、语法高亮和状态栏的更新
+        self.ui_scheduler = UIUpdateScheduler(self)
+        self.ui_scheduler.register("line_numbers", self._refresh_line_numbers)
+        self.ui_scheduler.register("current_line", self._refresh_current_line)
+        self.ui_scheduler.register("syntax", self._refresh_syntax_highlight)
+        self.ui_scheduler.register("status_bar", self._update_status_bar)
+
         # 创建应用初始化器
         self.initializer = AppInitializer(self)
 
@@ -56,8 +70,14 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         # 初始化书签管理器
         self.bookmark_manager = BookmarkManager(self)
 
+        # 初始化文档管理器, 文档列表或当前文档变化时刷新标签栏
+        self.documents = DocumentManager(self)
+        self.documents.add_listener(self.tab_bar.refresh)
+        self.tab_bar.refresh()
+
         # 绑定应用程序事件和快捷方式
-        self._bind_app_events()
+        with startup_profiler.phase("绑定事件和快捷键"):
+            self._bind_app_events()
 
         # 启动自动保存功能
         self.auto_save_manager.start_auto_save()
@@ -76,6 +96,35 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
             logger.error(f"拖拽功能初始化失败: {e}")
             self.nm.show_error(message=f"拖拽功能初始化失败: {e}")
 
+    def start_instance_server(self):
+        """
+        启动单实例服务, 之后启动的编辑器会把文件转发到当前窗口打开
+
+        Returns:
+            bool: 是否成功启动
+        """
+        self.instance_server = SingleInstanceServer(self, self.open_forwarded_files)
+        return self.instance_server.start()
+
+    def open_forwarded_files(self, file_paths):
+        """
+        打开其他启动转发过来的文件, 并把窗口切换到前台
+
+        Args:
+            file_paths (list): 文件绝对路径列表, 为空时只激活窗口
+        """
+        # 窗口最小化时先还原, 再短暂置顶以便切换到前台
+        if self.state() == "iconic":
+            self.deiconify()
+        self.lift()
+        self.attributes("-topmost", True)
+        self.after_idle(self.attributes, "-topmost", False)
+        self.focus_force()
+
+        for file_path in file_paths:
+            logger.info(f"打开转发的文件: {file_path}")
+            self.open_file_with_path(file_path)
+
     def handle_drag_drop(self, files):
         """
         处理文件拖拽事件, 先检查是否为只读模式, 再调用实际的拖拽处理方法
@@ -100,8 +149,8 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         try:
             logger.info("触发垃圾回收...")
 
-            # 清空撤销/重做堆栈
-            self.text_area.edit_reset()
+            # 清空撤销/重做步骤及其磁盘日志
+            self.undo_journal.reset()
 
             # 手动触发垃圾回收
             gc.collect()
@@ -171,6 +220,9 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         # 取消自动保存任务 (如果有)
         self.auto_save_manager.stop_auto_save()
 
+        # 取消待执行的界面更新
+        self.ui_scheduler.cancel()
+
         # 如果启用自动保存并且有当前打开的文件, 尝试自动保存
         if self.auto_save_manager.auto_save_enabled and self.current_file_path:
             self.auto_save_manager._auto_save()
@@ -178,9 +230,12 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         # 停止文件监听
         self.file_watcher.stop_watching()
 
-        # 检查是否需要保存当前文件
-        if self.check_save_before_close():
+        # 检查所有文档是否需要保存, 并保存各文档的撤销历史和书签
+        if self.file_ops.check_save_all_before_exit():
             self.clear_memory()  # 清理内存
+            config_manager.flush()  # 写入尚未写入的配置
+            if self.instance_server is not None:
+                self.instance_server.close()  # 停止接收其他启动转发的文件
             self.destroy()  # 关闭窗口
         # 如果用户取消保存, 则不关闭窗口
 
@@ -202,11 +257,11 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         self.text_area.bind(
             "<<Selection>>", self._on_cursor_move
         )  # 监听选择内容改变事件
-        self.text_area.bind("<MouseWheel>", self._on_cursor_move)  # 监听鼠标滚轮事件
+        self.text_area.bind("<MouseWheel>", self._on_scroll)  # 监听鼠标滚轮事件
 
         # 绑定Linux鼠标滚轮事件
-        self.text_area.bind("<Button-4>", self._on_cursor_move, add="+")
-        self.text_area.bind("<Button-5>", self._on_cursor_move, add="+")
+        self.text_area.bind("<Button-4>", self._on_scroll, add="+")
+        self.text_area.bind("<Button-5>", self._on_scroll, add="+")
 
         # 直接绑定回车键事件, 确保自动递增编号功能优先级最高
         self.text_area.bind("<Return>", self._on_enter_key)  # 专门处理回车键
@@ -223,6 +278,13 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         )  # 剪切事件，使用add="+"保留默认行为
         self.text_area.bind("<<Modified>>", self._on_text_change)  # 文本修改事件
 
+        # 订阅文本修改记录, 查找替换等程序内的修改不产生按键事件, 也能及时更新显示
+        self.text_change_proxy.subscribe(lambda change: self.update_editor_display())
+
+        # Tk自带的撤销已关闭, 撤销/重做快捷键交给撤销日志处理
+        self.text_area.bind("<<Undo>>", lambda e: self.undo() or "break")
+        self.text_area.bind("<<Redo>>", lambda e: self.redo() or "break")
+
         # 绑定文本框焦点离开事件, 触发自动保存
         self.text_area.bind("<FocusOut>", self._on_text_area_focus_out)
 
@@ -233,6 +295,15 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         self.bind("<Control-Shift-S>", lambda e: self.save_file_as())  # 另存为
         self.bind("<Control-Shift-B>", lambda e: self.save_file_copy())  # 保存副本
         self.bind("<Control-w>", lambda e: self.close_file())  # 关闭文件
+
+        # 切换文档快捷键, 文本框的Ctrl+Tab默认用于切换焦点, 需要拦截
+        for widget in (self, self.text_area):
+            widget.bind(
+                "<Control-Tab>", lambda e: self.next_document() or "break"
+            )  # 下一个文档
+            widget.bind(
+                "<Control-Shift-Tab>", lambda e: self.previous_document() or "break"
+            )  # 上一个文档
         self.bind(
             "<Control-e>", lambda e: self.open_containing_folder()
         )  # 打开文件所在目录
@@ -422,7 +493,7 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
             selected_lines = self._get_selected_lines()
 
             # 开始撤销操作组
-            self.text_area.edit_separator()
+            self.undo_journal.separator()
 
             if selected_lines:
                 # 有选中的文本, 对每一个选中的行进行处理
@@ -466,7 +537,7 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
                     self.text_area.insert("insert", "\t" * self.tab_width_var.get())
 
             # 结束撤销操作组
-            self.text_area.edit_separator()
+            self.undo_journal.separator()
 
         except Exception as e:
             # 错误处理, 确保功能不中断
@@ -754,12 +825,7 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
 
     def _on_text_change(self, event=None):
         """文本改变事件处理"""
-        # 获取当前修改状态
-        is_modified = self.is_modified()
-
-        # 如果为已修改状态, 更新缓存的字符数
-        if is_modified:
-            self.update_char_count()
+        # 字符数由文本统计模型根据修改增量维护, 这里无需重新统计
 
         # 如果是新文件或没有打开文件, 且文本框内容为空, 重置为未修改状态
         if (
@@ -791,40 +857,43 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
 
     def update_editor_display(self):
         """
-        统一更新编辑器显示元素的方法, 包括行号绘制、当前行高亮和语法高亮
+        统一更新编辑器显示元素的方法, 包括行号绘制、当前行高亮、语法高亮和状态栏
 
-        这个方法提供了一个统一的接口来更新编辑器的各种视觉元素, 避免代码重复,
-        并确保在需要时可以一次性更新所有相关的显示组件。
-        方法内部会根据当前的配置状态判断是否需要执行相应的更新。
+        这里只把各显示组件标记为需要更新, 实际更新由界面更新调度器在下一帧统一执行,
+        同一帧内多次调用只会让每个组件更新一次。
+        各组件的更新函数内部会根据当前的配置状态判断是否需要执行相应的更新。
         """
-        try:
-            # 更新行号绘制 - 只有在启用行号显示时才执行
-            if self.line_numbers_var.get():
-                self.after_idle(self.line_number_canvas.draw_line_numbers)
-
-            # 更新当前行高亮 - 只有在启用当前行高亮时才执行
-            if self.highlight_current_line_var.get():
-                self._highlight_current_line()
+        self.ui_scheduler.mark_dirty(
+            "line_numbers", "current_line", "syntax", "status_bar"
+        )
 
-            # 更新语法高亮 - 只有在启用语法高亮且使用可见区域渲染模式时才执行
-            if (
-                self.syntax_highlight_var.get()
-                and self.syntax_highlighter.render_visible_only
-            ):
-                self.syntax_highlighter._handle_event()
+    def _refresh_line_numbers(self):
+        """更新行号绘制 - 只有在启用行号显示时才执行"""
+        if self.line_numbers_var.get():
+            self.line_number_canvas.draw_line_numbers()
 
-            # 更新状态栏信息
-            self._update_status_bar()
+    def _refresh_current_line(self):
+        """更新当前行高亮 - 只有在启用当前行高亮时才执行"""
+        if self.highlight_current_line_var.get():
+            self._highlight_current_line()
 
-        except Exception as e:
-            logger.error(f"更新编辑器显示时出错: {e}")
-            self.nm.show_error(message=f"更新编辑器显示时出错: {e}")
+    def _refresh_syntax_highlight(self):
+        """更新语法高亮 - 只有在启用语法高亮且使用可见区域渲染模式时才执行"""
+        if (
+            self.syntax_highlight_var.get()
+            and self.syntax_highlighter.render_visible_only
+        ):
+            self.syntax_highlighter._handle_event()
 
     def _on_cursor_move(self, event=None):
         """光标移动事件处理"""
         # 使用统一的更新方法
         self.update_editor_display()
 
+    def _on_scroll(self, event=None):
+        """鼠标滚轮事件处理, 滚动不会改变光标位置, 只需更新行号和语法高亮"""
+        self.ui_scheduler.mark_dirty("line_numbers", "syntax")
+
     def _clear_current_line_highlight(self):
         """
         清除当前光标所在行的高亮
@@ -880,8 +949,8 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
             # print(f"Error in _on_mouse_left_click: {e}")
             pass
 
-        # 确保文本框处理完点击事件后立即更新显示
-        self.after_idle(self.update_editor_display)
+        # 标记需要更新, 调度器会在文本框处理完点击事件后的空闲时刻统一更新显示
+        self.update_editor_display()
 
     def _update_status_bar(self):
         """更新状态栏信息"""
@@ -894,37 +963,8 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         row, col = cursor_pos.split(".")
         row, col = int(row), int(col) + 1  # 转换为1基索引
 
-        # 获取选中字符数
-        try:
-            selected_content = self.text_area.get(ctk.SEL_FIRST, ctk.SEL_LAST)
-            # 计算选中内容的字符数, 不特殊处理换行符
-            selected_chars = len(selected_content)
-
-            # 获取选中的起始和结束位置
-            start_pos = self.text_area.index(ctk.SEL_FIRST)
-            end_pos = self.text_area.index(ctk.SEL_LAST)
-
-            # 提取起始和结束行号
-            start_row = int(start_pos.split(".")[0])
-            end_row = int(end_pos.split(".")[0])
-
-            # 计算选中的行数
-            selected_lines = end_row - start_row + 1
-
-            # 特殊情况处理：
-            # 1. 如果选中内容为空, 不显示行数
-            # 2. 如果全选且末尾没有字符（即end_col为0）, 则减去一行
-            end_col = int(end_pos.split(".")[1])
-            if selected_chars == 0:
-                selected_lines = None
-            elif end_col == 0 and end_row > start_row:
-                # 全选情况, 末尾位置在行首, 减去一行
-                selected_lines = end_row - start_row
-
-        except tk.TclError:
-            # 没有选中内容
-            selected_chars = None
-            selected_lines = None
+        # 获取选中字符数和行数, 只使用索引计算, 不复制选中的文本
+        selected_chars, selected_lines = self._get_selection_counts()
 
         # 根据文件修改状态确定状态文本
         status = "已修改" if self.is_modified() else "就绪"
@@ -941,6 +981,46 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         # 更新窗口标题
         self._update_window_title()
 
+    def _get_selection_counts(self):
+        """
+        根据选区索引计算选中的字符数和行数
+
+        字符数由Tk的count命令计算, 行数由起止索引的行号得出, 开销与选区大小无关
+
+        Returns:
+            tuple: (选中字符数, 选中行数), 没有选中内容时均为None;
+                选中内容为空时行数为None
+        """
+        sel_ranges = self.text_area._textbox.tag_ranges(ctk.SEL)
+        if not sel_ranges:
+            # 没有选中内容
+            return None, None
+
+        # 获取选中的起始和结束位置
+        start_pos = str(sel_ranges[0])
+        end_pos = str(sel_ranges[-1])
+
+        # 计算选中内容的字符数, 不特殊处理换行符
+        selected_chars = self.text_stats.count_chars(start_pos, end_pos)
+
+        # 提取起始和结束行号
+        start_row = int(start_pos.split(".")[0])
+        end_row, end_col = map(int, end_pos.split("."))
+
+        # 计算选中的行数
+        selected_lines = end_row - start_row + 1
+
+        # 特殊情况处理：
+        # 1. 如果选中内容为空, 不显示行数
+        # 2. 如果全选且末尾没有字符（即end_col为0）, 则减去一行
+        if selected_chars == 0:
+            selected_lines = None
+        elif end_col == 0 and end_row > start_row:
+            # 全选情况, 末尾位置在行首, 减去一行
+            selected_lines = end_row - start_row
+
+        return selected_chars, selected_lines
+
     def toggle_fullscreen(self, switch_state=True):
         """
         切换全屏模式
@@ -1001,7 +1081,7 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
             title_part = "新文件"
         else:
             # 没有文件路径的情况
-            if self._total_chars > 0:
+            if self.get_char_count() > 0:
                 title_part = "未命名"
             else:
                 title_part = None
@@ -1015,7 +1095,12 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
             # 没有内容时只显示程序名
             title = self.app_name
 
-        self.title(title)
+        # 标题未变化时不重复设置, 避免窗口管理器重绘标题栏
+        if self.title() != title:
+            self.title(title)
+
+        # 当前文档的标签与窗口标题显示相同的文件名和修改状态
+        self.tab_bar.refresh_active()
 
     def open_file(self):
         """打开文件并加载到文本编辑区域"""
@@ -1083,6 +1168,38 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
         # 直接调用文件操作处理器的关闭文件方法
         self.file_ops.close_file()
 
+    def switch_document(self, document):
+        """
+        切换到指定文档
+
+        Args:
+            document: 标签对应的文档
+        """
+        self.documents.activate(document)
+        self.text_area.focus_set()
+
+    def next_document(self):
+        """切换到下一个文档"""
+        self.documents.activate_next(1)
+        self.text_area.focus_set()
+
+    def previous_document(self):
+        """切换到上一个文档"""
+        self.documents.activate_next(-1)
+        self.text_area.focus_set()
+
+    def close_document(self, document):
+        """
+        关闭指定文档, 先切换到该文档, 以便提示保存时用户能看到其内容
+
+        Args:
+            document: 标签对应的文档
+        """
+        if document not in self.documents:
+            return
+        self.documents.activate(document)
+        self.close_file()
+
     def handle_bookmark_navigation(self, direction, event):
         """
         处理书签导航的专用方法
@@ -1168,21 +1285,24 @@ class QuickEditApp(EditOperations, SelectionOperations, ctk.CTk):
 
     def get_char_count(self):
         """
-        获取文本区域的字符数, 使用缓存机制提高性能
+        获取文本区域的字符数, 由文本统计模型增量维护, 开销为O(1)
 
         Returns:
             int: 文本区域的字符数
         """
-        return self._total_chars
+        if self.text_stats is None:
+            return 0
+        return self.text_stats.char_count
 
     def update_char_count(self):
         """
-        更新缓存的字符数
+        重新同步缓存的字符数
 
-        在文件内容发生变化时调用此方法
+        字符数已随每次修改增量更新, 此方法只作为兜底校正,
+        由Tk直接计数, 不会把整个缓冲区复制到Python
         """
-        # 使用end-1c获取文本, 这会自动排除末尾的换行符
-        self._total_chars = len(self.text_area.get("1.0", "end-1c"))
+        if self.text_stats is not None:
+            self.text_stats.refresh_counts()
 
     def _reset_settings(self):
         """
@@ -3,9 +3,7 @@
 """
 
 import os
-import filetype
 import codecs
-import chardet
 import threading
 from loguru import logger
 
@@ -40,6 +38,9 @@ class FileOperationCore:
             # 第一步：使用filetype库检测魔数（仅当提供了文件路径时）
             if file_path is not None and os.path.exists(file_path):
                 try:
+                    # 检测库在首次打开文件时再导入, 减少启动时间
+                    import filetype
+
                     kind = filetype.guess(file_path)
                     if kind is not None:
                         # filetype能够识别的文件类型都是二进制文件
@@ -68,6 +69,8 @@ class FileOperationCore:
 
             # 第三步：使用chardet检测编码置信度
             try:
+                import chardet
+
                 result = chardet.detect(sample)
                 if result and result.get("confidence", 0) > 0.8:
                     # 高置信度编码检测，判定为文本文件
@@ -154,6 +157,8 @@ class FileOperationCore:
             # 检测编码
             if raw_data:
                 try:
+                    import chardet
+
                     result = chardet.detect(raw_data)
                     encoding = result["encoding"] if result["encoding"] else "UTF-8"
 
@@ -468,16 +468,20 @@ class FileOperations:
         Args:
             filename: 文件名, 默认为"新文件"
         """
-        # 先调用关闭文件方法
-        if not self.close_file():
-            return False
+        # 当前文档是空白文档时直接复用, 否则在新标签中新建
+        if self.root.documents.is_blank():
+            if not self.close_file():
+                return False
+        else:
+            self.root.documents.new_document()
 
         # 设置新文件特定的状态
         self.root.is_new_file = True
 
-        # 更新窗口标题为新文件
+        # 更新窗口标题和标签为新文件
         app_name = self.root.app_name
         self.root.title(f"{filename} - {app_name}")
+        self.root.tab_bar.refresh_active()
 
     def handle_dropped_files(self, files):
         """
@@ -489,77 +493,91 @@ class FileOperations:
         if not files:
             return
 
-        # 如果拖拽了多个文件, 直接提示并返回
-        if len(files) > 1:
-            # messagebox.showinfo("提示", "只支持打开单个文件, 请一次只拖拽一个文件")
-            self.root.nm.show_info(message="只支持打开单个文件, 请一次只拖拽一个文件")
-            return
-
-        # 解码文件路径
-        file_path = files[0]
-        if isinstance(file_path, bytes):
-            # 尝试多种编码方式解码文件路径
-            for encoding in ["utf-8", "gbk", "gb2312", locale.getpreferredencoding()]:
-                try:
-                    file_path = file_path.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
-                # 如果所有编码都失败, 使用替换策略
-                file_path = file_path.decode("utf-8", errors="replace")
+        file_paths = []
+        for file_path in files:
+            # 解码文件路径
+            if isinstance(file_path, bytes):
+                # 尝试多种编码方式解码文件路径
+                for encoding in [
+                    "utf-8",
+                    "gbk",
+                    "gb2312",
+                    locale.getpreferredencoding(),
+                ]:
+                    try:
+                        file_path = file_path.decode(encoding)
+                        break
+                    except UnicodeDecodeError:
+                        continue
+                else:
+                    # 如果所有编码都失败, 使用替换策略
+                    file_path = file_path.decode("utf-8", errors="replace")
+
+            # 检查路径是否存在
+            if not os.path.exists(file_path):
+                # 路径不存在, 提示用户
+                self.root.nm.show_warning(
+                    title="文件不存在",
+                    message=f"无法打开文件: {os.path.basename(file_path)}",
+                )
+                continue
 
-        # 检查路径是否存在
-        if os.path.exists(file_path):
             # 检查是否是目录
             if os.path.isdir(file_path):
-                # messagebox.showwarning(
-                #     "不支持的操作", f"无法打开目录: {os.path.basename(file_path)}"
-                # )
                 self.root.nm.show_warning(
                     title="不支持的操作",
                     message=f"无法打开目录: {os.path.basename(file_path)}",
                 )
-                return
+                continue
 
-            # 延迟关闭当前文件和打开新文件, 确保在主线程中执行
-            self.root.after(10, lambda: self._process_dropped_file(file_path))
-        else:
-            # 路径不存在, 提示用户
-            # messagebox.showwarning(
-            #     "文件不存在", f"无法打开文件: {os.path.basename(file_path)}"
-            # )
-            self.root.nm.show_warning(
-                title="文件不存在",
-                message=f"无法打开文件: {os.path.basename(file_path)}",
-            )
-            return
+            file_paths.append(file_path)
+
+        if file_paths:
+            # 延迟打开文件, 确保在主线程中执行
+            self.root.after(10, lambda: self._process_dropped_files(file_paths))
 
-    def _process_dropped_file(self, file_path):
+    def _process_dropped_files(self, file_paths):
         """
-        处理拖拽的文件, 确保在主线程中执行
+        处理拖拽的文件, 确保在主线程中执行, 每个文件在各自的标签中打开
 
         Args:
-            file_path: 文件路径
+            file_paths: 文件路径列表
         """
-        try:
-            # 关闭当前文件
-            if not self.close_file():
-                return False  # 用户取消了操作
+        for file_path in file_paths:
+            try:
+                # 使用通用方法打开文件
+                self._open_file(check_save=True, check_backup=True, file_path=file_path)
+            except Exception as e:
+                logger.error(f"处理拖拽文件时出错: {file_path}, 错误信息: {str(e)}")
+                # messagebox.showerror("错误", f"处理拖拽文件时出错: {e}")
+                self.root.nm.show_error(message=f"处理拖拽文件时出错: {e}")
 
-            # 使用通用方法打开文件
-            self._open_file(check_save=True, check_backup=True, file_path=file_path)
-        except Exception as e:
-            logger.error(f"处理拖拽文件时出错: {file_path}, 错误信息: {str(e)}")
-            # messagebox.showerror("错误", f"处理拖拽文件时出错: {e}")
-            self.root.nm.show_error(message=f"处理拖拽文件时出错: {e}")
+    def _save_document_state(self):
+        """
+        保存当前文件的撤销历史和书签, 以便重新打开时恢复
+
+        只在内容与磁盘上的文件一致时保存, 否则重新打开时校验必然失败
+        """
+        if (
+            not self.root.current_file_path
+            or self.root.is_new_file
+            or self.root.is_modified()
+        ):
+            return
+
+        self.root.undo_journal.save_history(self.root.current_file_path)
+        self.root.bookmark_manager.save_bookmarks(self.root.current_file_path)
 
     def _reset_editor_state(self):
         """重置编辑器状态, 包括清空内容、重置文件属性和更新状态栏"""
-        # 清空编辑器内容
+        # 保存撤销历史和书签, 必须在清空内容之前
+        self._save_document_state()
+
+        # 清空编辑器内容和书签
         self.root.text_area.delete("1.0", tk.END)
+        self.root.bookmark_manager.reset()
 
-        # 更新字符数缓存, 确保_total_chars为0
+        # 更新字符数缓存, 确保字符数为0
         self.root.update_char_count()
 
         # 获取配置中的默认换行符和编码
@@ -636,15 +654,45 @@ class FileOperations:
 
     def close_file(self):
         """
-        关闭当前文件, 重置窗口和状态栏状态
+        关闭当前文件, 还有其他文档时关闭当前标签, 否则重置窗口和状态栏状态
         """
         # 检查是否需要保存当前文件
         if not self.check_save_before_close():
             return False  # 用户取消了操作
 
-        # 重置编辑器状态
-        self._reset_editor_state()
+        if len(self.root.documents) > 1:
+            # 保存撤销历史和书签后关闭标签, 切换到相邻的文档
+            self._save_document_state()
+            self.root.documents.close_active()
+        else:
+            # 重置编辑器状态
+            self._reset_editor_state()
+
+        return True
+
+    def check_save_all_before_exit(self):
+        """
+        退出前检查所有文档, 需要时提示保存, 然后保存各文档的撤销历史和书签
+
+        先检查全部文档再保存撤销历史, 用户中途取消时所有文档保持原样
 
+        Returns:
+            bool: 可以退出返回True, 如果用户取消则返回False
+        """
+        documents = self.root.documents
+
+        # 依次切换到有未保存修改的文档并提示保存
+        for document in list(documents):
+            if documents.is_modified(document) or document is documents.active:
+                documents.activate(document)
+                if not self.check_save_before_close():
+                    return False
+
+        # 挂起的文档没有撤销步骤和书签时不需要载入
+        for document in list(documents):
+            if document is documents.active or document.has_saved_state:
+                documents.activate(document)
+                self._save_document_state()
         return True
 
     def check_save_before_close(self):
@@ -730,14 +778,21 @@ class FileOperations:
 
         Raises:
             ValueError: 当select_path=False且file_path为None或空字符串时抛出
+
+        Note:
+            - 指定编码重新打开和自动重载在当前标签中进行, 其余情况在新标签中打开文件
+            - 文件已经打开时直接切换到对应的标签, 当前文档是空白文档时直接复用
         """
         # 参数验证: 当不需要选择路径时, 必须提供有效的文件路径
         if not select_path and not file_path:
             logger.error("打开文件时未提供有效文件路径")
             return False
 
+        # 在新标签中打开时当前文档保持打开, 不需要检查保存
+        in_new_tab = encoding is None and not is_auto_reload
+
         # 检查文件是否已保存
-        if check_save:
+        if check_save and not in_new_tab:
             if not self.check_save_before_close():
                 return False  # 用户取消了操作
 
@@ -766,6 +821,18 @@ class FileOperations:
             self.root.nm.show_error(message=f"指定路径不是文件: {file_path}")
             return False
 
+        created_tab = False
+        if in_new_tab:
+            # 文件已经打开时直接切换到对应的标签
+            document = self.root.documents.find(file_path)
+            if document is not None:
+                self.root.documents.activate(document)
+                return True
+
+            if not self.root.documents.is_blank():
+                self.root.documents.new_document()
+                created_tab = True
+
         # 重置编辑器状态
         self._reset_editor_state()
 
@@ -775,7 +842,12 @@ class FileOperations:
                 return True  # 已处理备份恢复, 无需继续打开文件
 
         # 调用核心文件打开逻辑
-        return self._open_file_core(file_path, encoding, is_auto_reload)
+        opened = self._open_file_core(file_path, encoding, is_auto_reload)
+
+        # 打开失败时关闭刚才新建的标签, 回到之前的文档
+        if not opened and created_tab:
+            self.root.documents.close_active()
+        return opened
 
     def _open_file_core(self, file_path, encoding=None, is_auto_reload=False):
         """
@@ -831,6 +903,13 @@ class FileOperations:
                     encoding = data["encoding"]
                     line_ending = data["line_ending"]
 
+                    # 替换内容前保存上一个文件的撤销历史和书签, 重载同一文件时内容已变化, 不需要保存,
+                    # 但要记下书签位置, 重载后按行列恢复
+                    if is_auto_reload:
+                        bookmark_positions = self.root.bookmark_manager.get_positions()
+                    else:
+                        self._save_document_state()
+
                     # 插入编辑器内容
                     self.root.text_area.delete("1.0", tk.END)
                     self.root.text_area.insert("1.0", content)
@@ -838,6 +917,15 @@ class FileOperations:
                     # 调用清除方法, 清除刚才插入的撤销栈
                     self.root.clear_memory()
 
+                    # 内容哈希与保存时一致则恢复该文件的撤销历史
+                    self.root.undo_journal.load_history(file_path)
+
+                    # 恢复书签, 替换内容时旧书签的标记都已移到文本开头
+                    if is_auto_reload:
+                        self.root.bookmark_manager.restore_positions(bookmark_positions)
+                    else:
+                        self.root.bookmark_manager.load_bookmarks(file_path)
+
                     # 保存当前文件路径到编辑器实例
                     self.root.current_file_path = file_path
                     self.root.current_encoding = encoding
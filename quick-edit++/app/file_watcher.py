@@ -41,29 +41,63 @@ class FileWatcher:
         self.last_saved_mtime = 0  # 记录最后一次保存时的文件修改时间
 
         # 从配置管理器获取文件监听器配置
-        self.config = config_manager.get("file_watcher")
+        self._load_config()
+
+        # 订阅文件监听器配置, 修改配置后自动应用
+        config_manager.subscribe("file_watcher", self._on_config_changed)
+
+    def _load_config(self) -> None:
+        """从配置快照读取文件监听器配置"""
+        self.config = config_manager.get_component_config("file_watcher")
         # 计算实际使用的值（将秒转换为毫秒）
         self.check_interval = (
-            self.config["check_interval"] * 1000
+            self.config.check_interval * 1000
         )  # 文件变更检查间隔（毫秒）
-        self.save_buffer = self.config["save_buffer"]  # 保存后的缓冲时间（秒）
+        self.save_buffer = self.config.save_buffer  # 保存后的缓冲时间（秒）
         self.readonly_notify_delay = (
-            self.config["readonly_notify_delay"] * 1000
+            self.config.readonly_notify_delay * 1000
         )  # 只读模式下通知重置延迟（毫秒）
         self.edit_notify_delay = (
-            self.config["edit_notify_delay"] * 1000
+            self.config.edit_notify_delay * 1000
         )  # 编辑模式下通知重置延迟（毫秒）
-        self.monitoring_enabled = self.config.get(
-            "monitoring_enabled", True
-        )  # 是否启用文件变更监控
-        self.silent_reload = self.config.get("silent_reload", False)  # 是否静默自动重载
+        self.monitoring_enabled = self.config.monitoring_enabled  # 是否启用文件变更监控
+        self.silent_reload = self.config.silent_reload  # 是否静默自动重载
+
+    def _on_config_changed(self, key_path, value) -> None:
+        """
+        文件监听器配置变更回调
+
+        重新读取配置, 监控开关变化时停止或开始监听当前文件,
+        检查间隔等其他配置在下次检查时生效
 
-    def start_watching(self, file_path: str) -> None:
+        Args:
+            key_path: 变更的配置键路径
+            value: 配置值, 统一从快照读取以得到校正类型后的值
+        """
+        was_enabled = self.monitoring_enabled
+        self._load_config()
+        if self.monitoring_enabled == was_enabled:
+            return
+
+        # 如果禁用了监控，停止当前的文件监听
+        if not self.monitoring_enabled and self.watched_file:
+            self.stop_watching()
+        # 如果启用了监控，且当前有打开的文件，则开始监听
+        elif (
+            self.monitoring_enabled
+            and self.app.current_file_path
+            and not self.watched_file
+        ):
+            self.start_watching(self.app.current_file_path)
+
+    def start_watching(self, file_path: str, keep_cache: bool = False) -> None:
         """
         开始监听指定文件
 
         Args:
             file_path: 要监听的文件路径
+            keep_cache: 是否保留该文件已缓存的信息, 切换回之前打开的文档时使用,
+                        这样切换期间发生的外部修改会在下次检查时发现
         """
         if not file_path or not os.path.exists(file_path):
             return
@@ -79,7 +113,8 @@ class FileWatcher:
         self.watched_file = file_path
 
         # 缓存文件信息并记录当前修改时间
-        self._update_file_cache(file_path, update_mtime=True)
+        if not (keep_cache and file_path in self.file_info):
+            self._update_file_cache(file_path, update_mtime=True)
 
         # 启动定时检查
         self._schedule_check()
@@ -355,18 +390,10 @@ class FileWatcher:
         Args:
             enabled: 是否启用文件变更监控
         """
-        self.monitoring_enabled = enabled
-        # 更新配置
+        # 更新配置, 配置变更回调会停止或开始监听当前文件
         config_manager.set("file_watcher.monitoring_enabled", enabled)
         config_manager.save_config()
 
-        # 如果禁用了监控，停止当前的文件监听
-        if not enabled and self.watched_file:
-            self.stop_watching()
-        # 如果启用了监控，且当前有打开的文件，则开始监听
-        elif enabled and self.app.current_file_path and not self.watched_file:
-            self.start_watching(self.app.current_file_path)
-
     def set_silent_reload(self, silent: bool) -> None:
         """
         设置静默重载模式
@@ -374,7 +401,6 @@ class FileWatcher:
         Args:
             silent: 是否启用静默重载模式
         """
-        self.silent_reload = silent
-        # 更新配置
+        # 更新配置, 配置变更回调会更新静默重载状态
         config_manager.set("file_watcher.silent_reload", silent)
         config_manager.save_config()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+行处理引擎模块
+为行排序和行去重提供外部排序支持: 逐行读取文本, 按内存预算切分为有序段,
+超出预算的有序段写入临时文件, 最后通过heapq.merge多路归并,
+无论选中文本有多少行, 额外占用的内存都保持在预算之内
+"""
+
+import heapq
+import io
+import locale
+import re
+import tempfile
+import threading
+from contextlib import ExitStack
+
+# 每个有序段的内存预算（字节）, 按字符数加上每个字符串对象的固定开销估算
+RUN_MEMORY = 32 * 1024 * 1024
+
+# 每个字符串对象的固定开销估算（字节）
+STRING_OVERHEAD = 56
+
+# 一次归并同时打开的临时文件数上限, 超过时分多轮归并
+MAX_OPEN_RUNS = 64
+
+# 支持的排序方式
+SORT_MODES = ("text", "natural", "numeric", "locale")
+
+# 自然排序时切分数字与非数字部分
+_DIGITS_PATTERN = re.compile(r"(\d+)")
+
+# 数值排序时匹配行首的数字, 支持符号、小数和科学计数法
+_NUMBER_PATTERN = re.compile(r"\s*([+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)")
+
+# 设置排序区域只需要执行一次
+_collate_lock = threading.Lock()
+_collate_ready = False
+
+
+def iter_lines(text):
+    """
+    逐行遍历文本, 不复制整个行列表
+
+    结果与text.split("\\n")一致: 文本以换行符结尾时最后产生一个空行
+
+    Args:
+        text (str): 要遍历的文本
+
+    Yields:
+        str: 不含换行符的行
+    """
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _ensure_collate_locale():
+    """使用系统区域设置作为字符串排序规则, 失败时保持默认规则"""
+    global _collate_ready
+    with _collate_lock:
+        if _collate_ready:
+            return
+        try:
+            locale.setlocale(locale.LC_COLLATE, "")
+        except locale.Error:
+            pass
+        _collate_ready = True
+
+
+def _natural_key(line):
+    """自然排序键, 行中的数字按数值比较, 其余部分忽略大小写"""
+    # 切分结果中偶数位置总是文本, 奇数位置总是数字, 比较时类型一致
+    parts = _DIGITS_PATTERN.split(line.casefold())
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return parts
+
+
+def _numeric_key(line):
+    """数值排序键, 按行首的数字排序, 没有数字的行排在最后并按文本排序"""
+    match = _NUMBER_PATTERN.match(line)
+    if match:
+        return (0, float(match.group(1)), "")
+    return (1, 0.0, line)
+
+
+def make_sort_key(mode="text", ignore_case=False):
+    """
+    创建排序键函数
+
+    Args:
+        mode (str): 排序方式, text为按字符编码排序, natural为自然排序,
+            numeric为按行首数值排序, locale为按系统区域设置排序
+        ignore_case (bool): 是否忽略大小写, 仅对text和locale有效
+
+    Returns:
+        callable: 排序键函数, 按字符编码区分大小写排序时返回None
+    """
+    if mode not in SORT_MODES:
+        raise ValueError(f"不支持的排序方式: {mode}")
+
+    if mode == "natural":
+        return _natural_key
+    if mode == "numeric":
+        return _numeric_key
+    if mode == "locale":
+        _ensure_collate_locale()
+        if ignore_case:
+            return lambda line: locale.strxfrm(line.casefold())
+        return locale.strxfrm
+    return str.casefold if ignore_case else None
+
+
+class ExternalSorter:
+    """
+    外部排序器类
+
+    对不含换行符的字符串记录排序; 记录总量不超过内存预算时直接在内存中排序,
+    否则把每个有序段写入临时文件, 再多路归并; 排序是稳定的, 结果与sorted一致
+    """
+
+    def __init__(
+        self,
+        key=None,
+        reverse=False,
+        run_memory=RUN_MEMORY,
+        max_open_runs=MAX_OPEN_RUNS,
+        temp_dir=None,
+    ):
+        """
+        初始化外部排序器
+
+        Args:
+            key (callable, optional): 排序键函数
+            reverse (bool): 是否降序
+            run_memory (int): 每个有序段的内存预算（字节）
+            max_open_runs (int): 一次归并同时打开的临时文件数上限
+            temp_dir (str, optional): 临时文件目录, 默认使用系统临时目录
+        """
+        self.key = key
+        self.reverse = reverse
+        self.run_memory = run_memory
+        self.max_open_runs = max(2, max_open_runs)
+        self.temp_dir = temp_dir
+        self.spilled_runs = 0  # 写入临时文件的有序段数量, 便于分析
+
+    def sort(self, records):
+        """
+        排序记录
+
+        Args:
+            records (iterable): 不含换行符的字符串记录
+
+        Yields:
+            str: 排好序的记录
+        """
+        with ExitStack() as stack:
+            runs = []
+            buffer = []
+            used = 0
+
+            for record in records:
+                buffer.append(record)
+                used += len(record) + STRING_OVERHEAD
+                if used >= self.run_memory:
+                    runs.append(self._spill(stack, buffer))
+                    buffer = []
+                    used = 0
+
+            # 没有写入临时文件, 直接在内存中排序
+            if not runs:
+                buffer.sort(key=self.key, reverse=self.reverse)
+                yield from buffer
+                return
+
+            if buffer:
+                runs.append(self._spill(stack, buffer))
+                buffer = None
+
+            # 有序段过多时先分组归并, 限制同时打开的文件数
+            while len(runs) > self.max_open_runs:
+                merged = []
+                for i in range(0, len(runs), self.max_open_runs):
+                    group = runs[i : i + self.max_open_runs]
+                    if len(group) == 1:
+                        merged.append(group[0])
+                        continue
+                    merged.append(self._write_run(stack, self._merge(group)))
+                    for run in group:
+                        run.close()
+                runs = merged
+
+            yield from self._merge(runs)
+
+    def _spill(self, stack, buffer):
+        """排序内存中的记录并写入临时文件"""
+        buffer.sort(key=self.key, reverse=self.reverse)
+        return self._write_run(stack, buffer)
+
+    def _write_run(self, stack, records):
+        """
+        把有序记录写入临时文件
+
+        Returns:
+            file: 已回到开头的临时文件, 随ExitStack关闭并自动删除
+        """
+        run = stack.enter_context(
+            tempfile.TemporaryFile(
+                mode="w+",
+                encoding="utf-8",
+                errors="surrogatepass",
+                # 只按\n划分记录, 记录中的\r (仅CR换行的文本) 保持原样
+                newline="\n",
+                dir=self.temp_dir,
+            )
+        )
+        run.writelines(f"{record}\n" for record in records)
+        run.seek(0)
+        self.spilled_runs += 1
+        return run
+
+    def _merge(self, runs):
+        """多路归并有序段, heapq.merge对相同的键保持有序段的先后顺序"""
+        readers = [(line[:-1] for line in run) for run in runs]
+        return heapq.merge(*readers, key=self.key, reverse=self.reverse)
+
+
+class LineEngine:
+    """
+    行处理引擎类
+
+    对文本中的行排序或去重, 行的划分与text.split("\\n")一致,
+    中间结果的内存占用受run_memory限制
+    """
+
+    def __init__(self, run_memory=RUN_MEMORY, temp_dir=None):
+        """
+        初始化行处理引擎
+
+        Args:
+            run_memory (int): 每个有序段的内存预算（字节）
+            temp_dir (str, optional): 临时文件目录, 默认使用系统临时目录
+        """
+        self.run_memory = run_memory
+        self.temp_dir = temp_dir
+
+    def _sorter(self, key=None, reverse=False):
+        """创建使用当前内存预算的外部排序器"""
+        return ExternalSorter(
+            key=key,
+            reverse=reverse,
+            run_memory=self.run_memory,
+            temp_dir=self.temp_dir,
+        )
+
+    def sort_lines(self, text, mode="text", reverse=False, ignore_case=False):
+        """
+        对文本中的行排序
+
+        Args:
+            text (str): 要排序的文本
+            mode (str): 排序方式, 参见make_sort_key
+            reverse (bool): 是否降序
+            ignore_case (bool): 是否忽略大小写
+
+        Returns:
+            str: 排序后的文本, 相同键的行保持原有顺序
+        """
+        sorter = self._sorter(make_sort_key(mode, ignore_case), reverse)
+        return self._join(sorter.sort(iter_lines(text)))
+
+    def dedupe_lines(self, text, ignore_case=False, with_counts=False):
+        """
+        移除文本中的重复行, 保留每行第一次出现的位置
+
+        Args:
+            text (str): 要处理的文本
+            ignore_case (bool): 是否忽略大小写, 忽略时保留第一次出现时的写法
+            with_counts (bool): 是否在每行前添加出现次数, 格式为 "次数\\t行"
+
+        Returns:
+            str: 去重后的文本
+        """
+        normalize = str.casefold if ignore_case else None
+
+        # 整段文本在预算之内时直接使用字典去重
+        if len(text) * 2 < self.run_memory:
+            counts = {}
+            firsts = {}
+            for line in iter_lines(text):
+                key = normalize(line) if normalize else line
+                if key in counts:
+                    counts[key] += 1
+                else:
+                    counts[key] = 1
+                    firsts[key] = line
+            lines = (
+                f"{counts[key]}\t{line}" if with_counts else line
+                for key, line in firsts.items()
+            )
+            return self._join(lines)
+
+        return self._join(self._external_dedupe(text, normalize, with_counts))
+
+    def _external_dedupe(self, text, normalize, with_counts):
+        """
+        使用外部排序去重, 分三步完成:
+        1. 按行内容排序 "行号\\t内容" 记录, 相同内容的记录相邻且按行号排列
+        2. 每组相同内容只保留第一条记录的行号和组内计数, 再按行号排序
+        3. 重新遍历原文本, 只输出保留下来的行
+
+        Yields:
+            str: 去重后的行
+        """
+        # 行号补零到固定宽度, 按字符串排序即按行号排序
+        width = len(str(text.count("\n") + 1))
+
+        def records():
+            for number, line in enumerate(iter_lines(text)):
+                key = normalize(line) if normalize else line
+                yield f"{number:0{width}d}\t{key}"
+
+        def firsts():
+            by_content = self._sorter(key=lambda record: record[width + 1 :])
+            current = None
+            first = count = 0
+            for record in by_content.sort(records()):
+                content = record[width + 1 :]
+                if content != current:
+                    if count:
+                        yield f"{first:0{width}d}\t{count}"
+                    current = content
+                    first = int(record[:width])
+                    count = 0
+                count += 1
+            if count:
+                yield f"{first:0{width}d}\t{count}"
+
+        kept = self._sorter().sort(firsts())
+        next_kept = next(kept, None)
+        for number, line in enumerate(iter_lines(text)):
+            if next_kept is None:
+                return
+            if number != int(next_kept[:width]):
+                continue
+            count = next_kept[width + 1 :]
+            yield f"{count}\t{line}" if with_counts else line
+            next_kept = next(kept, None)
+
+    @staticmethod
+    def _join(lines):
+        """以换行符连接各行, 逐行写入缓冲区, 避免同时持有行列表和结果字符串"""
+        output = io.StringIO()
+        first = True
+        for line in lines:
+            if not first:
+                output.write("\n")
+            output.write(line)
+            first = False
+        return output.getvalue()
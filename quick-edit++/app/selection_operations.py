@@ -7,22 +7,30 @@
 """
 
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
 import base64
 import json
-import xml.dom.minidom as minidom
-import black
-from ruamel.yaml import YAML
-import sqlparse
+from xml.parsers.expat import ExpatError
 from loguru import logger
+from config.config_manager import config_manager
 import re
-import jsbeautifier
-import bs4
-import cssutils
-import toml
 import html
 from urllib.parse import unquote
 from urllib.parse import quote
+from app.line_engine import LineEngine
+from app.selection_transform import (
+    ASYNC_THRESHOLD,
+    SelectionExportTask,
+    SelectionTransformCancelled,
+    SelectionTransformError,
+    SelectionTransformTask,
+)
+from app.structured_formatter import (
+    CsvStreamFormatter,
+    JsonStreamFormatter,
+    XmlStreamFormatter,
+)
+from ui.transform_progress_dialog import TransformProgressDialog
 
 
 class SelectionOperations:
@@ -103,35 +111,171 @@ class SelectionOperations:
 
         return True
 
-    def add_hash_comment(self):
+    def _transform_selection(
+        self, operation_name, transform, error_name=None, with_progress=False
+    ):
         """
-        为选中的每行文本添加#号注释
+        使用转换函数替换选中文本
 
-        检查是否有选中文本和是否为只读模式, 然后为每行添加#号注释
+        选中文本较大时在工作线程中转换并显示进度对话框; 转换结果按行与原文比较,
+        只替换发生变化的行, 未变化部分的标签和标记得以保留, 所有修改合并为一个撤销步骤
+
+        Args:
+            operation_name (str): 操作名称, 用于提示信息
+            transform (callable): 纯文本转换函数, 参数为选中文本, 返回转换后的文本,
+                遇到无效输入时抛出SelectionTransformError
+            error_name (str, optional): 出错时提示的操作名称, 默认与operation_name相同
+            with_progress (bool): 为True时转换函数的第二个参数为进度回调,
+                参数为 (已处理字符数, 总字符数), 进度对话框据此显示确定进度
         """
         # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("添加注释"):
+        if not self._check_editable_selection(operation_name):
+            return
+
+        # 上一次后台转换尚未完成
+        if getattr(self, "_transform_task", None) is not None:
+            messagebox.showwarning("警告", "请等待当前的文本转换完成")
+            return
+
+        error_name = error_name or operation_name
+
+        # 获取选中文本和范围
+        selected_text = self.get_selected_text()
+        start_index, end_index = self.get_selection_range()
+        task = SelectionTransformTask(selected_text, transform, with_progress)
+
+        # 小段文本直接在当前线程中转换
+        if len(selected_text) < ASYNC_THRESHOLD:
+            task.run()
+            self._finish_selection_transform(task, start_index, end_index, error_name)
+            return
+
+        # 大段文本在工作线程中转换, 期间显示进度对话框
+        self._transform_task = task
+        revision = self.text_stats.revision
+        dialog = TransformProgressDialog(self, operation_name, on_cancel=task.cancel)
+        task.start()
+        self.after(
+            50,
+            self._check_selection_transform,
+            task,
+            dialog,
+            (start_index, end_index, revision, error_name),
+        )
+
+    def _check_selection_transform(self, task, dialog, context):
+        """
+        轮询后台转换任务, 完成后在界面线程中应用结果
+
+        Args:
+            task (SelectionTransformTask): 转换任务
+            dialog (TransformProgressDialog): 进度对话框
+            context (tuple): (起始索引, 结束索引, 开始时的文本版本号, 出错时提示的操作名称)
+        """
+        start_index, end_index, revision, error_name = context
+
+        # 已取消, 对话框已关闭, 结果直接丢弃
+        if task.cancelled():
+            self._transform_task = None
+            return
+
+        if task.is_alive():
+            dialog.set_stage(task.stage)
+            dialog.set_progress(task.progress)
+            self.after(50, self._check_selection_transform, task, dialog, context)
+            return
+
+        self._transform_task = None
+        dialog.close()
+
+        # 转换期间文本被修改时, 选区索引已经失效
+        if self.text_stats.revision != revision:
+            messagebox.showwarning("警告", f"转换期间文本已被修改, 已放弃{error_name}")
+            return
+
+        self._finish_selection_transform(task, start_index, end_index, error_name)
+
+    def _finish_selection_transform(self, task, start_index, end_index, error_name):
+        """
+        显示转换错误或应用转换结果
+
+        Args:
+            task (SelectionTransformTask): 已完成的转换任务
+            start_index (str): 选中文本的起始索引
+            end_index (str): 选中文本的结束索引
+            error_name (str): 出错时提示的操作名称
+        """
+        if task.error is not None:
+            if isinstance(task.error, SelectionTransformError):
+                messagebox.showerror(task.error.title, task.error.message)
+            else:
+                logger.error(f"{error_name}时出错: {str(task.error)}")
+                messagebox.showerror("错误", f"{error_name}时出错: {str(task.error)}")
             return
 
         try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
+            self._apply_line_hunks(start_index, end_index, task.hunks, task.result)
+        except Exception as e:
+            logger.error(f"{error_name}时出错: {str(e)}")
+            messagebox.showerror("错误", f"{error_name}时出错: {str(e)}")
 
+    def _apply_line_hunks(self, start_index, end_index, hunks, new_text):
+        """
+        在一个撤销步骤中应用按行比较得到的替换片段, 并重新选中转换后的文本
+
+        Args:
+            start_index (str): 选中文本的起始索引
+            end_index (str): 选中文本的结束索引
+            hunks (list): diff_line_hunks返回的替换片段
+            new_text (str): 转换后的完整文本
+        """
+        start_line = int(start_index.split(".")[0])
+
+        def line_index(line):
+            """把选中文本中的行序号换算为文本组件索引"""
+            if line is None:
+                return end_index
+            if line == 0:
+                return start_index
+            return f"{start_line + line}.0"
+
+        textbox = self.text_area._textbox
+
+        # 同一次调用中的所有片段由撤销日志记录为同一个撤销步骤
+        self.undo_journal.separator()
+
+        # 从后往前应用, 前面片段的索引不会受到影响
+        for first, last, text in reversed(hunks):
+            begin = line_index(first)
+            if first != last:
+                textbox.delete(begin, line_index(last))
+            if text:
+                textbox.insert(begin, text)
+
+        self.undo_journal.separator()
+
+        # 重新选中转换后的文本
+        textbox.tag_remove(tk.SEL, "1.0", tk.END)
+        textbox.tag_add(tk.SEL, start_index, f"{start_index}+{len(new_text)}c")
+
+    def add_hash_comment(self):
+        """
+        为选中的每行文本添加#号注释
+
+        检查是否有选中文本和是否为只读模式, 然后为每行添加#号注释
+        """
+
+        def transform(selected_text):
             # 将选中文本按行分割
             lines = selected_text.split("\n")
 
             # 为每行添加#号注释
             commented_lines = [f"# {line}" if line.strip() else line for line in lines]
 
-            # 替换选中文本
             commented_text = "\n".join(commented_lines)
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, commented_text)
+            return commented_text
 
-        except Exception as e:
-            logger.error(f"添加注释时出错: {str(e)}")
-            messagebox.showerror("错误", f"添加注释时出错: {str(e)}")
+        self._transform_selection("添加注释", transform)
 
     def add_slash_comment(self):
         """
@@ -139,29 +283,18 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后为每行添加//注释
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("添加注释"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 将选中文本按行分割
             lines = selected_text.split("\n")
 
             # 为每行添加//注释
             commented_lines = [f"// {line}" if line.strip() else line for line in lines]
 
-            # 替换选中文本
             commented_text = "\n".join(commented_lines)
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, commented_text)
+            return commented_text
 
-        except Exception as e:
-            logger.error(f"添加注释时出错: {str(e)}")
-            messagebox.showerror("错误", f"添加注释时出错: {str(e)}")
+        self._transform_selection("添加注释", transform)
 
     def remove_line_comment(self):
         """
@@ -169,15 +302,8 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后移除每行开头的#或//注释
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("移除注释"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 将选中文本按行分割
             lines = selected_text.split("\n")
 
@@ -201,14 +327,10 @@ class SelectionOperations:
                     # 没有注释符号, 保持原样
                     uncommented_lines.append(line)
 
-            # 替换选中文本
             uncommented_text = "\n".join(uncommented_lines)
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, uncommented_text)
+            return uncommented_text
 
-        except Exception as e:
-            logger.error(f"移除注释时出错: {str(e)}")
-            messagebox.showerror("错误", f"移除注释时出错: {str(e)}")
+        self._transform_selection("移除注释", transform)
 
     def base64_encode(self):
         """
@@ -216,27 +338,15 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本进行Base64编码
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("Base64编码"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 对选中文本进行Base64编码
             encoded_text = base64.b64encode(selected_text.encode("utf-8")).decode(
                 "utf-8"
             )
+            return encoded_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, encoded_text)
-
-        except Exception as e:
-            logger.error(f"Base64编码时出错: {str(e)}")
-            messagebox.showerror("错误", f"Base64编码时出错: {str(e)}")
+        self._transform_selection("Base64编码", transform)
 
     def base64_decode(self):
         """
@@ -244,36 +354,28 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本进行Base64解码
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("Base64解码"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 对选中文本进行Base64解码
             try:
-                decoded_text = base64.b64decode(selected_text.encode("utf-8")).decode(
-                    "utf-8"
+                try:
+                    decoded_text = base64.b64decode(
+                        selected_text.encode("utf-8")
+                    ).decode("utf-8")
+                except Exception:
+                    # 如果解码失败, 尝试忽略无效字符
+                    decoded_text = base64.b64decode(
+                        selected_text.encode("utf-8"), validate=False
+                    ).decode("utf-8")
+            except Exception as e:
+                logger.error(f"Base64解码时出错: {str(e)}")
+                raise SelectionTransformError(
+                    "错误",
+                    f"Base64解码时出错: {str(e)}\n请确保选中的文本是有效的Base64编码",
                 )
-            except Exception:
-                # 如果解码失败, 尝试忽略无效字符
-                decoded_text = base64.b64decode(
-                    selected_text.encode("utf-8"), validate=False
-                ).decode("utf-8")
+            return decoded_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, decoded_text)
-
-        except Exception as e:
-            logger.error(f"Base64解码时出错: {str(e)}")
-            messagebox.showerror(
-                "错误",
-                f"Base64解码时出错: {str(e)}\n请确保选中的文本是有效的Base64编码",
-            )
+        self._transform_selection("Base64解码", transform)
 
     def to_upper_case(self):
         """
@@ -281,25 +383,13 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后将选中文本转换为大写
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("转为大写"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 将选中文本转换为大写
             upper_text = selected_text.upper()
+            return upper_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, upper_text)
-
-        except Exception as e:
-            logger.error(f"转为大写时出错: {str(e)}")
-            messagebox.showerror("错误", f"转为大写时出错: {str(e)}")
+        self._transform_selection("转为大写", transform)
 
     def to_lower_case(self):
         """
@@ -307,25 +397,13 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后将选中文本转换为小写
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("转为小写"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 将选中文本转换为小写
             lower_text = selected_text.lower()
+            return lower_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, lower_text)
-
-        except Exception as e:
-            logger.error(f"转为小写时出错: {str(e)}")
-            messagebox.showerror("错误", f"转为小写时出错: {str(e)}")
+        self._transform_selection("转为小写", transform)
 
     def to_title_case(self):
         """
@@ -333,25 +411,13 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后将选中文本转换为首字母大写
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("首字母大写"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 将选中文本转换为首字母大写
             title_text = selected_text.title()
+            return title_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, title_text)
-
-        except Exception as e:
-            logger.error(f"首字母大写时出错: {str(e)}")
-            messagebox.showerror("错误", f"首字母大写时出错: {str(e)}")
+        self._transform_selection("首字母大写", transform)
 
     def trim_whitespace(self):
         """
@@ -360,15 +426,8 @@ class SelectionOperations:
         检查是否有选中文本和是否为只读模式, 然后移除选中文本的首尾空白
         能够智能判断单行或多行文本，采用相应的处理方式
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("移除首尾空白"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 判断是否为多行文本
             is_multiline = "\n" in selected_text
 
@@ -377,29 +436,13 @@ class SelectionOperations:
                 lines = selected_text.split("\n")
                 trimmed_lines = [line.strip() for line in lines]
                 trimmed_text = "\n".join(trimmed_lines)
-
-                # 计算新的结束位置
-                start_line = int(start_index.split(".")[0])
-                line_count = len(trimmed_lines)
-                end_line = start_line + line_count - 1
-                end_column = len(trimmed_lines[-1]) if trimmed_lines else 0
             else:
                 # 单行处理：直接移除首尾空白
                 trimmed_text = selected_text.strip()
 
-                # 计算新的结束位置
-                end_line = int(start_index.split(".")[0])
-                end_column = len(trimmed_text)
-
-            new_end_index = f"{end_line}.{end_column}"
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, trimmed_text)
+            return trimmed_text
 
-        except Exception as e:
-            logger.error(f"移除首尾空白时出错: {str(e)}")
-            messagebox.showerror("错误", f"移除首尾空白时出错: {str(e)}")
+        self._transform_selection("移除首尾空白", transform)
 
     def trim_left_whitespace(self):
         """
@@ -408,15 +451,8 @@ class SelectionOperations:
         检查是否有选中文本和是否为只读模式, 然后移除选中文本的左侧空白
         能够智能判断单行或多行文本，采用相应的处理方式
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("移除左侧空白"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 判断是否为多行文本
             is_multiline = "\n" in selected_text
 
@@ -425,29 +461,13 @@ class SelectionOperations:
                 lines = selected_text.split("\n")
                 trimmed_lines = [line.lstrip() for line in lines]
                 trimmed_text = "\n".join(trimmed_lines)
-
-                # 计算新的结束位置
-                start_line = int(start_index.split(".")[0])
-                line_count = len(trimmed_lines)
-                end_line = start_line + line_count - 1
-                end_column = len(trimmed_lines[-1]) if trimmed_lines else 0
             else:
                 # 单行处理：直接移除左侧空白
                 trimmed_text = selected_text.lstrip()
 
-                # 计算新的结束位置
-                end_line = int(start_index.split(".")[0])
-                end_column = len(trimmed_text)
-
-            new_end_index = f"{end_line}.{end_column}"
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, trimmed_text)
+            return trimmed_text
 
-        except Exception as e:
-            logger.error(f"移除左侧空白时出错: {str(e)}")
-            messagebox.showerror("错误", f"移除左侧空白时出错: {str(e)}")
+        self._transform_selection("移除左侧空白", transform)
 
     def trim_right_whitespace(self):
         """
@@ -456,15 +476,8 @@ class SelectionOperations:
         检查是否有选中文本和是否为只读模式, 然后移除选中文本的右侧空白
         能够智能判断单行或多行文本，采用相应的处理方式
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("移除右侧空白"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 判断是否为多行文本
             is_multiline = "\n" in selected_text
 
@@ -473,29 +486,13 @@ class SelectionOperations:
                 lines = selected_text.split("\n")
                 trimmed_lines = [line.rstrip() for line in lines]
                 trimmed_text = "\n".join(trimmed_lines)
-
-                # 计算新的结束位置
-                start_line = int(start_index.split(".")[0])
-                line_count = len(trimmed_lines)
-                end_line = start_line + line_count - 1
-                end_column = len(trimmed_lines[-1]) if trimmed_lines else 0
             else:
                 # 单行处理：直接移除右侧空白
                 trimmed_text = selected_text.rstrip()
 
-                # 计算新的结束位置
-                end_line = int(start_index.split(".")[0])
-                end_column = len(trimmed_text)
-
-            new_end_index = f"{end_line}.{end_column}"
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, trimmed_text)
+            return trimmed_text
 
-        except Exception as e:
-            logger.error(f"移除右侧空白时出错: {str(e)}")
-            messagebox.showerror("错误", f"移除右侧空白时出错: {str(e)}")
+        self._transform_selection("移除右侧空白", transform)
 
     def remove_extra_whitespace(self):
         """
@@ -504,15 +501,8 @@ class SelectionOperations:
         检查是否有选中文本和是否为只读模式, 然后移除选中文本中的空白
         能够智能判断单行或多行文本，采用相应的处理方式
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("移除多余空白"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 判断是否为多行文本
             is_multiline = "\n" in selected_text
 
@@ -521,29 +511,13 @@ class SelectionOperations:
                 lines = selected_text.split("\n")
                 cleaned_lines = [" ".join(line.split()) for line in lines]
                 cleaned_text = "\n".join(cleaned_lines)
-
-                # 计算新的结束位置
-                start_line = int(start_index.split(".")[0])
-                line_count = len(cleaned_lines)
-                end_line = start_line + line_count - 1
-                end_column = len(cleaned_lines[-1]) if cleaned_lines else 0
             else:
                 # 单行处理：直接移除多余空白
                 cleaned_text = " ".join(selected_text.split())
 
-                # 计算新的结束位置
-                end_line = int(start_index.split(".")[0])
-                end_column = len(cleaned_text)
-
-            new_end_index = f"{end_line}.{end_column}"
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, cleaned_text)
+            return cleaned_text
 
-        except Exception as e:
-            logger.error(f"移除多余空白时出错: {str(e)}")
-            messagebox.showerror("错误", f"移除多余空白时出错: {str(e)}")
+        self._transform_selection("移除多余空白", transform)
 
     def remove_empty_lines(self):
         """
@@ -551,28 +525,16 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后移除选中文本中的空白行
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("移除空白行"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 移除选中文本中的空白行
             # 分割为行, 过滤掉空行或只包含空白字符的行
             lines = selected_text.split("\n")
             non_empty_lines = [line for line in lines if line.strip() != ""]
             cleaned_text = "\n".join(non_empty_lines)
+            return cleaned_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, cleaned_text)
-
-        except Exception as e:
-            logger.error(f"移除空白行时出错: {str(e)}")
-            messagebox.showerror("错误", f"移除空白行时出错: {str(e)}")
+        self._transform_selection("移除空白行", transform)
 
     def merge_empty_lines(self):
         """
@@ -580,15 +542,8 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后合并选中文本中的连续空白行
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("合并空白行"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 合并选中文本中的连续空白行
             # 分割为行, 处理连续的空白行
             lines = selected_text.split("\n")
@@ -604,14 +559,9 @@ class SelectionOperations:
                 prev_empty = current_empty
 
             cleaned_text = "\n".join(result_lines)
+            return cleaned_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, cleaned_text)
-
-        except Exception as e:
-            logger.error(f"合并空白行时出错: {str(e)}")
-            messagebox.showerror("错误", f"合并空白行时出错: {str(e)}")
+        self._transform_selection("合并空白行", transform)
 
     def remove_duplicate_lines(self):
         """
@@ -619,35 +569,25 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后移除选中文本中的重复行
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("移除重复行"):
-            return
 
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
+        def transform(selected_text):
+            # 保持原始顺序去重, 大文本使用外部排序, 不在内存中保存所有行
+            return LineEngine().dedupe_lines(selected_text)
 
-            # 移除选中文本中的重复行
-            # 分割为行, 使用集合去重, 但保持原始顺序
-            lines = selected_text.split("\n")
-            seen_lines = set()
-            unique_lines = []
+        self._transform_selection("移除重复行", transform)
 
-            for line in lines:
-                if line not in seen_lines:
-                    seen_lines.add(line)
-                    unique_lines.append(line)
+    def remove_duplicate_lines_ignore_case(self):
+        """
+        忽略大小写移除选中文本中的重复行
 
-            cleaned_text = "\n".join(unique_lines)
+        检查是否有选中文本和是否为只读模式, 然后移除选中文本中忽略大小写后重复的行,
+        保留每行第一次出现时的写法
+        """
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, cleaned_text)
+        def transform(selected_text):
+            return LineEngine().dedupe_lines(selected_text, ignore_case=True)
 
-        except Exception as e:
-            logger.error(f"移除重复行时出错: {str(e)}")
-            messagebox.showerror("错误", f"移除重复行时出错: {str(e)}")
+        self._transform_selection("忽略大小写移除重复行", transform)
 
     def merge_duplicate_lines(self):
         """
@@ -655,63 +595,52 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后合并选中文本中的重复行
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("合并重复行"):
-            return
 
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
+        def transform(selected_text):
+            # 合并选中文本中的重复行, 每行只保留第一次出现的位置
+            return LineEngine().dedupe_lines(selected_text)
 
-            # 合并选中文本中的重复行
-            # 分割为行, 统计每行出现的次数, 然后只保留一次
-            lines = selected_text.split("\n")
-            seen_lines = set()
-            merged_lines = []
+        self._transform_selection("合并重复行", transform)
 
-            for line in lines:
-                if line not in seen_lines:
-                    seen_lines.add(line)
-                    merged_lines.append(line)
+    def count_duplicate_lines(self):
+        """
+        统计选中文本中每行出现的次数
 
-            cleaned_text = "\n".join(merged_lines)
+        检查是否有选中文本和是否为只读模式, 然后合并选中文本中的重复行,
+        并在每行前添加出现次数, 格式为 "次数\t行"
+        """
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, cleaned_text)
+        def transform(selected_text):
+            return LineEngine().dedupe_lines(selected_text, with_counts=True)
 
-        except Exception as e:
-            logger.error(f"合并重复行时出错: {str(e)}")
-            messagebox.showerror("错误", f"合并重复行时出错: {str(e)}")
+        self._transform_selection("统计重复行", transform)
 
-    def sort_lines_ascending(self):
+    def _sort_lines(
+        self, operation_name, mode="text", reverse=False, ignore_case=False
+    ):
         """
-        对选中文本按升序排序
+        按指定方式对选中文本中的行排序
 
-        检查是否有选中文本和是否为只读模式, 然后对选中文本按升序排序
+        Args:
+            operation_name (str): 操作名称, 用于提示信息
+            mode (str): 排序方式, 参见line_engine.make_sort_key
+            reverse (bool): 是否降序
+            ignore_case (bool): 是否忽略大小写
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("升序排序"):
-            return
 
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
+        def transform(selected_text):
+            # 大文本的有序段写入临时文件后多路归并, 内存占用保持在预算之内
+            return LineEngine().sort_lines(selected_text, mode, reverse, ignore_case)
 
-            # 分割为行并按升序排序
-            lines = selected_text.split("\n")
-            sorted_lines = sorted(lines)
-            sorted_text = "\n".join(sorted_lines)
+        self._transform_selection(operation_name, transform)
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, sorted_text)
+    def sort_lines_ascending(self):
+        """
+        对选中文本按升序排序
 
-        except Exception as e:
-            logger.error(f"升序排序时出错: {str(e)}")
-            messagebox.showerror("错误", f"升序排序时出错: {str(e)}")
+        检查是否有选中文本和是否为只读模式, 然后对选中文本按升序排序
+        """
+        self._sort_lines("升序排序")
 
     def sort_lines_descending(self):
         """
@@ -719,27 +648,41 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本按降序排序
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("降序排序"):
-            return
+        self._sort_lines("降序排序", reverse=True)
 
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
+    def sort_lines_ignore_case(self):
+        """
+        对选中文本忽略大小写按升序排序
 
-            # 分割为行并按降序排序
-            lines = selected_text.split("\n")
-            sorted_lines = sorted(lines, reverse=True)
-            sorted_text = "\n".join(sorted_lines)
+        检查是否有选中文本和是否为只读模式, 然后对选中文本忽略大小写按升序排序
+        """
+        self._sort_lines("忽略大小写排序", ignore_case=True)
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, sorted_text)
+    def sort_lines_natural(self):
+        """
+        对选中文本按自然顺序排序
 
-        except Exception as e:
-            logger.error(f"降序排序时出错: {str(e)}")
-            messagebox.showerror("错误", f"降序排序时出错: {str(e)}")
+        检查是否有选中文本和是否为只读模式, 然后对选中文本按自然顺序排序,
+        行中的数字按数值比较, 例如 file2 排在 file10 之前
+        """
+        self._sort_lines("自然排序", mode="natural")
+
+    def sort_lines_numeric(self):
+        """
+        对选中文本按行首数值排序
+
+        检查是否有选中文本和是否为只读模式, 然后对选中文本按行首的数值排序,
+        不以数字开头的行排在最后
+        """
+        self._sort_lines("数值排序", mode="numeric")
+
+    def sort_lines_locale(self):
+        """
+        对选中文本按系统区域设置排序
+
+        检查是否有选中文本和是否为只读模式, 然后对选中文本按系统区域设置的排序规则排序
+        """
+        self._sort_lines("区域设置排序", mode="locale")
 
     def reverse_characters(self):
         """
@@ -747,25 +690,13 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后反转选中文本中的字符顺序
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("反转字符"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 反转字符顺序
             reversed_text = selected_text[::-1]
+            return reversed_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, reversed_text)
-
-        except Exception as e:
-            logger.error(f"反转字符时出错: {str(e)}")
-            messagebox.showerror("错误", f"反转字符时出错: {str(e)}")
+        self._transform_selection("反转字符", transform)
 
     def reverse_lines(self):
         """
@@ -773,445 +704,258 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后反转选中文本中的行顺序
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("反转行"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 按行分割文本
             lines = selected_text.split("\n")
 
             # 反转行顺序
             reversed_lines = lines[::-1]
             reversed_text = "\n".join(reversed_lines)
+            return reversed_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, reversed_text)
-
-        except Exception as e:
-            logger.error(f"反转行时出错: {str(e)}")
-            messagebox.showerror("错误", f"反转行时出错: {str(e)}")
+        self._transform_selection("反转行", transform)
 
     # 基本命名转换方法
     def snake_to_camel(self):
         """
         下划线转驼峰：snake_case → camelCase
         """
-        if not self._check_editable_selection("下划线转驼峰"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             parts = selected_text.split("_")
             camel_case = parts[0].lower()
             for part in parts[1:]:
                 if part:  # 忽略空部分
                     camel_case += part.capitalize()
+            return camel_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, camel_case)
-
-        except Exception as e:
-            logger.error(f"下划线转驼峰时出错: {str(e)}")
-            messagebox.showerror("错误", f"下划线转驼峰时出错: {str(e)}")
+        self._transform_selection("下划线转驼峰", transform)
 
     def camel_to_snake(self):
         """
         驼峰转下划线：camelCase → snake_case
         """
-        if not self._check_editable_selection("驼峰转下划线"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             import re
 
             snake_case = re.sub(r"(?<!^)(?=[A-Z])", "_", selected_text).lower()
+            return snake_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, snake_case)
-
-        except Exception as e:
-            logger.error(f"驼峰转下划线时出错: {str(e)}")
-            messagebox.showerror("错误", f"驼峰转下划线时出错: {str(e)}")
+        self._transform_selection("驼峰转下划线", transform)
 
     # 扩展命名转换方法
     def snake_to_pascal(self):
         """
         下划线转帕斯卡：snake_case → PascalCase
         """
-        if not self._check_editable_selection("下划线转帕斯卡"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             parts = selected_text.split("_")
             pascal_case = "".join(part.capitalize() for part in parts if part)
+            return pascal_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, pascal_case)
-
-        except Exception as e:
-            logger.error(f"下划线转帕斯卡时出错: {str(e)}")
-            messagebox.showerror("错误", f"下划线转帕斯卡时出错: {str(e)}")
+        self._transform_selection("下划线转帕斯卡", transform)
 
     def pascal_to_snake(self):
         """
         帕斯卡转下划线：PascalCase → snake_case
         """
-        if not self._check_editable_selection("帕斯卡转下划线"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             import re
 
             snake_case = re.sub(r"(?<!^)(?=[A-Z])", "_", selected_text).lower()
+            return snake_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, snake_case)
-
-        except Exception as e:
-            logger.error(f"帕斯卡转下划线时出错: {str(e)}")
-            messagebox.showerror("错误", f"帕斯卡转下划线时出错: {str(e)}")
+        self._transform_selection("帕斯卡转下划线", transform)
 
     def camel_to_pascal(self):
         """
         驼峰转帕斯卡：camelCase → PascalCase
         """
-        if not self._check_editable_selection("驼峰转帕斯卡"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             pascal_case = (
                 selected_text[0].upper() + selected_text[1:] if selected_text else ""
             )
+            return pascal_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, pascal_case)
-
-        except Exception as e:
-            logger.error(f"驼峰转帕斯卡时出错: {str(e)}")
-            messagebox.showerror("错误", f"驼峰转帕斯卡时出错: {str(e)}")
+        self._transform_selection("驼峰转帕斯卡", transform)
 
     def pascal_to_camel(self):
         """
         帕斯卡转驼峰：PascalCase → camelCase
         """
-        if not self._check_editable_selection("帕斯卡转驼峰"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             camel_case = (
                 selected_text[0].lower() + selected_text[1:] if selected_text else ""
             )
+            return camel_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, camel_case)
-
-        except Exception as e:
-            logger.error(f"帕斯卡转驼峰时出错: {str(e)}")
-            messagebox.showerror("错误", f"帕斯卡转驼峰时出错: {str(e)}")
+        self._transform_selection("帕斯卡转驼峰", transform)
 
     def kebab_to_snake(self):
         """
         短横线转下划线：kebab-case → snake_case
         """
-        if not self._check_editable_selection("短横线转下划线"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             snake_case = selected_text.replace("-", "_")
+            return snake_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, snake_case)
-
-        except Exception as e:
-            logger.error(f"短横线转下划线时出错: {str(e)}")
-            messagebox.showerror("错误", f"短横线转下划线时出错: {str(e)}")
+        self._transform_selection("短横线转下划线", transform)
 
     def snake_to_kebab(self):
         """
         下划线转短横线：snake_case → kebab-case
         """
-        if not self._check_editable_selection("下划线转短横线"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             kebab_case = selected_text.replace("_", "-")
+            return kebab_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, kebab_case)
-
-        except Exception as e:
-            logger.error(f"下划线转短横线时出错: {str(e)}")
-            messagebox.showerror("错误", f"下划线转短横线时出错: {str(e)}")
+        self._transform_selection("下划线转短横线", transform)
 
     def kebab_to_camel(self):
         """
         短横线转驼峰：kebab-case → camelCase
         """
-        if not self._check_editable_selection("短横线转驼峰"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             parts = selected_text.split("-")
             camel_case = parts[0].lower()
             for part in parts[1:]:
                 if part:  # 忽略空部分
                     camel_case += part.capitalize()
+            return camel_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, camel_case)
-
-        except Exception as e:
-            logger.error(f"短横线转驼峰时出错: {str(e)}")
-            messagebox.showerror("错误", f"短横线转驼峰时出错: {str(e)}")
+        self._transform_selection("短横线转驼峰", transform)
 
     def camel_to_kebab(self):
         """
         驼峰转短横线：camelCase → kebab-case
         """
-        if not self._check_editable_selection("驼峰转短横线"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             import re
 
             kebab_case = re.sub(r"(?<!^)(?=[A-Z])", "-", selected_text).lower()
+            return kebab_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, kebab_case)
-
-        except Exception as e:
-            logger.error(f"驼峰转短横线时出错: {str(e)}")
-            messagebox.showerror("错误", f"驼峰转短横线时出错: {str(e)}")
+        self._transform_selection("驼峰转短横线", transform)
 
     # 大小写转换方法
     def to_title_case(self):
         """
         每个单词首字母大写（标题格式）
         """
-        if not self._check_editable_selection("标题格式"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             title_case = selected_text.title()
+            return title_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, title_case)
-
-        except Exception as e:
-            logger.error(f"标题格式转换时出错: {str(e)}")
-            messagebox.showerror("错误", f"标题格式转换时出错: {str(e)}")
+        self._transform_selection("标题格式", transform, error_name="标题格式转换")
 
     # 空格处理方法
     def space_to_snake(self):
         """
         空格转下划线：space separated → space_separated
         """
-        if not self._check_editable_selection("空格转下划线"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             snake_case = selected_text.replace(" ", "_")
+            return snake_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, snake_case)
-
-        except Exception as e:
-            logger.error(f"空格转下划线时出错: {str(e)}")
-            messagebox.showerror("错误", f"空格转下划线时出错: {str(e)}")
+        self._transform_selection("空格转下划线", transform)
 
     def space_to_kebab(self):
         """
         空格转短横线：space separated → space-separated
         """
-        if not self._check_editable_selection("空格转短横线"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             kebab_case = selected_text.replace(" ", "-")
+            return kebab_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, kebab_case)
-
-        except Exception as e:
-            logger.error(f"空格转短横线时出错: {str(e)}")
-            messagebox.showerror("错误", f"空格转短横线时出错: {str(e)}")
+        self._transform_selection("空格转短横线", transform)
 
     def space_to_camel(self):
         """
         空格转驼峰：space separated → spaceSeparated
         """
-        if not self._check_editable_selection("空格转驼峰"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             parts = selected_text.split(" ")
             camel_case = parts[0].lower()
             for part in parts[1:]:
                 if part:  # 忽略空部分
                     camel_case += part.capitalize()
+            return camel_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, camel_case)
-
-        except Exception as e:
-            logger.error(f"空格转驼峰时出错: {str(e)}")
-            messagebox.showerror("错误", f"空格转驼峰时出错: {str(e)}")
+        self._transform_selection("空格转驼峰", transform)
 
     def snake_to_space(self):
         """
         下划线转空格：snake_case → snake case
         """
-        if not self._check_editable_selection("下划线转空格"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             space_case = selected_text.replace("_", " ")
+            return space_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, space_case)
-
-        except Exception as e:
-            logger.error(f"下划线转空格时出错: {str(e)}")
-            messagebox.showerror("错误", f"下划线转空格时出错: {str(e)}")
+        self._transform_selection("下划线转空格", transform)
 
     def kebab_to_space(self):
         """
         短横线转空格：kebab-case → kebab case
         """
-        if not self._check_editable_selection("短横线转空格"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             space_case = selected_text.replace("-", " ")
+            return space_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, space_case)
-
-        except Exception as e:
-            logger.error(f"短横线转空格时出错: {str(e)}")
-            messagebox.showerror("错误", f"短横线转空格时出错: {str(e)}")
+        self._transform_selection("短横线转空格", transform)
 
     def camel_to_space(self):
         """
         驼峰转空格：camelCase → camel case
         """
-        if not self._check_editable_selection("驼峰转空格"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             import re
 
             space_case = re.sub(r"(?<!^)(?=[A-Z])", " ", selected_text)
+            return space_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, space_case)
-
-        except Exception as e:
-            logger.error(f"驼峰转空格时出错: {str(e)}")
-            messagebox.showerror("错误", f"驼峰转空格时出错: {str(e)}")
+        self._transform_selection("驼峰转空格", transform)
 
     # 编程特定转换方法
     def to_constant_case(self):
         """
         常量命名：text → TEXT（全大写+下划线）
         """
-        if not self._check_editable_selection("常量命名"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             import re
 
@@ -1219,52 +963,34 @@ class SelectionOperations:
             constant_case = re.sub(r"(?<!^)(?=[A-Z])", "_", selected_text).upper()
             # 替换空格和短横线为下划线
             constant_case = constant_case.replace(" ", "_").replace("-", "_")
+            return constant_case
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, constant_case)
-
-        except Exception as e:
-            logger.error(f"常量命名转换时出错: {str(e)}")
-            messagebox.showerror("错误", f"常量命名转换时出错: {str(e)}")
+        self._transform_selection("常量命名", transform, error_name="常量命名转换")
 
     def to_private_variable(self):
         """
         私有变量命名：text → _text
         """
-        if not self._check_editable_selection("私有变量命名"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             private_var = (
                 "_" + selected_text
                 if not selected_text.startswith("_")
                 else selected_text
             )
+            return private_var
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, private_var)
-
-        except Exception as e:
-            logger.error(f"私有变量命名转换时出错: {str(e)}")
-            messagebox.showerror("错误", f"私有变量命名转换时出错: {str(e)}")
+        self._transform_selection(
+            "私有变量命名", transform, error_name="私有变量命名转换"
+        )
 
     def to_class_name(self):
         """
         类命名：text → TextClass（帕斯卡+Class后缀）
         """
-        if not self._check_editable_selection("类命名"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             import re
 
@@ -1278,26 +1004,16 @@ class SelectionOperations:
             )
             # 添加Class后缀
             class_name = pascal_case + "Class"
+            return class_name
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, class_name)
-
-        except Exception as e:
-            logger.error(f"类命名转换时出错: {str(e)}")
-            messagebox.showerror("错误", f"类命名转换时出错: {str(e)}")
+        self._transform_selection("类命名", transform, error_name="类命名转换")
 
     def to_interface_name(self):
         """
         接口命名：text → IText（I前缀+帕斯卡）
         """
-        if not self._check_editable_selection("接口命名"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             import re
 
@@ -1311,26 +1027,16 @@ class SelectionOperations:
             )
             # 添加I前缀
             interface_name = "I" + pascal_case
+            return interface_name
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, interface_name)
-
-        except Exception as e:
-            logger.error(f"接口命名转换时出错: {str(e)}")
-            messagebox.showerror("错误", f"接口命名转换时出错: {str(e)}")
+        self._transform_selection("接口命名", transform, error_name="接口命名转换")
 
     def to_function_name(self):
         """
         函数命名：text → getText()（驼峰+括号）
         """
-        if not self._check_editable_selection("函数命名"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             import re
 
@@ -1345,27 +1051,17 @@ class SelectionOperations:
                     camel_case += part.capitalize()
             # 添加get前缀和括号
             function_name = "get" + camel_case[0].upper() + camel_case[1:] + "()"
+            return function_name
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, function_name)
-
-        except Exception as e:
-            logger.error(f"函数命名转换时出错: {str(e)}")
-            messagebox.showerror("错误", f"函数命名转换时出错: {str(e)}")
+        self._transform_selection("函数命名", transform, error_name="函数命名转换")
 
     # 数据库相关转换方法
     def to_table_name(self):
         """
         表名转换：text → texts（复数形式）
         """
-        if not self._check_editable_selection("表名转换"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             # 简单的复数形式转换
             if selected_text.endswith("y"):
@@ -1374,58 +1070,33 @@ class SelectionOperations:
                 table_name = selected_text + "es"
             else:
                 table_name = selected_text + "s"
+            return table_name
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, table_name)
-
-        except Exception as e:
-            logger.error(f"表名转换时出错: {str(e)}")
-            messagebox.showerror("错误", f"表名转换时出错: {str(e)}")
+        self._transform_selection("表名转换", transform)
 
     def to_column_name(self):
         """
         列名转换：text → text_id（添加_id后缀）
         """
-        if not self._check_editable_selection("列名转换"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             column_name = selected_text + "_id"
+            return column_name
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, column_name)
-
-        except Exception as e:
-            logger.error(f"列名转换时出错: {str(e)}")
-            messagebox.showerror("错误", f"列名转换时出错: {str(e)}")
+        self._transform_selection("列名转换", transform)
 
     def to_foreign_key(self):
         """
         外键命名：text → text_id（添加_id后缀）
         """
-        if not self._check_editable_selection("外键命名"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 转换逻辑
             foreign_key = selected_text + "_id"
+            return foreign_key
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, foreign_key)
-
-        except Exception as e:
-            logger.error(f"外键命名转换时出错: {str(e)}")
-            messagebox.showerror("错误", f"外键命名转换时出错: {str(e)}")
+        self._transform_selection("外键命名", transform, error_name="外键命名转换")
 
     def _reselect_text(self, start_index, text_length):
         """
@@ -1444,95 +1115,58 @@ class SelectionOperations:
         """
         格式化JSON字符串, 使其更易读
         """
-        if not self._check_editable_selection("格式化JSON"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
-            # 尝试解析JSON
+        def transform(selected_text, progress):
+            # 逐个标记流式输出, 不构建对象树
             try:
-                json_data = json.loads(selected_text)
-                # 格式化JSON, 缩进为2个空格
-                formatted_json = json.dumps(json_data, indent=2, ensure_ascii=False)
+                formatted_json = JsonStreamFormatter(
+                    selected_text, indent=2, progress=progress
+                ).to_string()
             except json.JSONDecodeError as e:
-                messagebox.showerror("JSON解析错误", f"无效的JSON格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_json)
+                raise SelectionTransformError(
+                    "JSON解析错误", f"无效的JSON格式: {str(e)}"
+                )
+            return formatted_json
 
-        except Exception as e:
-            logger.error(f"格式化JSON时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化JSON时出错: {str(e)}")
+        self._transform_selection("格式化JSON", transform, with_progress=True)
 
     def compress_json(self):
         """
         压缩JSON字符串, 移除所有空白字符
         """
-        if not self._check_editable_selection("压缩JSON"):
-            return
 
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
-
-            # 尝试解析JSON
+        def transform(selected_text, progress):
+            # 逐个标记流式输出, 不添加任何缩进
             try:
-                json_data = json.loads(selected_text)
-                # 压缩JSON, 不添加任何缩进
-                compressed_json = json.dumps(
-                    json_data, separators=(",", ":"), ensure_ascii=False
-                )
+                compressed_json = JsonStreamFormatter(
+                    selected_text, indent=None, progress=progress
+                ).to_string()
             except json.JSONDecodeError as e:
-                messagebox.showerror("JSON解析错误", f"无效的JSON格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, compressed_json)
+                raise SelectionTransformError(
+                    "JSON解析错误", f"无效的JSON格式: {str(e)}"
+                )
+            return compressed_json
 
-        except Exception as e:
-            logger.error(f"压缩JSON时出错: {str(e)}")
-            messagebox.showerror("错误", f"压缩JSON时出错: {str(e)}")
+        self._transform_selection("压缩JSON", transform, with_progress=True)
 
     def format_xml(self):
         """
         格式化XML字符串, 使其更易读
         """
-        if not self._check_editable_selection("格式化XML"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
-            # 尝试解析XML
+        def transform(selected_text, progress):
+            # 分块送入增量解析器, 边解析边输出带缩进的标签
             try:
-                # 解析XML
-                dom = minidom.parseString(selected_text)
-
-                # 格式化XML，使用缩进
-                formatted_xml = dom.toprettyxml(indent="  ")
-
-                # 去除空行
-                formatted_xml = "\n".join(
-                    [line for line in formatted_xml.split("\n") if line.strip()]
-                )
-
+                formatted_xml = XmlStreamFormatter(
+                    selected_text, indent="  ", progress=progress
+                ).to_string()
+            except SelectionTransformCancelled:
+                raise
             except Exception as e:
-                messagebox.showerror("XML解析错误", f"无效的XML格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_xml)
+                raise SelectionTransformError("XML解析错误", f"无效的XML格式: {str(e)}")
+            return formatted_xml
 
-        except Exception as e:
-            logger.error(f"格式化XML时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化XML时出错: {str(e)}")
+        self._transform_selection("格式化XML", transform, with_progress=True)
 
     def format_csv(self, compress=False):
         """
@@ -1541,176 +1175,115 @@ class SelectionOperations:
         Args:
             compress (bool): True为压缩格式化，False为展开格式化
         """
-        if not self._check_editable_selection("格式化CSV"):
-            return
 
-        try:
-            # 获取选中文本
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
-
-            # 使用自定义CSV格式化器
+        def transform(selected_text, progress):
+            # 逐行解析并重新拼接字段
             try:
-                formatted_csv = self._custom_csv_formatter(selected_text, compress)
+                formatted_csv = CsvStreamFormatter(
+                    selected_text, compress=compress, progress=progress
+                ).to_string()
+            except SelectionTransformCancelled:
+                raise
             except Exception as e:
-                messagebox.showerror("CSV解析错误", f"无效的CSV格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_csv)
-
-        except Exception as e:
-            logger.error(f"格式化CSV时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化CSV时出错: {str(e)}")
-
-    def _custom_csv_formatter(self, csv_text, compress=False):
-        """
-        自定义CSV格式化器
+                raise SelectionTransformError("CSV解析错误", f"无效的CSV格式: {str(e)}")
+            return formatted_csv
 
-        Args:
-            csv_text (str): 要格式化的CSV文本
-            compress (bool): True为压缩格式化，False为展开格式化
+        self._transform_selection("格式化CSV", transform, with_progress=True)
 
-        Returns:
-            str: 格式化后的CSV文本
+    def export_formatted_selection(self, format_type, compress=False):
         """
-        if not csv_text:
-            return csv_text
+        把选中文本格式化后直接写入文件, 不修改编辑器中的文本
 
-        # 分割行
-        lines = csv_text.split("\n")
-        formatted_lines = []
+        适用于格式化结果过大、不适合放回编辑器的情况, 格式化结果逐块写入文件
 
-        for line in lines:
-            # 跳过空行
-            if not line.strip():
-                formatted_lines.append("")
-                continue
-
-            # 解析行中的字段
-            fields = self._parse_csv_line(line)
+        Args:
+            format_type (str): 格式类型, 可选 json, xml, csv
+            compress (bool): 是否输出压缩格式, 对json和csv有效
+        """
+        formats = {
+            "json": ("JSON", ".json", "JSON解析错误", "无效的JSON格式"),
+            "xml": ("XML", ".xml", "XML解析错误", "无效的XML格式"),
+            "csv": ("CSV", ".csv", "CSV解析错误", "无效的CSV格式"),
+        }
+        name, extension, error_title, error_prefix = formats[format_type]
+        operation_name = f"{'压缩' if compress else '格式化'}{name}到文件"
+
+        # 导出不修改文本, 只读模式下也可以使用
+        if not self.has_selection():
+            messagebox.showwarning("警告", f"请先选中要{operation_name}的文本")
+            return
 
-            # 格式化行
-            if compress:
-                # 压缩格式：移除所有不必要的空格
-                formatted_line = ",".join(fields)
-            else:
-                # 展开格式：每个逗号后添加2个空格
-                formatted_line = ",  ".join(fields)
+        if getattr(self, "_transform_task", None) is not None:
+            messagebox.showwarning("警告", "请等待当前的文本转换完成")
+            return
 
-            formatted_lines.append(formatted_line)
+        file_path = filedialog.asksaveasfilename(
+            title=operation_name,
+            defaultextension=extension,
+            filetypes=[(f"{name}文件", f"*{extension}"), ("所有文件", "*.*")],
+            initialdir=config_manager.get_file_dialog_initial_dir(),
+        )
+        if not file_path:
+            return
 
-        return "\n".join(formatted_lines)
+        selected_text = self.get_selected_text()
+        if format_type == "json":
+            formatter = JsonStreamFormatter(
+                selected_text, indent=None if compress else 2
+            )
+        elif format_type == "xml":
+            formatter = XmlStreamFormatter(selected_text)
+        else:
+            formatter = CsvStreamFormatter(selected_text, compress=compress)
+
+        task = SelectionExportTask(formatter, file_path)
+        self._transform_task = task
+        dialog = TransformProgressDialog(self, operation_name, on_cancel=task.cancel)
+        task.start()
+        self.after(
+            50,
+            self._check_selection_export,
+            task,
+            dialog,
+            (error_title, error_prefix),
+        )
+
+    def _check_selection_export(self, task, dialog, errors):
+        """
+        轮询导出任务, 完成后提示结果
 
-    def _parse_csv_line(self, line):
+        Args:
+            task (SelectionExportTask): 导出任务
+            dialog (TransformProgressDialog): 进度对话框
+            errors (tuple): (错误对话框标题, 错误内容前缀)
         """
-        解析CSV行，正确处理引号和转义字符，并自动补全逗号
+        if task.is_alive():
+            if not task.cancelled():
+                dialog.set_progress(task.progress)
+            self.after(50, self._check_selection_export, task, dialog, errors)
+            return
 
-        Args:
-            line (str): CSV行文本
+        self._transform_task = None
+        if task.cancelled():
+            return
+        dialog.close()
 
-        Returns:
-            list: 解析后的字段列表
-        """
-        fields = []
-        current_field = ""
-        in_quotes = False
-        i = 0
-        line_length = len(line)
-
-        while i < line_length:
-            char = line[i]
-
-            if char == '"':
-                # 处理引号
-                if in_quotes and i + 1 < line_length and line[i + 1] == '"':
-                    # 转义的引号（两个连续引号）
-                    current_field += '"'
-                    i += 2
-                    continue
-                else:
-                    # 开始或结束引号
-                    in_quotes = not in_quotes
-                    i += 1
-                    continue
-            elif char == "," and not in_quotes:
-                # 字段分隔符
-                fields.append(current_field)
-                current_field = ""
-                i += 1
-                continue
-            elif char == " " and not in_quotes:
-                # 处理引号外的空格
-                # 检查是否是字段间的空格（用于自动补逗号）
-                if (
-                    current_field
-                    and i + 1 < line_length
-                    and line[i + 1] != ","
-                    and line[i + 1] != " "
-                ):
-                    # 可能是字段间的空格，先保留，稍后处理
-                    current_field += char
-                    i += 1
-                    continue
-                elif (
-                    not current_field
-                    and i + 1 < line_length
-                    and line[i + 1] != ","
-                    and line[i + 1] != " "
-                ):
-                    # 可能是字段间的空格，先保留，稍后处理
-                    current_field += char
-                    i += 1
-                    continue
-                else:
-                    # 跳过其他空格
-                    i += 1
-                    continue
-            else:
-                # 普通字符
-                current_field += char
-                i += 1
-
-        # 添加最后一个字段
-        fields.append(current_field)
-
-        # 处理可能由空格分隔的字段（自动补逗号）
-        processed_fields = []
-        for field in fields:
-            if " " in field and not field.startswith('"') and not field.endswith('"'):
-                # 检查是否是由空格分隔的多个字段
-                sub_fields = field.split()
-                if len(sub_fields) > 1:
-                    # 如果是数字或简单文本，认为是多个字段
-                    is_multiple_fields = True
-                    for sub_field in sub_fields:
-                        # 如果包含非字母数字字符，可能不是简单字段
-                        if not sub_field.replace("_", "").replace("-", "").isalnum():
-                            is_multiple_fields = False
-                            break
-
-                    if is_multiple_fields:
-                        processed_fields.extend(sub_fields)
-                    else:
-                        processed_fields.append(field)
-                else:
-                    processed_fields.append(field)
+        if task.error is not None:
+            error_title, error_prefix = errors
+            logger.error(f"导出格式化结果时出错: {str(task.error)}")
+            if isinstance(task.error, (json.JSONDecodeError, ExpatError)):
+                messagebox.showerror(error_title, f"{error_prefix}: {str(task.error)}")
             else:
-                processed_fields.append(field)
+                messagebox.showerror("错误", f"导出格式化结果时出错: {str(task.error)}")
+            return
 
-        return processed_fields
+        self.nm.show_info(message=f"已导出到 {task.file_path}")
 
     def format_ini(self):
         """格式化INI文本（对齐键值对），保留注释，确保节之间有空行分隔。
         支持等号(=)和冒号(:)作为键值对分隔符，支持分号(;)和井号(#)作为注释符号"""
-        if not self._check_editable_selection("格式化INI"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 分割成行
             lines = selected_text.split("\n")
 
@@ -1818,28 +1391,21 @@ class SelectionOperations:
 
             # 重新组合文本
             formatted_ini = "\n".join(formatted_lines)
+            return formatted_ini
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_ini)
-
-        except Exception as e:
-            logger.error(f"格式化INI时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化INI时出错: {str(e)}")
+        self._transform_selection("格式化INI", transform)
 
     def format_python(self):
         """
         格式化Python代码
         """
-        if not self._check_editable_selection("格式化Python"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 尝试使用black格式化
             try:
+                # 格式化库较大, 首次使用时再导入
+                import black
+
                 # 创建模式对象，设置行长度
                 mode = black.FileMode(line_length=88)
 
@@ -1847,40 +1413,33 @@ class SelectionOperations:
                 formatted_code = black.format_str(selected_text, mode=mode)
 
             except ImportError:
-                messagebox.showerror(
+                raise SelectionTransformError(
                     "Black库缺失", "未安装black库，无法格式化Python代码"
                 )
-                return
             except SyntaxError as e:
-                messagebox.showerror("Python语法错误", f"无效的Python代码: {str(e)}")
-                return
+                raise SelectionTransformError(
+                    "Python语法错误", f"无效的Python代码: {str(e)}"
+                )
             except Exception as e:
-                messagebox.showerror(
+                raise SelectionTransformError(
                     "Python格式化错误", f"格式化Python代码时出错: {str(e)}"
                 )
-                return
+            return formatted_code
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_code)
-
-        except Exception as e:
-            logger.error(f"格式化Python代码时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化Python代码时出错: {str(e)}")
+        self._transform_selection(
+            "格式化Python", transform, error_name="格式化Python代码"
+        )
 
     def format_yaml(self):
         """
         格式化YAML字符串, 使其更易读，保留注释
         """
-        if not self._check_editable_selection("格式化YAML"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 尝试解析YAML
             try:
+                from ruamel.yaml import YAML
+
                 # 创建YAML对象，设置保留注释
                 yaml_obj = YAML()
                 yaml_obj.indent(mapping=2, sequence=4, offset=2)
@@ -1897,35 +1456,27 @@ class SelectionOperations:
                 formatted_yaml = string_stream.getvalue()
 
             except ImportError:
-                messagebox.showerror(
+                raise SelectionTransformError(
                     "YAML库缺失", "未安装ruamel.yaml库，无法格式化YAML"
                 )
-                return
             except Exception as e:
-                messagebox.showerror("YAML解析错误", f"无效的YAML格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_yaml)
+                raise SelectionTransformError(
+                    "YAML解析错误", f"无效的YAML格式: {str(e)}"
+                )
+            return formatted_yaml
 
-        except Exception as e:
-            logger.error(f"格式化YAML时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化YAML时出错: {str(e)}")
+        self._transform_selection("格式化YAML", transform)
 
     def format_sql_upper(self):
         """
         将SQL关键字转换为大写
         """
-        if not self._check_editable_selection("SQL关键字大写"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 使用sqlparse解析SQL
             try:
+                import sqlparse
+
                 parsed = sqlparse.parse(selected_text)[0]
                 # 将关键字转换为大写
                 formatted_sql = sqlparse.format(
@@ -1937,30 +1488,21 @@ class SelectionOperations:
                     indent_width=2,
                 )
             except Exception as e:
-                messagebox.showerror("SQL解析错误", f"无效的SQL格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_sql)
+                raise SelectionTransformError("SQL解析错误", f"无效的SQL格式: {str(e)}")
+            return formatted_sql
 
-        except Exception as e:
-            logger.error(f"SQL关键字大写时出错: {str(e)}")
-            messagebox.showerror("错误", f"SQL关键字大写时出错: {str(e)}")
+        self._transform_selection("SQL关键字大写", transform)
 
     def format_sql_lower(self):
         """
         将SQL关键字转换为小写
         """
-        if not self._check_editable_selection("SQL关键字小写"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 使用sqlparse解析SQL
             try:
+                import sqlparse
+
                 parsed = sqlparse.parse(selected_text)[0]
                 # 将关键字转换为小写
                 formatted_sql = sqlparse.format(
@@ -1972,30 +1514,21 @@ class SelectionOperations:
                     indent_width=2,
                 )
             except Exception as e:
-                messagebox.showerror("SQL解析错误", f"无效的SQL格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_sql)
+                raise SelectionTransformError("SQL解析错误", f"无效的SQL格式: {str(e)}")
+            return formatted_sql
 
-        except Exception as e:
-            logger.error(f"SQL关键字小写时出错: {str(e)}")
-            messagebox.showerror("错误", f"SQL关键字小写时出错: {str(e)}")
+        self._transform_selection("SQL关键字小写", transform)
 
     def format_sql(self):
         """
         格式化SQL语句，使其更易读
         """
-        if not self._check_editable_selection("格式化SQL"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 使用sqlparse解析SQL
             try:
+                import sqlparse
+
                 parsed = sqlparse.parse(selected_text)[0]
                 # 格式化SQL，关键字大写，添加缩进
                 formatted_sql = sqlparse.format(
@@ -2007,30 +1540,21 @@ class SelectionOperations:
                     indent_width=2,
                 )
             except Exception as e:
-                messagebox.showerror("SQL解析错误", f"无效的SQL格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_sql)
+                raise SelectionTransformError("SQL解析错误", f"无效的SQL格式: {str(e)}")
+            return formatted_sql
 
-        except Exception as e:
-            logger.error(f"格式化SQL时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化SQL时出错: {str(e)}")
+        self._transform_selection("格式化SQL", transform)
 
     def compress_sql(self):
         """
         压缩SQL语句，移除不必要的空白字符
         """
-        if not self._check_editable_selection("压缩SQL"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 使用sqlparse解析SQL
             try:
+                import sqlparse
+
                 parsed = sqlparse.parse(selected_text)[0]
                 # 压缩SQL，移除多余空格和换行
                 formatted_sql = sqlparse.format(
@@ -2042,29 +1566,20 @@ class SelectionOperations:
                     strip_whitespace=True,
                 )
             except Exception as e:
-                messagebox.showerror("SQL解析错误", f"无效的SQL格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_sql)
+                raise SelectionTransformError("SQL解析错误", f"无效的SQL格式: {str(e)}")
+            return formatted_sql
 
-        except Exception as e:
-            logger.error(f"压缩SQL时出错: {str(e)}")
-            messagebox.showerror("错误", f"压缩SQL时出错: {str(e)}")
+        self._transform_selection("压缩SQL", transform)
 
     def format_html(self):
         """
         格式化HTML代码，使其更易读
         """
-        if not self._check_editable_selection("格式化HTML"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             try:
+                import bs4
+
                 # 使用BeautifulSoup解析HTML
                 soup = bs4.BeautifulSoup(selected_text, "html.parser")
 
@@ -2072,29 +1587,22 @@ class SelectionOperations:
                 formatted_html = soup.prettify()
 
             except Exception as e:
-                messagebox.showerror("HTML解析错误", f"无效的HTML格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_html)
+                raise SelectionTransformError(
+                    "HTML解析错误", f"无效的HTML格式: {str(e)}"
+                )
+            return formatted_html
 
-        except Exception as e:
-            logger.error(f"格式化HTML时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化HTML时出错: {str(e)}")
+        self._transform_selection("格式化HTML", transform)
 
     def compress_html(self):
         """
         压缩HTML代码，移除不必要的空白字符
         """
-        if not self._check_editable_selection("压缩HTML"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             try:
+                import bs4
+
                 # 使用BeautifulSoup解析HTML
                 soup = bs4.BeautifulSoup(selected_text, "html.parser")
 
@@ -2106,29 +1614,22 @@ class SelectionOperations:
                 compressed_html = re.sub(r"\s+", " ", compressed_html)
 
             except Exception as e:
-                messagebox.showerror("HTML解析错误", f"无效的HTML格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, compressed_html)
+                raise SelectionTransformError(
+                    "HTML解析错误", f"无效的HTML格式: {str(e)}"
+                )
+            return compressed_html
 
-        except Exception as e:
-            logger.error(f"压缩HTML时出错: {str(e)}")
-            messagebox.showerror("错误", f"压缩HTML时出错: {str(e)}")
+        self._transform_selection("压缩HTML", transform)
 
     def format_css(self):
         """
         格式化CSS代码，使其更易读
         """
-        if not self._check_editable_selection("格式化CSS"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             try:
+                import cssutils
+
                 # 使用cssutils解析CSS
                 parser = cssutils.CSSParser()
                 sheet = parser.parseString(selected_text)
@@ -2141,29 +1642,20 @@ class SelectionOperations:
                 )
 
             except Exception as e:
-                messagebox.showerror("CSS解析错误", f"无效的CSS格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_css)
+                raise SelectionTransformError("CSS解析错误", f"无效的CSS格式: {str(e)}")
+            return formatted_css
 
-        except Exception as e:
-            logger.error(f"格式化CSS时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化CSS时出错: {str(e)}")
+        self._transform_selection("格式化CSS", transform)
 
     def compress_css(self):
         """
         压缩CSS代码，移除不必要的空白字符和注释
         """
-        if not self._check_editable_selection("压缩CSS"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             try:
+                import cssutils
+
                 # 使用cssutils解析CSS
                 parser = cssutils.CSSParser()
                 sheet = parser.parseString(selected_text)
@@ -2186,29 +1678,20 @@ class SelectionOperations:
                 compressed_css = compressed_css.strip()
 
             except Exception as e:
-                messagebox.showerror("CSS解析错误", f"无效的CSS格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, compressed_css)
+                raise SelectionTransformError("CSS解析错误", f"无效的CSS格式: {str(e)}")
+            return compressed_css
 
-        except Exception as e:
-            logger.error(f"压缩CSS时出错: {str(e)}")
-            messagebox.showerror("错误", f"压缩CSS时出错: {str(e)}")
+        self._transform_selection("压缩CSS", transform)
 
     def format_javascript(self):
         """
         格式化JavaScript代码，使其更易读
         """
-        if not self._check_editable_selection("格式化JavaScript"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             try:
+                import jsbeautifier
+
                 # 使用jsbeautifier格式化JavaScript
                 options = jsbeautifier.default_options()
                 options.indent_size = 2  # 缩进2个空格
@@ -2218,31 +1701,22 @@ class SelectionOperations:
                 formatted_js = jsbeautifier.beautify(selected_text, options)
 
             except Exception as e:
-                messagebox.showerror(
+                raise SelectionTransformError(
                     "JavaScript解析错误", f"无效的JavaScript格式: {str(e)}"
                 )
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_js)
+            return formatted_js
 
-        except Exception as e:
-            logger.error(f"格式化JavaScript时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化JavaScript时出错: {str(e)}")
+        self._transform_selection("格式化JavaScript", transform)
 
     def compress_javascript(self):
         """
         压缩JavaScript代码，移除不必要的空白字符和注释
         """
-        if not self._check_editable_selection("压缩JavaScript"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             try:
+                import jsbeautifier
+
                 # 使用jsbeautifier压缩JavaScript
                 options = jsbeautifier.default_options()
                 options.indent_size = 0
@@ -2270,31 +1744,22 @@ class SelectionOperations:
                 compressed_js = compressed_js.strip()
 
             except Exception as e:
-                messagebox.showerror(
+                raise SelectionTransformError(
                     "JavaScript解析错误", f"无效的JavaScript格式: {str(e)}"
                 )
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, compressed_js)
+            return compressed_js
 
-        except Exception as e:
-            logger.error(f"压缩JavaScript时出错: {str(e)}")
-            messagebox.showerror("错误", f"压缩JavaScript时出错: {str(e)}")
+        self._transform_selection("压缩JavaScript", transform)
 
     def format_toml(self):
         """
         格式化TOML文件，使其结构更清晰、易读
         """
-        if not self._check_editable_selection("格式化TOML"):
-            return
-
-        try:
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             try:
+                import toml
+
                 # 解析TOML内容
                 data = toml.loads(selected_text)
 
@@ -2315,16 +1780,12 @@ class SelectionOperations:
                 )
 
             except Exception as e:
-                messagebox.showerror("TOML解析错误", f"无效的TOML格式: {str(e)}")
-                return
-
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, formatted_toml)
+                raise SelectionTransformError(
+                    "TOML解析错误", f"无效的TOML格式: {str(e)}"
+                )
+            return formatted_toml
 
-        except Exception as e:
-            logger.error(f"格式化TOML时出错: {str(e)}")
-            messagebox.showerror("错误", f"格式化TOML时出错: {str(e)}")
+        self._transform_selection("格式化TOML", transform)
 
     def url_encode(self):
         """
@@ -2332,27 +1793,15 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本进行URL编码
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("URL编码"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 对选中文本进行URL编码
             encoded_text = quote(
                 selected_text, safe=""
             )  # safe=''表示对所有特殊字符进行编码
+            return encoded_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, encoded_text)
-
-        except Exception as e:
-            logger.error(f"URL编码时出错: {str(e)}")
-            messagebox.showerror("错误", f"URL编码时出错: {str(e)}")
+        self._transform_selection("URL编码", transform)
 
     def url_decode(self):
         """
@@ -2360,25 +1809,13 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本进行URL解码
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("URL解码"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 对选中文本进行URL解码
             decoded_text = unquote(selected_text)
+            return decoded_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, decoded_text)
-
-        except Exception as e:
-            logger.error(f"URL解码时出错: {str(e)}")
-            messagebox.showerror("错误", f"URL解码时出错: {str(e)}")
+        self._transform_selection("URL解码", transform)
 
     def html_entity_encode(self):
         """
@@ -2386,25 +1823,13 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本进行HTML实体编码
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("HTML实体编码"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 对选中文本进行HTML实体编码
             encoded_text = html.escape(selected_text)
+            return encoded_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, encoded_text)
-
-        except Exception as e:
-            logger.error(f"HTML实体编码时出错: {str(e)}")
-            messagebox.showerror("错误", f"HTML实体编码时出错: {str(e)}")
+        self._transform_selection("HTML实体编码", transform)
 
     def html_entity_decode(self):
         """
@@ -2412,25 +1837,13 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本进行HTML实体解码
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("HTML实体解码"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 对选中文本进行HTML实体解码
             decoded_text = html.unescape(selected_text)
+            return decoded_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, decoded_text)
-
-        except Exception as e:
-            logger.error(f"HTML实体解码时出错: {str(e)}")
-            messagebox.showerror("错误", f"HTML实体解码时出错: {str(e)}")
+        self._transform_selection("HTML实体解码", transform)
 
     def unicode_escape_encode(self):
         """
@@ -2438,25 +1851,13 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本进行Unicode转义序列编码
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("Unicode转义序列编码"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 对选中文本进行Unicode转义序列编码
             encoded_text = selected_text.encode("unicode-escape").decode("utf-8")
+            return encoded_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, encoded_text)
-
-        except Exception as e:
-            logger.error(f"Unicode转义序列编码时出错: {str(e)}")
-            messagebox.showerror("错误", f"Unicode转义序列编码时出错: {str(e)}")
+        self._transform_selection("Unicode转义序列编码", transform)
 
     def unicode_escape_decode(self):
         """
@@ -2464,25 +1865,13 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本进行Unicode转义序列解码
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("Unicode转义序列解码"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 对选中文本进行Unicode转义序列解码
             decoded_text = selected_text.encode("utf-8").decode("unicode-escape")
+            return decoded_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, decoded_text)
-
-        except Exception as e:
-            logger.error(f"Unicode转义序列解码时出错: {str(e)}")
-            messagebox.showerror("错误", f"Unicode转义序列解码时出错: {str(e)}")
+        self._transform_selection("Unicode转义序列解码", transform)
 
     def jwt_decode(self):
         """
@@ -2490,25 +1879,17 @@ class SelectionOperations:
 
         检查是否有选中文本和是否为只读模式, 然后对选中文本进行JWT解码
         """
-        # 检查是否可以进行编辑操作
-        if not self._check_editable_selection("JWT解码"):
-            return
-
-        try:
-            # 获取选中文本和范围
-            selected_text = self.get_selected_text()
-            start_index, end_index = self.get_selection_range()
 
+        def transform(selected_text):
             # 尝试解码JWT
             try:
                 # 分割JWT令牌
                 parts = selected_text.split(".")
                 if len(parts) != 3:
-                    messagebox.showerror(
+                    raise SelectionTransformError(
                         "JWT格式错误",
                         "无效的JWT格式，JWT应包含三个部分：头部.载荷.签名",
                     )
-                    return
 
                 # 解码头部和载荷（不验证签名）
 
@@ -2539,14 +1920,10 @@ class SelectionOperations:
 {parts[2]}
 """
 
+            except SelectionTransformError:
+                raise
             except Exception as e:
-                messagebox.showerror("JWT解码错误", f"解码JWT时出错: {str(e)}")
-                return
+                raise SelectionTransformError("JWT解码错误", f"解码JWT时出错: {str(e)}")
+            return decoded_text
 
-            # 替换选中文本
-            self.text_area.delete(start_index, end_index)
-            self.text_area.insert(start_index, decoded_text)
-
-        except Exception as e:
-            logger.error(f"JWT解码时出错: {str(e)}")
-            messagebox.showerror("错误", f"JWT解码时出错: {str(e)}")
+        self._transform_selection("JWT解码", transform)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+选中文本转换模块
+在工作线程中执行纯文本转换函数, 并按行比较转换前后的文本,
+只生成发生变化的片段, 由界面线程在同一个撤销组中应用
+"""
+
+import difflib
+import os
+import threading
+
+# 超过该字符数的选中文本在工作线程中转换, 并显示进度对话框
+ASYNC_THRESHOLD = 1 << 20
+
+# 去掉首尾相同行后, 中间部分超过该行数时不再逐行比较, 直接整体替换
+MAX_DIFF_LINES = 20000
+
+
+class SelectionTransformError(Exception):
+    """
+    文本转换错误类
+
+    转换函数遇到无效输入时抛出, 界面线程会以指定的标题和内容显示错误
+    """
+
+    def __init__(self, title, message):
+        """
+        初始化文本转换错误
+
+        Args:
+            title (str): 错误对话框标题
+            message (str): 错误对话框内容
+        """
+        super().__init__(message)
+        self.title = title
+        self.message = message
+
+
+def _split_lines(text):
+    """
+    按换行符切分文本, 每行保留行尾的换行符
+
+    与str.splitlines不同, 只把\\n视为换行, 与Tk文本组件的行一致;
+    各行拼接后与原文本完全相同, 便于由行号换算出字符偏移
+    """
+    lines = text.split("\n")
+    result = [line + "\n" for line in lines[:-1]]
+    if lines[-1]:
+        result.append(lines[-1])
+    return result
+
+
+# 查找首尾相同部分时每次比较的字符数, 只复制这么大的切片
+_COMPARE_CHUNK = 1 << 16
+
+
+def _count_lines(text, start=0, end=None):
+    """
+    统计文本中 [start, end) 范围内的行数, 不切分文本
+
+    与_split_lines一致, 末尾没有换行符的部分也算一行
+    """
+    if end is None:
+        end = len(text)
+    if start >= end:
+        return 0
+    count = text.count("\n", start, end)
+    if text[end - 1] != "\n":
+        count += 1
+    return count
+
+
+def _at_line_start(text, index):
+    """检查索引是否位于行首"""
+    return index == 0 or text[index - 1] == "\n"
+
+
+def _common_prefix_length(a, b, limit):
+    """按块比较两个字符串, 返回开头相同部分的字符数, 不超过limit"""
+    i = 0
+    while i < limit:
+        size = min(_COMPARE_CHUNK, limit - i)
+        chunk_a = a[i : i + size]
+        chunk_b = b[i : i + size]
+        if chunk_a != chunk_b:
+            return i + len(os.path.commonprefix([chunk_a, chunk_b]))
+        i += size
+    return limit
+
+
+def _common_suffix_length(a, b, limit):
+    """按块比较两个字符串, 返回结尾相同部分的字符数, 不超过limit"""
+    i = 0
+    while i < limit:
+        size = min(_COMPARE_CHUNK, limit - i)
+        chunk_a = a[len(a) - i - size : len(a) - i]
+        chunk_b = b[len(b) - i - size : len(b) - i]
+        if chunk_a != chunk_b:
+            return i + len(os.path.commonprefix([chunk_a[::-1], chunk_b[::-1]]))
+        i += size
+    return limit
+
+
+def diff_line_hunks(old_text, new_text, should_stop=None):
+    """
+    按行比较转换前后的文本, 生成需要替换的片段
+
+    首尾相同的部分直接在字符串上按块比较, 只切分中间不同的部分,
+    中间部分过大时不切分, 整体替换, 避免为整段文本建立行列表
+
+    Args:
+        old_text (str): 转换前的文本
+        new_text (str): 转换后的文本
+        should_stop (callable, optional): 返回True时中止比较
+
+    Returns:
+        list: (起始行, 结束行, 替换文本) 元组列表, 行号为old_text中从0开始的行序号,
+            替换范围为 [起始行, 结束行) 对应的所有字符, 行号为None表示文本末尾;
+            被中止时返回None
+    """
+    if old_text == new_text:
+        return []
+
+    # 开头相同的部分, 退回到行首
+    limit = min(len(old_text), len(new_text))
+    prefix = _common_prefix_length(old_text, new_text, limit)
+    prefix = old_text.rfind("\n", 0, prefix) + 1
+
+    # 结尾相同的部分, 不与开头重叠, 前进到两边都是行首的位置
+    suffix = _common_suffix_length(old_text, new_text, limit - prefix)
+    old_end = len(old_text) - suffix
+    new_end = len(new_text) - suffix
+    if not (_at_line_start(old_text, old_end) and _at_line_start(new_text, new_end)):
+        newline = old_text.find("\n", old_end)
+        old_end = len(old_text) if newline == -1 else newline + 1
+        new_end = len(new_text) - (len(old_text) - old_end)
+
+    if should_stop and should_stop():
+        return None
+
+    prefix_lines = old_text.count("\n", 0, prefix)
+    total_lines = prefix_lines + _count_lines(old_text, prefix)
+
+    def to_line(index):
+        """把中间部分的行序号换算为old_text中的行序号, 末尾换算为None"""
+        line = prefix_lines + index
+        return None if line == total_lines else line
+
+    old_count = _count_lines(old_text, prefix, old_end)
+    new_count = _count_lines(new_text, prefix, new_end)
+
+    # 中间部分过大时逐行比较的开销过高, 直接整体替换
+    if max(old_count, new_count) > MAX_DIFF_LINES:
+        return [(to_line(0), to_line(old_count), new_text[prefix:new_end])]
+
+    old_middle = _split_lines(old_text[prefix:old_end])
+    new_middle = _split_lines(new_text[prefix:new_end])
+    matcher = difflib.SequenceMatcher(None, old_middle, new_middle, autojunk=False)
+
+    hunks = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        hunks.append((to_line(i1), to_line(i2), "".join(new_middle[j1:j2])))
+
+    return hunks
+
+
+class SelectionTransformCancelled(Exception):
+    """文本转换已取消, 由进度回调抛出以中止转换函数"""
+
+
+class SelectionTransformTask(threading.Thread):
+    """
+    选中文本转换任务类
+
+    可以作为线程启动, 也可以直接调用run在当前线程中同步执行;
+    转换函数只能处理字符串, 不能访问任何Tk组件
+    """
+
+    def __init__(self, text, transform, with_progress=False):
+        """
+        初始化转换任务
+
+        Args:
+            text (str): 选中的文本
+            transform (callable): 纯文本转换函数, 参数为原文本, 返回转换后的文本
+            with_progress (bool): 是否把report_progress作为第二个参数传给转换函数
+        """
+        super().__init__(daemon=True)
+        self.text = text
+        self.transform = transform
+        self.with_progress = with_progress
+
+        self.stage = "正在转换文本..."  # 当前阶段, 用于显示进度
+        self.progress = None  # 当前阶段的完成比例, None表示无法估计
+        self.result = None  # 转换后的文本
+        self.hunks = None  # 需要替换的片段
+        self.error = None  # 转换过程中的异常
+        self._stop_event = threading.Event()
+
+    def cancel(self):
+        """取消任务, 已在执行的转换函数无法中断, 但其结果会被丢弃"""
+        self._stop_event.set()
+
+    def cancelled(self):
+        """检查任务是否已取消"""
+        return self._stop_event.is_set()
+
+    def report_progress(self, done, total):
+        """
+        报告转换进度, 由转换函数在工作线程中调用
+
+        Args:
+            done (int): 已处理的字符数
+            total (int): 总字符数
+
+        Raises:
+            SelectionTransformCancelled: 任务已取消, 转换函数应当中止
+        """
+        if self.cancelled():
+            raise SelectionTransformCancelled()
+        self.progress = done / total if total else 1.0
+
+    def run(self):
+        """执行转换并比较差异"""
+        try:
+            if self.with_progress:
+                result = self.transform(self.text, self.report_progress)
+            else:
+                result = self.transform(self.text)
+            if self.cancelled():
+                return
+
+            self.stage = "正在比较差异..."
+            self.progress = None
+            hunks = diff_line_hunks(self.text, result, self.cancelled)
+            if hunks is None or self.cancelled():
+                return
+
+            self.result = result
+            self.hunks = hunks
+        except Exception as e:
+            self.error = e
+
+
+class SelectionExportTask(threading.Thread):
+    """
+    选中文本导出任务类
+
+    在工作线程中把流式格式化器的结果逐块写入文件, 不经过文本组件
+    """
+
+    def __init__(self, formatter, file_path):
+        """
+        初始化导出任务
+
+        Args:
+            formatter: 流式格式化器, 需要提供to_file方法和progress属性
+            file_path (str): 目标文件路径
+        """
+        super().__init__(daemon=True)
+        self.formatter = formatter
+        self.file_path = file_path
+        formatter.progress = self.report_progress
+
+        self.stage = "正在写入文件..."  # 当前阶段, 用于显示进度
+        self.progress = 0.0  # 完成比例
+        self.error = None  # 导出过程中的异常
+        self._stop_event = threading.Event()
+
+    def cancel(self):
+        """取消任务, 未完成的文件会被删除"""
+        self._stop_event.set()
+
+    def cancelled(self):
+        """检查任务是否已取消"""
+        return self._stop_event.is_set()
+
+    def report_progress(self, done, total):
+        """记录写入进度, 任务已取消时中止写入"""
+        if self.cancelled():
+            raise SelectionTransformCancelled()
+        self.progress = done / total if total else 1.0
+
+    def run(self):
+        """逐块写入文件"""
+        try:
+            self.formatter.to_file(self.file_path)
+        except SelectionTransformCancelled:
+            pass
+        except Exception as e:
+            self.error = e
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+单实例模块
+第一个启动的编辑器在本地监听连接 (Windows使用命名管道, 其他系统使用Unix套接字),
+之后的启动把文件路径转发给已运行的编辑器后立即退出, 不再重复创建窗口和加载配置;
+几乎同时启动的多个编辑器中只有一个能开始监听, 其余的照常运行但不接收转发
+"""
+
+import getpass
+import hashlib
+import os
+import queue
+import secrets
+import sys
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from loguru import logger
+from config.config_manager import APP_CONFIG_DIR
+
+if sys.platform != "win32":
+    import fcntl
+
+# 主线程检查转发请求的间隔（毫秒）
+POLL_INTERVAL = 200
+
+# 等待已运行实例确认的超时时间（秒）
+FORWARD_TIMEOUT = 2
+
+# 连接密钥文件名, 保存在配置目录下, 只有同一用户的进程可以读取
+AUTHKEY_FILE_NAME = "instance.key"
+
+# Unix套接字文件名, 保存在配置目录下
+SOCKET_FILE_NAME = "instance.sock"
+
+# 监听期间持有排他锁的文件名, 进程退出时系统自动释放锁
+LOCK_FILE_NAME = "instance.lock"
+
+
+def _instance_address():
+    """
+    获取单实例监听地址
+
+    Returns:
+        tuple: (地址, 地址族), Windows下为按用户区分的命名管道, 其他系统为Unix套接字
+    """
+    if sys.platform == "win32":
+        user = hashlib.sha1(getpass.getuser().encode("utf-8")).hexdigest()[:12]
+        return rf"\\.\pipe\QuickEditPlus-{user}", "AF_PIPE"
+    return os.path.join(APP_CONFIG_DIR, SOCKET_FILE_NAME), "AF_UNIX"
+
+
+def _authkey_path():
+    """获取连接密钥文件路径"""
+    return os.path.join(APP_CONFIG_DIR, AUTHKEY_FILE_NAME)
+
+
+def forward_files(file_paths):
+    """
+    把文件路径转发给已运行的编辑器
+
+    Args:
+        file_paths (list): 要打开的文件绝对路径列表, 可以为空, 为空时只激活窗口
+
+    Returns:
+        bool: 已运行的编辑器确认收到返回True, 没有运行中的编辑器或转发失败返回False
+    """
+    try:
+        with open(_authkey_path(), "rb") as f:
+            authkey = f.read()
+    except OSError:
+        # 没有密钥文件说明没有运行中的编辑器
+        return False
+
+    address, family = _instance_address()
+    try:
+        with Client(address, family=family, authkey=authkey) as conn:
+            conn.send({"files": list(file_paths)})
+            if conn.poll(FORWARD_TIMEOUT):
+                return conn.recv() == "ok"
+            logger.warning("已运行的编辑器没有响应")
+    except (OSError, EOFError, AuthenticationError) as e:
+        logger.debug(f"无法连接已运行的编辑器: {e}")
+    return False
+
+
+class SingleInstanceServer:
+    """
+    单实例服务类
+
+    后台线程接受其他启动转发的文件路径并放入队列, 主线程定时从队列取出后
+    调用回调打开文件, 所有界面操作都在主线程执行
+    """
+
+    def __init__(self, root, on_files):
+        """
+        初始化单实例服务
+
+        Args:
+            root: Tk主窗口, 用于在主线程定时检查转发请求
+            on_files (callable): 收到转发请求时在主线程调用, 参数为文件路径列表
+        """
+        self.root = root
+        self.on_files = on_files
+        self._listener = None
+        self._authkey = None
+        self._lock_fd = None
+        self._thread = None
+        self._requests = queue.Queue()
+        self._poll_job = None
+        self._closed = False
+
+    @property
+    def is_running(self):
+        """是否正在监听"""
+        return self._listener is not None and not self._closed
+
+    def start(self):
+        """
+        开始监听其他启动的转发请求
+
+        Returns:
+            bool: 是否成功开始监听, 失败时编辑器照常运行, 只是不能接收转发
+        """
+        address, family = _instance_address()
+        authkey = secrets.token_bytes(32)
+        try:
+            os.makedirs(APP_CONFIG_DIR, exist_ok=True)
+            if family == "AF_UNIX":
+                # 持有锁的实例正在监听, 不能删除它的套接字文件和密钥;
+                # Windows下命名管道的第一个实例是独占的, 不需要锁
+                if not self._acquire_lock():
+                    logger.info("已有编辑器在监听, 本实例不接收转发")
+                    return False
+                if os.path.exists(address):
+                    # 没有实例持有锁, 残留的套接字文件来自异常退出的实例
+                    os.remove(address)
+            self._listener = Listener(address, family=family, authkey=authkey)
+            self._write_authkey(authkey)
+            self._authkey = authkey
+        except OSError as e:
+            logger.warning(f"单实例服务启动失败: {e}")
+            if self._listener is not None:
+                self._listener.close()
+                self._listener = None
+            self._release_lock()
+            return False
+
+        self._thread = threading.Thread(
+            target=self._serve, name="SingleInstanceServer", daemon=True
+        )
+        self._thread.start()
+        self._poll_job = self.root.after(POLL_INTERVAL, self._poll)
+        logger.info(f"单实例服务已启动: {address}")
+        return True
+
+    def close(self):
+        """停止监听并删除密钥文件"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._poll_job is not None:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except Exception:
+                pass
+            self._poll_job = None
+
+        if self._listener is not None:
+            # 先删除密钥, 之后的启动不会再尝试连接;
+            # 密钥已被之后启动的实例替换时保留
+            try:
+                with open(_authkey_path(), "rb") as f:
+                    own_key = f.read() == self._authkey
+                if own_key:
+                    os.remove(_authkey_path())
+            except OSError:
+                pass
+            try:
+                self._listener.close()
+            except OSError:
+                pass
+            self._listener = None
+        self._release_lock()
+
+    def _acquire_lock(self):
+        """
+        获取监听锁
+
+        Returns:
+            bool: 是否获得锁, 其他实例持有锁时返回False
+        """
+        fd = os.open(
+            os.path.join(APP_CONFIG_DIR, LOCK_FILE_NAME), os.O_RDWR | os.O_CREAT, 0o600
+        )
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        except OSError:
+            os.close(fd)
+            raise
+        self._lock_fd = fd
+        return True
+
+    def _release_lock(self):
+        """释放监听锁, 锁文件保留供之后的启动使用"""
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _write_authkey(self, authkey):
+        """写入连接密钥, 文件权限只允许当前用户读写"""
+        path = _authkey_path()
+        temp_path = f"{path}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(authkey)
+        os.replace(temp_path, path)
+
+    def _serve(self):
+        """后台线程: 接受连接并把转发的文件路径放入队列"""
+        listener = self._listener
+        while not self._closed:
+            try:
+                conn = listener.accept()
+            except AuthenticationError as e:
+                logger.warning(f"拒绝未通过验证的连接: {e}")
+                continue
+            except (OSError, EOFError):
+                if self._closed:
+                    return
+                continue
+
+            with conn:
+                try:
+                    message = conn.recv()
+                    files = message.get("files") if isinstance(message, dict) else None
+                    if not isinstance(files, list):
+                        conn.send("invalid")
+                        continue
+                    self._requests.put([str(path) for path in files])
+                    conn.send("ok")
+                except (OSError, EOFError) as e:
+                    logger.debug(f"读取转发请求失败: {e}")
+                except Exception as e:
+                    logger.warning(f"无效的转发请求: {e}")
+
+    def _poll(self):
+        """主线程: 处理队列中的转发请求"""
+        self._poll_job = None
+        while True:
+            try:
+                files = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self.on_files(files)
+            except Exception as e:
+                logger.error(f"打开转发的文件失败: {e}")
+
+        if not self._closed:
+            self._poll_job = self.root.after(POLL_INTERVAL, self._poll)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时分析模块
+启用启动跟踪后记录各启动阶段的耗时、首次绘制时间以及延迟初始化的子系统,
+并把结果写入配置目录下的报告文件
+"""
+
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from loguru import logger
+
+# 启用启动跟踪的环境变量, 值为1时启用, 也可以使用命令行参数--trace-startup
+TRACE_ENV_VAR = "QUICKEDIT_TRACE_STARTUP"
+
+# 首次绘制的目标耗时（毫秒）, 报告中标明是否达标
+FIRST_PAINT_TARGET_MS = 800
+
+# 启动报告文件名, 保存在配置目录下
+REPORT_FILE_NAME = "startup_trace.txt"
+
+
+class StartupProfiler:
+    """
+    启动耗时分析器类
+
+    未启用时phase和lazy只是空的上下文管理器, 几乎没有开销;
+    计时起点为本模块被导入的时刻, 应尽早导入
+    """
+
+    def __init__(self):
+        """初始化启动耗时分析器"""
+        self.enabled = os.environ.get(TRACE_ENV_VAR, "0") == "1"
+        self.origin = time.perf_counter()  # 计时起点
+        self.phases = []  # (嵌套深度, 阶段名称, 开始时间ms, 耗时ms), 按开始顺序排列
+        self.lazy_inits = []  # (子系统名称, 开始时间ms, 耗时ms)
+        self.first_paint_ms = None  # 首次绘制完成的时间
+        self._depth = 0  # 当前阶段的嵌套深度
+
+    def enable(self):
+        """启用启动跟踪"""
+        self.enabled = True
+
+    def _elapsed_ms(self, moment=None):
+        """计算从计时起点到指定时刻的毫秒数"""
+        if moment is None:
+            moment = time.perf_counter()
+        return (moment - self.origin) * 1000
+
+    @contextmanager
+    def phase(self, name):
+        """
+        记录一个启动阶段的耗时, 可以嵌套使用
+
+        Args:
+            name (str): 阶段名称
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        depth = self._depth
+        # 先占位, 保证外层阶段排在内层阶段之前
+        index = len(self.phases)
+        self.phases.append(None)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            duration = (time.perf_counter() - start) * 1000
+            self.phases[index] = (depth, name, self._elapsed_ms(start), duration)
+
+    @contextmanager
+    def lazy(self, name):
+        """
+        记录一个子系统在首次使用时的初始化耗时
+
+        首次绘制之后发生的延迟初始化会追加到已写入的报告中
+
+        Args:
+            name (str): 子系统名称
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.lazy_inits.append((name, self._elapsed_ms(start), duration))
+            logger.debug(f"延迟初始化 {name} 耗时 {duration:.1f} ms")
+            if self.first_paint_ms is not None:
+                self.write_report()
+
+    def mark_first_paint(self, root):
+        """
+        在进入主循环之前调用, 窗口完成首次绘制后记录时间并写入报告
+
+        Args:
+            root: Tk主窗口
+        """
+        if not self.enabled:
+            return
+
+        def on_idle():
+            # 空闲回调在窗口的重绘回调之后执行, 此时首帧已经绘制完成
+            self.first_paint_ms = self._elapsed_ms()
+            self.write_report()
+
+        # 先等主循环开始处理事件, 再排在已有的重绘回调之后
+        root.after(0, lambda: root.after_idle(on_idle))
+
+    def format_report(self):
+        """
+        生成启动报告文本
+
+        Returns:
+            str: 报告文本
+        """
+        lines = [
+            "QuickEdit++ 启动跟踪报告",
+            f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Python: {sys.version.split()[0]} ({platform.platform()})",
+            "",
+            f"{'阶段':<40}{'开始(ms)':>12}{'耗时(ms)':>12}",
+        ]
+        for record in self.phases:
+            if record is None:
+                continue
+            depth, name, start, duration = record
+            label = "  " * depth + name
+            lines.append(f"{label:<40}{start:>12.1f}{duration:>12.1f}")
+
+        lines.append("")
+        if self.first_paint_ms is not None:
+            passed = self.first_paint_ms <= FIRST_PAINT_TARGET_MS
+            lines.append(
+                f"首次绘制: {self.first_paint_ms:.1f} ms "
+                f"(目标 {FIRST_PAINT_TARGET_MS} ms, {'达标' if passed else '未达标'})"
+            )
+        else:
+            lines.append("首次绘制: 未完成")
+
+        if self.lazy_inits:
+            lines.append("")
+            lines.append("延迟初始化:")
+            for name, start, duration in self.lazy_inits:
+                lines.append(f"  {name:<38}{start:>12.1f}{duration:>12.1f}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_report(self):
+        """把启动报告写入配置目录"""
+        # 延迟导入, 避免计时起点之前就加载配置
+        from config.config_manager import APP_CONFIG_DIR
+
+        report_path = os.path.join(APP_CONFIG_DIR, REPORT_FILE_NAME)
+        try:
+            os.makedirs(APP_CONFIG_DIR, exist_ok=True)
+            with open(report_path, "w", encoding="utf-8") as f:
+                f.write(self.format_report())
+            logger.info(f"启动跟踪报告已写入: {report_path}")
+        except OSError as e:
+            logger.error(f"写入启动跟踪报告失败: {e}")
+
+
+# 创建全局启动耗时分析器实例
+startup_profiler = StartupProfiler()
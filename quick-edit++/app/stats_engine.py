@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文档统计引擎模块
+按行边界把文本切分为分块, 每个分块只做一次融合扫描统计字符、单词、行和段落,
+大文本分发到进程池并行计算, 每完成一个分块即回调一次部分结果
+
+注意: 本模块会在子进程中被导入, 不能引入tkinter、配置管理器等重量级依赖
+"""
+
+import os
+import re
+import concurrent.futures
+from loguru import logger
+
+# 每个分块的目标字符数（实际会延伸到下一个换行符之后）
+CHUNK_SIZE = 1 << 20
+
+# 超过该字符数时使用进程池并行统计
+PARALLEL_THRESHOLD = 8 * CHUNK_SIZE
+
+# 可以直接累加的计数字段
+COUNTER_KEYS = (
+    "total_chars",
+    "total_lines",
+    "chinese_chars",
+    "english_chars",
+    "digit_chars",
+    "space_chars",
+    "punctuation_chars",
+    "english_words",
+    "chinese_words",
+    "paragraphs",
+    "code_lines",
+    "comment_lines",
+    "blank_lines",
+)
+
+# 融合后的字符分类正则, 各分组互不相交, 一次扫描即可区分全部字符类型
+# 每次匹配的是同类字符的连续片段, 片段长度即字符数, 片段个数即单词/词组数
+# 英文片段拆成两个分组: 两侧都不是单词字符的片段等价于 \b[a-zA-Z]+\b, 计为英文单词
+CHAR_CLASS_PATTERN = re.compile(
+    r"([\u4e00-\u9fff]+)"
+    r"|((?<!\w)[a-zA-Z]+(?!\w))"
+    r"|([a-zA-Z]+)"
+    r"|([0-9]+)"
+    r"|([ \t]+)"
+    r"|([^\w\s\u4e00-\u9fff]+)"
+)
+
+# CHAR_CLASS_PATTERN 各分组编号
+_GROUP_CHINESE = 1
+_GROUP_ENGLISH_WORD = 2
+_GROUP_ENGLISH = 3
+_GROUP_DIGIT = 4
+_GROUP_SPACE = 5
+_GROUP_PUNCTUATION = 6
+
+# 通用注释模式, 合并为一个正则, 每行只需搜索一次
+COMMENT_PATTERN = re.compile(
+    "|".join(
+        f"(?:{pattern})"
+        for pattern in (
+            r"//.*$",  # C风格单行注释
+            r"/\*.*?\*/",  # C风格多行注释
+            r"#.*$",  # Python/Shell风格注释
+            r"<!--.*?-->",  # HTML/XML注释
+            r"--.*$",  # SQL注释
+            r"%.*$",  # MATLAB注释
+            r'""".*?"""',  # Python多行注释
+            r"'''.*?'''",  # Python多行注释
+            r"::.*$",  # Windows批处理注释
+            r"rem.*$",  # DOS批处理注释
+            r"@REM.*$",  # DOS批处理注释
+            r"\{.*?\}",  # Pascal风格注释
+            r"\(\*.*?\*\)",  # Pascal风格注释
+        )
+    ),
+    re.MULTILINE | re.DOTALL,
+)
+
+
+def split_into_chunks(text, chunk_size=CHUNK_SIZE):
+    """
+    按行边界切分文本, 保证单词、行和段落都不会跨越分块
+
+    Args:
+        text (str): 要切分的文本
+        chunk_size (int): 每个分块的目标字符数
+
+    Returns:
+        list: (起始位置, 结束位置) 元组列表
+    """
+    chunks = []
+    total = len(text)
+    start = 0
+
+    while start < total:
+        newline = text.find("\n", start + chunk_size)
+        end = total if newline == -1 else newline + 1
+        chunks.append((start, end))
+        start = end
+
+    return chunks
+
+
+def count_chunk(chunk):
+    """
+    对单个分块做一次融合扫描, 只累加计数, 不构建匹配列表
+
+    Args:
+        chunk (str): 以换行符结尾（或位于文本末尾）的文本分块
+
+    Returns:
+        dict: 分块统计结果, 额外包含首尾行是否为非空行, 用于合并段落数
+    """
+    stats = dict.fromkeys(COUNTER_KEYS, 0)
+    stats["total_chars"] = len(chunk)
+
+    # 字符类型与单词统计: 按分组编号累加片段长度和片段个数
+    char_counts = [0] * 7
+    run_counts = [0] * 7
+    for match in CHAR_CLASS_PATTERN.finditer(chunk):
+        group = match.lastindex
+        start, end = match.span()
+        char_counts[group] += end - start
+        run_counts[group] += 1
+
+    stats["chinese_chars"] = char_counts[_GROUP_CHINESE]
+    stats["english_chars"] = (
+        char_counts[_GROUP_ENGLISH_WORD] + char_counts[_GROUP_ENGLISH]
+    )
+    stats["digit_chars"] = char_counts[_GROUP_DIGIT]
+    stats["space_chars"] = char_counts[_GROUP_SPACE]
+    stats["punctuation_chars"] = char_counts[_GROUP_PUNCTUATION]
+    stats["chinese_words"] = run_counts[_GROUP_CHINESE]
+    stats["english_words"] = run_counts[_GROUP_ENGLISH_WORD]
+
+    # 行统计: 空行、注释行、代码行和段落（连续非空行组成一个段落）
+    comment_search = COMMENT_PATTERN.search
+    in_paragraph = False
+    first_has_text = None
+    lines = chunk.splitlines()
+
+    for line in lines:
+        if not line.strip():
+            stats["blank_lines"] += 1
+            in_paragraph = False
+            if first_has_text is None:
+                first_has_text = False
+            continue
+
+        if first_has_text is None:
+            first_has_text = True
+        if not in_paragraph:
+            stats["paragraphs"] += 1
+            in_paragraph = True
+
+        if comment_search(line):
+            stats["comment_lines"] += 1
+        else:
+            stats["code_lines"] += 1
+
+    stats["total_lines"] = len(lines)
+    stats["starts_with_text"] = bool(first_has_text)
+    stats["ends_with_text"] = in_paragraph
+
+    return stats
+
+
+def finalize_stats(totals, boundaries=()):
+    """
+    根据累加计数推导出派生统计项
+
+    Args:
+        totals (dict): 按 COUNTER_KEYS 累加的计数
+        boundaries (iterable): 按分块顺序排列的 (首行非空, 尾行非空) 元组,
+            相邻分块首尾都是非空行时属于同一段落, 需要扣除重复计数
+
+    Returns:
+        dict: 与统计对话框字段一致的完整统计结果
+    """
+    stats = {key: totals.get(key, 0) for key in COUNTER_KEYS}
+
+    previous_ends_with_text = False
+    for starts_with_text, ends_with_text in boundaries:
+        if previous_ends_with_text and starts_with_text:
+            stats["paragraphs"] -= 1
+        previous_ends_with_text = ends_with_text
+
+    total_lines = stats["total_lines"]
+    stats["total_chars_no_spaces"] = stats["total_chars"] - stats["space_chars"]
+    stats["non_empty_lines"] = total_lines - stats["blank_lines"]
+    stats["other_chars"] = (
+        stats["total_chars"]
+        - stats["chinese_chars"]
+        - stats["english_chars"]
+        - stats["digit_chars"]
+        - stats["space_chars"]
+        - stats["punctuation_chars"]
+    )
+    stats["total_words"] = stats["english_words"] + stats["chinese_words"]
+    stats["total_code_lines"] = total_lines
+    stats["effective_lines"] = stats["code_lines"]
+
+    if total_lines > 0:
+        stats["comment_ratio"] = stats["comment_lines"] / total_lines
+        stats["blank_ratio"] = stats["blank_lines"] / total_lines
+        stats["effective_ratio"] = stats["effective_lines"] / total_lines
+    else:
+        stats["comment_ratio"] = 0.0
+        stats["blank_ratio"] = 0.0
+        stats["effective_ratio"] = 0.0
+
+    return stats
+
+
+class StatsEngine:
+    """
+    文档统计引擎类
+
+    小文本在调用线程中逐块统计, 大文本分发到进程池并行统计,
+    两种方式都会在每个分块完成后回调当前的部分结果
+    """
+
+    def __init__(
+        self,
+        text,
+        chunk_size=CHUNK_SIZE,
+        parallel_threshold=PARALLEL_THRESHOLD,
+        max_workers=None,
+    ):
+        """
+        初始化统计引擎
+
+        Args:
+            text (str): 要统计的文本
+            chunk_size (int): 每个分块的目标字符数
+            parallel_threshold (int): 启用进程池的文本长度阈值
+            max_workers (int, optional): 进程池最大进程数, 默认为CPU核心数
+        """
+        self.text = text
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        self._chunks = split_into_chunks(text, chunk_size)
+        self._totals = dict.fromkeys(COUNTER_KEYS, 0)
+        self._boundaries = [None] * len(self._chunks)
+        self._done_chars = 0
+
+    def run(self, on_partial=None, should_stop=None):
+        """
+        执行统计
+
+        Args:
+            on_partial (callable, optional): 部分结果回调, 参数为 (统计结果, 已处理字符数, 总字符数)
+            should_stop (callable, optional): 返回True时中止统计
+
+        Returns:
+            dict: 完整统计结果, 被中止时返回None
+        """
+        should_stop = should_stop or (lambda: False)
+        use_pool = (
+            len(self.text) >= self.parallel_threshold
+            and len(self._chunks) > 1
+            and self.max_workers > 1
+        )
+
+        completed = False
+        if use_pool:
+            try:
+                completed = self._run_parallel(on_partial, should_stop)
+            except (OSError, RuntimeError) as e:
+                # 进程池不可用或进程异常退出时回退到单线程统计
+                logger.warning(f"进程池统计失败, 回退到单线程统计: {e}")
+                self._reset()
+                completed = self._run_sequential(on_partial, should_stop)
+        else:
+            completed = self._run_sequential(on_partial, should_stop)
+
+        if not completed:
+            return None
+
+        return finalize_stats(self._totals, self._boundaries)
+
+    def _reset(self):
+        """清空已累加的结果"""
+        self._totals = dict.fromkeys(COUNTER_KEYS, 0)
+        self._boundaries = [None] * len(self._chunks)
+        self._done_chars = 0
+
+    def _merge(self, index, chunk_stats, on_partial):
+        """合并一个分块的结果并回调部分结果"""
+        for key in COUNTER_KEYS:
+            self._totals[key] += chunk_stats[key]
+        self._boundaries[index] = (
+            chunk_stats["starts_with_text"],
+            chunk_stats["ends_with_text"],
+        )
+        self._done_chars += chunk_stats["total_chars"]
+
+        if on_partial:
+            # 尚未完成的分块没有边界信息, 段落数在全部完成前是近似值
+            known = [b for b in self._boundaries if b is not None]
+            on_partial(
+                finalize_stats(self._totals, known),
+                self._done_chars,
+                len(self.text),
+            )
+
+    def _run_sequential(self, on_partial, should_stop):
+        """在当前线程中逐块统计"""
+        for index, (start, end) in enumerate(self._chunks):
+            if should_stop():
+                return False
+            self._merge(index, count_chunk(self.text[start:end]), on_partial)
+        return True
+
+    def _run_parallel(self, on_partial, should_stop):
+        """使用进程池并行统计, 限制在途分块数量以控制内存峰值"""
+        workers = min(self.max_workers, len(self._chunks))
+        max_in_flight = workers * 2
+        pending = {}
+        next_index = 0
+
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        try:
+            while next_index < len(self._chunks) or pending:
+                if should_stop():
+                    return False
+
+                # 补充在途任务
+                while next_index < len(self._chunks) and len(pending) < max_in_flight:
+                    start, end = self._chunks[next_index]
+                    future = executor.submit(count_chunk, self.text[start:end])
+                    pending[future] = next_index
+                    next_index += 1
+
+                done, _ = concurrent.futures.wait(
+                    pending,
+                    timeout=0.1,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    index = pending.pop(future)
+                    self._merge(index, future.result(), on_partial)
+
+            return True
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def calculate_document_stats(text, on_partial=None, should_stop=None):
+    """
+    统计文档的便捷函数
+
+    Args:
+        text (str): 要统计的文本
+        on_partial (callable, optional): 部分结果回调
+        should_stop (callable, optional): 返回True时中止统计
+
+    Returns:
+        dict: 完整统计结果, 被中止时返回None
+    """
+    return StatsEngine(text).run(on_partial=on_partial, should_stop=should_stop)
@@ -0,0 +1,625 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+结构化文本流式格式化模块
+JSON使用词法扫描逐个标记输出, XML使用expat增量解析, CSV逐行处理,
+都不构建完整的对象树, 格式化结果按块产生, 可以写入缓冲区或文件, 并报告进度
+"""
+
+import json
+import os
+import re
+from json.decoder import scanstring
+from json.encoder import encode_basestring
+from xml.parsers import expat
+
+# 每个输出块的大小（字符数）
+CHUNK_SIZE = 64 * 1024
+
+# XML每次送入解析器的字符数
+XML_FEED_SIZE = 64 * 1024
+
+# JSON的空白字符和数字, 与json模块的定义一致
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_NUMBER = re.compile(r"(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?")
+
+# JSON的字面量及其规范写法
+_JSON_LITERALS = (
+    ("null", "null"),
+    ("true", "true"),
+    ("false", "false"),
+    ("NaN", "NaN"),
+    ("Infinity", "Infinity"),
+    ("-Infinity", "-Infinity"),
+)
+
+# JSON扫描器的状态
+_EXPECT_VALUE = 0  # 需要一个值
+_EXPECT_VALUE_OR_CLOSE = 1  # 数组开始后, 需要第一个元素或 ]
+_EXPECT_KEY = 2  # 对象中逗号之后, 需要键
+_EXPECT_KEY_OR_CLOSE = 3  # 对象开始后, 需要第一个键或 }
+_EXPECT_COLON = 4  # 键之后, 需要冒号
+_EXPECT_COMMA_OR_CLOSE = 5  # 值之后, 需要逗号或结束符
+_DONE = 6  # 顶层值已结束
+
+
+def _float_repr(value):
+    """按json.dumps的规则输出浮点数"""
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "Infinity"
+    if value == float("-inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def _escape_xml(text):
+    """按minidom的规则转义XML文本和属性值"""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def parse_csv_line(line):
+    """
+    解析CSV行，正确处理引号和转义字符，并自动补全逗号
+
+    Args:
+        line (str): CSV行文本
+
+    Returns:
+        list: 解析后的字段列表
+    """
+    fields = []
+    current_field = ""
+    in_quotes = False
+    i = 0
+    line_length = len(line)
+
+    while i < line_length:
+        char = line[i]
+
+        if char == '"':
+            # 处理引号
+            if in_quotes and i + 1 < line_length and line[i + 1] == '"':
+                # 转义的引号（两个连续引号）
+                current_field += '"'
+                i += 2
+                continue
+            else:
+                # 开始或结束引号
+                in_quotes = not in_quotes
+                i += 1
+                continue
+        elif char == "," and not in_quotes:
+            # 字段分隔符
+            fields.append(current_field)
+            current_field = ""
+            i += 1
+            continue
+        elif char == " " and not in_quotes:
+            # 处理引号外的空格
+            # 检查是否是字段间的空格（用于自动补逗号）
+            if (
+                current_field
+                and i + 1 < line_length
+                and line[i + 1] != ","
+                and line[i + 1] != " "
+            ):
+                # 可能是字段间的空格，先保留，稍后处理
+                current_field += char
+                i += 1
+                continue
+            elif (
+                not current_field
+                and i + 1 < line_length
+                and line[i + 1] != ","
+                and line[i + 1] != " "
+            ):
+                # 可能是字段间的空格，先保留，稍后处理
+                current_field += char
+                i += 1
+                continue
+            else:
+                # 跳过其他空格
+                i += 1
+                continue
+        else:
+            # 普通字符
+            current_field += char
+            i += 1
+
+    # 添加最后一个字段
+    fields.append(current_field)
+
+    # 处理可能由空格分隔的字段（自动补逗号）
+    processed_fields = []
+    for field in fields:
+        if " " in field and not field.startswith('"') and not field.endswith('"'):
+            # 检查是否是由空格分隔的多个字段
+            sub_fields = field.split()
+            if len(sub_fields) > 1:
+                # 如果是数字或简单文本，认为是多个字段
+                is_multiple_fields = True
+                for sub_field in sub_fields:
+                    # 如果包含非字母数字字符，可能不是简单字段
+                    if not sub_field.replace("_", "").replace("-", "").isalnum():
+                        is_multiple_fields = False
+                        break
+
+                if is_multiple_fields:
+                    processed_fields.extend(sub_fields)
+                else:
+                    processed_fields.append(field)
+            else:
+                processed_fields.append(field)
+        else:
+            processed_fields.append(field)
+
+    return processed_fields
+
+
+class StreamFormatter:
+    """
+    流式格式化器基类
+
+    子类实现_fragments生成输出片段, 并在self.position中记录已处理的输入字符数;
+    基类把片段合并为大小约为CHUNK_SIZE的输出块, 每产生一个块报告一次进度
+    """
+
+    def __init__(self, text, progress=None):
+        """
+        初始化流式格式化器
+
+        Args:
+            text (str): 要格式化的文本
+            progress (callable, optional): 进度回调, 参数为 (已处理字符数, 总字符数),
+                回调中抛出的异常会中止格式化
+        """
+        self.text = text
+        self.progress = progress
+        self.position = 0  # 已处理的输入字符数
+
+    def _fragments(self):
+        """生成输出片段, 由子类实现"""
+        raise NotImplementedError
+
+    def chunks(self):
+        """
+        按块生成格式化结果
+
+        Yields:
+            str: 输出块
+        """
+        total = len(self.text)
+        buffer = []
+        size = 0
+
+        for fragment in self._fragments():
+            buffer.append(fragment)
+            size += len(fragment)
+            if size >= CHUNK_SIZE:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+                if self.progress:
+                    self.progress(self.position, total)
+
+        if buffer:
+            yield "".join(buffer)
+        if self.progress:
+            self.progress(total, total)
+
+    def to_string(self):
+        """
+        格式化为字符串
+
+        Returns:
+            str: 格式化后的文本
+        """
+        return "".join(self.chunks())
+
+    def to_file(self, file_path, encoding="utf-8"):
+        """
+        逐块把格式化结果写入文件, 先写入临时文件, 成功后再替换目标文件
+
+        Args:
+            file_path (str): 目标文件路径
+            encoding (str): 文件编码
+        """
+        temp_path = f"{file_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding=encoding, newline="") as f:
+                for chunk in self.chunks():
+                    f.write(chunk)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class JsonStreamFormatter(StreamFormatter):
+    """
+    JSON流式格式化器类
+
+    逐个扫描JSON标记并直接输出, 不构建对象树; 输出格式与
+    json.dumps(json.loads(text), indent=..., ensure_ascii=False) 一致,
+    但对象中的重复键会全部保留
+    """
+
+    def __init__(self, text, indent=2, progress=None):
+        """
+        初始化JSON流式格式化器
+
+        Args:
+            text (str): JSON文本
+            indent (int, optional): 缩进空格数, 为None时输出压缩格式
+            progress (callable, optional): 进度回调
+        """
+        super().__init__(text, progress)
+        self.indent = indent
+
+    def _fragments(self):
+        """
+        扫描JSON标记并生成输出片段
+
+        Raises:
+            json.JSONDecodeError: JSON格式无效
+        """
+        s = self.text
+        n = len(s)
+        skip = _JSON_WHITESPACE.match
+        match_number = _JSON_NUMBER.match
+
+        if self.indent is None:
+            item_separator, key_separator = ",", ":"
+        else:
+            item_separator, key_separator = ",", ": "
+
+        newlines = {}
+
+        def newline(level):
+            """获取换行和指定层级的缩进, 压缩格式时为空"""
+            if self.indent is None:
+                return ""
+            if level not in newlines:
+                newlines[level] = "\n" + " " * (self.indent * level)
+            return newlines[level]
+
+        # 输出片段先在列表中累积, 每处理一批标记合并输出一次, 减少生成器切换
+        output = []
+        emit = output.append
+        batch = 0
+
+        stack = []  # 未闭合容器的结束符
+        state = _EXPECT_VALUE
+        pos = skip(s, 0).end()
+
+        while True:
+            batch += 1
+            if batch >= 4096:
+                batch = 0
+                self.position = pos
+                yield "".join(output)
+                output.clear()
+
+            if state == _DONE:
+                if pos != n:
+                    raise json.JSONDecodeError("Extra data", s, pos)
+                self.position = pos
+                if output:
+                    yield "".join(output)
+                return
+
+            if pos >= n:
+                if state in (_EXPECT_KEY, _EXPECT_KEY_OR_CLOSE):
+                    raise json.JSONDecodeError(
+                        "Expecting property name enclosed in double quotes", s, pos
+                    )
+                if state == _EXPECT_COLON:
+                    raise json.JSONDecodeError("Expecting ':' delimiter", s, pos)
+                if state == _EXPECT_COMMA_OR_CLOSE:
+                    raise json.JSONDecodeError("Expecting ',' delimiter", s, pos)
+                raise json.JSONDecodeError("Expecting value", s, pos)
+
+            char = s[pos]
+
+            if state in (_EXPECT_VALUE, _EXPECT_VALUE_OR_CLOSE):
+                if state == _EXPECT_VALUE_OR_CLOSE:
+                    if char == "]":
+                        stack.pop()
+                        emit("]")
+                        pos += 1
+                        state = _EXPECT_COMMA_OR_CLOSE if stack else _DONE
+                        pos = skip(s, pos).end()
+                        continue
+                    emit(newline(len(stack)))
+
+                if char == "{":
+                    stack.append("}")
+                    emit("{")
+                    pos += 1
+                    state = _EXPECT_KEY_OR_CLOSE
+                elif char == "[":
+                    stack.append("]")
+                    emit("[")
+                    pos += 1
+                    state = _EXPECT_VALUE_OR_CLOSE
+                else:
+                    if char == '"':
+                        value, pos = scanstring(s, pos + 1)
+                        emit(encode_basestring(value))
+                    else:
+                        number = match_number(s, pos)
+                        if number is not None:
+                            integer, fraction, exponent = number.groups()
+                            if fraction or exponent:
+                                emit(_float_repr(float(number.group())))
+                            else:
+                                emit(str(int(integer)))
+                            pos = number.end()
+                        else:
+                            for literal, canonical in _JSON_LITERALS:
+                                if s.startswith(literal, pos):
+                                    emit(canonical)
+                                    pos += len(literal)
+                                    break
+                            else:
+                                raise json.JSONDecodeError("Expecting value", s, pos)
+                    state = _EXPECT_COMMA_OR_CLOSE if stack else _DONE
+
+            elif state in (_EXPECT_KEY, _EXPECT_KEY_OR_CLOSE):
+                if char == "}" and state == _EXPECT_KEY_OR_CLOSE:
+                    stack.pop()
+                    emit("}")
+                    pos += 1
+                    state = _EXPECT_COMMA_OR_CLOSE if stack else _DONE
+                elif char == '"':
+                    if state == _EXPECT_KEY_OR_CLOSE:
+                        emit(newline(len(stack)))
+                    key, pos = scanstring(s, pos + 1)
+                    emit(encode_basestring(key))
+                    state = _EXPECT_COLON
+                else:
+                    raise json.JSONDecodeError(
+                        "Expecting property name enclosed in double quotes", s, pos
+                    )
+
+            elif state == _EXPECT_COLON:
+                if char != ":":
+                    raise json.JSONDecodeError("Expecting ':' delimiter", s, pos)
+                emit(key_separator)
+                pos += 1
+                state = _EXPECT_VALUE
+
+            else:
+                closer = stack[-1]
+                if char == ",":
+                    emit(item_separator)
+                    emit(newline(len(stack)))
+                    pos += 1
+                    state = _EXPECT_KEY if closer == "}" else _EXPECT_VALUE
+                elif char == closer:
+                    stack.pop()
+                    emit(newline(len(stack)))
+                    emit(closer)
+                    pos += 1
+                    state = _EXPECT_COMMA_OR_CLOSE if stack else _DONE
+                else:
+                    raise json.JSONDecodeError("Expecting ',' delimiter", s, pos)
+
+            pos = skip(s, pos).end()
+
+
+class XmlStreamFormatter(StreamFormatter):
+    """
+    XML流式格式化器类
+
+    分块送入expat增量解析, 在解析回调中直接输出带缩进的标签,
+    只缓存当前元素的文本内容; 输出与minidom.toprettyxml去除空行后一致,
+    只有与其他节点混排的CDATA段单独缩进一行 (minidom输出时不加缩进和换行)
+    """
+
+    def __init__(self, text, indent="  ", progress=None):
+        """
+        初始化XML流式格式化器
+
+        Args:
+            text (str): XML文本
+            indent (str): 每层缩进使用的字符串
+            progress (callable, optional): 进度回调
+        """
+        super().__init__(text, progress)
+        self.indent = indent
+
+    def _fragments(self):
+        """
+        增量解析XML并生成输出片段
+
+        Raises:
+            expat.ExpatError: XML格式无效
+        """
+        output = []
+        # 当前元素中尚未输出的文本和CDATA节点, 每项为 [是否CDATA, 内容]
+        nodes = []
+        in_cdata = [False]
+        # 尚未输出的开始标签, 元素没有子节点时输出为单行或自闭合标签
+        pending = {"tag": None}
+        depth = [0]
+
+        def write_line(level, content):
+            # 换行符写在每行开头, 分块输出时末尾不会多出换行符
+            output.append(f"\n{self.indent * level}{content}")
+
+        def flush_pending():
+            """输出等待中的开始标签, 其所属元素包含子节点"""
+            if pending["tag"] is not None:
+                write_line(depth[0] - 1, f"{pending['tag']}>")
+                pending["tag"] = None
+
+        def write_text(level, content):
+            """
+            与minidom一样输出文本: 只在第一行前加缩进, 其余行保持原样,
+            去除只有空白的行
+            """
+            lines = content.split("\n")
+            lines[0] = self.indent * level + lines[0]
+            output.extend(f"\n{line}" for line in lines if line.strip())
+
+        def flush_text():
+            """输出缓存的文本和CDATA节点, 其所属元素包含多个子节点"""
+            if not nodes:
+                return
+            flush_pending()
+            for is_cdata, content in nodes:
+                if is_cdata:
+                    write_line(depth[0], f"<![CDATA[{content}]]>")
+                else:
+                    write_text(depth[0], _escape_xml(content))
+            nodes.clear()
+
+        def start_element(name, attributes):
+            flush_text()
+            flush_pending()
+            parts = [f"<{name}"]
+            for i in range(0, len(attributes), 2):
+                parts.append(f' {attributes[i]}="{_escape_xml(attributes[i + 1])}"')
+            pending["tag"] = "".join(parts)
+            depth[0] += 1
+
+        def end_element(name):
+            if pending["tag"] is not None and len(nodes) <= 1:
+                # 没有子节点或只有一个文本节点, 文本内容原样写在同一行
+                if not nodes:
+                    write_line(depth[0] - 1, f"{pending['tag']}/>")
+                elif nodes[0][0]:
+                    write_line(
+                        depth[0] - 1,
+                        f"{pending['tag']}><![CDATA[{nodes[0][1]}]]></{name}>",
+                    )
+                else:
+                    write_text(
+                        depth[0] - 1,
+                        f"{pending['tag']}>{_escape_xml(nodes[0][1])}</{name}>",
+                    )
+                nodes.clear()
+                pending["tag"] = None
+            else:
+                flush_text()
+                write_line(depth[0] - 1, f"</{name}>")
+            depth[0] -= 1
+
+        def character_data(data):
+            # 相邻的文本合并为一个节点, 每个CDATA段是单独的节点
+            if nodes and (in_cdata[0] or not nodes[-1][0]):
+                nodes[-1][1] += data
+            else:
+                nodes.append([in_cdata[0], data])
+
+        def start_cdata():
+            in_cdata[0] = True
+            nodes.append([True, ""])
+
+        def end_cdata():
+            in_cdata[0] = False
+
+        def comment(data):
+            flush_text()
+            flush_pending()
+            write_line(depth[0], f"<!--{data}-->")
+
+        def processing_instruction(target, data):
+            flush_text()
+            flush_pending()
+            write_line(depth[0], f"<?{target} {data}?>" if data else f"<?{target}?>")
+
+        def start_doctype(name, system_id, public_id, has_internal_subset):
+            if public_id:
+                write_line(0, f'<!DOCTYPE {name} PUBLIC "{public_id}" "{system_id}">')
+            elif system_id:
+                write_line(0, f'<!DOCTYPE {name} SYSTEM "{system_id}">')
+            else:
+                write_line(0, f"<!DOCTYPE {name}>")
+
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.ordered_attributes = True
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.CharacterDataHandler = character_data
+        parser.StartCdataSectionHandler = start_cdata
+        parser.EndCdataSectionHandler = end_cdata
+        parser.CommentHandler = comment
+        parser.ProcessingInstructionHandler = processing_instruction
+        parser.StartDoctypeDeclHandler = start_doctype
+
+        # minidom总是输出不带编码的XML声明
+        output.append('<?xml version="1.0" ?>')
+
+        text = self.text
+        for start in range(0, len(text), XML_FEED_SIZE):
+            parser.Parse(text[start : start + XML_FEED_SIZE], False)
+            self.position = min(start + XML_FEED_SIZE, len(text))
+            if output:
+                yield "".join(output)
+                output.clear()
+
+        parser.Parse("", True)
+        self.position = len(text)
+        if output:
+            yield "".join(output)
+
+
+class CsvStreamFormatter(StreamFormatter):
+    """
+    CSV流式格式化器类
+
+    逐行解析字段并重新拼接, 不复制整个行列表
+    """
+
+    def __init__(self, text, compress=False, progress=None):
+        """
+        初始化CSV流式格式化器
+
+        Args:
+            text (str): CSV文本
+            compress (bool): True为压缩格式化，False为展开格式化
+            progress (callable, optional): 进度回调
+        """
+        super().__init__(text, progress)
+        self.compress = compress
+
+    def _fragments(self):
+        """逐行格式化CSV并生成输出片段"""
+        text = self.text
+        if not text:
+            return
+
+        # 压缩格式：移除所有不必要的空格; 展开格式：每个逗号后添加2个空格
+        separator = "," if self.compress else ",  "
+
+        start = 0
+        while True:
+            end = text.find("\n", start)
+            line = text[start:] if end == -1 else text[start:end]
+
+            # 空行保留为空行
+            if line.strip():
+                yield separator.join(parse_csv_line(line))
+
+            if end == -1:
+                self.position = len(text)
+                return
+
+            yield "\n"
+            start = end + 1
+            self.position = start
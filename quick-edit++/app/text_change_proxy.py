@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文本组件命令代理模块
+将底层tk.Text的Tcl命令重命名, 并在原位置安装一个Tcl过程作为代理,
+只有insert/delete/replace会回调到Python, 其余子命令直接在Tcl层转发;
+每次修改完成后向订阅者发布修改记录, 订阅者可以只处理实际变化的范围
+"""
+
+from contextlib import contextmanager
+
+from loguru import logger
+
+# 需要通知观察者的修改类子命令
+EDIT_OPERATIONS = ("insert", "delete", "replace")
+
+# 记录修改结束位置的标记, 右侧重力保证插入文本后标记位于插入内容之后
+CHANGE_END_MARK = "text_change_end"
+
+
+class TextChange:
+    """
+    文本修改记录类
+
+    描述一次insert/delete/replace修改: 修改前start到old_end之间的文本
+    被替换为修改后start到end之间的文本
+    """
+
+    __slots__ = ("operation", "start", "old_end", "end", "inserted", "revision")
+
+    def __init__(self, operation, start, old_end, end, inserted, revision):
+        """
+        初始化修改记录
+
+        Args:
+            operation (str): 修改类型, insert/delete/replace
+            start (str): 修改起始位置
+            old_end (str): 修改前被删除范围的结束位置, 纯插入时与start相同
+            end (str): 修改后插入内容的结束位置, 纯删除时与start相同
+            inserted (int): 插入的字符数
+            revision (int): 修改完成后的文本版本号
+        """
+        self.operation = operation
+        self.start = start
+        self.old_end = old_end
+        self.end = end
+        self.inserted = inserted
+        self.revision = revision
+
+    @property
+    def start_line(self):
+        """修改起始行号"""
+        return int(self.start.split(".")[0])
+
+    @property
+    def end_line(self):
+        """修改后插入内容的结束行号"""
+        return int(self.end.split(".")[0])
+
+    @property
+    def line_delta(self):
+        """修改导致的行数变化, 正数为增加的行数"""
+        return self.end_line - int(self.old_end.split(".")[0])
+
+    def __repr__(self):
+        return (
+            f"TextChange({self.operation}, {self.start}, {self.old_end}, "
+            f"{self.end}, inserted={self.inserted}, revision={self.revision})"
+        )
+
+
+class TextChangeProxy:
+    """
+    文本修改代理类
+
+    观察者需要实现 before_change(operation, *args) 和 after_change(operation, *args),
+    before_change在Tk执行修改前调用, after_change在修改完成后调用（修改失败也会调用）;
+    订阅者通过subscribe注册, 只在文本实际发生变化后收到一个TextChange修改记录
+    """
+
+    def __init__(self, text_widget):
+        """
+        初始化并安装代理
+
+        Args:
+            text_widget: 底层tk.Text组件, 通常为CTkTextbox._textbox
+        """
+        self.text_widget = text_widget
+        self.tk = text_widget.tk
+        self.widget_name = str(text_widget._w)
+        self.orig_name = f"{self.widget_name}_orig"
+        self.observers = []
+        self.subscribers = []
+        self.revision = 0  # 每发布一次修改记录加1
+        self._muted = False  # 暂停发布修改记录, 观察者仍然收到通知
+
+        # 修改前计算的起始位置和被删除范围的结束位置
+        self._pending = None
+
+        # Python回调命令名称
+        self._before_name = f"{self.widget_name}_before_change"
+        self._after_name = f"{self.widget_name}_after_change"
+
+        self._install()
+
+    def _install(self):
+        """重命名原始组件命令并安装Tcl代理过程"""
+        self.tk.createcommand(self._before_name, self._before_change)
+        self.tk.createcommand(self._after_name, self._after_change)
+        self.tk.call("rename", self.widget_name, self.orig_name)
+
+        # 代理过程完全在Tcl层转发, 原始命令的返回值和错误会原样返回给调用者
+        self.tk.eval(f"""
+proc {{{self.widget_name}}} {{args}} {{
+    set op [lindex $args 0]
+    if {{$op in {{{" ".join(EDIT_OPERATIONS)}}}}} {{
+        {{{self._before_name}}} {{*}}$args
+        set code [catch {{uplevel 1 [list {{{self.orig_name}}} {{*}}$args]}} result options]
+        {{{self._after_name}}} {{*}}$args
+        return -options $options $result
+    }}
+    tailcall {{{self.orig_name}}} {{*}}$args
+}}
+""")
+
+    def uninstall(self):
+        """卸载代理, 恢复原始组件命令"""
+        try:
+            self.tk.call("rename", self.widget_name, "")
+            self.tk.call("rename", self.orig_name, self.widget_name)
+            self.tk.deletecommand(self._before_name)
+            self.tk.deletecommand(self._after_name)
+        except Exception as e:
+            logger.error(f"卸载文本组件代理失败: {e}")
+
+    def add_observer(self, observer):
+        """
+        添加观察者
+
+        Args:
+            observer: 实现了before_change和after_change方法的对象
+        """
+        if observer not in self.observers:
+            self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        移除观察者
+
+        Args:
+            observer: 之前添加的观察者
+        """
+        if observer in self.observers:
+            self.observers.remove(observer)
+
+    def subscribe(self, callback):
+        """
+        订阅修改记录
+
+        Args:
+            callback (callable): 接收一个TextChange参数的回调函数
+        """
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        取消订阅修改记录
+
+        Args:
+            callback (callable): 之前订阅的回调函数
+        """
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    @contextmanager
+    def muted(self):
+        """
+        暂停向订阅者发布修改记录, 用于整体替换文本之后由调用方统一刷新的场景;
+        观察者仍然收到每次修改的通知
+        """
+        muted = self._muted
+        self._muted = True
+        try:
+            yield
+        finally:
+            self._muted = muted
+
+    def _index(self, index):
+        """通过原始命令获取规范化的位置, 避免再次经过代理过程"""
+        return str(self.tk.call(self.orig_name, "index", index))
+
+    def _compare(self, index1, op, index2):
+        """通过原始命令比较两个位置"""
+        return self.tk.getboolean(
+            self.tk.call(self.orig_name, "compare", index1, op, index2)
+        )
+
+    def _clamp(self, index):
+        """Tk不会修改文本末尾的换行符, 末尾之后的位置按末尾换行符之前处理"""
+        if self._compare(index, ">", "end-1c"):
+            return self._index("end-1c")
+        return index
+
+    def _changed_range(self, operation, args):
+        """
+        计算修改前将被替换的范围
+
+        Args:
+            operation (str): 修改类型
+            args (tuple): 修改命令的参数
+
+        Returns:
+            tuple: (起始位置, 结束位置)
+        """
+        if operation == "insert":
+            start = self._clamp(self._index(args[0]))
+            return start, start
+
+        if operation == "replace":
+            start, end = self._index(args[0]), self._index(args[1])
+        elif len(args) == 1:
+            start = self._index(args[0])
+            end = self._index(f"{start}+1c")
+        else:
+            # delete可以同时删除多个范围, 取覆盖所有范围的最小区间
+            indexes = [self._index(index) for index in args]
+            start, end = indexes[0], indexes[1]
+            for index in indexes:
+                if self._compare(index, "<", start):
+                    start = index
+                if self._compare(index, ">", end):
+                    end = index
+
+        start, end = self._clamp(start), self._clamp(end)
+        if self._compare(end, "<", start):
+            end = start
+        return start, end
+
+    def _before_change(self, operation, *args):
+        """修改执行前的回调, 观察者的异常不能影响Tk的修改操作"""
+        self._pending = None
+        # 禁用状态下Tk会忽略修改, 不需要生成修改记录
+        if (
+            self.subscribers
+            and not self._muted
+            and args
+            and str(self.tk.call(self.orig_name, "cget", "-state")) != "disabled"
+        ):
+            try:
+                start, old_end = self._changed_range(operation, args)
+                self.tk.call(self.orig_name, "mark", "set", CHANGE_END_MARK, old_end)
+                self.tk.call(
+                    self.orig_name, "mark", "gravity", CHANGE_END_MARK, "right"
+                )
+                self._pending = (start, old_end)
+            except Exception as e:
+                logger.error(f"计算文本修改范围失败: {e}")
+
+        for observer in self.observers:
+            try:
+                observer.before_change(operation, *args)
+            except Exception as e:
+                logger.error(f"文本修改观察者处理失败: {e}")
+
+    def _after_change(self, operation, *args):
+        """修改执行后的回调, 观察者的异常不能影响Tk的修改操作"""
+        for observer in self.observers:
+            try:
+                observer.after_change(operation, *args)
+            except Exception as e:
+                logger.error(f"文本修改观察者处理失败: {e}")
+
+        if self._pending is not None:
+            self._publish(operation)
+
+    def _publish(self, operation):
+        """
+        生成修改记录并发布给订阅者
+
+        Args:
+            operation (str): 修改类型
+        """
+        start, old_end = self._pending
+        self._pending = None
+        try:
+            end = self._index(CHANGE_END_MARK)
+            self.tk.call(self.orig_name, "mark", "unset", CHANGE_END_MARK)
+            inserted = 0
+            if end != start:
+                inserted = self.tk.getint(
+                    self.tk.call(self.orig_name, "count", "-chars", start, end)
+                )
+        except Exception as e:
+            logger.error(f"生成文本修改记录失败: {e}")
+            return
+
+        # 组件禁用或修改失败时文本没有变化, 不发布记录
+        if old_end == start and inserted == 0:
+            return
+
+        self.revision += 1
+        change = TextChange(operation, start, old_end, end, inserted, self.revision)
+        for callback in self.subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"文本修改订阅者处理失败: {e}")
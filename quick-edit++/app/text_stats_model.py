@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文本统计模型模块
+根据文本组件的插入/删除增量维护字符数、行数、单词数等统计信息,
+状态栏和文档统计对话框直接读取缓存值, 不再每次复制整个缓冲区重新统计
+"""
+
+import time
+import threading
+from loguru import logger
+from app.stats_engine import COUNTER_KEYS, count_chunk, finalize_stats, StatsEngine
+
+# 单次修改涉及的行区域超过该字符数时不做增量统计, 改为后台全量重新统计
+REGION_LIMIT = 65536
+
+# 增量统计失效后, 空闲多久开始后台全量统计（毫秒）
+STALE_RECOUNT_DELAY = 1000
+
+# 兜底的定期全量校验间隔（毫秒）
+VERIFY_INTERVAL = 60000
+
+# 距离上次修改至少经过多久才视为空闲（秒）
+IDLE_SECONDS = 1.0
+
+# 后台统计线程的轮询间隔（毫秒）
+RECOUNT_POLL_INTERVAL = 100
+
+
+def _join(upper_has_text, lower_has_text):
+    """相邻两行都不是空行时属于同一段落"""
+    return 1 if upper_has_text and lower_has_text else 0
+
+
+class TextStatsModel:
+    """
+    文本统计模型类
+
+    作为TextChangeProxy的观察者, 在修改前后分别统计受影响的行区域,
+    用差值更新总计数, 读取统计值的开销为O(1)
+    """
+
+    def __init__(self, app, text_widget):
+        """
+        初始化文本统计模型
+
+        Args:
+            app: 应用程序实例, 用于调度定时任务
+            text_widget: 底层tk.Text组件
+        """
+        self.app = app
+        self.text = text_widget
+
+        # 对外公开的O(1)统计值
+        self.char_count = 0  # 总字符数
+        self.line_count = 0  # 总行数
+        self.revision = 0  # 修改版本号, 每次修改递增
+
+        # 可累加的详细统计计数
+        self._totals = dict.fromkeys(COUNTER_KEYS, 0)
+        self._stale = False  # 详细统计是否失效
+        self._verified_revision = 0  # 最近一次全量校验对应的版本号
+        self._last_edit_time = 0.0
+        self._pending = None  # 修改前记录的区域信息
+
+        # 后台全量统计相关
+        self._recount_job = None
+        self._recount_thread = None
+        self._recount_result = None
+
+        self.resync()
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    @property
+    def word_count(self):
+        """总单词数（英文单词 + 中文词组）"""
+        return self._totals["english_words"] + self._totals["chinese_words"]
+
+    @property
+    def is_stale(self):
+        """详细统计是否正在等待全量重新统计"""
+        return self._stale
+
+    def get_stats(self):
+        """
+        获取完整统计结果
+
+        Returns:
+            dict: 与文档统计对话框字段一致的统计结果, 详细统计失效时返回None
+        """
+        if self._stale:
+            return None
+        return finalize_stats(self._totals)
+
+    def refresh_counts(self):
+        """仅由Tk重新计算字符数和行数, 不复制缓冲区, 也不触及详细统计"""
+        self.char_count = self.count_chars("1.0", "end-1c")
+        self.line_count = self._count_lines()
+
+    def resync(self):
+        """
+        重新同步统计值
+
+        字符数和行数直接由Tk计算, 不复制缓冲区; 小文本同步重新统计详细信息,
+        大文本标记为失效并安排后台统计
+        """
+        self.refresh_counts()
+
+        if self.char_count <= REGION_LIMIT:
+            stats = count_chunk(self.text.get("1.0", "end-1c"))
+            self._totals = {key: stats[key] for key in COUNTER_KEYS}
+            self._stale = False
+            self._verified_revision = self.revision
+        else:
+            self._mark_stale()
+
+    # ------------------------------------------------------------------
+    # TextChangeProxy观察者接口
+    # ------------------------------------------------------------------
+
+    def before_change(self, operation, *args):
+        """
+        修改前记录受影响的行区域及其统计
+
+        Args:
+            operation (str): insert, delete 或 replace
+            *args: 传给Tk的原始参数
+        """
+        self._pending = None
+        last_line = self._last_line()
+
+        if operation == "insert":
+            indices = args[:1]
+        elif operation == "delete":
+            indices = list(args)
+            if len(indices) % 2 == 1:
+                # 单个索引删除的是该位置的一个字符, 可能是行尾换行符
+                indices.append(f"{indices[-1]}+1c")
+        else:
+            indices = args[:2]
+
+        if not indices:
+            return
+
+        lines = [self._line_of(index, last_line) for index in indices]
+        first_line, region_last = min(lines), max(lines)
+
+        start, end = self._region_bounds(first_line, region_last, last_line)
+        old_chars = self.count_chars(start, end)
+
+        old_stats = None
+        prev_has_text = next_has_text = False
+        if not self._stale and old_chars <= REGION_LIMIT:
+            prev_has_text = self._line_has_text(first_line - 1, last_line)
+            next_has_text = self._line_has_text(region_last + 1, last_line)
+            if prev_has_text is not None and next_has_text is not None:
+                old_stats = count_chunk(self.text.get(start, end))
+
+        self._pending = (
+            first_line,
+            region_last,
+            last_line,
+            old_chars,
+            old_stats,
+            prev_has_text,
+            next_has_text,
+        )
+
+    def after_change(self, operation, *args):
+        """
+        修改后统计新的行区域, 用差值更新总计数
+
+        Args:
+            operation (str): insert, delete 或 replace
+            *args: 传给Tk的原始参数
+        """
+        if self._pending is None:
+            return
+
+        (
+            first_line,
+            region_last,
+            old_last_line,
+            old_chars,
+            old_stats,
+            prev_has_text,
+            next_has_text,
+        ) = self._pending
+        self._pending = None
+
+        new_last_line = self._last_line()
+        new_region_last = region_last + new_last_line - old_last_line
+        start, end = self._region_bounds(first_line, new_region_last, new_last_line)
+        new_chars = self.count_chars(start, end)
+
+        self.char_count += new_chars - old_chars
+        self.line_count = self._count_lines()
+        self.revision += 1
+        self._last_edit_time = time.monotonic()
+
+        if old_stats is not None and new_chars <= REGION_LIMIT:
+            new_stats = count_chunk(self.text.get(start, end))
+            for key in COUNTER_KEYS:
+                self._totals[key] += new_stats[key] - old_stats[key]
+
+            # 区域首尾与相邻行可能连成同一段落, 修正段落数
+            self._totals["paragraphs"] += (
+                _join(prev_has_text, old_stats["starts_with_text"])
+                + _join(old_stats["ends_with_text"], next_has_text)
+                - _join(prev_has_text, new_stats["starts_with_text"])
+                - _join(new_stats["ends_with_text"], next_has_text)
+            )
+            self._schedule_recount(VERIFY_INTERVAL, replace=False)
+        else:
+            self._mark_stale()
+
+    # ------------------------------------------------------------------
+    # 内部工具方法
+    # ------------------------------------------------------------------
+
+    def _last_line(self):
+        """获取最后一行的行号（不含Tk自动追加的换行符）"""
+        return int(self.text.index("end-1c").split(".")[0])
+
+    def _line_of(self, index, last_line):
+        """获取索引所在的行号, 超出末尾时截断到最后一行"""
+        return min(int(self.text.index(index).split(".")[0]), last_line)
+
+    def _region_bounds(self, first_line, region_last, last_line):
+        """
+        获取行区域的起止索引
+
+        区域包含每行末尾的换行符, 最后一行除外, 这样所有区域拼接后与
+        text.get("1.0", "end-1c") 完全一致, 各区域的统计可以直接累加
+        """
+        if region_last < last_line:
+            return f"{first_line}.0", f"{region_last + 1}.0"
+        return f"{first_line}.0", f"{region_last}.end"
+
+    def count_chars(self, start, end):
+        """
+        使用Tk计算两个索引之间的字符数, 不把文本复制到Python
+
+        Args:
+            start (str): 起始索引
+            end (str): 结束索引
+
+        Returns:
+            int: 字符数
+        """
+        result = self.text.tk.call(self.text._w, "count", "-chars", start, end)
+        return int(result) if result != "" else 0
+
+    def _count_lines(self):
+        """计算行数, 与str.splitlines的结果一致"""
+        line, column = self.text.index("end-1c").split(".")
+        return int(line) if int(column) > 0 else int(line) - 1
+
+    def _line_has_text(self, line, last_line):
+        """
+        判断指定行是否为非空行
+
+        Returns:
+            bool: 行不存在或为空行时返回False; 行过长无法廉价判断时返回None
+        """
+        if line < 1 or line > last_line:
+            return False
+        start, end = f"{line}.0", f"{line}.end"
+        if self.count_chars(start, end) > REGION_LIMIT:
+            return None
+        return bool(self.text.get(start, end).strip())
+
+    def _mark_stale(self):
+        """标记详细统计失效, 并在空闲时安排全量重新统计"""
+        self._stale = True
+        self._schedule_recount(STALE_RECOUNT_DELAY, replace=True)
+
+    def _schedule_recount(self, delay, replace):
+        """
+        安排全量重新统计
+
+        Args:
+            delay (int): 延迟毫秒数
+            replace (bool): 是否替换已存在的定时任务
+        """
+        if self._recount_job is not None:
+            if not replace:
+                return
+            self.app.after_cancel(self._recount_job)
+        self._recount_job = self.app.after(delay, self._start_recount)
+
+    def _start_recount(self):
+        """在后台线程中全量重新统计, 仅在编辑空闲时执行"""
+        self._recount_job = None
+
+        # 没有新的修改, 不需要校验
+        if not self._stale and self.revision == self._verified_revision:
+            return
+
+        # 上一次统计尚未完成或用户仍在编辑, 稍后再试
+        busy = self._recount_thread is not None and self._recount_thread.is_alive()
+        if busy or time.monotonic() - self._last_edit_time < IDLE_SECONDS:
+            self._schedule_recount(STALE_RECOUNT_DELAY, replace=True)
+            return
+
+        revision = self.revision
+        text = self.text.get("1.0", "end-1c")
+        self._recount_result = None
+
+        def worker():
+            try:
+                self._recount_result = (revision, StatsEngine(text).run())
+            except Exception as e:
+                logger.error(f"后台全量统计失败: {e}")
+                self._recount_result = (revision, None)
+
+        self._recount_thread = threading.Thread(target=worker, daemon=True)
+        self._recount_thread.start()
+        self.app.after(RECOUNT_POLL_INTERVAL, self._check_recount)
+
+    def _check_recount(self):
+        """轮询后台统计结果, 版本号未变化时才应用"""
+        if self._recount_thread is not None and self._recount_thread.is_alive():
+            self.app.after(RECOUNT_POLL_INTERVAL, self._check_recount)
+            return
+
+        self._recount_thread = None
+        if self._recount_result is None:
+            return
+
+        revision, stats = self._recount_result
+        self._recount_result = None
+
+        if stats is None or revision != self.revision:
+            # 统计期间又有修改, 重新安排
+            self._schedule_recount(STALE_RECOUNT_DELAY, replace=True)
+            return
+
+        totals = {key: stats[key] for key in COUNTER_KEYS}
+        if not self._stale and totals != self._totals:
+            logger.warning("增量统计与全量统计结果不一致, 已使用全量统计结果校正")
+
+        self._totals = totals
+        self.char_count = stats["total_chars"]
+        self._stale = False
+        self._verified_revision = revision
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+界面更新调度模块
+各界面组件只标记自身需要更新, 由调度器按帧合并, 每帧中每个更新函数最多执行一次
+"""
+
+import time
+from loguru import logger
+
+# 两次刷新之间的最小间隔（毫秒）, 约等于60帧每秒
+FRAME_INTERVAL = 16
+
+
+class UIUpdateScheduler:
+    """
+    界面更新调度器类
+
+    通过register注册更新函数, 通过mark_dirty标记需要更新的组件,
+    同一帧内的多次标记只会触发一次刷新, 刷新时按注册顺序执行各更新函数,
+    并记录每个更新函数的执行耗时, 便于性能分析
+    """
+
+    def __init__(self, widget, frame_interval=FRAME_INTERVAL):
+        """
+        初始化界面更新调度器
+
+        Args:
+            widget: 用于调度定时任务的Tk组件, 通常为主窗口
+            frame_interval (int): 两次刷新之间的最小间隔（毫秒）
+        """
+        self.widget = widget
+        self.frame_interval = frame_interval
+
+        self._updaters = {}  # 更新函数名称到回调的映射, 保持注册顺序
+        self._dirty = set()  # 待更新的组件名称
+        self._job = None  # 已安排的刷新任务
+        self._last_flush_time = 0.0  # 上次刷新的时间
+        self._timings = {}  # 各更新函数的耗时统计
+
+    def register(self, name, callback):
+        """
+        注册更新函数
+
+        Args:
+            name (str): 组件名称
+            callback (callable): 无参数的更新函数
+        """
+        self._updaters[name] = callback
+        self._timings[name] = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+
+    def mark_dirty(self, *names):
+        """
+        标记组件需要更新, 并安排下一帧刷新
+
+        Args:
+            *names (str): 组件名称, 不传时标记全部已注册的组件
+        """
+        for name in names or self._updaters:
+            if name not in self._updaters:
+                logger.warning(f"未注册的界面更新组件: {name}")
+                continue
+            self._dirty.add(name)
+
+        if self._dirty:
+            self._schedule()
+
+    def _schedule(self):
+        """安排刷新任务, 距上次刷新不足一帧时延迟到下一帧"""
+        if self._job is not None:
+            return
+
+        elapsed = (time.perf_counter() - self._last_flush_time) * 1000
+        try:
+            if elapsed >= self.frame_interval:
+                self._job = self.widget.after_idle(self.flush)
+            else:
+                delay = max(1, int(self.frame_interval - elapsed))
+                self._job = self.widget.after(delay, self.flush)
+        except Exception as e:
+            # 窗口已销毁时无法再安排任务
+            logger.debug(f"安排界面刷新失败: {e}")
+            self._job = None
+
+    def flush(self):
+        """立即执行所有待更新组件的更新函数"""
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+        self._last_flush_time = time.perf_counter()
+
+        # 先取出再清空, 更新函数执行期间的新标记会安排到下一帧
+        dirty = self._dirty
+        self._dirty = set()
+
+        for name, callback in self._updaters.items():
+            if name not in dirty:
+                continue
+
+            start = time.perf_counter()
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"界面更新组件 {name} 执行失败: {e}")
+            finally:
+                self._record_timing(name, time.perf_counter() - start)
+
+    def cancel(self):
+        """取消已安排的刷新任务并清空待更新标记"""
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+        self._dirty.clear()
+
+    def _record_timing(self, name, elapsed):
+        """记录更新函数的执行耗时（秒）"""
+        timing = self._timings[name]
+        timing["count"] += 1
+        timing["total"] += elapsed
+        timing["last"] = elapsed
+        timing["max"] = max(timing["max"], elapsed)
+
+    def get_timings(self):
+        """
+        获取各更新函数的耗时统计
+
+        Returns:
+            dict: 组件名称到统计信息的映射, 统计信息包含执行次数count,
+                总耗时total_ms, 平均耗时avg_ms, 最大耗时max_ms和最近一次耗时last_ms
+        """
+        result = {}
+        for name, timing in self._timings.items():
+            count = timing["count"]
+            result[name] = {
+                "count": count,
+                "total_ms": timing["total"] * 1000,
+                "avg_ms": timing["total"] * 1000 / count if count else 0.0,
+                "max_ms": timing["max"] * 1000,
+                "last_ms": timing["last"] * 1000,
+            }
+        return result
+
+    def reset_timings(self):
+        """清空耗时统计"""
+        for name in self._timings:
+            self._timings[name] = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
@@ -0,0 +1,764 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+撤销日志模块
+以紧凑的增量记录每次修改, 取代Tk自带的撤销栈: 内存中的撤销步骤超过预算时,
+较旧的步骤写入磁盘日志; 关闭文件时撤销历史保存到配置目录,
+重新打开同一文件且内容哈希一致时恢复
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from loguru import logger
+
+# 内存中撤销步骤的默认预算（字节）
+DEFAULT_MEMORY_BUDGET = 8 * 1024 * 1024
+
+# 每个增量的固定开销估算（字节）
+DELTA_OVERHEAD = 128
+
+# 撤销历史文件的格式版本
+HISTORY_VERSION = 1
+
+# 撤销历史目录中最多保留的文件数, 超过时删除最久未使用的
+MAX_HISTORY_FILES = 50
+
+# 记录修改后的结束位置使用的标记, 右侧重力使其停在插入文本之后
+_END_MARK = "undo_journal_end"
+
+# 增量中各字段的位置: [起始索引, 修改前结束索引, 修改后结束索引, 删除的文本, 插入的文本]
+_START, _OLD_END, _NEW_END, _DELETED, _INSERTED = range(5)
+
+
+def _delta_kind(delta):
+    """获取增量类型, 用于判断连续输入能否合并"""
+    if not delta[_DELETED]:
+        return "insert"
+    if not delta[_INSERTED]:
+        return "delete"
+    return "replace"
+
+
+def _delta_size(delta):
+    """估算增量占用的内存"""
+    return len(delta[_DELETED]) + len(delta[_INSERTED]) + DELTA_OVERHEAD
+
+
+def content_hash(text):
+    """
+    计算文本内容的哈希值, 用于校验撤销历史是否属于当前内容
+
+    Args:
+        text (str): 文本内容
+
+    Returns:
+        str: 十六进制SHA-256摘要
+    """
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class UndoStep:
+    """
+    撤销步骤类
+
+    一个步骤包含一次操作产生的所有增量; 写入磁盘后只保留文件位置, 需要时再读回
+    """
+
+    __slots__ = ("deltas", "size", "location", "mergeable")
+
+    def __init__(self, deltas):
+        """
+        初始化撤销步骤
+
+        Args:
+            deltas (list): 增量列表, 按修改顺序排列
+        """
+        self.deltas = deltas
+        self.size = sum(_delta_size(delta) for delta in deltas)
+        self.location = None  # 写入磁盘后为 (文件, 偏移, 长度)
+        self.mergeable = True  # 是否允许与之后的连续输入合并
+
+    @classmethod
+    def from_location(cls, location):
+        """
+        创建只记录磁盘位置的撤销步骤, 用于恢复保存的撤销历史
+
+        Args:
+            location (tuple): (文件, 偏移, 长度)
+        """
+        step = cls([])
+        step.deltas = None
+        step.location = location
+        step.mergeable = False
+        return step
+
+    @property
+    def spilled(self):
+        """步骤是否已写入磁盘"""
+        return self.deltas is None
+
+    def load(self):
+        """
+        获取步骤的增量, 已写入磁盘时从文件读回
+
+        Returns:
+            list: 增量列表
+        """
+        if self.deltas is not None:
+            return self.deltas
+        file, offset, length = self.location
+        file.seek(offset)
+        return json.loads(file.read(length).decode("ascii"))
+
+    def spill(self, file):
+        """
+        把增量追加写入磁盘日志并释放内存
+
+        Args:
+            file: 以二进制读写模式打开的日志文件
+        """
+        data = json.dumps(self.deltas).encode("ascii")
+        file.seek(0, os.SEEK_END)
+        offset = file.tell()
+        file.write(data)
+        self.location = (file, offset, len(data))
+        self.deltas = None
+
+
+class UndoJournal:
+    """
+    撤销日志类
+
+    作为TextChangeProxy的观察者记录每次修改; 同一次事件处理中的所有修改
+    在空闲时合并为一个撤销步骤, 相邻的连续输入或连续退格进一步合并为一个步骤
+    """
+
+    def __init__(
+        self,
+        app,
+        text_widget,
+        memory_budget=DEFAULT_MEMORY_BUDGET,
+        max_steps=0,
+        history_dir=None,
+    ):
+        """
+        初始化撤销日志
+
+        Args:
+            app: 应用程序实例, 用于调度空闲任务
+            text_widget: 底层tk.Text组件
+            memory_budget (int): 内存中撤销步骤的预算（字节）
+            max_steps (int): 最多保留的撤销步骤数, 0表示不限制
+            history_dir (str, optional): 撤销历史保存目录, 为None时不保存
+        """
+        self.app = app
+        self.text = text_widget
+        self.memory_budget = memory_budget
+        self.max_steps = max_steps
+        self.history_dir = history_dir
+
+        self._undo_stack = []
+        self._redo_stack = []
+        self._memory = 0  # 内存中撤销步骤占用的字节数估算
+
+        self._group = None  # 当前事件中尚未结束的增量列表
+        self._close_job = None  # 结束当前步骤的空闲任务
+        self._separator = False  # 下一个步骤不与上一个步骤合并
+        self._pending = None  # 修改前记录的信息
+        self._applying = False  # 正在执行撤销或重做, 不记录自身的修改
+
+        self._spill_file = None  # 本次会话的磁盘日志
+        self._spill_dead = 0  # 磁盘日志中已丢弃步骤占用的字节数
+        self._history_file = None  # 恢复的撤销历史文件
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    @property
+    def can_undo(self):
+        """是否有可撤销的步骤"""
+        return bool(self._undo_stack or self._group)
+
+    @property
+    def can_redo(self):
+        """是否有可重做的步骤"""
+        return bool(self._redo_stack) and not self._group
+
+    @property
+    def memory_usage(self):
+        """内存中撤销步骤占用的字节数估算"""
+        return self._memory
+
+    def separator(self):
+        """结束当前撤销步骤, 之后的修改不会与之前的修改合并"""
+        self._close_group()
+        self._separator = True
+
+    def undo(self):
+        """
+        撤销上一个步骤
+
+        Returns:
+            bool: 没有可撤销的步骤时返回False
+        """
+        self._close_group()
+        if not self._undo_stack:
+            return False
+
+        step = self._undo_stack.pop()
+        deltas = step.load()
+
+        # 逆序把每个增量的插入文本换回删除的文本
+        self._apply(
+            (delta[_START], delta[_NEW_END], delta[_DELETED])
+            for delta in reversed(deltas)
+        )
+        self._place_cursor(deltas[0][_START])
+
+        step.mergeable = False
+        self._redo_stack.append(step)
+        self._separator = True
+        return True
+
+    def redo(self):
+        """
+        重做上一个撤销的步骤
+
+        Returns:
+            bool: 没有可重做的步骤时返回False
+        """
+        self._close_group()
+        if not self._redo_stack:
+            return False
+
+        step = self._redo_stack.pop()
+        deltas = step.load()
+
+        self._apply(
+            (delta[_START], delta[_OLD_END], delta[_INSERTED]) for delta in deltas
+        )
+        self._place_cursor(deltas[-1][_NEW_END])
+
+        self._undo_stack.append(step)
+        self._separator = True
+        return True
+
+    @contextmanager
+    def paused(self):
+        """暂停记录修改, 用于撤销、重做和切换文档时整体替换文本等不应记录的修改"""
+        applying = self._applying
+        self._applying = True
+        try:
+            yield
+        finally:
+            self._applying = applying
+
+    def reset(self):
+        """清空撤销和重做步骤, 并关闭磁盘日志"""
+        self._cancel_close_job()
+        self._group = None
+        self._pending = None
+        self._separator = False
+        self._undo_stack = []
+        self._redo_stack = []
+        self._memory = 0
+
+        for file in (self._spill_file, self._history_file):
+            if file is not None:
+                try:
+                    file.close()
+                except OSError as e:
+                    logger.debug(f"关闭撤销日志文件失败: {e}")
+        self._spill_file = None
+        self._spill_dead = 0
+        self._history_file = None
+
+    def suspend(self):
+        """
+        取出当前的撤销和重做步骤, 用于切换到其他文档
+
+        内存中的步骤全部写入磁盘日志, 挂起的文档不占用撤销内存,
+        返回的状态交给resume恢复
+
+        Returns:
+            Optional[tuple]: 撤销状态, 没有任何步骤时返回None
+        """
+        self._close_group()
+        if not self._undo_stack and not self._redo_stack:
+            self.reset()
+            return None
+
+        try:
+            for stack in (self._undo_stack, self._redo_stack):
+                for step in stack:
+                    if step.spilled:
+                        continue
+                    if self._spill_file is None:
+                        self._spill_file = tempfile.TemporaryFile("w+b")
+                    step.spill(self._spill_file)
+        except OSError as e:
+            # 写入失败的步骤留在内存中, 恢复时重新计入预算
+            logger.error(f"撤销步骤写入磁盘失败: {e}")
+
+        state = (
+            self._undo_stack,
+            self._redo_stack,
+            self._spill_file,
+            self._history_file,
+        )
+
+        # 日志文件已转交给挂起的状态, 不能在reset中关闭
+        self._spill_file = None
+        self._history_file = None
+        self.reset()
+        return state
+
+    def resume(self, state):
+        """
+        恢复suspend取出的撤销和重做步骤, 替换当前的步骤
+
+        Args:
+            state (Optional[tuple]): suspend返回的撤销状态
+        """
+        self.reset()
+        if state is None:
+            return
+
+        undo_stack, redo_stack, spill_file, history_file = state
+        self._undo_stack = undo_stack
+        self._redo_stack = redo_stack
+        self._spill_file = spill_file
+        self._history_file = history_file
+        self._memory = sum(
+            step.size for step in undo_stack + redo_stack if not step.spilled
+        )
+        if spill_file is not None:
+            try:
+                live = sum(
+                    step.location[2]
+                    for step in undo_stack + redo_stack
+                    if step.spilled and step.location[0] is spill_file
+                )
+                self._spill_dead = spill_file.seek(0, os.SEEK_END) - live
+            except OSError as e:
+                logger.debug(f"读取撤销日志大小失败: {e}")
+        self._enforce_budget()
+
+    def save_history(self, file_path):
+        """
+        保存撤销历史, 保存后清空当前日志
+
+        应在文件内容与磁盘上的文件一致时调用, 例如关闭已保存的文件时
+
+        Args:
+            file_path (str): 撤销历史所属的文件路径
+
+        Returns:
+            bool: 是否保存成功
+        """
+        self._close_group()
+        if not self.history_dir or not self._undo_stack:
+            self.reset()
+            return False
+
+        history_path = self._history_path(file_path)
+        temp_path = f"{history_path}.tmp"
+        try:
+            os.makedirs(self.history_dir, exist_ok=True)
+            header = {
+                "version": HISTORY_VERSION,
+                "file_path": os.path.abspath(file_path),
+                "content_hash": content_hash(self.text.get("1.0", "end-1c")),
+                "saved_at": time.time(),
+            }
+
+            # 已写入磁盘的步骤逐个读回写出, 不会同时全部载入内存
+            with open(temp_path, "wb") as f:
+                f.write(json.dumps(header).encode("ascii") + b"\n")
+                for step in self._undo_stack:
+                    if step.spilled:
+                        file, offset, length = step.location
+                        file.seek(offset)
+                        data = file.read(length)
+                    else:
+                        data = json.dumps(step.deltas).encode("ascii")
+                    f.write(data + b"\n")
+
+            # 替换前先关闭可能指向旧历史文件的句柄
+            self.reset()
+            os.replace(temp_path, history_path)
+            self._prune_history()
+            return True
+
+        except Exception as e:
+            logger.error(f"保存撤销历史失败: {e}")
+            self.reset()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+    def load_history(self, file_path):
+        """
+        恢复文件的撤销历史, 当前内容的哈希与保存时不一致则丢弃历史
+
+        Args:
+            file_path (str): 文件路径
+
+        Returns:
+            bool: 是否恢复了撤销历史
+        """
+        self.reset()
+        if not self.history_dir:
+            return False
+
+        history_path = self._history_path(file_path)
+        if not os.path.exists(history_path):
+            return False
+
+        try:
+            file = open(history_path, "rb")
+        except OSError as e:
+            logger.error(f"打开撤销历史失败: {e}")
+            return False
+
+        try:
+            header = json.loads(file.readline().decode("ascii"))
+            valid = (
+                header.get("version") == HISTORY_VERSION
+                and header.get("file_path") == os.path.abspath(file_path)
+                and header.get("content_hash")
+                == content_hash(self.text.get("1.0", "end-1c"))
+            )
+
+            # 只记录每个步骤在文件中的位置, 撤销到该步骤时再读取
+            steps = []
+            while valid:
+                offset = file.tell()
+                line = file.readline()
+                if not line:
+                    break
+                location = (file, offset, len(line.rstrip(b"\n")))
+                steps.append(UndoStep.from_location(location))
+        except (ValueError, OSError) as e:
+            logger.warning(f"撤销历史已损坏: {e}")
+            valid = False
+
+        if not valid or not steps:
+            file.close()
+            self._remove_history(history_path)
+            return False
+
+        self._history_file = file
+        self._undo_stack = steps
+        self._trim_steps()
+        logger.info(f"已恢复 {len(self._undo_stack)} 个撤销步骤: {file_path}")
+        return True
+
+    # ------------------------------------------------------------------
+    # TextChangeProxy观察者接口
+    # ------------------------------------------------------------------
+
+    def before_change(self, operation, *args):
+        """
+        修改前记录起止位置和将被删除的文本
+
+        Args:
+            operation (str): insert, delete 或 replace
+            *args: 传给Tk的原始参数
+        """
+        self._pending = None
+        if self._applying or not args:
+            return
+
+        # 只读状态下Tk会忽略修改
+        text = self.text
+        if str(text.cget("state")) == "disabled":
+            return
+
+        if operation == "insert":
+            start = self._clamp(text.index(args[0]))
+            old_end = start
+            deleted = ""
+            inserted = "".join(args[1::2])
+        elif operation == "delete" and len(args) <= 2:
+            start = self._clamp(text.index(args[0]))
+            end = args[1] if len(args) == 2 else f"{start}+1c"
+            old_end = self._clamp(text.index(end))
+            deleted = text.get(start, old_end)
+            inserted = ""
+        elif operation == "replace" and len(args) >= 3:
+            start = self._clamp(text.index(args[0]))
+            old_end = self._clamp(text.index(args[1]))
+            deleted = text.get(start, old_end)
+            inserted = "".join(args[2::2])
+        else:
+            # 一次删除多个范围等少见情况, 记录为整个文档的替换
+            start = "1.0"
+            old_end = text.index("end-1c")
+            deleted = text.get("1.0", "end-1c")
+            inserted = None
+
+        if inserted == "" and not deleted:
+            return
+
+        # 修改后该标记位于新文本的末尾
+        text.mark_set(_END_MARK, old_end)
+        text.mark_gravity(_END_MARK, "right")
+        self._pending = (start, old_end, deleted, inserted)
+
+    def after_change(self, operation, *args):
+        """
+        修改后记录新文本的结束位置, 并把增量加入当前步骤
+
+        Args:
+            operation (str): insert, delete 或 replace
+            *args: 传给Tk的原始参数
+        """
+        if self._pending is None:
+            return
+
+        start, old_end, deleted, inserted = self._pending
+        self._pending = None
+
+        new_end = self.text.index(_END_MARK)
+        if inserted is None:
+            inserted = self.text.get("1.0", "end-1c")
+        if deleted == inserted:
+            return
+
+        if self._group is None:
+            self._group = []
+            # 新的修改使重做步骤失效
+            self._drop_redo()
+            try:
+                self._close_job = self.app.after_idle(self._close_group)
+            except Exception as e:
+                logger.debug(f"安排撤销步骤结束任务失败: {e}")
+
+        self._group.append([start, old_end, new_end, deleted, inserted])
+
+    # ------------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------------
+
+    def _clamp(self, index):
+        """Tk不会修改末尾自动追加的换行符, 超过该位置的索引截断到末尾"""
+        if self.text.compare(index, ">", "end-1c"):
+            return self.text.index("end-1c")
+        return index
+
+    def _cancel_close_job(self):
+        """取消尚未执行的步骤结束任务"""
+        if self._close_job is not None:
+            try:
+                self.app.after_cancel(self._close_job)
+            except Exception:
+                pass
+            self._close_job = None
+
+    def _close_group(self):
+        """结束当前步骤, 可以合并时并入上一个步骤"""
+        self._cancel_close_job()
+        group = self._group
+        self._group = None
+        if not group:
+            return
+
+        separator = self._separator
+        self._separator = False
+
+        if not separator and self._merge_into_top(group):
+            return
+
+        step = UndoStep(group)
+        self._undo_stack.append(step)
+        self._memory += step.size
+        self._trim_steps()
+        self._enforce_budget()
+
+    def _merge_into_top(self, group):
+        """
+        把单个增量合并到上一个步骤, 用于连续输入和连续退格
+
+        Returns:
+            bool: 是否已合并
+        """
+        if len(group) != 1 or not self._undo_stack:
+            return False
+
+        top = self._undo_stack[-1]
+        if top.spilled or not top.mergeable or len(top.deltas) != 1:
+            return False
+
+        previous, current = top.deltas[0], group[0]
+        kind = _delta_kind(current)
+        if kind != _delta_kind(previous):
+            return False
+
+        if kind == "insert" and current[_START] == previous[_NEW_END]:
+            # 在上次输入的末尾继续输入
+            previous[_INSERTED] += current[_INSERTED]
+            previous[_NEW_END] = current[_NEW_END]
+        elif kind == "delete" and current[_OLD_END] == previous[_START]:
+            # 在上次删除的位置继续向前删除
+            previous[_DELETED] = current[_DELETED] + previous[_DELETED]
+            previous[_START] = current[_START]
+            previous[_NEW_END] = current[_START]
+        else:
+            return False
+
+        size = _delta_size(previous)
+        self._memory += size - top.size
+        top.size = size
+        self._enforce_budget()
+        return True
+
+    def _drop_redo(self):
+        """丢弃所有重做步骤"""
+        if not self._redo_stack:
+            return
+        steps = self._redo_stack
+        self._redo_stack = []
+        self._discard(steps)
+
+    def _trim_steps(self):
+        """丢弃超过数量上限的最旧撤销步骤"""
+        if self.max_steps <= 0:
+            return
+        excess = len(self._undo_stack) - self.max_steps
+        if excess <= 0:
+            return
+        steps = self._undo_stack[:excess]
+        del self._undo_stack[:excess]
+        self._discard(steps)
+
+    def _discard(self, steps):
+        """
+        释放已从撤销或重做栈中移除的步骤
+
+        内存中的步骤从预算中扣除, 磁盘日志中的步骤计为失效字节,
+        失效字节超过仍在使用的字节时压缩磁盘日志
+
+        Args:
+            steps (list): 已移除的步骤
+        """
+        for step in steps:
+            if not step.spilled:
+                self._memory -= step.size
+            elif self._spill_file is not None and step.location[0] is self._spill_file:
+                self._spill_dead += step.location[2]
+
+        if self._spill_dead:
+            try:
+                size = self._spill_file.seek(0, os.SEEK_END)
+                if self._spill_dead > size - self._spill_dead:
+                    self._compact_spill_file()
+            except OSError as e:
+                logger.error(f"压缩撤销日志失败: {e}")
+
+    def _compact_spill_file(self):
+        """
+        把仍在使用的步骤逐个复制到新的磁盘日志, 更新它们的位置后关闭旧日志
+
+        Raises:
+            OSError: 读写日志失败, 此时继续使用旧日志
+        """
+        old_file = self._spill_file
+        new_file = tempfile.TemporaryFile("w+b")
+        locations = []
+        try:
+            for stack in (self._undo_stack, self._redo_stack):
+                for step in stack:
+                    if not step.spilled or step.location[0] is not old_file:
+                        continue
+                    _, offset, length = step.location
+                    old_file.seek(offset)
+                    locations.append((step, (new_file, new_file.tell(), length)))
+                    new_file.write(old_file.read(length))
+        except OSError:
+            new_file.close()
+            raise
+
+        for step, location in locations:
+            step.location = location
+        self._spill_file = new_file
+        self._spill_dead = 0
+        try:
+            old_file.close()
+        except OSError as e:
+            logger.debug(f"关闭撤销日志文件失败: {e}")
+
+    def _enforce_budget(self):
+        """内存超过预算时, 依次把最旧的撤销步骤和最远的重做步骤写入磁盘"""
+        if self._memory <= self.memory_budget:
+            return
+
+        try:
+            if self._spill_file is None:
+                self._spill_file = tempfile.TemporaryFile("w+b")
+
+            for stack in (self._undo_stack, self._redo_stack):
+                for step in stack:
+                    if self._memory <= self.memory_budget:
+                        return
+                    if step.spilled:
+                        continue
+                    self._memory -= step.size
+                    step.spill(self._spill_file)
+        except OSError as e:
+            logger.error(f"撤销步骤写入磁盘失败: {e}")
+
+    def _apply(self, replacements):
+        """
+        依次执行替换, 不记录到撤销日志
+
+        Args:
+            replacements (iterable): (起始索引, 结束索引, 新文本) 元组
+        """
+        with self.paused():
+            for start, end, new_text in replacements:
+                if self.text.compare(start, "<", end):
+                    self.text.delete(start, end)
+                if new_text:
+                    self.text.insert(start, new_text)
+
+    def _place_cursor(self, index):
+        """把光标移动到撤销或重做的位置并滚动到可见"""
+        self.text.mark_set("insert", index)
+        self.text.see("insert")
+
+    def _history_path(self, file_path):
+        """获取文件对应的撤销历史路径"""
+        key = hashlib.sha1(
+            os.path.abspath(file_path).encode("utf-8", "surrogatepass")
+        ).hexdigest()
+        return os.path.join(self.history_dir, f"{key}.jsonl")
+
+    def _remove_history(self, history_path):
+        """删除失效的撤销历史"""
+        try:
+            os.remove(history_path)
+        except OSError as e:
+            logger.debug(f"删除撤销历史失败: {e}")
+
+    def _prune_history(self):
+        """撤销历史文件过多时删除最久未使用的"""
+        try:
+            paths = [
+                os.path.join(self.history_dir, name)
+                for name in os.listdir(self.history_dir)
+                if name.endswith(".jsonl")
+            ]
+            if len(paths) <= MAX_HISTORY_FILES:
+                return
+            paths.sort(key=os.path.getmtime)
+            for path in paths[: len(paths) - MAX_HISTORY_FILES]:
+                self._remove_history(path)
+        except OSError as e:
+            logger.debug(f"清理撤销历史失败: {e}")
@@ -13,6 +13,7 @@ from .config_manager import (
     DEFAULT_CONFIG,
     merge_configs,
 )
+from .config_snapshot import ConfigSnapshot
 
 __all__ = [
     "ConfigManager",
@@ -20,4 +21,5 @@ __all__ = [
     "CONFIG_PATH",
     "DEFAULT_CONFIG",
     "merge_configs",
+    "ConfigSnapshot",
 ]
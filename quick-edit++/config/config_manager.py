@@ -8,9 +8,13 @@
 import os
 import json
 import copy
+import atexit
+import tempfile
+import threading
 from tkinter import messagebox
 from pathlib import Path
 from loguru import logger
+from .config_snapshot import ConfigSnapshot
 
 # 应用程序常量
 APP_VERSION = "v0.0.36"  # 版本号
@@ -23,6 +27,12 @@ APP_CONFIG_DIR = os.path.join(str(Path.home()), ".QuickEditPlus")
 CONFIG_FILE_NAME = "config.json"
 CONFIG_PATH = os.path.join(APP_CONFIG_DIR, CONFIG_FILE_NAME)
 
+# 保存配置后延迟写入文件的时间（秒）, 期间的多次保存合并为一次写入
+SAVE_DELAY = 0.5
+
+# 配置值缓存中表示配置项不存在的标记
+_MISSING = object()
+
 # 默认配置字段
 DEFAULT_CONFIG = {
     # 应用程序全局设置
@@ -44,6 +54,7 @@ DEFAULT_CONFIG = {
         "truncate_path_length": 50,  # 文件路径截断显示的最大字符数
         "file_dialog_initial_dir": "",  # 文件选择器初始路径，空字符串表示使用系统默认路径
         "app_name": "QuickEdit++",  # 应用程序名称
+        "single_instance": True,  # 是否启用单实例模式, 之后的启动把文件转发给已运行的编辑器
     },
     # 文件监听器配置
     "file_watcher": {
@@ -71,6 +82,9 @@ DEFAULT_CONFIG = {
         "line_number_bg_color_dark": "#2b2b2b",  # 行号背景色（深色模式）
         "line_number_font_color": "#2b91af",  # 行号字体颜色
         "max_undo": 50,  # 最大撤销次数
+        "undo_memory_budget": 8388608,  # 撤销日志的内存预算（字节）, 超出后旧的撤销步骤写入磁盘
+        "persist_undo_history": True,  # 关闭文件时是否保存撤销历史, 重新打开时恢复
+        "persist_bookmarks": True,  # 关闭文件时是否保存书签, 重新打开时恢复
         "show_line_numbers": True,  # 是否显示行号
         "auto_increment_number": True,  # 是否启用自动递增编号功能
         "highlight_current_line": True,  # 是否启用光标所在行高亮
@@ -98,6 +112,14 @@ DEFAULT_CONFIG = {
         "font_size": 12,
         "font_bold": True,
     },
+    # 标签栏配置
+    "tab_bar": {
+        "show_tab_bar": True,  # 是否显示文档标签栏
+        "font": "Microsoft YaHei UI",
+        "font_size": 12,
+        "font_bold": False,
+        "max_title_length": 24,  # 标签标题显示的最大字符数
+    },
     # 组件默认字体配置
     "components": {
         "font": "Microsoft YaHei UI",
@@ -193,9 +215,24 @@ class ConfigManager:
 
     def __init__(self):
         """初始化配置管理器"""
+        self._lock = threading.Lock()  # 保护待写入的配置文本和写入定时器
+        self._write_lock = threading.Lock()  # 保证同一时间只有一个线程写入配置文件
+        self._pending = None  # 待写入的配置文本, 为None表示没有未写入的修改
+        self._save_timer = None  # 延迟写入定时器
+        self._subscribers = {}  # 配置键路径 -> 变更回调列表
+
+        # 查找缓存, 修改配置后版本号递增并清空值缓存和快照缓存
+        self.version = 0  # 配置版本号
+        self._key_cache = {}  # 配置键路径 -> 拆分后的键元组, 与配置内容无关, 不会失效
+        self._value_cache = {}  # 配置键路径 -> 配置值
+        self._snapshot_cache = {}  # 组件名称 -> 配置快照
+
         # 加载配置文件
         self.load_config()
 
+        # 退出时写入尚未写入的配置
+        atexit.register(self.flush)
+
         logger.info("config manager initialized successfully!")
         logger.info(f"config file path: {CONFIG_PATH}")
 
@@ -207,7 +244,10 @@ class ConfigManager:
             - 如果配置目录不存在，先创建配置目录
             - 如果配置文件不存在，先保存默认配置，然后使用默认配置
             - 如果配置文件存在但解析失败，使用默认配置
+            - 加载前先写入尚未写入的配置, 加载后通知所有订阅者
         """
+        self.flush()
+
         # 确保配置目录存在
         if not os.path.exists(APP_CONFIG_DIR):
             os.makedirs(APP_CONFIG_DIR, exist_ok=True)
@@ -217,6 +257,8 @@ class ConfigManager:
             # 保存默认配置
             self.save_config(DEFAULT_CONFIG)
             self.config = copy.deepcopy(DEFAULT_CONFIG)
+            self._invalidate_cache()
+            self._notify()
             return
 
         try:
@@ -237,6 +279,9 @@ class ConfigManager:
                 "配置文件错误", f"配置文件读取失败，已返回默认配置\n错误信息: {str(e)}"
             )
 
+        self._invalidate_cache()
+        self._notify()
+
     def save_config(self, config=None):
         """
         保存配置到文件
@@ -245,34 +290,148 @@ class ConfigManager:
             config (dict, optional): 要保存的配置字典，如果为None则保存当前配置
 
         Returns:
-            bool: 是否保存成功
+            bool: 是否已提交保存
 
         说明：
-            - 确保配置目录存在
-            - 使用UTF-8编码保存
+            - 调用时立即序列化配置, 之后对配置的修改不影响本次保存
+            - 文件在SAVE_DELAY秒后由后台线程写入, 期间的多次保存只写入最后一次
+            - 写入临时文件后替换配置文件, 写入中断不会损坏原文件
+            - 需要立即写入时调用flush
         """
         try:
             # 使用传入的配置或当前配置
             config_to_save = config if config is not None else self.config
+            data = json.dumps(config_to_save, ensure_ascii=False, indent=2)
+        except (TypeError, ValueError) as e:
+            logger.error(f"配置序列化失败: {e}")
+            return False
+
+        with self._lock:
+            self._pending = data
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+        return True
+
+    def flush(self):
+        """
+        立即写入尚未写入的配置
+
+        Returns:
+            bool: 是否写入成功, 没有需要写入的配置时返回True
+        """
+        with self._write_lock:
+            with self._lock:
+                data = self._pending
+                self._pending = None
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+
+            if data is None:
+                return True
+
+            if self._write_config(data):
+                return True
+
+            # 写入失败时保留待写入的配置, 下次保存或退出时重试
+            with self._lock:
+                if self._pending is None:
+                    self._pending = data
+            return False
+
+    @property
+    def is_dirty(self):
+        """是否有尚未写入文件的配置"""
+        return self._pending is not None
 
+    def _write_config(self, data):
+        """
+        把配置文本写入临时文件, 再替换配置文件
+
+        Args:
+            data (str): 配置文本
+
+        Returns:
+            bool: 是否写入成功
+        """
+        temp_path = None
+        try:
             # 确保配置目录存在
             os.makedirs(APP_CONFIG_DIR, exist_ok=True)
 
-            # 保存配置文件
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                json.dump(config_to_save, f, ensure_ascii=False, indent=2)
-
-            # 如果保存的是当前配置，则更新内部状态
-            if config is None:
-                self.config = config_to_save
+            # 临时文件与配置文件在同一目录, 保证替换是原子操作
+            fd, temp_path = tempfile.mkstemp(
+                prefix=f"{CONFIG_FILE_NAME}.", suffix=".tmp", dir=APP_CONFIG_DIR
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, CONFIG_PATH)
             return True
 
-        except IOError as e:
+        except OSError as e:
             # 保存失败
             logger.error(f"配置文件保存失败: {e}")
-            print(f"配置文件保存失败: {e}")
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
             return False
 
+    def subscribe(self, key_path, callback):
+        """
+        订阅配置项变更
+
+        修改该配置项、其下级或上级配置项, 以及重新加载或重置配置时调用回调
+
+        Args:
+            key_path (str): 配置键路径，如 "app.theme_mode" 或 "text_editor"
+            callback (callable): 回调函数, 参数为 (key_path, 当前值)
+        """
+        callbacks = self._subscribers.setdefault(key_path, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def unsubscribe(self, key_path, callback):
+        """
+        取消订阅配置项变更
+
+        Args:
+            key_path (str): 订阅时的配置键路径
+            callback (callable): 订阅时的回调函数
+        """
+        callbacks = self._subscribers.get(key_path)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._subscribers[key_path]
+
+    def _notify(self, changed_path=None):
+        """
+        通知受影响的订阅者
+
+        Args:
+            changed_path (str, optional): 被修改的配置键路径, 为None时通知所有订阅者
+        """
+        for key_path, callbacks in list(self._subscribers.items()):
+            if changed_path is not None and not (
+                key_path == changed_path
+                or key_path.startswith(f"{changed_path}.")
+                or changed_path.startswith(f"{key_path}.")
+            ):
+                continue
+
+            value = self.get(key_path)
+            for callback in list(callbacks):
+                try:
+                    callback(key_path, value)
+                except Exception as e:
+                    logger.error(f"配置变更回调执行失败: {key_path}, 错误: {e}")
+
     def get(self, key_path, default=None):
         """
         获取配置项
@@ -283,8 +442,33 @@ class ConfigManager:
 
         Returns:
             配置值或默认值
+
+        说明：
+            - 查找结果按键路径缓存, 修改或重新加载配置后失效
+            - 返回的字典和列表是配置本身而不是副本, 修改后需要调用set
         """
-        keys = key_path.split(".")
+        value = self._value_cache.get(key_path, _MISSING)
+        if value is _MISSING:
+            value = self._lookup(key_path)
+            self._value_cache[key_path] = value
+
+        # 值为None时返回默认值
+        return default if value is None else value
+
+    def _lookup(self, key_path):
+        """
+        按键路径逐级查找配置值
+
+        Args:
+            key_path (str): 配置键路径
+
+        Returns:
+            配置值, 配置项不存在时返回None
+        """
+        keys = self._key_cache.get(key_path)
+        if keys is None:
+            keys = self._key_cache[key_path] = tuple(key_path.split("."))
+
         value = self.config
 
         # 使用字典的 get 方法逐级获取配置值
@@ -292,12 +476,18 @@ class ConfigManager:
             for key in keys:
                 value = value.get(key)  # 获取当前键对应的值
                 if value is None:
-                    return default  # 如果值为None, 返回默认值
+                    return None
             return value
 
         except AttributeError:
-            # 如果配置结构不符合预期（例如中间节点不是字典），返回默认值
-            return default
+            # 如果配置结构不符合预期（例如中间节点不是字典），返回None
+            return None
+
+    def _invalidate_cache(self):
+        """配置修改后递增版本号并清空查找缓存"""
+        self.version += 1
+        self._value_cache.clear()
+        self._snapshot_cache.clear()
 
     def set(self, key_path, value):
         """
@@ -330,6 +520,8 @@ class ConfigManager:
             else:
                 logger.debug(f"更新配置项 {key_path}: {old_value} -> {value}")
 
+            self._invalidate_cache()
+            self._notify(key_path)
             return True
         except Exception as e:
             logger.error(f"设置配置项 {key_path} 失败: {str(e)}")
@@ -343,10 +535,52 @@ class ConfigManager:
         Args:
             component_name (str): 组件名称，如 "app", "text_editor", "toolbar" 等
 
+        Returns:
+            ConfigSnapshot: 组件配置的只读快照, 支持属性访问和字典式访问
+
+        说明：
+            - 默认配置中存在的配置项类型与默认值不符时使用默认值, 读取时不必再检查类型
+            - 同一版本的配置返回同一个快照对象, 修改配置后生成新的快照
+        """
+        snapshot = self._snapshot_cache.get(component_name)
+        if snapshot is None:
+            values = self._typed_component_values(component_name)
+            snapshot = ConfigSnapshot(values, component_name)
+            self._snapshot_cache[component_name] = snapshot
+        return snapshot
+
+    def _typed_component_values(self, component_name):
+        """
+        获取组件配置, 并按默认配置校正配置项类型
+
+        Args:
+            component_name (str): 组件名称
+
         Returns:
             dict: 组件配置字典
         """
-        return self.get(component_name, {})
+        values = self.get(component_name, {})
+        defaults = DEFAULT_CONFIG.get(component_name)
+        if not isinstance(defaults, dict):
+            return values if isinstance(values, dict) else {}
+        if not isinstance(values, dict):
+            logger.warning(f"配置 {component_name} 不是字典，使用默认配置")
+            return defaults
+
+        result = dict(values)
+        for key, default_value in defaults.items():
+            value = result.get(key)
+            if value is None:
+                result[key] = default_value
+            elif isinstance(default_value, float) and type(value) is int:
+                # 整数可以作为浮点数配置项的值
+                result[key] = float(value)
+            elif type(value) is not type(default_value):
+                logger.warning(
+                    f"配置项 {component_name}.{key} 类型错误: {value!r}，使用默认值"
+                )
+                result[key] = default_value
+        return result
 
     def set_component_config(self, component_name, config_dict):
         """
@@ -392,9 +626,8 @@ class ConfigManager:
         Returns:
             bool: 是否设置成功
         """
-        component_config = self.get_component_config(component_name)
-        if not component_config:
-            component_config = {}
+        # 快照是只读的, 复制为字典后修改
+        component_config = self.get_component_config(component_name).to_dict()
 
         component_config["font"] = font_config.get("font", "Microsoft YaHei UI")
         component_config["font_size"] = font_config.get("font_size", 12)
@@ -412,6 +645,8 @@ class ConfigManager:
         logger.info("开始重置配置为默认值")
         self.config = copy.deepcopy(DEFAULT_CONFIG)  # 创建默认配置的深拷贝
         result = self.save_config()
+        self._invalidate_cache()
+        self._notify()
 
         if result:
             logger.info("配置重置成功并已保存")
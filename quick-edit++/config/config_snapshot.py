@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+配置快照模块
+提供组件配置的只读快照, 热点代码直接读取属性, 不必每次按键路径逐级查找字典
+"""
+
+from collections.abc import Mapping
+
+
+def _freeze(value):
+    """把嵌套字典转换为快照, 列表转换为元组, 其余值原样返回"""
+    if isinstance(value, dict):
+        return ConfigSnapshot(value)
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """把快照和元组还原为可修改的字典和列表"""
+    if isinstance(value, ConfigSnapshot):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class ConfigSnapshot(Mapping):
+    """
+    配置快照类
+
+    组件配置的只读副本, 支持属性访问 (snapshot.font_size) 和字典式访问
+    (snapshot["font_size"], snapshot.get("font_size", 15));
+    修改配置请使用config_manager.set, 修改后config_manager会生成新的快照
+    """
+
+    __slots__ = ("_name", "_values")
+
+    def __init__(self, values, name=""):
+        """
+        初始化配置快照
+
+        Args:
+            values (dict): 配置字典, 会被复制, 之后对原字典的修改不影响快照
+            name (str): 配置名称, 用于错误信息
+        """
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(
+            self, "_values", {key: _freeze(value) for key, value in values.items()}
+        )
+
+    def __getattr__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(f"配置 {self._name} 中没有配置项: {key}") from None
+
+    def __setattr__(self, key, value):
+        raise AttributeError("配置快照是只读的, 请使用config_manager.set修改配置")
+
+    def __delattr__(self, key):
+        raise AttributeError("配置快照是只读的, 请使用config_manager.set修改配置")
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"ConfigSnapshot({self._name!r}, {self._values!r})"
+
+    def to_dict(self):
+        """
+        转换为可修改的字典
+
+        Returns:
+            dict: 配置字典的深拷贝
+        """
+        return {key: _thaw(value) for key, value in self._values.items()}
@@ -62,21 +62,17 @@ class SyntaxHighlighter:
         """
         logger.debug("初始化语法高亮器")
 
-        # 从配置管理器获取配置
+        # 从配置管理器获取配置快照, 已按默认配置补全并校正类型, 直接读取属性
         syntax_config = config_manager.get_component_config("syntax_highlighter")
-        if not syntax_config:
-            logger.warning("无法获取语法高亮器配置，将使用默认配置")
 
         # 设置初始化参数
         self.app = app
         self.text_widget = app.text_area
-        self.render_visible_only = syntax_config.get("render_visible_only", False)
-        self.highlight_enabled = syntax_config.get("enabled", True)
-        self.max_lines_per_highlight = syntax_config.get(
-            "max_lines_per_highlight", 1000
-        )
+        self.render_visible_only = syntax_config.render_visible_only
+        self.highlight_enabled = syntax_config.enabled
+        self.max_lines_per_highlight = syntax_config.max_lines_per_highlight
         # 可见行模式下，上下扩展的行数
-        self.visible_line_context = syntax_config.get("visible_line_context", 10)
+        self.visible_line_context = syntax_config.visible_line_context
 
         # 内部状态
         self.language_handlers = {}  # 存储不同语言的处理器
@@ -87,9 +83,12 @@ class SyntaxHighlighter:
 
         # 防抖机制相关属性
         self._highlight_task_id = None  # 用于执行高亮任务的任务ID
-        self._debounce_delay = syntax_config.get(
-            "debounce_delay", 100
-        )  # 从配置获取防抖延迟时间 (毫秒)
+        # 从配置获取防抖延迟时间 (毫秒)
+        self._debounce_delay = syntax_config.debounce_delay
+
+        # 增量高亮相关属性
+        self._dirty_line = None  # 上次高亮之后最靠前的修改行号
+        self._highlighted_range = None  # 上次高亮时的可见行范围
 
         # 不再需要重叠检查相关的配置
 
@@ -99,6 +98,16 @@ class SyntaxHighlighter:
         # 绑定事件
         self._bind_events()
 
+        # 订阅文本修改记录, 编辑后只重新高亮修改位置之后的可见行
+        if app.text_change_proxy is not None:
+            app.text_change_proxy.subscribe(self._on_text_change)
+
+        # 订阅启用状态和渲染模式配置, 修改配置后自动应用
+        config_manager.subscribe("syntax_highlighter.enabled", self._on_config_changed)
+        config_manager.subscribe(
+            "syntax_highlighter.render_visible_only", self._on_config_changed
+        )
+
         logger.debug("highlighter init complete!")
 
     def _register_default_handlers(self):
@@ -171,9 +180,7 @@ class SyntaxHighlighter:
             # 文本修改事件(修改状态)
             self.text_widget.bind("<<Modified>>", self._handle_event, add="+")
 
-            # 文本变化事件 - 统一处理所有文本变化(插入/删除)
-            self.text_widget.bind("<<TextInsert>>", self._handle_event, add="+")
-            self.text_widget.bind("<<TextDelete>>", self._handle_event, add="+")
+            # 文本插入/删除由文本修改代理发布的修改记录处理, 见_on_text_change
 
             # 鼠标滚动事件 - 仅在只渲染可见行模式下需要
             self.text_widget.bind(
@@ -440,10 +447,30 @@ class SyntaxHighlighter:
 
         return first_line, last_line
 
-    def _highlight_visible_lines_with_handler(self, handler):
-        """使用指定处理器高亮当前可见的行"""
+    def _highlight_visible_lines_with_handler(
+        self, handler, line_range=None, from_line=None
+    ):
+        """
+        使用指定处理器高亮当前可见的行
+
+        Args:
+            handler: 语言处理器实例
+            line_range: 已计算的可见行范围, 为None时重新计算
+            from_line: 只高亮该行之后的可见行, 为None时高亮全部可见行
+        """
         # 获取可见行范围
-        first_line, last_line = self._get_visible_line_range()
+        if line_range is None:
+            line_range = self._get_visible_line_range()
+        first_line, last_line = line_range
+
+        # 记录本次高亮的可见行范围, 之前的修改都已经处理
+        self._highlighted_range = line_range
+        self._dirty_line = None
+
+        if from_line is not None:
+            first_line = max(first_line, from_line)
+            if first_line >= last_line:
+                return
 
         # 计算清除和添加高亮的范围
         start_index = f"{first_line}.0"
@@ -657,7 +684,66 @@ class SyntaxHighlighter:
         self._highlight_task_id = None
 
         # 使用after_idle调用高亮方法, 确保在UI空闲时执行
-        self.text_widget.after_idle(self.apply_highlighting)
+        self.text_widget.after_idle(self._refresh_highlighting)
+
+    def _on_text_change(self, change):
+        """
+        文本修改记录的订阅回调, 记录最靠前的修改行并安排高亮任务
+
+        Args:
+            change: 文本修改代理发布的TextChange修改记录
+        """
+        if not self.render_visible_only or not self.current_language:
+            return
+
+        if self._dirty_line is None or change.start_line < self._dirty_line:
+            self._dirty_line = change.start_line
+        self._handle_event()
+
+    def _refresh_highlighting(self):
+        """
+        编辑或滚动之后更新可见行的高亮
+
+        可见行范围没有变化时只重新高亮修改位置之后的行, 修改位置之前的行不受影响;
+        可见行范围和文本都没有变化时(如移动光标)不做任何处理
+        """
+        if not self.highlight_enabled or not self.current_language:
+            return
+
+        if not self.render_visible_only:
+            self.apply_highlighting()
+            return
+
+        handler = self._get_current_handler()
+        if not handler:
+            return
+
+        try:
+            line_range = self._get_visible_line_range()
+            from_line = None
+            if line_range == self._highlighted_range:
+                if self._dirty_line is None:
+                    return
+                # 向上多处理几行上下文, 覆盖跨行的字符串和注释
+                from_line = self._dirty_line - self.visible_line_context
+
+            self._highlight_visible_lines_with_handler(handler, line_range, from_line)
+        except Exception as e:
+            logger.error(f"更新语法高亮失败: {str(e)}")
+
+    def _on_config_changed(self, key_path, value):
+        """
+        语法高亮配置变更回调, 只在值与当前状态不同时重新高亮
+
+        Args:
+            key_path: 变更的配置键路径
+            value: 配置值, 统一从快照读取以得到校正类型后的值
+        """
+        syntax_config = config_manager.get_component_config("syntax_highlighter")
+        if syntax_config.enabled != self.highlight_enabled:
+            self.set_enabled(syntax_config.enabled, self.app.current_file_path)
+        if syntax_config.render_visible_only != self.render_visible_only:
+            self.set_render_mode(syntax_config.render_visible_only)
 
     def set_render_mode(self, render_visible_only: bool):
         """
@@ -710,6 +796,53 @@ class SyntaxHighlighter:
         """
         return self.current_language
 
+    def export_state(self):
+        """
+        导出当前的高亮状态, 用于切换文档后直接恢复, 不必重新检测语言和高亮
+
+        Returns:
+            Optional[tuple]: (语言, {标签名: 范围元组}), 没有设置语言时返回None
+        """
+        if not self.current_language:
+            return None
+
+        textbox = self.text_widget._textbox
+        ranges = {}
+        for tag_name in textbox.tag_names():
+            if not tag_name.startswith("syntax_"):
+                continue
+            tag_ranges = textbox.tag_ranges(tag_name)
+            if tag_ranges:
+                ranges[tag_name] = tuple(str(index) for index in tag_ranges)
+        return self.current_language, ranges
+
+    def restore_state(self, state) -> bool:
+        """
+        恢复export_state导出的高亮状态, 文本内容必须与导出时一致
+
+        Args:
+            state: export_state返回的高亮状态
+
+        Returns:
+            bool: 是否已恢复, 未恢复时调用方应重新应用高亮
+        """
+        self.reset_highlighting()
+        if not state or not self.highlight_enabled:
+            return False
+
+        language, ranges = state
+        if language != "auto" and language not in self.language_handlers:
+            return False
+
+        self.current_language = language
+        self.current_file_extension = None if language == "auto" else language
+        self._setup_tags()
+
+        textbox = self.text_widget._textbox
+        for tag_name, tag_ranges in ranges.items():
+            textbox.tag_add(tag_name, *tag_ranges)
+        return True
+
     def reset_highlighting(self):
         """
         重置语法高亮 - 用于文件操作时关闭文件时调用
@@ -723,5 +856,7 @@ class SyntaxHighlighter:
             self.clear_highlight("1.0", "end")
             self.current_language = None
             self.current_file_extension = None
+            self._dirty_line = None
+            self._highlighted_range = None
         except Exception:
             pass
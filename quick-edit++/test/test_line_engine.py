@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""行处理引擎测试, 使用很小的内存预算走临时文件归并的路径"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.line_engine import LineEngine
+
+# 包含仅CR换行和CRLF换行的文本, 行的划分只看\n
+CR_TEXT = "b\rx\na\nc\r\nd\n" * 3
+
+
+def test_sort_lines_keeps_cr_inside_lines():
+    engine = LineEngine(run_memory=200)
+    expected = "\n".join(sorted(CR_TEXT.split("\n")))
+    assert engine.sort_lines(CR_TEXT) == expected
+    assert LineEngine().sort_lines(CR_TEXT) == expected
+
+
+def test_dedupe_lines_keeps_cr_inside_lines():
+    engine = LineEngine(run_memory=200)
+    expected = LineEngine().dedupe_lines(CR_TEXT, with_counts=True)
+    assert engine.dedupe_lines(CR_TEXT, with_counts=True) == expected
+    assert engine.dedupe_lines(CR_TEXT) == "b\rx\na\nc\r\nd\n"
+
+
+if __name__ == "__main__":
+    test_sort_lines_keeps_cr_inside_lines()
+    test_dedupe_lines_keeps_cr_inside_lines()
+    print("ok")
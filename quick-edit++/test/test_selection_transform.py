@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""按行比较的测试, 检查替换片段的正确性和大文本比较时的内存峰值"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.selection_transform import MAX_DIFF_LINES, _split_lines, diff_line_hunks
+
+
+def apply_hunks(old_text, hunks):
+    """按_apply_line_hunks的方式从后往前应用替换片段"""
+    lines = _split_lines(old_text)
+    for first, last, text in reversed(hunks):
+        first = len(lines) if first is None else first
+        last = len(lines) if last is None else last
+        lines[first:last] = [text]
+    return "".join(lines)
+
+
+def test_hunks_rebuild_new_text():
+    cases = [
+        ("a\nb\nc\n", "a\nx\nc\n"),
+        ("a\nb", "a\nbc"),
+        ("a\n", "a\nb\n"),
+        ("x\nab", "x\nzab"),
+        ("b\rx\na\n", "a\nb\rx\n"),
+        ("", "a"),
+        ("a\nb\n", ""),
+    ]
+    random.seed(0)
+    alphabet = ["a", "b", "\n", "\r", "ab\n"]
+    for _ in range(2000):
+        cases.append(
+            tuple(
+                "".join(random.choice(alphabet) for _ in range(random.randint(0, 12)))
+                for _ in range(2)
+            )
+        )
+
+    for old_text, new_text in cases:
+        hunks = diff_line_hunks(old_text, new_text)
+        assert apply_hunks(old_text, hunks) == new_text
+
+
+def test_hunks_only_cover_changed_lines():
+    old_text = "".join(f"{i}\n" for i in range(100))
+    new_text = old_text.replace("50\n", "fifty\n")
+    assert diff_line_hunks(old_text, new_text) == [(50, 51, "fifty\n")]
+    assert diff_line_hunks(old_text, old_text) == []
+
+
+def test_large_diff_memory_peak():
+    random.seed(0)
+    lines = [f"line {random.randrange(10**9):09d}" for _ in range(MAX_DIFF_LINES * 10)]
+    old_text = "header\n" + "\n".join(lines) + "\n"
+    new_text = "header\n" + "\n".join(sorted(lines)) + "\n"
+
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        hunks = diff_line_hunks(old_text, new_text)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    assert hunks == [(1, None, new_text[len("header\n") :])]
+    # 只复制替换文本本身, 不为整段文本建立行列表
+    assert peak < 2 * len(new_text)
+
+
+if __name__ == "__main__":
+    test_hunks_rebuild_new_text()
+    test_hunks_only_cover_changed_lines()
+    test_large_diff_memory_peak()
+    print("ok")
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""XML流式格式化测试, 输出与minidom.toprettyxml去除空行后的结果比较"""
+
+import os
+import sys
+from xml.dom import minidom
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import structured_formatter
+from app.structured_formatter import XmlStreamFormatter
+
+CASES = [
+    "<a><![CDATA[1<2]]></a>",
+    "<a>hello <b>x</b> tail</a>",
+    "<r><a>1</a><b> x </b>\n  text\n  more <c/>z</r>",
+    '<?xml version="1.0"?><!-- c --><r a="1&amp;"><p>t&lt;"q"</p></r>',
+    "<r>\n  <a/>\n  <b>line 1\n\n  line 2</b>\n</r>",
+    "<r><?pi data?><a> </a><b/></r>",
+]
+
+
+def minidom_format(text):
+    pretty = minidom.parseString(text).toprettyxml(indent="  ")
+    return "\n".join(line for line in pretty.split("\n") if line.strip())
+
+
+def stream_format(text):
+    return "".join(XmlStreamFormatter(text, indent="  ")._fragments())
+
+
+def test_xml_matches_minidom():
+    for text in CASES:
+        assert stream_format(text) == minidom_format(text), text
+
+
+def test_xml_matches_minidom_in_small_chunks(monkeypatch):
+    monkeypatch.setattr(structured_formatter, "XML_FEED_SIZE", 3)
+    for text in CASES:
+        assert stream_format(text) == minidom_format(text), text
+
+
+def test_xml_keeps_mixed_cdata_sections():
+    # minidom不给混排的CDATA段加缩进和换行, 这里单独缩进一行
+    assert stream_format("<r>a<![CDATA[<b>]]>c</r>") == (
+        '<?xml version="1.0" ?>\n<r>\n  a\n  <![CDATA[<b>]]>\n  c\n</r>'
+    )
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""撤销日志测试, 预算为0时所有步骤都写入磁盘日志, 不需要文本组件"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.undo_journal import UndoJournal
+
+
+def add_step(journal, number):
+    """模拟一次事件处理结束, 加入一个插入文本的步骤"""
+    journal._group = [["1.0", "1.0", "1.8", "", f"{number:08d}"]]
+    journal._separator = True
+    journal._close_group()
+
+
+def spill_size(journal):
+    return journal._spill_file.seek(0, os.SEEK_END)
+
+
+def live_size(journal):
+    return sum(
+        step.location[2]
+        for step in journal._undo_stack + journal._redo_stack
+        if step.spilled
+    )
+
+
+def test_trimmed_steps_are_compacted():
+    journal = UndoJournal(None, None, memory_budget=0, max_steps=10)
+    for number in range(1000):
+        add_step(journal, number)
+        assert spill_size(journal) <= 2 * live_size(journal)
+
+    assert len(journal._undo_stack) == 10
+    assert [step.load()[0][4] for step in journal._undo_stack] == [
+        f"{number:08d}" for number in range(990, 1000)
+    ]
+
+
+def test_dropped_redo_steps_are_compacted():
+    journal = UndoJournal(None, None, memory_budget=0)
+    for number in range(20):
+        add_step(journal, number)
+    for _ in range(15):
+        journal._redo_stack.append(journal._undo_stack.pop())
+
+    journal._drop_redo()
+    assert spill_size(journal) == live_size(journal)
+    assert [step.load()[0][4] for step in journal._undo_stack] == [
+        f"{number:08d}" for number in range(5)
+    ]
+
+
+def test_resume_counts_dead_bytes():
+    journal = UndoJournal(None, None, memory_budget=0)
+    for number in range(10):
+        add_step(journal, number)
+    journal._redo_stack.append(journal._undo_stack.pop())
+    journal._drop_redo()
+
+    state = journal.suspend()
+    journal.resume(state)
+    assert journal._spill_dead == spill_size(journal) - live_size(journal) > 0
+
+
+if __name__ == "__main__":
+    test_trimmed_steps_are_compacted()
+    test_dropped_redo_steps_are_compacted()
+    test_resume_counts_dead_bytes()
+    print("ok")
@@ -6,534 +6,16 @@
 """
 
 import os
-import re
 import threading
 import queue
-import time
-import gc
 import math
 from datetime import datetime
-from pathlib import Path
 import tkinter as tk
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 from config.config_manager import config_manager
 from ui.utils import truncate_string
-
-
-class StatsCalculator:
-    """文档统计计算器类"""
-
-    # 预编译正则表达式以提高性能
-    CHINESE_CHARS_PATTERN = re.compile(r"[\u4e00-\u9fff]")
-    ENGLISH_CHARS_PATTERN = re.compile(r"[a-zA-Z]")
-    DIGIT_CHARS_PATTERN = re.compile(r"[0-9]")
-    SPACE_CHARS_PATTERN = re.compile(r"[ \t]")
-    PUNCTUATION_CHARS_PATTERN = re.compile(r"[^\w\s\u4e00-\u9fff]")
-    ENGLISH_WORDS_PATTERN = re.compile(r"\b[a-zA-Z]+\b")
-    CHINESE_WORDS_PATTERN = re.compile(r"[\u4e00-\u9fff]+")
-    PARAGRAPH_PATTERN = re.compile(r"\n\s*\n")
-
-    def __init__(self, text_content, file_path=None):
-        """
-        初始化统计计算器
-
-        Args:
-            text_content (str): 要分析的文本内容
-            file_path (str, optional): 文件路径, 用于代码分析
-        """
-        self.text_content = text_content
-        self.file_path = file_path
-        self.file_extension = Path(file_path).suffix.lower() if file_path else ""
-        # 移除初始化时的耗时操作, 改为按需计算
-        self.total_lines = 0
-        self.total_chars = 0
-
-        # 预编译注释模式以提高性能
-        self._compiled_comment_patterns = None
-
-    # 已移除is_code_file方法 - 所有文件都被统一处理, 不需要区分代码文件
-
-    def get_comment_patterns(self):
-        """
-        获取注释模式
-        使用通用注释模式, 适用于所有文件类型
-        """
-        if self._compiled_comment_patterns is not None:
-            return self._compiled_comment_patterns
-
-        # 通用注释模式, 适用于大多数编程语言
-        patterns = [
-            r"//.*$",  # C风格单行注释
-            r"/\*.*?\*/",  # C风格多行注释
-            r"#.*$",  # Python/Shell风格注释
-            r"<!--.*?-->",  # HTML/XML注释
-            r"--.*$",  # SQL注释
-            r"%.*$",  # MATLAB注释
-            r'""".*?"""',  # Python多行注释
-            r"'''.*?'''",  # Python多行注释
-            r"::.*$",  # Windows批处理注释
-            r"rem.*$",  # DOS批处理注释
-            r"@REM.*$",  # DOS批处理注释
-            r"\{.*?\}",  # Pascal风格注释
-            r"\(\*.*?\*\)",  # Pascal风格注释
-        ]
-
-        # 预编译所有模式
-        self._compiled_comment_patterns = [
-            re.compile(pattern, re.MULTILINE | re.DOTALL) for pattern in patterns
-        ]
-        return self._compiled_comment_patterns
-
-    def _process_text_in_batches(
-        self,
-        text,
-        batch_size,
-        process_func,
-        progress_callback=None,
-        progress_range=(0, 100),
-        progress_message="处理中...",
-    ):
-        """
-        批处理文本的通用方法, 优化内存使用
-
-        Args:
-            text (str): 要处理的文本
-            batch_size (int): 每批处理的大小
-            process_func (callable): 处理每批文本的函数, 接收批次文本, 返回处理结果
-            progress_callback (callable, optional): 进度回调函数
-            progress_range (tuple, optional): 进度范围 (start, end)
-            progress_message (str, optional): 进度消息
-
-        Returns:
-            处理结果的汇总
-        """
-        total_chars = len(text)
-        start_progress, end_progress = progress_range
-        last_progress_update = start_progress
-        result = None
-
-        # 分批处理, 减少内存占用
-        for i in range(0, total_chars, batch_size):
-            batch_text = text[i : i + batch_size]
-            batch_result = process_func(batch_text)
-
-            # 汇总结果
-            if result is None:
-                result = batch_result
-            else:
-                # 假设batch_result是一个字典, 我们需要将值相加
-                for key in batch_result:
-                    if key in result:
-                        result[key] += batch_result[key]
-
-            # 清除批处理文本的引用, 帮助垃圾回收
-            del batch_text
-            del batch_result
-
-            # 更新进度, 但减少更新频率
-            if progress_callback and total_chars > 0:
-                progress = start_progress + int(
-                    (i + batch_size) / total_chars * (end_progress - start_progress)
-                )
-                # 只在进度变化超过5%时才更新
-                if progress - last_progress_update >= 5:
-                    progress_callback(progress, f"{progress_message} {progress}%")
-                    last_progress_update = progress
-
-                    # 在进度更新时触发垃圾回收, 释放内存
-                    if i % (batch_size * 5) == 0:  # 每处理5个批次触发一次垃圾回收
-                        gc.collect()
-
-        # 最终垃圾回收
-        gc.collect()
-        return result if result is not None else {}
-
-    def _count_chars_in_batch(self, batch_text):
-        """
-        批处理统计字符类型
-
-        Args:
-            batch_text (str): 批次文本
-
-        Returns:
-            dict: 字符统计结果
-        """
-        return {
-            "chinese_chars": len(self.CHINESE_CHARS_PATTERN.findall(batch_text)),
-            "english_chars": len(self.ENGLISH_CHARS_PATTERN.findall(batch_text)),
-            "digit_chars": len(self.DIGIT_CHARS_PATTERN.findall(batch_text)),
-            "space_chars": len(self.SPACE_CHARS_PATTERN.findall(batch_text)),
-            "punctuation_chars": len(
-                self.PUNCTUATION_CHARS_PATTERN.findall(batch_text)
-            ),
-        }
-
-    def _count_words_in_batch(self, batch_text):
-        """
-        批处理统计单词
-
-        Args:
-            batch_text (str): 批次文本
-
-        Returns:
-            dict: 单词统计结果
-        """
-        return {
-            "english_words": len(self.ENGLISH_WORDS_PATTERN.findall(batch_text)),
-            "chinese_words": len(self.CHINESE_WORDS_PATTERN.findall(batch_text)),
-        }
-
-    def _process_lines_in_batches(
-        self,
-        lines,
-        batch_size,
-        process_func,
-        progress_callback=None,
-        progress_range=(0, 100),
-        progress_message="处理中...",
-    ):
-        """
-        批处理行的通用方法, 用于代码统计, 优化内存使用和UI响应性
-
-        Args:
-            lines (list): 要处理的行列表
-            batch_size (int): 每批处理的大小
-            process_func (callable): 处理每批行的函数, 接收批次行, 返回处理结果
-            progress_callback (callable, optional): 进度回调函数
-            progress_range (tuple, optional): 进度范围 (start, end)
-            progress_message (str, optional): 进度消息
-
-        Returns:
-            处理结果的汇总
-        """
-        total_lines = len(lines)
-        start_progress, end_progress = progress_range
-        last_progress_update = start_progress
-        result = None
-
-        # 减小批处理大小, 提高进度更新频率, 改善UI响应性
-        adjusted_batch_size = min(batch_size, 100)  # 限制最大批处理大小为100
-
-        # 分批处理, 减少内存占用
-        for i in range(0, total_lines, adjusted_batch_size):
-            batch_lines = lines[i : i + adjusted_batch_size]
-            batch_result = process_func(batch_lines)
-
-            # 汇总结果
-            if result is None:
-                result = batch_result
-            else:
-                # 假设batch_result是一个字典, 我们需要将值相加
-                for key in batch_result:
-                    if key in result:
-                        result[key] += batch_result[key]
-
-            # 清除批处理行的引用, 帮助垃圾回收
-            del batch_lines
-            del batch_result
-
-            # 更新进度, 提高更新频率以改善UI响应性
-            if progress_callback and total_lines > 0:
-                progress = start_progress + int(
-                    (i + adjusted_batch_size)
-                    / total_lines
-                    * (end_progress - start_progress)
-                )
-                # 降低进度更新阈值到2%, 更频繁更新UI
-                if progress - last_progress_update >= 2:
-                    progress_callback(progress, f"{progress_message} {progress}%")
-                    last_progress_update = progress
-
-                    # 更频繁地触发垃圾回收, 释放内存
-                    if (
-                        i % (adjusted_batch_size * 3) == 0
-                    ):  # 每处理3个批次触发一次垃圾回收
-                        gc.collect()
-
-        # 最终垃圾回收
-        gc.collect()
-        return result if result is not None else {}
-
-    def _count_code_lines_in_batch(self, batch_lines):
-        """
-        批处理统计代码行
-
-        Args:
-            batch_lines (list): 批次行列表
-
-        Returns:
-            dict: 代码行统计结果
-        """
-        comment_patterns = self.get_comment_patterns()
-        code_lines = 0
-        comment_lines = 0
-        blank_lines = 0  # 重命名为blank_lines以保持与其他方法一致
-
-        for line in batch_lines:
-            stripped_line = line.strip()
-
-            # 空行
-            if not stripped_line:
-                blank_lines += 1
-                continue
-
-            # 检查是否为注释行 - 使用预编译的正则表达式提高性能
-            is_comment = False
-            for compiled_pattern in comment_patterns:
-                if compiled_pattern.search(line):
-                    is_comment = True
-                    break
-
-            if is_comment:
-                comment_lines += 1
-            else:
-                code_lines += 1
-
-        return {
-            "code_lines": code_lines,
-            "comment_lines": comment_lines,
-            "blank_lines": blank_lines,  # 重命名为blank_lines以保持与其他方法一致
-        }
-
-    def calculate_basic_stats(self, progress_callback=None):
-        """
-        计算基本统计信息
-
-        Args:
-            progress_callback: 进度回调函数
-
-        Returns:
-            dict: 包含所有基本统计信息的字典
-        """
-        # 处理空文档情况
-        if not self.text_content:
-            return {
-                "total_chars": 0,
-                "total_chars_no_spaces": 0,
-                "total_lines": 0,
-                "non_empty_lines": 0,
-                "chinese_chars": 0,
-                "english_chars": 0,
-                "digit_chars": 0,
-                "space_chars": 0,
-                "punctuation_chars": 0,
-                "other_chars": 0,
-                "total_words": 0,
-                "english_words": 0,
-                "chinese_words": 0,
-                "paragraphs": 0,
-                "total_code_lines": 0,
-                "code_lines": 0,
-                "comment_lines": 0,
-                "blank_lines": 0,
-                "effective_lines": 0,
-                "comment_ratio": 0.0,
-                "blank_ratio": 0.0,
-                "effective_ratio": 0.0,
-            }
-
-        stats = {}
-        text = self.text_content
-        total_chars = len(text)
-
-        # 初始化基本计数
-        if progress_callback:
-            progress_callback(5, "初始化统计参数...")
-
-        # 基本统计
-        self.total_chars = total_chars
-        self.total_lines = len(text.splitlines())
-
-        stats["total_chars"] = self.total_chars
-        stats["total_chars_no_spaces"] = len(text.replace(" ", "").replace("\t", ""))
-        stats["total_lines"] = self.total_lines
-
-        if progress_callback:
-            progress_callback(15, "分析文档行数...")
-
-        # 非空行数
-        non_empty_lines = 0
-        lines = text.splitlines()
-        total_lines = len(lines)
-
-        # 减小批处理大小, 增加进度更新频率, 改善UI响应性
-        batch_size = max(100, total_lines // 20)  # 减小批处理大小, 增加批次数
-        last_progress_update = 0
-
-        for i in range(0, total_lines, batch_size):
-            batch_end = min(i + batch_size, total_lines)
-            for j in range(i, batch_end):
-                if lines[j].strip():
-                    non_empty_lines += 1
-
-            # 增加进度更新频率, 只在进度变化超过2%时才更新
-            if progress_callback:
-                progress = 15 + int((j / total_lines) * 25)  # 15%到40%
-                if progress - last_progress_update >= 2:  # 降低阈值到2%, 更频繁更新
-                    progress_callback(progress, f"分析文档行数... {progress}%")
-                    last_progress_update = progress
-
-        stats["non_empty_lines"] = non_empty_lines
-
-        if progress_callback:
-            progress_callback(40, "统计字符类型...")
-
-        # 字符类型统计 - 使用批处理方法提高性能
-        if total_chars > 50000:  # 降低阈值, 更多文件使用批处理
-            char_stats = self._process_text_in_batches(
-                text,
-                20000,
-                self._count_chars_in_batch,  # 减小批处理大小
-                progress_callback,
-                (40, 60),
-                "统计字符类型...",
-            )
-            stats.update(char_stats)
-        else:
-            # 小文件直接处理
-            if progress_callback:
-                progress_callback(45, "统计中文字符...")
-            stats["chinese_chars"] = len(self.CHINESE_CHARS_PATTERN.findall(text))
-
-            if progress_callback:
-                progress_callback(50, "统计英文字符...")
-            stats["english_chars"] = len(self.ENGLISH_CHARS_PATTERN.findall(text))
-
-            if progress_callback:
-                progress_callback(55, "统计数字字符...")
-            stats["digit_chars"] = len(self.DIGIT_CHARS_PATTERN.findall(text))
-
-            if progress_callback:
-                progress_callback(57, "统计空格字符...")
-            stats["space_chars"] = len(self.SPACE_CHARS_PATTERN.findall(text))
-
-            if progress_callback:
-                progress_callback(59, "统计标点符号...")
-            stats["punctuation_chars"] = len(
-                self.PUNCTUATION_CHARS_PATTERN.findall(text)
-            )
-
-        # 计算其他字符数
-        stats["other_chars"] = (
-            stats["total_chars"]
-            - stats.get("chinese_chars", 0)
-            - stats.get("english_chars", 0)
-            - stats.get("digit_chars", 0)
-            - stats.get("space_chars", 0)
-            - stats.get("punctuation_chars", 0)
-        )
-
-        if progress_callback:
-            progress_callback(60, "统计单词数量...")
-
-        # 单词统计 (中英文) - 使用批处理方法提高性能
-        if total_chars > 50000:  # 降低阈值, 更多文件使用批处理
-            word_stats = self._process_text_in_batches(
-                text,
-                20000,
-                self._count_words_in_batch,  # 减小批处理大小
-                progress_callback,
-                (60, 80),
-                "统计单词数量...",
-            )
-            stats.update(word_stats)
-            # 计算总单词数
-            stats["total_words"] = word_stats.get("english_words", 0) + word_stats.get(
-                "chinese_words", 0
-            )
-        else:
-            # 小文件直接处理
-            if progress_callback:
-                progress_callback(65, "统计英文单词...")
-            english_words = len(self.ENGLISH_WORDS_PATTERN.findall(text))
-
-            if progress_callback:
-                progress_callback(75, "统计中文词组...")
-            chinese_words = len(self.CHINESE_WORDS_PATTERN.findall(text))
-
-            stats["english_words"] = english_words
-            stats["chinese_words"] = chinese_words
-            # 计算总单词数
-            stats["total_words"] = english_words + chinese_words
-
-        if progress_callback:
-            progress_callback(80, "分析段落结构...")
-
-        # 段落统计 - 使用预编译的正则表达式提高性能
-        paragraphs = self.PARAGRAPH_PATTERN.split(text.strip())
-        stats["paragraphs"] = len([p for p in paragraphs if p.strip()])
-
-        # 所有文件统一处理, 不再需要代码文件标志
-
-        if progress_callback:
-            progress_callback(100, "基本统计完成")
-
-        return stats
-
-    def calculate_code_stats(self, progress_callback=None):
-        """
-        计算文档统计信息 (简化版, 适用于所有文件)
-
-        Args:
-            progress_callback: 进度回调函数
-
-        Returns:
-            dict: 包含所有文档统计信息的字典
-        """
-        # 处理空文档情况
-        if not self.text_content:
-            return {
-                "total_code_lines": 0,
-                "code_lines": 0,
-                "comment_lines": 0,
-                "blank_lines": 0,
-                "effective_lines": 0,
-                "comment_ratio": 0.0,
-                "blank_ratio": 0.0,
-                "effective_ratio": 0.0,
-            }
-
-        lines = self.text_content.splitlines()
-        total_lines = len(lines)
-
-        if progress_callback:
-            progress_callback(0, "开始分析文档结构...")
-
-        # 使用批处理方法统计文档行, 减小批处理大小, 增加进度更新频率
-        code_stats = self._process_lines_in_batches(
-            lines,
-            max(50, total_lines // 20),
-            self._count_code_lines_in_batch,  # 减小批处理大小, 增加批次数
-            progress_callback,
-            (0, 90),
-            "分析文档内容...",
-        )
-
-        # 添加总行数
-        code_stats["total_code_lines"] = total_lines
-
-        if progress_callback:
-            progress_callback(90, "计算统计比率...")
-
-        # 计算比率
-        if total_lines > 0:
-            code_stats["comment_ratio"] = (
-                code_stats.get("comment_lines", 0) / total_lines
-            )
-            code_stats["blank_ratio"] = code_stats.get("blank_lines", 0) / total_lines
-            code_stats["effective_ratio"] = (
-                code_stats.get("effective_lines", 0) / total_lines
-            )
-        else:
-            code_stats["comment_ratio"] = 0.0
-            code_stats["blank_ratio"] = 0.0
-            code_stats["effective_ratio"] = 0.0
-
-        if progress_callback:
-            progress_callback(100, "文档分析完成")
-
-        return code_stats
+from app.stats_engine import StatsEngine
 
 
 class StatsWorker(threading.Thread):
@@ -555,7 +37,6 @@ class StatsWorker(threading.Thread):
         self.result_queue = result_queue
         self.progress_queue = progress_queue
         self._stop_event = threading.Event()
-        self.calculator = None  # 延迟初始化
 
     def stop(self):
         """停止线程"""
@@ -565,37 +46,35 @@ class StatsWorker(threading.Thread):
         """检查线程是否已停止"""
         return self._stop_event.is_set()
 
+    def _on_partial(self, stats, done_chars, total_chars):
+        """
+        统计引擎的部分结果回调, 将当前结果和进度推送到队列
+
+        Args:
+            stats (dict): 当前已完成分块的统计结果
+            done_chars (int): 已处理字符数
+            total_chars (int): 总字符数
+        """
+        progress = int(done_chars / total_chars * 100) if total_chars else 100
+        self.result_queue.put(("partial", stats))
+        self.progress_queue.put(("progress", progress, f"分析文档内容... {progress}%"))
+
     def run(self):
         """运行工作线程"""
         try:
             # 发送开始信号
             self.progress_queue.put(("start", "开始分析文档内容..."))
 
-            # 延迟初始化计算器, 避免在主线程中耗时
-            self.progress_queue.put(("progress", 5, "初始化计算器..."))
-            self.calculator = StatsCalculator(self.text_content, self.file_path)
-
-            if self.stopped():
-                return
-
-            # 计算基本统计
-            self.progress_queue.put(("progress", 10, "计算字符统计..."))
-            basic_stats = self.calculator.calculate_basic_stats(
-                lambda p, msg: self.progress_queue.put(("progress", 10 + p * 0.3, msg))
+            # 统计引擎每完成一个分块就推送一次部分结果
+            stats = StatsEngine(self.text_content).run(
+                on_partial=self._on_partial, should_stop=self.stopped
             )
-            self.result_queue.put(("basic_stats", basic_stats))
 
-            if self.stopped():
+            if stats is None or self.stopped():
                 return
 
-            # 计算文档统计 (适用于所有文件)
-            self.progress_queue.put(("progress", 40, "分析文档结构..."))
-            code_stats = self.calculator.calculate_code_stats(
-                lambda p, msg: self.progress_queue.put(
-                    ("progress", 40 + p * 0.6, msg)  # 40%到100%
-                )
-            )
-            self.result_queue.put(("code_stats", code_stats))
+            self.result_queue.put(("basic_stats", stats))
+            self.result_queue.put(("code_stats", stats))
 
             # 发送完成信号
             self.progress_queue.put(("progress", 100, "分析完成"))
@@ -609,22 +88,22 @@ class StatsWorker(threading.Thread):
 class DocumentStatsDialog(ctk.CTkToplevel):
     """文档统计信息对话框类"""
 
-    def __init__(self, parent, text_content, file_path=None):
+    def __init__(self, parent, text_content=None, file_path=None, stats=None):
         """
         初始化文档统计对话框
 
         Args:
             parent: 父窗口
-            text_content (str): 要统计的文本内容
+            text_content (str, optional): 要统计的文本内容, 为None时在需要统计时才从文本区域读取
             file_path (str, optional): 文件路径
+            stats (dict, optional): 文本统计模型提供的现成统计结果, 提供时直接显示, 不再重新统计
         """
         super().__init__(parent)
 
         self.parent = parent
         self.text_content = text_content
         self.file_path = file_path
-        # 移除计算器的初始化, 将在工作线程中创建
-        self.calculator = None
+        self.precomputed_stats = stats
 
         # 创建全屏状态变量
         self.fullscreen_var = tk.BooleanVar(value=False)
@@ -1344,145 +823,111 @@ class DocumentStatsDialog(ctk.CTkToplevel):
 
     def _start_worker(self):
         """启动工作线程"""
+        # 已有现成的统计结果时直接放入队列, 不复制文本也不启动线程
+        if self.precomputed_stats is not None:
+            stats = self.precomputed_stats
+            self.precomputed_stats = None
+            self.result_queue.put(("basic_stats", stats))
+            self.result_queue.put(("code_stats", stats))
+            self.progress_queue.put(("progress", 100, "分析完成"))
+            self.progress_queue.put(("complete", "统计信息已准备就绪"))
+            return
+
+        # 需要重新统计时才读取文本内容
+        if self.text_content is None:
+            self.text_content = self.parent.text_area.get("1.0", "end-1c")
+
         self.worker = StatsWorker(
             self.text_content, self.file_path, self.result_queue, self.progress_queue
         )
         self.worker.start()
 
     def _check_progress(self):
-        """检查进度和结果队列 - 高度优化版本, 最大程度避免阻塞UI线程"""
-        # 减少UI更新频率, 避免过于频繁的更新
-        self.last_ui_update = getattr(self, "last_ui_update", 0)
-        current_time = time.time()
-
-        # 进一步降低UI更新频率为每50ms一次, 提高响应性
-        should_update_ui = current_time - self.last_ui_update >= 0.05
-
+        """检查进度和结果队列, 每次合并队列中积压的消息, 只刷新一次UI"""
         # 记录上次处理的进度, 避免重复更新相同的进度
         last_progress = getattr(self, "last_progress", -1)
+        latest_message = None
+        final_message = None
 
         try:
-            # 进一步限制每次处理的消息数量, 最大程度避免阻塞UI线程
-            max_messages_per_check = 1  # 每次只处理1条消息, 立即返回
-            messages_processed = 0
-
-            # 处理进度队列中的消息, 但严格限制数量
-            while (
-                not self.progress_queue.empty()
-                and messages_processed < max_messages_per_check
-            ):
+            # 一次性取出所有进度消息, 只保留最新的进度
+            while True:
                 try:
                     msg_type, *msg_data = self.progress_queue.get_nowait()
-                    messages_processed += 1
-
-                    if msg_type == "start":
-                        # 开始计算, 总是更新UI
-                        self.status_label.configure(text=msg_data[0])
-                        self._update_progress(msg_data[0])
-                        self.last_ui_update = current_time
-                    elif msg_type == "progress":
-                        # 更新进度, 但只在进度有显著变化时更新UI
-                        progress, message = msg_data
-                        if (
-                            abs(progress - last_progress) >= 0.5
-                        ):  # 进一步降低阈值到0.5%, 最频繁更新
-                            self.status_label.configure(text=message)
-                            self._update_progress(message)
-                            last_progress = progress
-                            self.last_ui_update = current_time
-                    elif msg_type == "complete":
-                        # 计算完成, 处理所有结果队列中的消息
-                        self._process_all_results()
-
-                        # 更新状态和按钮
-                        self.status_label.configure(text=msg_data[0])
-                        self._update_progress(msg_data[0])
-                        self.cancel_button.configure(text="关闭", command=self.destroy)
-                        self.export_button.configure(state="normal")
-                        # 显示内容并隐藏加载动画
-                        self._show_content()
-                        return
-                    elif msg_type == "error":
-                        # 发生错误
-                        self.status_label.configure(text=msg_data[0])
-                        self._update_progress(msg_data[0])
-                        self.cancel_button.configure(text="关闭", command=self.destroy)
-                        # 使用after在主线程中显示错误消息
-                        self.after(0, lambda: messagebox.showerror("错误", msg_data[0]))
-                        return
                 except queue.Empty:
                     break
 
-            # 如果还有进度消息未处理, 立即再次检查, 但使用after避免阻塞
-            if (
-                not self.progress_queue.empty()
-                and messages_processed >= max_messages_per_check
-            ):
-                # 更短的延迟, 更快响应
-                self.after(5, self._check_progress)
-                return
-
-            # 处理结果队列中的消息, 但严格限制数量
-            messages_processed = 0
-            while (
-                not self.result_queue.empty()
-                and messages_processed < max_messages_per_check
-            ):
-                try:
-                    result_type, data = self.result_queue.get_nowait()
-                    messages_processed += 1
-
-                    if result_type == "basic_stats":
-                        # 基本统计结果
-                        self.basic_stats = data
-                        # 使用after确保在主线程中更新UI
-                        self.after(0, self._update_basic_stats_ui)
-                    elif result_type == "code_stats":
-                        # 代码统计结果
-                        self.code_stats = data
-                        # 使用after确保在主线程中更新UI
-                        self.after(0, self._update_code_stats_ui)
-                except queue.Empty:
-                    break
-
-            # 如果还有结果消息未处理, 立即再次检查, 但使用after避免阻塞
-            if (
-                not self.result_queue.empty()
-                and messages_processed >= max_messages_per_check
-            ):
-                # 更短的延迟, 更快响应
-                self.after(5, self._check_progress)
+                if msg_type == "start":
+                    latest_message = msg_data[0]
+                elif msg_type == "progress":
+                    progress, message = msg_data
+                    if abs(progress - last_progress) >= 0.5:
+                        latest_message = message
+                        last_progress = progress
+                elif msg_type in ("complete", "error"):
+                    final_message = (msg_type, msg_data[0])
+
+            # 处理结果队列, 部分结果会随统计进度流式刷新到界面
+            self._process_all_results()
+
+            if latest_message is not None:
+                self.status_label.configure(text=latest_message)
+                self._update_progress(latest_message)
+
+            if final_message is not None:
+                msg_type, message = final_message
+                self.status_label.configure(text=message)
+                self._update_progress(message)
+                self.cancel_button.configure(text="关闭", command=self.destroy)
+
+                if msg_type == "complete":
+                    self.export_button.configure(state="normal")
+                    # 显示内容并隐藏加载动画
+                    self._show_content()
+                else:
+                    # 使用after在主线程中显示错误消息
+                    self.after(0, lambda: messagebox.showerror("错误", message))
                 return
 
         except Exception as e:
             messagebox.showerror("错误", f"处理进度时发生错误: {str(e)}")
 
-        # 更新UI时间戳和进度记录
-        self.last_ui_update = current_time
+        # 更新进度记录
         self.last_progress = last_progress
 
-        # 继续检查进度, 进一步降低频率到50ms, 最大程度提高响应性
+        # 继续检查进度
         self.after(50, self._check_progress)
 
     def _process_all_results(self):
-        """处理所有结果队列中的消息"""
-        while not self.result_queue.empty():
+        """处理所有结果队列中的消息, 多个部分结果只刷新最新的一个"""
+        partial_stats = None
+
+        while True:
             try:
                 result_type, data = self.result_queue.get_nowait()
-
-                if result_type == "basic_stats":
-                    # 基本统计结果
-                    self.basic_stats = data
-                    # 使用after确保在主线程中更新UI
-                    self.after(0, self._update_basic_stats_ui)
-                elif result_type == "code_stats":
-                    # 代码统计结果
-                    self.code_stats = data
-                    # 使用after确保在主线程中更新UI
-                    self.after(0, self._update_code_stats_ui)
             except queue.Empty:
                 break
 
+            if result_type == "partial":
+                # 部分结果, 后到的结果覆盖先到的结果
+                partial_stats = data
+            elif result_type == "basic_stats":
+                # 基本统计结果
+                partial_stats = None
+                self.basic_stats = data
+                self._update_basic_stats_ui()
+            elif result_type == "code_stats":
+                # 代码统计结果
+                self.code_stats = data
+                self._update_code_stats_ui()
+
+        if partial_stats is not None:
+            # 收到第一份部分结果时即显示统计内容, 之后随进度持续刷新
+            self.basic_stats = partial_stats
+            self.code_stats = partial_stats
+            self._show_content()
+            self._update_basic_stats_ui()
+
     def _update_basic_stats_ui(self):
         """更新基本统计UI - 适配新的卡片式布局"""
         # 确保UI更新在主线程中执行
@@ -1588,10 +1033,8 @@ class DocumentStatsDialog(ctk.CTkToplevel):
         if hasattr(self, "code_stats") and self.code_stats:
             self._update_doc_stats_in_basic_tab()
 
-        # 强制立即更新UI
+        # 刷新界面
         self.update_idletasks()
-        # 确保UI立即刷新
-        self.update()
 
     def _update_doc_stats_in_basic_tab(self):
         """更新基本统计选项卡中的文档统计部分 - 适配新的卡片式布局"""
@@ -1650,10 +1093,8 @@ class DocumentStatsDialog(ctk.CTkToplevel):
         # 同时更新基本统计中的文档统计部分
         self._update_doc_stats_in_basic_tab()
 
-        # 强制立即更新UI
+        # 刷新界面
         self.update_idletasks()
-        # 确保UI立即刷新
-        self.update()
 
     def _cancel_calculation(self):
         """取消计算"""
@@ -1833,7 +1274,7 @@ class DocumentStatsDialog(ctk.CTkToplevel):
                     f.write("-" * 30 + "\n")
                     f.write(f"有效行数: {self.code_stats.get('code_lines', 0):,}\n")
                     f.write(f"注释行数: {self.code_stats.get('comment_lines', 0):,}\n")
-                    f.write(f"空行数: {self.code_stats.get('empty_lines', 0):,}\n\n")
+                    f.write(f"空行数: {self.code_stats.get('blank_lines', 0):,}\n\n")
 
                     # 文档比例统计已移除 - 不再导出比例数据
 
@@ -1918,12 +1359,13 @@ def show_document_stats_dialog(parent):
     Args:
         parent: 父窗口
     """
-    # 获取当前文本内容
-    text_content = parent.text_area.get("1.0", "end-1c")
     file_path = parent.current_file_path
 
+    # 优先使用增量维护的统计结果, 统计失效时由对话框在后台重新统计
+    stats = parent.text_stats.get_stats() if parent.text_stats else None
+
     # 创建并显示对话框
-    dialog = DocumentStatsDialog(parent, text_content, file_path)
+    dialog = DocumentStatsDialog(parent, file_path=file_path, stats=stats)
 
     # 确保窗口获得焦点
     dialog.focus_set()
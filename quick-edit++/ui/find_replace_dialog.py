@@ -5,7 +5,6 @@
 查找替换对话框模块
 """
 
-from turtle import width
 from loguru import logger
 import customtkinter as ctk
 from config.config_manager import ConfigManager
@@ -8,21 +8,15 @@ import tkinter as tk
 """
 
 
-def create_insert_submenu(parent_menu, root, menu_font_tuple):
+def populate_insert_submenu(insert_submenu, root, menu_font_tuple):
     """
-    创建插入子菜单，包含所有插入功能
+    填充插入子菜单，包含所有插入功能
 
     参数:
-        parent_menu: 父菜单组件
+        insert_submenu: 要填充的空插入子菜单
         root: 主应用窗口实例
         menu_font_tuple: 菜单字体配置
-
-    返回:
-        配置好的插入子菜单
     """
-    # 创建插入子菜单
-    insert_submenu = tk.Menu(parent_menu, tearoff=0, font=menu_font_tuple)
-
     # 代码相关插入
     script_submenu = tk.Menu(insert_submenu, tearoff=0, font=menu_font_tuple)
     insert_submenu.add_cascade(label="代码", menu=script_submenu)
@@ -414,5 +408,3 @@ def create_insert_submenu(parent_menu, root, menu_font_tuple):
     uuid_submenu.add_command(
         label="UUID v1 (基于时间)", command=lambda: root.insert_uuid_v1()
     )
-
-    return insert_submenu
@@ -16,6 +16,13 @@ class LineNumberCanvas(ctk.CTkCanvas):
         **kwargs: 传递给CTkCanvas的其他参数
     """
 
+    # 影响行号栏背景色的配置项, 变更时自动更新主题
+    THEME_CONFIG_KEYS = (
+        "app.theme_mode",
+        "text_editor.line_number_bg_color",
+        "text_editor.line_number_bg_color_dark",
+    )
+
     def __init__(self, parent, text_widget=None, width=60, **kwargs):
         super().__init__(parent, width=width, **kwargs)
         self.parent = parent
@@ -23,25 +30,19 @@ class LineNumberCanvas(ctk.CTkCanvas):
         self.width = width
 
         # 获取文本框字体配置
-        text_editor_config = config_manager.get("text_editor", {})
-        font_family = text_editor_config.get("font", "Microsoft YaHei UI")
-        font_size = text_editor_config.get("font_size", 15)
+        text_editor_config = config_manager.get_component_config("text_editor")
+        font_family = text_editor_config.font
+        font_size = text_editor_config.font_size
 
         # 设置文本颜色
-        self.text_color = config_manager.get(
-            "text_editor.line_number_font_color", "#2b91af"
-        )
+        self.text_color = text_editor_config.line_number_font_color
 
         # 设置背景颜色 - 根据主题模式选择合适的颜色
-        theme_mode = config_manager.get("app.theme_mode", "light")
+        theme_mode = config_manager.get_component_config("app").theme_mode
         if theme_mode == "dark":
-            self.bg_color = config_manager.get(
-                "text_editor.line_number_bg_color_dark", "#2b2b2b"
-            )
+            self.bg_color = text_editor_config.line_number_bg_color_dark
         else:
-            self.bg_color = config_manager.get(
-                "text_editor.line_number_bg_color", "#cccccc"
-            )
+            self.bg_color = text_editor_config.line_number_bg_color
 
         # 配置Canvas样式 - 根据主题模式设置边框
         if theme_mode == "dark":
@@ -57,12 +58,24 @@ class LineNumberCanvas(ctk.CTkCanvas):
         self._cached_total_lines = None
         self._cached_line_number_width = width  # 初始化为传入的宽度
 
+        # 行号项池: 每个槽位为 (背景矩形ID, 文本ID), 重绘时复用, 不再删除重建
+        self._slots = []
+        self._slot_lines = []  # 每个槽位当前显示的行号, None表示隐藏
+        self._slot_positions = []  # 每个槽位当前的 (y坐标, 行高, 宽度)
+        self._item_slots = {}  # 画布项ID到槽位的映射, 用于点击定位
+        self._last_layout = None  # 上次绘制的布局, 用于跳过无变化的重绘
+        self._redraw_job = None  # 合并后的重绘任务
+
         # 使用统一的方法设置字体
         self.set_font(font_family, font_size)
 
         # 调用set_text_widget来设置文本组件并绑定事件
         self.set_text_widget(text_widget)
 
+        # 订阅主题相关配置, 不再由菜单在切换主题后手动刷新
+        for key_path in self.THEME_CONFIG_KEYS:
+            config_manager.subscribe(key_path, self._on_theme_config_changed)
+
         # 初始绘制示例行号
         self.parent.after(200, self.draw_line_numbers)
 
@@ -83,6 +96,12 @@ class LineNumberCanvas(ctk.CTkCanvas):
 
         # 清除缓存，强制重新计算行号宽度
         self._cached_total_lines = None
+        self.invalidate()
+
+        # 更新已创建的行号项的字体, 并让所有槽位在下次绘制时重新定位
+        for _, text_id in self._slots:
+            self.itemconfigure(text_id, font=self.line_number_font)
+        self._slot_positions = [None] * len(self._slots)
 
         # 重新绘制行号
         self.draw_line_numbers()
@@ -111,18 +130,15 @@ class LineNumberCanvas(ctk.CTkCanvas):
     def _on_line_number_click(self, event):
         """处理行号点击事件，选中对应的整行内容"""
         # 获取点击位置对应的行号
-        clicked_item = self.find_closest(event.x, event.y)[0]
-        tags = self.gettags(clicked_item)
+        closest = self.find_closest(event.x, event.y)
+        if not closest:
+            return
 
-        # 查找行号标签
+        # 通过画布项所在的槽位查找行号
         line_number = None
-        for tag in tags:
-            if tag.startswith("line_"):
-                try:
-                    line_number = int(tag.split("_")[1])
-                    break
-                except (ValueError, IndexError):
-                    continue
+        slot = self._item_slots.get(closest[0])
+        if slot is not None:
+            line_number = self._slot_lines[slot]
 
         # 如果找到了行号，选中对应的整行内容
         if line_number and self.text_widget:
@@ -139,42 +155,107 @@ class LineNumberCanvas(ctk.CTkCanvas):
 
     def _on_text_change(self, event=None):
         """文本内容变化时更新行号"""
-        self.draw_line_numbers()
+        self.request_redraw()
 
     def _on_scroll(self, event=None):
         """滚动时更新行号位置"""
+        self.request_redraw()
+
+    def request_redraw(self):
+        """
+        请求重绘行号
+
+        同一帧内的多次请求只会在空闲时执行一次绘制
+        """
+        if self._redraw_job is None:
+            self._redraw_job = self.after_idle(self._run_redraw)
+
+    def _run_redraw(self):
+        """执行合并后的重绘请求"""
+        self._redraw_job = None
         self.draw_line_numbers()
 
-    def draw_line_numbers(self):
+    def invalidate(self):
+        """清除布局缓存, 下次绘制时强制更新所有行号项"""
+        self._last_layout = None
+
+    def _get_visible_layout(self):
         """
-        绘制行号
+        获取可见区域的行号布局
+
+        Returns:
+            tuple: (总行数, 可见行布局元组), 可见行布局为 (行号, y坐标, 行高) 元组
         """
-        # 清除之前的行号和高亮矩形
-        self.delete("all")
+        # 获取总行数 (使用end-1c来正确获取最后一行)
+        last_line = self.text_widget.index("end-1c").split(".")[0]
+        total_lines = int(last_line)
+
+        # 获取可见区域的第一行和最后一行
+        first_visible = int(self.text_widget.index("@0,0").split(".")[0])
 
-        # 获取文本区域的行数
+        # 计算可见区域的最后一行，考虑文本框高度
         try:
-            # 获取总行数 (使用end-1c来正确获取最后一行)
-            last_line = self.text_widget.index("end-1c").split(".")[0]
-            total_lines = int(last_line)
+            # 获取文本框的高度
+            text_height = self.text_widget.winfo_height()
+            # 获取最后一行的索引
+            last_visible_index = self.text_widget.index(f"@0,{text_height}")
+            last_visible = int(last_visible_index.split(".")[0])
+        except:
+            # 如果计算失败，使用默认值
+            last_visible = first_visible + 50  # 默认显示50行
 
-            # 获取可见区域的第一行和最后一行
-            first_visible = int(self.text_widget.index("@0,0").split(".")[0])
+        # 确保范围有效
+        first_visible = max(1, first_visible)
+        last_visible = min(total_lines, last_visible)
 
-            # 计算可见区域的最后一行，考虑文本框高度
-            try:
-                # 获取文本框的高度
-                text_height = self.text_widget.winfo_height()
-                # 获取最后一行的索引
-                last_visible_index = self.text_widget.index(f"@0,{text_height}")
-                last_visible = int(last_visible_index.split(".")[0])
-            except:
-                # 如果计算失败，使用默认值
-                last_visible = first_visible + 50  # 默认显示50行
-
-            # 确保范围有效
-            first_visible = max(1, first_visible)
-            last_visible = min(total_lines, last_visible)
+        layout = []
+        for i in range(first_visible, last_visible + 1):
+            # 使用dlineinfo方法获取更准确的行位置信息
+            dlineinfo = self.text_widget.dlineinfo(f"{i}.0")
+
+            # 如果dlineinfo不可用, 跳过当前行
+            if not dlineinfo:
+                continue
+
+            layout.append((i, dlineinfo[1], dlineinfo[3]))
+
+        return total_lines, tuple(layout)
+
+    def _ensure_slots(self, count):
+        """
+        确保行号项池中至少有count个槽位
+
+        每个槽位包含一个透明背景矩形（同时作为点击区域）和一个行号文本项,
+        槽位只创建一次, 之后只通过coords和itemconfig更新
+        """
+        while len(self._slots) < count:
+            rect_id = self.create_rectangle(
+                0, 0, 0, 0, fill="", outline="", tags=("line_bg", "clickable")
+            )
+            text_id = self.create_text(
+                0,
+                0,
+                text="",
+                font=self.line_number_font,
+                fill=self.text_color,
+                anchor="e",  # 右对齐
+                tags=("line_number",),
+            )
+            self._slots.append((rect_id, text_id))
+            self._slot_lines.append(None)
+            self._slot_positions.append(None)
+            self._item_slots[rect_id] = len(self._slots) - 1
+            self._item_slots[text_id] = len(self._slots) - 1
+
+    def draw_line_numbers(self):
+        """
+        绘制行号
+
+        复用固定的行号项池, 只更新发生变化的槽位的坐标和文本;
+        首个可见行、行数和各行纵坐标都没有变化时直接跳过
+        """
+        try:
+            total_lines, layout = self._get_visible_layout()
 
             # 计算行号区域宽度 (根据行号位数动态调整宽度)
             # 只有当行数发生变化时才重新计算宽度
@@ -195,57 +276,52 @@ class LineNumberCanvas(ctk.CTkCanvas):
                 # 获取缓存的宽度
                 line_number_width = self._cached_line_number_width
 
-            # 绘制可见区域的行号
-            for i in range(first_visible, last_visible + 1):
-                # 使用dlineinfo方法获取更准确的行位置信息
-                dlineinfo = self.text_widget.dlineinfo(f"{i}.0")
+            # 布局未变化时无需重绘
+            current_layout = (total_lines, line_number_width, layout)
+            if current_layout == self._last_layout:
+                return
+            self._last_layout = current_layout
 
-                # 如果dlineinfo不可用, 跳过当前行
-                if not dlineinfo:
+            self._ensure_slots(len(layout))
+
+            for slot, (i, y_pos, line_height) in enumerate(layout):
+                rect_id, text_id = self._slots[slot]
+
+                # 行号与坐标都未变化的槽位跳过
+                position = (y_pos, line_height, line_number_width)
+                if (
+                    self._slot_lines[slot] == i
+                    and self._slot_positions[slot] == position
+                ):
                     continue
 
-                # 开始绘制
-                y_pos = dlineinfo[1]  # y坐标
-                line_height = dlineinfo[3]  # 行高
-
-                # 创建行号背景矩形（默认透明，鼠标悬浮时会使用悬浮颜色）
-                self.create_rectangle(
-                    0,
-                    y_pos,
-                    line_number_width,
-                    y_pos + line_height,
-                    fill="",
-                    outline="",
-                    tags=("line_bg", f"line_{i}"),
-                )
+                # 行号背景和点击区域（默认透明）
+                self.coords(rect_id, 0, y_pos, line_number_width, y_pos + line_height)
 
                 # 计算行号中心位置（垂直居中）
                 # 使用文本的基线位置来对齐行号，确保与文本行完全对齐
                 text_baseline = (
                     y_pos + line_height // 2 + 15
                 )  # 微调位置，使行号与文本对齐
-
-                # 在行号区域绘制行号
-                self.create_text(
-                    line_number_width - 5,
-                    text_baseline,  # x, y坐标，使用基线位置
-                    text=str(i),
-                    font=self.line_number_font,
-                    fill=self.text_color,
-                    anchor="e",  # 右对齐
-                    tags=("line_number", f"line_{i}"),
-                )
-
-                # 为行号添加可点击的透明矩形区域，扩大点击范围
-                self.create_rectangle(
-                    0,
-                    y_pos,
-                    line_number_width,
-                    y_pos + line_height,
-                    fill="",
-                    outline="",
-                    tags=("clickable", f"line_{i}"),
-                )
+                self.coords(text_id, line_number_width - 5, text_baseline)
+
+                if self._slot_lines[slot] is None:
+                    self.itemconfigure(rect_id, state="normal")
+                    self.itemconfigure(text_id, text=str(i), state="normal")
+                elif self._slot_lines[slot] != i:
+                    self.itemconfigure(text_id, text=str(i))
+
+                self._slot_lines[slot] = i
+                self._slot_positions[slot] = position
+
+            # 隐藏多余的槽位
+            for slot in range(len(layout), len(self._slots)):
+                if self._slot_lines[slot] is not None:
+                    rect_id, text_id = self._slots[slot]
+                    self.itemconfigure(rect_id, state="hidden")
+                    self.itemconfigure(text_id, state="hidden")
+                    self._slot_lines[slot] = None
+                    self._slot_positions[slot] = None
         except Exception as e:
             # 忽略错误, 保持程序稳定
             logger.error(f"Error in update_line_numbers: {e}")
@@ -257,6 +333,7 @@ class LineNumberCanvas(ctk.CTkCanvas):
             # 使用grid布局显示行号栏
             self.grid(row=0, column=0, sticky="nsw")
             # 显示时重新计算宽度以确保正确性
+            self.invalidate()
             self.draw_line_numbers()
         else:
             self.grid_forget()
@@ -275,6 +352,16 @@ class LineNumberCanvas(ctk.CTkCanvas):
         # 更新宽度缓存
         self._cached_line_number_width = new_width
 
+    def destroy(self):
+        """销毁行号栏, 并取消配置订阅"""
+        for key_path in self.THEME_CONFIG_KEYS:
+            config_manager.unsubscribe(key_path, self._on_theme_config_changed)
+        super().destroy()
+
+    def _on_theme_config_changed(self, key_path, value):
+        """主题相关配置变更回调"""
+        self.update_theme()
+
     def update_theme(self):
         """
         更新行号栏主题，根据当前主题模式设置合适的背景色
@@ -282,17 +369,14 @@ class LineNumberCanvas(ctk.CTkCanvas):
         当应用程序主题模式改变时调用此方法，以更新行号栏的背景色
         """
         # 获取当前主题模式
-        theme_mode = config_manager.get("app.theme_mode", "light")
+        theme_mode = config_manager.get_component_config("app").theme_mode
 
         # 根据主题模式选择背景色
+        text_editor_config = config_manager.get_component_config("text_editor")
         if theme_mode == "dark":
-            new_bg_color = config_manager.get(
-                "text_editor.line_number_bg_color_dark", "#2b2b2b"
-            )
+            new_bg_color = text_editor_config.line_number_bg_color_dark
         else:
-            new_bg_color = config_manager.get(
-                "text_editor.line_number_bg_color", "#cccccc"
-            )
+            new_bg_color = text_editor_config.line_number_bg_color
 
         # 如果背景色发生变化，更新背景色并重绘
         if new_bg_color != self.bg_color:
@@ -311,4 +395,5 @@ class LineNumberCanvas(ctk.CTkCanvas):
                 )
 
             # 重绘行号以应用新的背景色
+            self.invalidate()
             self.draw_line_numbers()
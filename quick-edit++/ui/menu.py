@@ -22,9 +22,10 @@ from ui.color_picker import show_color_picker
 from config.config_manager import config_manager
 from ui.utils import get_supported_encodings
 from tkinter import messagebox, filedialog
-from ui.insert_submenu import create_insert_submenu
+from ui.insert_submenu import populate_insert_submenu
 from ui.selected_text_submenu import create_selected_text_submenu
 from ui.notification import NotificationPosition
+from app.startup_profiler import startup_profiler
 
 
 def create_encoding_submenu(parent_menu, root, show_common_only=False, font_tuple=None):
@@ -114,6 +115,31 @@ def create_encoding_submenu(parent_menu, root, show_common_only=False, font_tupl
             )
 
 
+def create_lazy_submenu(parent_menu, name, populate, font_tuple=None):
+    """
+    创建首次展开时才填充菜单项的子菜单, 减少启动时创建的菜单项
+
+    Args:
+        parent_menu: 父菜单组件
+        name (str): 子菜单名称, 用于启动跟踪
+        populate (callable): 填充函数, 参数为空的子菜单
+        font_tuple (tuple, optional): 菜单字体元组
+
+    Returns:
+        tk.Menu: 子菜单
+    """
+    submenu = tk.Menu(parent_menu, tearoff=0, font=font_tuple)
+
+    def on_post():
+        # 只填充一次, 之后展开时不再回调
+        submenu.configure(postcommand="")
+        with startup_profiler.lazy(name):
+            populate(submenu)
+
+    submenu.configure(postcommand=on_post)
+    return submenu
+
+
 def create_menu(root):
     """创建菜单栏"""
     # 从配置管理器获取菜单字体设置
@@ -330,17 +356,22 @@ def create_menu(root):
     )
     edit_menu.add_cascade(label="复制到剪贴板", menu=copy_to_clipboard_submenu)
 
-    # 创建选中文本操作子菜单
-    selected_text_submenu = tk.Menu(main_menu, tearoff=0, font=menu_font_tuple)
-    edit_menu.add_cascade(
-        label="选中文本操作",
-        menu=create_selected_text_submenu(
-            selected_text_submenu, root, menu_font_tuple, True
-        ),
+    # 创建选中文本操作子菜单, 菜单项较多, 首次展开时再创建
+    selected_text_submenu = create_lazy_submenu(
+        main_menu,
+        "选中文本操作子菜单",
+        lambda menu: create_selected_text_submenu(menu, root, menu_font_tuple),
+        menu_font_tuple,
     )
+    edit_menu.add_cascade(label="选中文本操作", menu=selected_text_submenu)
 
-    # 创建插入子菜单
-    insert_submenu = create_insert_submenu(edit_menu, root, menu_font_tuple)
+    # 创建插入子菜单, 首次展开时再创建
+    insert_submenu = create_lazy_submenu(
+        edit_menu,
+        "插入子菜单",
+        lambda menu: populate_insert_submenu(menu, root, menu_font_tuple),
+        menu_font_tuple,
+    )
     edit_menu.add_cascade(label="插入", menu=insert_submenu)
 
     # 分隔符
@@ -862,23 +893,26 @@ def create_menu(root):
     # 将设置菜单添加到主菜单
     main_menu.add_cascade(label="设置", menu=settings_menu)
 
-    # 创建工具菜单
-    tools_menu = tk.Menu(main_menu, tearoff=0, font=menu_font_tuple)
+    # 创建工具菜单, 首次展开时再创建
+    def populate_tools_menu(tools_menu):
+        # 创建格式化子菜单
+        create_formatting_submenu(tools_menu, root, menu_font_tuple)
 
-    # 创建格式化子菜单
-    create_formatting_submenu(tools_menu, root, menu_font_tuple)
+        # 创建编码解码子菜单
+        create_encoding_decoding_submenu(tools_menu, root, menu_font_tuple)
 
-    # 创建编码解码子菜单
-    create_encoding_decoding_submenu(tools_menu, root, menu_font_tuple)
+        # 添加分隔符
+        tools_menu.add_separator()
 
-    # 添加分隔符
-    tools_menu.add_separator()
+        # 添加颜色选择器选项
+        tools_menu.add_command(
+            label="颜色选择器",
+            command=lambda: show_color_picker(root),
+            font=menu_font_tuple,
+        )
 
-    # 添加颜色选择器选项
-    tools_menu.add_command(
-        label="颜色选择器",
-        command=lambda: show_color_picker(root),
-        font=menu_font_tuple,
+    tools_menu = create_lazy_submenu(
+        main_menu, "工具菜单", populate_tools_menu, menu_font_tuple
     )
 
     # 将工具菜单添加到主菜单
@@ -1090,15 +1124,9 @@ def set_theme_mode(mode, root=None):
     mode_text = {"light": "浅色模式", "dark": "深色模式", "system": "跟随系统"}
     mode_name = mode_text.get(mode, mode)
 
-    # 更新行高亮颜色
+    # 更新行高亮颜色, 行号栏订阅了主题配置, 会自行更新
     root.after(60, lambda: root._setup_line_highlight(full_init=False))
 
-    # 更新行号栏
-    root.after(100, lambda: root.line_number_canvas.draw_line_numbers())
-
-    # 更新行号栏主题
-    root.after(120, lambda: root.line_number_canvas.update_theme())
-
     # 显示通知
     # messagebox.showinfo(
     #     "提示",
@@ -1256,13 +1284,10 @@ def toggle_syntax_highlight(root, switch_state=True):
         # 应用当前状态（不翻转）
         new_state = root.syntax_highlight_var.get()
 
-    # 保存配置到配置管理器
+    # 保存配置到配置管理器, 语法高亮管理器订阅了该配置, 会自行启用或禁用高亮
     config_manager.set("syntax_highlighter.enabled", new_state)
     config_manager.save_config()
 
-    # 应用设置到语法高亮管理器
-    root.syntax_highlighter.set_enabled(new_state, root.current_file_path)
-
     # 更新文件信息
     root.status_bar.update_file_info()
 
@@ -1280,17 +1305,10 @@ def set_syntax_highlight_mode(mode: bool, root):
         mode (bool): 渲染模式，可选值: True, False
         root: 主窗口实例，用于访问语法高亮管理器
     """
-    # 保存配置到配置管理器
+    # 保存配置到配置管理器, 语法高亮管理器订阅了该配置, 会自行切换模式并重新高亮
     config_manager.set("syntax_highlighter.render_visible_only", mode)
     config_manager.save_config()
 
-    # 应用设置到语法高亮管理器
-    root.syntax_highlighter.set_render_mode(mode)
-
-    # 应用到当前打开的文件
-    if root.current_file_path:
-        root.syntax_highlighter.apply_highlighting(root.current_file_path)
-
     # 显示通知
     mode_text = "渲染可见行" if mode else "渲染全部"
     # messagebox.showinfo("提示", f"语法高亮模式已设置为: {mode_text}, 请重启应用以生效")
@@ -31,6 +31,15 @@ def create_formatting_submenu(parent_menu, root, menu_font_tuple):
     # 添加JSON菜单项
     json_submenu.add_command(label="格式化JSON", command=lambda: root.format_json())
     json_submenu.add_command(label="压缩JSON", command=lambda: root.compress_json())
+    json_submenu.add_separator()
+    json_submenu.add_command(
+        label="格式化JSON到文件...",
+        command=lambda: root.export_formatted_selection("json"),
+    )
+    json_submenu.add_command(
+        label="压缩JSON到文件...",
+        command=lambda: root.export_formatted_selection("json", compress=True),
+    )
 
     # 创建CSV格式化子菜单
     csv_submenu = tk.Menu(formatting_submenu, tearoff=0, font=menu_font_tuple)
@@ -41,6 +50,15 @@ def create_formatting_submenu(parent_menu, root, menu_font_tuple):
     csv_submenu.add_command(
         label="压缩CSV", command=lambda: root.format_csv(compress=True)
     )
+    csv_submenu.add_separator()
+    csv_submenu.add_command(
+        label="格式化CSV到文件...",
+        command=lambda: root.export_formatted_selection("csv"),
+    )
+    csv_submenu.add_command(
+        label="压缩CSV到文件...",
+        command=lambda: root.export_formatted_selection("csv", compress=True),
+    )
 
     # 创建SQL格式化子菜单
     sql_submenu = tk.Menu(formatting_submenu, tearoff=0, font=menu_font_tuple)
@@ -85,6 +103,10 @@ def create_formatting_submenu(parent_menu, root, menu_font_tuple):
 
     # 添加其他格式化菜单项
     formatting_submenu.add_command(label="格式化XML", command=lambda: root.format_xml())
+    formatting_submenu.add_command(
+        label="格式化XML到文件...",
+        command=lambda: root.export_formatted_selection("xml"),
+    )
     formatting_submenu.add_command(label="格式化INI", command=lambda: root.format_ini())
     formatting_submenu.add_command(
         label="格式化TOML", command=lambda: root.format_toml()
@@ -361,6 +383,13 @@ def create_selected_text_submenu(
     line_processing_submenu.add_command(
         label="合并重复行", command=lambda: root.merge_duplicate_lines()
     )
+    line_processing_submenu.add_command(
+        label="忽略大小写移除重复行",
+        command=lambda: root.remove_duplicate_lines_ignore_case(),
+    )
+    line_processing_submenu.add_command(
+        label="统计重复行", command=lambda: root.count_duplicate_lines()
+    )
 
     # 添加分隔符
     line_processing_submenu.add_separator()
@@ -376,6 +405,19 @@ def create_selected_text_submenu(
     sort_submenu.add_command(
         label="降序排序", command=lambda: root.sort_lines_descending()
     )
+    sort_submenu.add_command(
+        label="忽略大小写排序", command=lambda: root.sort_lines_ignore_case()
+    )
+    sort_submenu.add_separator()
+    sort_submenu.add_command(
+        label="自然排序", command=lambda: root.sort_lines_natural()
+    )
+    sort_submenu.add_command(
+        label="数值排序", command=lambda: root.sort_lines_numeric()
+    )
+    sort_submenu.add_command(
+        label="区域设置排序", command=lambda: root.sort_lines_locale()
+    )
 
     # 创建反转子菜单
     reverse_submenu = tk.Menu(line_processing_submenu, tearoff=0, font=menu_font_tuple)
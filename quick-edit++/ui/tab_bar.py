@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+标签栏界面模块
+每个打开的文档对应一个标签, 点击标签切换文档, 点击关闭按钮或鼠标中键关闭文档
+"""
+
+import customtkinter as ctk
+from customtkinter import ThemeManager
+from config.config_manager import config_manager
+from ui.utils import truncate_string
+
+
+class TabBar(ctk.CTkFrame):
+    """标签栏类"""
+
+    def __init__(self, parent):
+        """
+        初始化标签栏
+
+        Args:
+            parent: 编辑器实例, 标签按钮调用其切换和关闭文档的方法
+        """
+        super().__init__(parent, height=32, corner_radius=0)
+
+        # 保存对父窗口的引用
+        self.parent = parent
+
+        # 获取标签栏配置
+        tab_config = config_manager.get_component_config("tab_bar")
+        self.max_title_length = tab_config.max_title_length
+        font_config = config_manager.get_font_config("tab_bar")
+        self.tab_font = (
+            font_config.get("font", "Microsoft YaHei UI"),
+            font_config.get("font_size", 12),
+            "bold" if font_config.get("font_bold", False) else "normal",
+        )
+
+        # 文档 -> (标签框架, 标题按钮, 关闭按钮, 当前显示的标题)
+        self._tabs = {}
+
+    def refresh(self):
+        """按文档列表重建标签的顺序, 并更新所有标签的标题和选中状态"""
+        documents = self.parent.documents
+        if documents is None:
+            return
+
+        # 删除已关闭文档的标签
+        for document in list(self._tabs):
+            if document not in documents:
+                self._tabs.pop(document)[0].destroy()
+
+        for column, document in enumerate(documents):
+            if document not in self._tabs:
+                self._create_tab(document)
+            self._tabs[document][0].grid(row=0, column=column, padx=(0, 2), pady=2)
+            self._update_tab(document)
+
+    def refresh_active(self):
+        """只更新当前文档标签的标题, 用于文件名或修改状态变化之后"""
+        documents = self.parent.documents
+        if documents is not None and documents.active in self._tabs:
+            self._update_tab(documents.active)
+
+    def _create_tab(self, document):
+        """创建文档对应的标签"""
+        frame = ctk.CTkFrame(self, corner_radius=6, fg_color="transparent")
+
+        title_button = ctk.CTkButton(
+            frame,
+            text="",
+            width=60,
+            height=26,
+            font=self.tab_font,
+            command=lambda: self.parent.switch_document(document),
+        )
+        title_button.pack(side="left")
+
+        close_button = ctk.CTkButton(
+            frame,
+            text="×",
+            width=22,
+            height=26,
+            font=self.tab_font,
+            fg_color="transparent",
+            text_color=ThemeManager.theme["CTkLabel"]["text_color"],
+            command=lambda: self.parent.close_document(document),
+        )
+        close_button.pack(side="left")
+
+        # 鼠标中键关闭标签
+        for widget in (frame, title_button, close_button):
+            widget.bind("<Button-2>", lambda e: self.parent.close_document(document))
+
+        self._tabs[document] = [frame, title_button, close_button, None]
+
+    def _update_tab(self, document):
+        """更新标签的标题和选中状态"""
+        tab = self._tabs[document]
+        documents = self.parent.documents
+
+        prefix = "*" if documents.is_modified(document) else ""
+        title = prefix + truncate_string(
+            documents.title_of(document), self.max_title_length
+        )
+        active = document is documents.active
+        state = (title, active)
+
+        # 标题和选中状态都没有变化时不重复配置, 避免按键时重绘标签
+        if tab[3] == state:
+            return
+        tab[3] = state
+
+        if active:
+            tab[1].configure(
+                text=title,
+                fg_color=ThemeManager.theme["CTkButton"]["fg_color"],
+                text_color=ThemeManager.theme["CTkButton"]["text_color"],
+            )
+        else:
+            tab[1].configure(
+                text=title,
+                fg_color="transparent",
+                text_color=ThemeManager.theme["CTkLabel"]["text_color"],
+            )
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文本转换进度对话框模块
+在后台转换大段选中文本时显示进度, 并提供取消按钮
+"""
+
+import customtkinter as ctk
+
+
+class TransformProgressDialog(ctk.CTkToplevel):
+    """文本转换进度对话框类"""
+
+    def __init__(self, parent, operation_name, on_cancel=None):
+        """
+        初始化进度对话框
+
+        Args:
+            parent: 父窗口
+            operation_name (str): 操作名称, 显示在标题中
+            on_cancel (callable, optional): 点击取消按钮或关闭窗口时的回调
+        """
+        super().__init__(parent)
+
+        self.on_cancel = on_cancel
+
+        # 设置对话框属性
+        self.title(operation_name)
+        self.resizable(False, False)
+
+        # 设置为模态对话框, 转换期间禁止编辑文本
+        self.transient(parent)
+        self.grab_set()
+
+        # 居中显示
+        self.master.center_window(self, 420, 160)
+
+        font = ctk.CTkFont(family="Microsoft YaHei UI", size=15)
+
+        # 阶段说明
+        self.stage_label = ctk.CTkLabel(
+            self, text=f"正在{operation_name}...", font=font
+        )
+        self.stage_label.pack(padx=20, pady=(20, 10), fill="x")
+
+        # 默认使用不确定模式的进度条, 转换函数报告进度后切换为确定模式
+        self.progress_bar = ctk.CTkProgressBar(self, mode="indeterminate")
+        self.progress_bar.pack(padx=20, pady=5, fill="x")
+        self.progress_bar.start()
+        self._determinate = False
+
+        # 取消按钮
+        self.cancel_button = ctk.CTkButton(
+            self, text="取消", font=font, width=100, command=self._on_cancel
+        )
+        self.cancel_button.pack(pady=(10, 20))
+
+        # 关闭窗口和ESC键等同于取消
+        self.protocol("WM_DELETE_WINDOW", self._on_cancel)
+        self.bind("<Escape>", lambda e: self._on_cancel())
+
+    def set_stage(self, text):
+        """
+        更新阶段说明
+
+        Args:
+            text (str): 阶段说明文本
+        """
+        if self.stage_label.cget("text") != text:
+            self.stage_label.configure(text=text)
+
+    def set_progress(self, fraction):
+        """
+        更新进度条
+
+        Args:
+            fraction (float): 完成比例, 范围0到1, 为None时显示不确定进度
+        """
+        if fraction is None:
+            if self._determinate:
+                self.progress_bar.configure(mode="indeterminate")
+                self.progress_bar.start()
+                self._determinate = False
+            return
+
+        if not self._determinate:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+            self._determinate = True
+        self.progress_bar.set(fraction)
+
+    def close(self):
+        """停止进度条并关闭对话框"""
+        self.progress_bar.stop()
+        self.grab_release()
+        self.destroy()
+
+    def _on_cancel(self):
+        """取消转换并关闭对话框"""
+        if self.on_cancel:
+            self.on_cancel()
+        self.close()
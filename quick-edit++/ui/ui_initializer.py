@@ -12,8 +12,10 @@ from config.config_manager import config_manager
 from ui.menu import create_menu
 from ui.toolbar import Toolbar
 from ui.status_bar import StatusBar
+from ui.tab_bar import TabBar
 from ui.line_number_canvas import LineNumberCanvas
 from ui.notification import Notification, NotificationPosition
+from app.startup_profiler import startup_profiler
 
 
 class UIInitializer:
@@ -67,7 +69,7 @@ class UIInitializer:
         """初始化窗口布局和工具栏/状态栏"""
         # 配置主窗口的网格布局
         self.app.grid_columnconfigure(0, weight=1)
-        self.app.grid_rowconfigure(1, weight=1)  # 文本区域所在行可扩展
+        self.app.grid_rowconfigure(2, weight=1)  # 文本区域所在行可扩展
 
         # 防止窗口大小变化时的重新计算，减少闪烁
         self.app.grid_propagate(False)
@@ -81,16 +83,21 @@ class UIInitializer:
             self.app.toolbar = Toolbar(self.app)
             # 不调用grid，因此工具栏不会显示
 
+        # 创建文档标签栏, 放置在工具栏和文本区域之间
+        self.app.tab_bar = TabBar(self.app)
+        if config_manager.get("tab_bar.show_tab_bar", True):
+            self.app.tab_bar.grid(row=1, column=0, sticky="ew")
+
         # 创建状态栏并放置在主窗口底部，传入APP实例
         self.app.status_bar = StatusBar(self.app)
         if config_manager.get("status_bar.show_status_bar", True):
-            self.app.status_bar.grid(row=2, column=0, sticky="ew")
+            self.app.status_bar.grid(row=3, column=0, sticky="ew")
 
     def init_text_editor(self):
         """初始化文本编辑区域及相关组件"""
         # 创建文本编辑区域框架
         self.app.text_frame = ctk.CTkFrame(self.app)
-        self.app.text_frame.grid(row=1, column=0, sticky="nsew")
+        self.app.text_frame.grid(row=2, column=0, sticky="nsew")
         # 设置网格权重，确保子组件能够正确填充
         self.app.text_frame.grid_columnconfigure(1, weight=1)  # 文本区域列可扩展
         self.app.text_frame.grid_columnconfigure(0, weight=0)  # 行号列固定
@@ -104,10 +111,9 @@ class UIInitializer:
         self.app.text_area = ctk.CTkTextbox(
             self.app.text_frame,  # 父容器
             wrap=wrap_mode,  # 换行模式
-            undo=True,  # 启用撤销功能
+            undo=False,  # 撤销由应用程序的撤销日志实现
             font=self.app.current_font,  # 字体设置
             border_spacing=5,  # 边框间距
-            maxundo=config_manager.get("text_editor.max_undo", 50),  # 最大撤销次数
             spacing1=5,  # 第一行上方的额外间距
             spacing2=3,  # 行之间的额外间距
             activate_scrollbars=True,  # 启用内置滚动条
@@ -213,11 +219,15 @@ class UIInitializer:
 
     def initialize_ui(self):
         """执行完整的UI初始化流程"""
-        # 按顺序执行UI初始化步骤
-        self.init_theme_and_window()
-        self.init_layout_and_bars()
-        self.init_text_editor()
-        self.init_menu_and_notification()
+        # 按顺序执行UI初始化步骤, 每一步都计入启动跟踪
+        with startup_profiler.phase("主题和窗口"):
+            self.init_theme_and_window()
+        with startup_profiler.phase("布局、工具栏和状态栏"):
+            self.init_layout_and_bars()
+        with startup_profiler.phase("文本编辑区"):
+            self.init_text_editor()
+        with startup_profiler.phase("菜单栏和通知"):
+            self.init_menu_and_notification()
 
         # 初始化后300ms绘制行号
         self.app.after(300, self.app.line_number_canvas.draw_line_numbers)